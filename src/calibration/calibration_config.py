@@ -214,7 +214,8 @@ class CalibrationConfig:
                 'imagenes_left': data['left_camera'].get('num_images', 'N/A'),
                 'imagenes_right': data['right_camera'].get('num_images', 'N/A'),
                 'tiene_estereo': 'stereo' in data and data['stereo'] is not None,
-                'tiene_depth_correction': 'depth_correction' in data and data['depth_correction'] is not None
+                'tiene_depth_correction': 'depth_correction' in data and data['depth_correction'] is not None,
+                'tiene_keyboard_plane': bool(data.get('keyboard_plane'))
             }
             
             if summary['tiene_estereo']:
@@ -225,6 +226,8 @@ class CalibrationConfig:
             if summary['tiene_depth_correction']:
                 summary['depth_correction_factor'] = data['depth_correction'].get('factor', 'N/A')
                 summary['depth_correction_samples'] = data['depth_correction'].get('num_samples', 'N/A')
+                model = data['depth_correction'].get('model')
+                summary['depth_correction_degree'] = model['degree'] if model else 0
             
             return summary
             
@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 Calibrador de Profundidad - Fase 3
-Calcula el factor de corrección de profundidad específico del sistema
+Calcula la corrección de profundidad específica del sistema: un factor de
+Z que varía con la posición (polinomio en x, y, z; ver DepthCorrection)
 """
 
 import cv2
@@ -10,12 +11,15 @@ import numpy as np
 import json
 from pathlib import Path
 from .calibration_config import CalibrationConfig
+from src.vision.depth_correction import DepthCorrection
+from src.vision.hand_landmarks import FINGER_TIP_IDS, INDEX_TIP_ID
 
 
 class DepthCalibrator:
     """
-    Calibrador para determinar el factor de corrección de profundidad
-    Mide a distancias conocidas y calcula el factor óptimo
+    Calibrador para determinar la corrección de profundidad
+    Mide a distancias conocidas en varias posiciones del campo de visión y
+    ajusta el factor de Z en función de la posición
     """
     
     def __init__(self, depth_estimator, width=1280, height=720):
@@ -32,20 +36,25 @@ class DepthCalibrator:
         # Distancias de referencia para medir (en cm)
         # Ajustadas a un rango más cercano y práctico
         self.reference_distances = [25, 30, 35, 40]
+        # Posiciones a medir en cada distancia (la corrección varía en x, y)
+        self.reference_positions = ['centro', 'izquierda', 'derecha',
+                                    'arriba', 'abajo']
         
         # Resultados de mediciones
         self.measurements = []  # [(distancia_real, distancia_medida), ...]
+        self.samples = []       # [(X, Y, Z) medido sin corregir, ...]
         
-        # Factor calculado
+        # Factor calculado (medio) y modelo espacial
         self.correction_factor = 1.0
+        self.correction = DepthCorrection.constant(1.0)
         
     def run_depth_calibration(self, cam_left, cam_right, hand_detector_left, hand_detector_right):
         """
         Ejecuta el proceso de calibración de profundidad
         
         Args:
-            cam_left: VideoThread de cámara izquierda
-            cam_right: VideoThread de cámara derecha
+            cam_left: VideoThread (o ReplayVideoThread) de cámara izquierda
+            cam_right: VideoThread (o ReplayVideoThread) de cámara derecha
             hand_detector_left: HandDetector para cámara izquierda
             hand_detector_right: HandDetector para cámara derecha
         
@@ -62,7 +71,8 @@ class DepthCalibrator:
         print("  1. Coloca tu DEDO ÍNDICE sobre una superficie plana")
         print("  2. Mide la distancia REAL con una regla (desde cámara a dedo)")
         print("  3. Mantén el dedo quieto y presiona ESPACIO para capturar")
-        print("  4. Repite para diferentes distancias")
+        print("  4. Repite en cada posición indicada (centro, izquierda,")
+        print("     derecha, arriba, abajo) y para cada distancia")
         print("\nDistancias a medir: 25cm, 30cm, 35cm, 40cm")
         print("\nPresiona ESPACIO en la ventana para comenzar cada medición")
         print("="*70 + "\n")
@@ -106,27 +116,30 @@ class DepthCalibrator:
                 return None
         
         print("[DEBUG] Iniciando bucle principal de mediciones...")
-        current_distance_idx = 0
+        current_step = 0
+        total_steps = len(self.reference_distances) * len(self.reference_positions)
         captured_measurements = []
+        captured_samples = []
         
         try:
-            print(f"[DEBUG] Objetivo: capturar {len(self.reference_distances)} mediciones")
-            while current_distance_idx < len(self.reference_distances):
+            print(f"[DEBUG] Objetivo: capturar {total_steps} mediciones")
+            while current_step < total_steps:
                 # Leer frames de ambas cámaras
-                _, frame_left = cam_left.next(black=False, wait=1)
-                _, frame_right = cam_right.next(black=False, wait=1)
+                finished_left, frame_left = cam_left.next(black=False, wait=1)
+                finished_right, frame_right = cam_right.next(black=False, wait=1)
+                
+                if finished_left or finished_right:
+                    # fuente agotada (p. ej. sesión grabada reproducida)
+                    print("[DEBUG] Fin del video, saliendo del bucle")
+                    break
                 
                 if frame_left is None or frame_right is None:
                     print("[DEBUG] Frame None detectado, continuando...")
                     continue
                 
-                # Detectar manos
-                hand_detector_left.findHands(frame_left)
-                hand_detector_right.findHands(frame_right)
-                
-                # Obtener resultados
-                results_left = hand_detector_left.results
-                results_right = hand_detector_right.results
+                # Detectar manos (yemas en píxeles, cualquier backend)
+                detection_left = hand_detector_left.detect(frame_left)
+                detection_right = hand_detector_right.detect(frame_right)
                 
                 # Dibujar detecciones
                 hand_detector_left.drawHands(frame_left)
@@ -134,30 +147,18 @@ class DepthCalibrator:
                 
                 # Calcular profundidad si ambas manos detectadas
                 depth_z = None
-                if results_left.multi_hand_landmarks and results_right.multi_hand_landmarks:
-                    # Obtener índice de ambas cámaras (landmark 8)
-                    landmarks_left = results_left.multi_hand_landmarks[0].landmark
-                    landmarks_right = results_right.multi_hand_landmarks[0].landmark
-                    
-                    index_left = landmarks_left[8]
-                    index_right = landmarks_right[8]
-                    
-                    # Convertir a coordenadas de píxel
-                    x_left = index_left.x * self.width
-                    y_left = index_left.y * self.height
-                    x_right = index_right.x * self.width
-                    y_right = index_right.y * self.height
-                    
-                    # Triangular sin corrección (usar factor 1.0 temporalmente)
-                    original_factor = self.depth_estimator.DEPTH_CORRECTION_FACTOR
-                    self.depth_estimator.DEPTH_CORRECTION_FACTOR = 1.0
+                point_3d = None
+                if len(detection_left) and len(detection_right):
+                    # Índice de la primera mano de ambas cámaras
+                    index = FINGER_TIP_IDS.index(INDEX_TIP_ID)
+                    x_left, y_left = detection_left.tips[0, index]
+                    x_right, y_right = detection_right.tips[0, index]
                     
+                    # Triangular sin corrección
                     point_3d = self.depth_estimator.triangulate_point_DLT(
-                        (x_left, y_left), (x_right, y_right)
+                        (x_left, y_left), (x_right, y_right), correct=False
                     )
                     
-                    self.depth_estimator.DEPTH_CORRECTION_FACTOR = original_factor
-                    
                     if point_3d is not None:
                         depth_z = point_3d[2]  # Profundidad sin corrección
                 
@@ -165,13 +166,16 @@ class DepthCalibrator:
                 combined = np.concatenate((frame_left, frame_right), axis=1)
                 
                 # Dibujar UI
-                target_distance = self.reference_distances[current_distance_idx]
+                distance_idx, position_idx = divmod(current_step, len(self.reference_positions))
+                target_distance = self.reference_distances[distance_idx]
+                target_position = self.reference_positions[position_idx]
                 combined = self._draw_calibration_ui(
                     combined, 
                     target_distance, 
                     depth_z,
-                    current_distance_idx + 1,
-                    len(self.reference_distances)
+                    current_step + 1,
+                    total_steps,
+                    target_position
                 )
                 
                 cv2.imshow(window_name, combined)
@@ -181,11 +185,12 @@ class DepthCalibrator:
                 if key == 32:  # ESPACIO - Capturar medición
                     if depth_z is not None:
                         captured_measurements.append((target_distance, depth_z))
-                        print(f"✓ Medición {current_distance_idx + 1}/{len(self.reference_distances)}: "
+                        captured_samples.append(tuple(point_3d))
+                        print(f"✓ Medición {current_step + 1}/{total_steps} ({target_position}): "
                               f"{target_distance}cm real → {depth_z:.2f}cm medido")
-                        current_distance_idx += 1
+                        current_step += 1
                         
-                        if current_distance_idx >= len(self.reference_distances):
+                        if current_step >= total_steps:
                             print("[DEBUG] Todas las mediciones completadas, saliendo del bucle")
                             break
                     else:
@@ -213,7 +218,9 @@ class DepthCalibrator:
         # Calcular factor de corrección
         if len(captured_measurements) >= 3:
             self.measurements = captured_measurements
+            self.samples = captured_samples
             self.correction_factor = self._calculate_correction_factor()
+            self.correction = self._fit_correction_model()
             
             print("\n" + "="*70)
             print("RESULTADOS DE CALIBRACIÓN DE PROFUNDIDAD")
@@ -226,7 +233,13 @@ class DepthCalibrator:
                 print(f"  {real:5.1f}cm real → {measured:6.2f}cm medido | Error: {error:+6.2f}cm ({error_pct:+5.1f}%)")
             
             print(f"\n✓ FACTOR DE CORRECCIÓN CALCULADO: {self.correction_factor:.4f}")
-            print(f"  Este factor se aplicará a todas las mediciones de profundidad")
+            real = np.array([m[0] for m in self.measurements])
+            corrected = self.correction.apply(np.array(self.samples))[:, 2]
+            single = self.correction_factor * np.array([m[1] for m in self.measurements])
+            print(f"  Modelo espacial de grado {self.correction.degree}: "
+                  f"error medio {np.mean(np.abs(corrected - real)):.2f}cm "
+                  f"(factor único: {np.mean(np.abs(single - real)):.2f}cm)")
+            print(f"  Esta corrección se aplicará a todas las mediciones de profundidad")
             print("="*70 + "\n")
             
             # Guardar en calibración
@@ -263,6 +276,19 @@ class DepthCalibrator:
         
         return factor
     
+    def _fit_correction_model(self):
+        """
+        Ajusta la corrección espacial (polinomio en x, y, z) a las muestras
+        
+        Returns:
+            DepthCorrection: Modelo ajustado (grado 0 = factor único si hay
+            pocas muestras)
+        """
+        if not self.samples:
+            return DepthCorrection.constant(self.correction_factor)
+        real_distances = [m[0] for m in self.measurements]
+        return DepthCorrection.fit(self.samples, real_distances)
+    
     def _save_correction_factor(self):
         """Guarda el factor de corrección en el archivo de calibración"""
         try:
@@ -275,9 +301,12 @@ class DepthCalibrator:
             # Agregar sección de profundidad (Fase 3)
             calib_data['depth_correction'] = {
                 'factor': self.correction_factor,
+                'model': self.correction.to_dict(),
                 'measurements': [
-                    {'real_cm': real, 'measured_cm': measured}
-                    for real, measured in self.measurements
+                    {'real_cm': real, 'measured_cm': measured,
+                     'measured_xyz_cm': [float(v) for v in xyz]}
+                    for (real, measured), xyz in zip(self.measurements,
+                                                     self.samples)
                 ],
                 'num_samples': len(self.measurements)
             }
@@ -291,7 +320,8 @@ class DepthCalibrator:
         except Exception as e:
             print(f"⚠ Error al guardar factor de corrección: {e}")
     
-    def _draw_calibration_ui(self, frame, target_distance, measured_depth, step, total_steps):
+    def _draw_calibration_ui(self, frame, target_distance, measured_depth, step, total_steps,
+                             target_position='centro'):
         """Dibuja la interfaz de calibración de profundidad"""
         overlay = frame.copy()
         h, w = frame.shape[:2]
@@ -306,7 +336,7 @@ class DepthCalibrator:
                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 255), 2)
         
         # Instrucción
-        instruction = f"Coloca tu dedo a {target_distance}cm de la camara"
+        instruction = f"Coloca tu dedo a {target_distance}cm de la camara ({target_position})"
         cv2.putText(frame, instruction, (20, 80),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
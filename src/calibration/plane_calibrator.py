@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calibrador del Plano del Teclado
+Ajusta la superficie donde se toca el teclado como un plano 3D a partir de
+yemas apoyadas sobre ella o de un tablero de ajedrez colocado encima
+"""
+
+import cv2
+import numpy as np
+import json
+from .calibration_config import CalibrationConfig
+from .camera_calibrator import CameraCalibrator
+from src.vision.hand_landmarks import FINGER_TIP_IDS, INDEX_TIP_ID
+from src.vision.keyboard_plane import KeyboardPlane
+
+
+class KeyboardPlaneCalibrator:
+    """
+    Calibrador del plano del teclado
+    Triangula puntos sobre la superficie y ajusta el plano; la profundidad
+    de presión pasa a ser la distancia de cada yema a ese plano
+    """
+
+    def __init__(self, depth_estimator, width=1280, height=720, board_size=None):
+        """
+        Args:
+            depth_estimator: Instancia de DepthEstimator ya calibrado (Fase 1+2)
+            width: Ancho de la imagen
+            height: Alto de la imagen
+            board_size: (cols, rows) esquinas internas del tablero; None = el
+                de calibration.json (o el tablero estándar)
+        """
+        self.depth_estimator = depth_estimator
+        self.width = width
+        self.height = height
+        self.board_size = board_size or self._load_board_size()
+
+        # Puntos capturados sobre la superficie (cm)
+        self.points = []
+
+        # Plano calculado
+        self.plane = None
+
+    @staticmethod
+    def _load_board_size():
+        """Tablero de la calibración guardada (cols, rows)"""
+        try:
+            with open(CalibrationConfig.CALIBRATION_FILE, 'r') as f:
+                board_config = json.load(f)['board_config']
+            return (board_config['cols'], board_config['rows'])
+        except Exception:
+            return (CalibrationConfig.DEFAULT_CHESSBOARD_COLS,
+                    CalibrationConfig.DEFAULT_CHESSBOARD_ROWS)
+
+    def fingertip_point(self, detection_left, detection_right):
+        """
+        Punto 3D del índice de la primera mano de cada cámara
+
+        Returns:
+            np.ndarray: (3,) en cm, o None si no hay mano o falla
+        """
+        if not len(detection_left) or not len(detection_right):
+            return None
+        index = FINGER_TIP_IDS.index(INDEX_TIP_ID)
+        points, valid = self.depth_estimator.triangulate_many(
+            detection_left.tips[:1, index], detection_right.tips[:1, index])
+        return points[0] if valid[0] else None
+
+    def chessboard_points(self, frame_left, frame_right):
+        """
+        Esquinas del tablero apoyado sobre la superficie, trianguladas
+
+        Args:
+            frame_left: Frame BGR de la cámara izquierda
+            frame_right: Frame BGR de la cámara derecha
+
+        Returns:
+            np.ndarray: (N, 3) en cm (vacío si no se ve en ambas cámaras)
+        """
+        detector = CameraCalibrator(None, 'plano', self.board_size,
+                                    CalibrationConfig.DEFAULT_SQUARE_SIZE_MM)
+        found_left, corners_left, _ = detector.detect_chessboard(frame_left)
+        found_right, corners_right, _ = detector.detect_chessboard(frame_right)
+        if not (found_left and found_right):
+            return np.zeros((0, 3))
+        corners_left = corners_left.reshape(-1, 2)
+        corners_right = self._match_corner_order(corners_left,
+                                                 corners_right.reshape(-1, 2))
+        points, valid = self.depth_estimator.triangulate_many(
+            corners_left, corners_right)
+        return points[valid]
+
+    def _match_corner_order(self, corners_left, corners_right):
+        """
+        Ordena las esquinas derechas como las izquierdas: cada cámara puede
+        empezar el tablero por otra esquina (rotado 180°, o 90° si es
+        cuadrado). Se elige el orden con menos diferencia de filas entre
+        las imágenes rectificadas.
+        """
+        cols, rows = self.board_size
+        grid = corners_right.reshape(rows, cols, 2)
+        turns = (0, 1, 2, 3) if rows == cols else (0, 2)
+        rect_left = self.depth_estimator.rectify_points(corners_left, True)
+        best, best_error = corners_right, np.inf
+        for k in turns:
+            candidate = np.rot90(grid, k).reshape(-1, 2)
+            rect_right = self.depth_estimator.rectify_points(candidate, False)
+            error = np.mean(np.abs(rect_left[:, 1] - rect_right[:, 1]))
+            if error < best_error:
+                best, best_error = candidate, error
+        return best
+
+    def run_plane_calibration(self, cam_left, cam_right, hand_detector_left, hand_detector_right):
+        """
+        Ejecuta la calibración del plano del teclado
+
+        Args:
+            cam_left: VideoThread (o ReplayVideoThread) de cámara izquierda
+            cam_right: VideoThread (o ReplayVideoThread) de cámara derecha
+            hand_detector_left: HandDetector para cámara izquierda
+            hand_detector_right: HandDetector para cámara derecha
+
+        Returns:
+            KeyboardPlane: Plano calculado (o None si cancelado)
+        """
+        print("\n" + "="*70)
+        print("CALIBRACIÓN DEL PLANO DEL TECLADO")
+        print("="*70)
+        print("\nINSTRUCCIONES:")
+        print("  - Apoya el DEDO ÍNDICE sobre la superficie y presiona ESPACIO;")
+        print("    repite en las esquinas y el centro del teclado (mínimo 3)")
+        print(f"  - O coloca el tablero ({self.board_size[0]}x{self.board_size[1]} esquinas) "
+              "sobre la superficie y presiona T")
+        print("  - ENTER para calcular el plano, ESC para cancelar")
+        print("="*70 + "\n")
+
+        window_name = "Calibracion del Plano del Teclado"
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(window_name, self.width * 2, self.height)
+        self.points = []
+
+        try:
+            while True:
+                finished_left, frame_left = cam_left.next(black=False, wait=1)
+                finished_right, frame_right = cam_right.next(black=False, wait=1)
+                if finished_left or finished_right:
+                    break
+                if frame_left is None or frame_right is None:
+                    continue
+
+                # Yema del índice (cualquier backend)
+                point = self.fingertip_point(
+                    hand_detector_left.detect(frame_left),
+                    hand_detector_right.detect(frame_right))
+                hand_detector_left.drawHands(frame_left)
+                hand_detector_right.drawHands(frame_right)
+
+                combined = np.concatenate((frame_left, frame_right), axis=1)
+                combined = self._draw_calibration_ui(combined, point)
+                cv2.imshow(window_name, combined)
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == 32:  # ESPACIO - yema apoyada
+                    if point is not None:
+                        self.points.append(point)
+                        print(f"✓ Punto {len(self.points)}: "
+                              f"({point[0]:.1f}, {point[1]:.1f}, {point[2]:.1f}) cm")
+                    else:
+                        print("✗ No se detecta dedo índice en ambas cámaras")
+                elif key in (ord('t'), ord('T')):  # Tablero sobre la superficie
+                    corners = self.chessboard_points(frame_left, frame_right)
+                    if len(corners):
+                        self.points.extend(corners)
+                        print(f"✓ Tablero: {len(corners)} esquinas")
+                    else:
+                        print("✗ Tablero no visible en ambas cámaras")
+                elif key == 13:  # ENTER - calcular
+                    if len(self.points) >= 3:
+                        break
+                    print(f"✗ Se necesitan al menos 3 puntos (tienes {len(self.points)})")
+                elif key == 27:  # ESC - cancelar
+                    print("\n✗ Calibración del plano cancelada")
+                    return None
+        finally:
+            try:
+                cv2.destroyWindow(window_name)
+            except:
+                pass  # La ventana ya puede estar cerrada
+
+        if len(self.points) < 3:
+            print(f"\n✗ Error: Se necesitan al menos 3 puntos (tienes {len(self.points)})")
+            return None
+        try:
+            self.plane = KeyboardPlane.fit(self.points)
+        except ValueError as e:
+            print(f"\n✗ Error: {e}")
+            return None
+
+        print(f"\n✓ PLANO DEL TECLADO: normal {np.round(self.plane.normal, 3)}, "
+              f"{len(self.points)} puntos, RMS {self.plane.rms_cm:.2f} cm")
+        self.depth_estimator.keyboard_plane = self.plane
+        self._save_plane()
+        return self.plane
+
+    def _save_plane(self):
+        """Guarda el plano en el archivo de calibración"""
+        try:
+            calib_file = CalibrationConfig.CALIBRATION_FILE
+            with open(calib_file, 'r') as f:
+                calib_data = json.load(f)
+
+            calib_data['keyboard_plane'] = self.plane.to_dict()
+
+            with open(calib_file, 'w') as f:
+                json.dump(calib_data, f, indent=4)
+
+            print(f"✓ Plano del teclado guardado en: {calib_file}")
+
+        except Exception as e:
+            print(f"⚠ Error al guardar plano del teclado: {e}")
+
+    def _draw_calibration_ui(self, frame, point):
+        """Dibuja la interfaz de calibración del plano"""
+        overlay = frame.copy()
+        w = frame.shape[1]
+        cv2.rectangle(overlay, (0, 0), (w, 120), (30, 30, 30), -1)
+        frame = cv2.addWeighted(frame, 0.6, overlay, 0.4, 0)
+
+        cv2.putText(frame, f"PLANO DEL TECLADO ({len(self.points)} puntos)", (20, 40),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 255), 2)
+        if point is not None:
+            status = f"Indice en ({point[0]:.1f}, {point[1]:.1f}, {point[2]:.1f}) cm"
+            color = (0, 255, 0)
+        else:
+            status = "Esperando deteccion del dedo indice..."
+            color = (0, 165, 255)
+        cv2.putText(frame, status, (20, 75),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        cv2.putText(frame, "[ESPACIO] Yema | [T] Tablero | [ENTER] Calcular | [ESC] Cancelar",
+                   (20, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        return frame
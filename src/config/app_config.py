@@ -63,7 +63,7 @@ class AppConfig:
     COLOR_DASHBOARD_TEXT = (0, 255, 0)
     
     # ==================== CÁMARAS ====================
-    CAMERA_INIT_WAIT = 0.5                # Tiempo de espera para inicialización de cámaras (segundos)
+    CAMERA_READY_TIMEOUT = 5.0            # Espera máxima del primer frame al abrir una cámara (segundos)
     
     # ==================== PERFORMANCE ====================
     TARGET_FPS = 30                       # FPS objetivo de la aplicación
@@ -1,3 +1,5 @@
 # gameplay module init
 from .rythm_game import RhythmGame
 from .song_chart import TUTORIAL_FACIL, MODO_APRENDER
+from .play_modes import (ModeManager, FreeMode, RhythmMode, TheoryMode,
+                         ConfigMode)
@@ -0,0 +1,348 @@
+"""
+Modos de juego (libre, ritmo, teoría, configuración)
+
+Cada modo se suscribe a la salida de la etapa 'teclado' del pipeline
+(on_keys corre en ese hilo y produce el audio) y aporta su parte del
+render en el hilo principal:
+
+- draw_under_hands(frame_left): entre el teclado y las manos (notas).
+- draw_frames(frame_left, frame_right): sobre los frames (lecciones).
+- draw_screen(h_frames): pantalla propia que reemplaza la de juego
+  (panel de configuración, menú de lecciones); None si no tiene.
+- handle_key(key): retorna el nombre del modo siguiente (el propio si
+  la tecla se consumió) o None si no la maneja.
+
+get_requirements() declara qué trabajo de visión consume el modo en cada
+momento (StageRequirements); el pipeline y el render saltan el resto.
+
+ModeManager mantiene el modo activo y su suscripción al pipeline.
+"""
+
+import threading
+
+import numpy as np
+
+from src.config.app_config import AppConfig
+from src.vision.pipeline_stages import (FULL_REQUIREMENTS,
+                                        COMPOSITION_REQUIREMENTS)
+
+
+class PlayMode:
+    """Base de los modos: sin audio ni dibujo propio"""
+
+    name = ''
+    requirements = FULL_REQUIREMENTS
+
+    def __init__(self, synth, virtual_keyboard, octave_base,
+                 velocity=127 * 2 // 3):
+        """
+        Args:
+            synth: fluidsynth.Synth (canal 0)
+            virtual_keyboard: VirtualKeyboard donde se toca
+            octave_base: Nota MIDI de la primera tecla
+            velocity: Velocidad de las notas
+        """
+        self.synth = synth
+        self.virtual_keyboard = virtual_keyboard
+        self.octave_base = octave_base
+        self.velocity = velocity
+
+    def enter(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def get_requirements(self):
+        return self.requirements
+
+    def on_keys(self, packet):
+        pass
+
+    def draw_under_hands(self, frame_left):
+        return frame_left
+
+    def draw_frames(self, frame_left, frame_right):
+        return frame_left, frame_right
+
+    def draw_screen(self, h_frames):
+        return None
+
+    def handle_key(self, key):
+        return None
+
+    def _midi_key(self, k_pos):
+        return self.virtual_keyboard.note_from_key(k_pos) + self.octave_base
+
+
+class FreeMode(PlayMode):
+    """Modo libre: cada tecla presionada suena y se apaga al soltarla"""
+
+    name = 'free'
+
+    def on_keys(self, packet):
+        if packet.on_map is None:
+            return
+        for k_pos in np.flatnonzero(packet.on_map):
+            self.synth.noteon(chan=0, key=self._midi_key(k_pos),
+                              vel=self.velocity)
+        for k_pos in np.flatnonzero(packet.off_map):
+            self.synth.noteoff(chan=0, key=self._midi_key(k_pos))
+
+
+class RhythmMode(PlayMode):
+    """
+    Juego de ritmo: las notas caen sobre el teclado y solo suenan los
+    aciertos. El estado del juego se comparte entre el hilo del teclado
+    (check_hit) y el del render (update/draw), protegido por un lock.
+    """
+
+    name = 'rhythm'
+
+    def __init__(self, synth, virtual_keyboard, octave_base, rhythm_game,
+                 song_chart, velocity=127 * 2 // 3):
+        super().__init__(synth, virtual_keyboard, octave_base, velocity)
+        self.rhythm_game = rhythm_game
+        self.song_chart = song_chart
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.rhythm_game.start_game(self.song_chart)
+
+    def exit(self):
+        with self.lock:
+            if self.rhythm_game.is_playing:
+                self.rhythm_game.stop_game()
+
+    def on_keys(self, packet):
+        if packet.on_map is None:
+            return
+        # Solo verificar teclas que están activas
+        for k_pos in np.flatnonzero(packet.on_map):
+            with self.lock:
+                hit_result = self.rhythm_game.check_hit(k_pos)
+            if hit_result:
+                print(f"Tecla {k_pos}: {hit_result}")
+                # Reproducir audio solo en los aciertos
+                self.synth.noteon(chan=0, key=self._midi_key(k_pos),
+                                  vel=self.velocity)
+
+    def draw_under_hands(self, frame_left):
+        vk = self.virtual_keyboard
+        with self.lock:
+            self.rhythm_game.update()
+            return self.rhythm_game.draw(frame_left, vk.kb_x0, vk.kb_x1,
+                                         vk.white_key_width)
+
+
+class ConfigMode(FreeMode):
+    """Panel de configuración sobre la imagen (sin detección ni audio)"""
+
+    name = 'config'
+    requirements = COMPOSITION_REQUIREMENTS
+
+    def __init__(self, synth, virtual_keyboard, octave_base, config_ui,
+                 keyboard_map, velocity=127 * 2 // 3):
+        super().__init__(synth, virtual_keyboard, octave_base, velocity)
+        self.config_ui = config_ui
+        self.keyboard_map = keyboard_map
+
+    def exit(self):
+        self.config_ui.reset_selection()
+
+    def draw_screen(self, h_frames):
+        return self.config_ui.draw_config_panel(h_frames)
+
+    def _apply_to_keyboard_map(self):
+        # Aplicar cambios en tiempo real
+        km = self.keyboard_map
+        km.depth_threshold = AppConfig.DEPTH_THRESHOLD
+        km.velocity_threshold = AppConfig.VELOCITY_THRESHOLD
+        km.velocity_enabled = AppConfig.VELOCITY_ENABLED
+        km.velocity_history_size = AppConfig.VELOCITY_HISTORY_SIZE
+
+    def handle_key(self, key):
+        config_ui = self.config_ui
+        # Navegación
+        if key == 82 or key == ord('w') or key == ord('W'):  # Arriba
+            config_ui.navigate_up()
+        elif key == 84 or key == ord('s') or key == ord('S'):  # Abajo
+            config_ui.navigate_down()
+
+        # Ajustar valores
+        elif key == 83 or key == ord('d') or key == ord('D'):  # Derecha (aumentar)
+            config_ui.increase_value()
+            self._apply_to_keyboard_map()
+        elif key == 81 or key == ord('a') or key == ord('A'):  # Izquierda (disminuir)
+            config_ui.decrease_value()
+            self._apply_to_keyboard_map()
+
+        # Presets (teclas 1-4)
+        elif 49 <= key <= 52:
+            preset_idx = key - 49
+            if preset_idx < len(config_ui.presets):
+                preset_key = config_ui.presets[preset_idx]['key']
+                config_ui.apply_preset(preset_key)
+                config_ui.selected_preset = preset_idx
+                print(f"✓ Preset aplicado: {config_ui.presets[preset_idx]['name']}")
+                self._apply_to_keyboard_map()
+
+        # Salir
+        elif key == ord('q') or key == ord('Q') or key == 27:  # Q o ESC
+            print("Modo configuración desactivado")
+            return FreeMode.name
+
+        return self.name
+
+
+class TheoryMode(FreeMode):
+    """
+    Menú de lecciones y lección activa. La lección dibuja sobre los frames
+    y recibe las teclas; las teclas tocadas suenan como en el modo libre.
+    """
+
+    name = 'theory'
+
+    def __init__(self, synth, virtual_keyboard, octave_base, lesson_manager,
+                 theory_ui, hand_detectors=(None, None),
+                 velocity=127 * 2 // 3):
+        super().__init__(synth, virtual_keyboard, octave_base, velocity)
+        self.lesson_manager = lesson_manager
+        self.theory_ui = theory_ui
+        self.hand_detectors = hand_detectors
+        self.current_lesson = None
+        self.current_lesson_id = None
+        self.lessons = []
+
+    @property
+    def in_lesson(self):
+        return self.current_lesson is not None
+
+    def get_requirements(self):
+        # el menú de lecciones solo compone los frames
+        if self.in_lesson:
+            return FULL_REQUIREMENTS
+        return COMPOSITION_REQUIREMENTS
+
+    def enter(self):
+        self.theory_ui.reset_selection()
+
+    def exit(self):
+        self.close_lesson()
+        self.theory_ui.reset_selection()
+
+    def open_lesson(self, lesson_id, lesson=None):
+        """
+        Inicia una lección por ID.
+
+        Returns:
+            bool: False si la lección no existe
+        """
+        if lesson is None:
+            lesson = self.lesson_manager.get_lesson(lesson_id)
+        if lesson is None:
+            return False
+        self.current_lesson = lesson
+        self.current_lesson_id = lesson_id
+        self.current_lesson.start()
+        return True
+
+    def close_lesson(self):
+        if self.current_lesson is not None:
+            self.current_lesson.stop()
+        self.current_lesson = None
+        self.current_lesson_id = None
+
+    def draw_frames(self, frame_left, frame_right):
+        if not self.in_lesson:
+            return frame_left, frame_right
+
+        # Ejecutar lección activa
+        frame_left, frame_right, continue_lesson = self.current_lesson.run(
+            frame_left, frame_right, self.virtual_keyboard, self.synth,
+            *self.hand_detectors)
+        if not continue_lesson:
+            # Salir de la lección
+            self.close_lesson()
+            print("Saliendo de la lección...")
+        return frame_left, frame_right
+
+    def draw_screen(self, h_frames):
+        if self.in_lesson:
+            return None
+        # Mostrar menú de lecciones
+        self.lessons = self.lesson_manager.get_all_lessons()
+        return self.theory_ui.draw_lesson_menu(h_frames, self.lessons)
+
+    def handle_key(self, key):
+        if self.in_lesson:
+            if key == 27:  # ESC dentro de lección
+                self.close_lesson()
+                print("Volviendo al menú de lecciones...")
+            else:  # Pasar teclas a la lección activa
+                self.current_lesson.handle_key(key, self.synth,
+                                               self.octave_base)
+            return self.name
+        return self._handle_menu_key(key)
+
+    def _handle_menu_key(self, key):
+        theory_ui = self.theory_ui
+        lessons = self.lessons
+        # Flecha arriba (múltiples códigos para compatibilidad)
+        if key == 82 or key == ord('w') or key == ord('W'):  # Flecha arriba o W
+            theory_ui.navigate_up(len(lessons))
+            print(f"Navegando: lección {theory_ui.get_selected_index() + 1}/{len(lessons)}")
+        # Flecha abajo
+        elif key == 84 or key == ord('s') or key == ord('S'):  # Flecha abajo o S
+            theory_ui.navigate_down(len(lessons))
+            print(f"Navegando: lección {theory_ui.get_selected_index() + 1}/{len(lessons)}")
+        # Números 1-9 para selección directa, o ENTER
+        elif 49 <= key <= 57 or key == 13:
+            selected_idx = key - 49 if key != 13 else theory_ui.get_selected_index()
+            if 0 <= selected_idx < len(lessons):
+                lesson_id, lesson = lessons[selected_idx]
+                self.open_lesson(lesson_id, lesson)
+                print(f"Iniciando lección: {lesson.name}")
+        elif key == ord('q') or key == ord('Q'):
+            print("Saliendo del modo teoría...")
+            return FreeMode.name
+        elif key == 27:  # ESC
+            return FreeMode.name
+        elif key != 255:  # Mostrar código de cualquier otra tecla para debug
+            print(f"Tecla presionada en menú teoría: código {key}")
+        return self.name
+
+
+class ModeManager:
+    """
+    Modo activo y su suscripción a la etapa del teclado del pipeline.
+    Cambiar de modo sale del anterior (exit) y entra al nuevo (enter).
+    """
+
+    def __init__(self, modes, pipeline=None, stage_name='teclado'):
+        self.modes = {mode.name: mode for mode in modes}
+        self.pipeline = pipeline
+        self.stage_name = stage_name
+        self.active = None
+
+    def __getitem__(self, name):
+        return self.modes[name]
+
+    def switch(self, name):
+        """Activa el modo `name` (reentrar reinicia el modo) y lo retorna"""
+        mode = self.modes[name]
+        self.close()
+        self.active = mode
+        mode.enter()
+        if self.pipeline is not None:
+            self.pipeline.subscribe(self.stage_name, mode.on_keys)
+        return mode
+
+    def close(self):
+        if self.active is None:
+            return
+        if self.pipeline is not None:
+            self.pipeline.unsubscribe(self.stage_name, self.active.on_keys)
+        self.active.exit()
+        self.active = None
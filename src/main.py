@@ -64,14 +64,27 @@ import traceback
 import cv2
 import numpy as np
 import fluidsynth
-from collections import deque
 
 # --- Vision ---
 from src.vision import video_thread, angles
 from src.vision.hand_detector import HandDetector
+from src.vision.hand_landmarks import INDEX_TIP_ID, flip_box
+from src.vision.hand_overlay import HandOverlay
+from src.vision.hand_tracker import HandTracker
+from src.vision.hand_landmarker_detector import HandLandmarkerDetector
+from src.vision.contour_hand_detector import ContourHandDetector
+from src.vision.quality_controller import QualityController
 from src.vision import keyboard_mapper as kbm
 from src.vision import load_depth_estimator
 from src.vision.stereo_config import StereoConfig
+from src.vision.session_recorder import StereoSessionRecorder, StereoSessionReplay
+from src.vision.multiprocess_capture import MultiProcessStereoCapture
+from src.vision.finger_filter import FingerFilterBank
+from src.vision.pipeline import Pipeline
+from src.vision.pipeline_stages import (CaptureStage, HandDetectionStage,
+                                        StereoFusionStage, KeyboardStage,
+                                        COMPOSITION_REQUIREMENTS,
+                                        compose_display)
 
 # --- Calibration ---
 from src.calibration import CalibrationManager
@@ -83,6 +96,8 @@ from src.piano.virtual_keyboard import VirtualKeyboard
 # --- Gameplay ---
 from src.gameplay.rythm_game import RhythmGame
 from src.gameplay.song_chart import TUTORIAL_FACIL
+from src.gameplay.play_modes import (ModeManager, FreeMode, RhythmMode,
+                                     TheoryMode, ConfigMode)
 
 # --- UI ---
 from src.ui.ui_helper import UIHelper
@@ -94,6 +109,7 @@ from src.theory import get_lesson_manager, TheoryUI
 
 # --- Config UI ---
 from src.ui.config_ui import ConfigUI
+from src.config.app_config import AppConfig
 
 # --- Common ---
 from src.common.toolbox import round_half_up
@@ -119,6 +135,56 @@ def frame_add_crosshairs(frame,
 def show_calibration_menu(ui_helper, pixel_width, pixel_height):
     return show_initial_menu()
 
+def run_surface_calibration(config, phase):
+    """
+    Fase 3 ('depth', DepthCalibrator) o plano del teclado ('plane',
+    KeyboardPlaneCalibrator) sobre la calibración estéreo guardada.
+
+    Ambas miden sobre los frames de la cámara sin voltear, el mismo
+    sistema en que StereoFusionStage triangula las yemas.
+
+    Returns:
+        Resultado del calibrador (None si se canceló o no hay Fase 1 + 2)
+    """
+    from src.calibration.calibration_config import CalibrationConfig
+    from src.calibration.depth_calibrator import DepthCalibrator
+    from src.calibration.plane_calibrator import KeyboardPlaneCalibrator
+
+    try:
+        depth_estimator = load_depth_estimator(CalibrationConfig.CALIBRATION_FILE)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"⚠ Se necesita la calibración estéreo (Fase 1 + 2): {e}")
+        return None
+
+    width, height = config.PIXEL_WIDTH, config.PIXEL_HEIGHT
+    cams = [video_thread.VideoThread(video_source=source,
+                                     video_width=width,
+                                     video_height=height,
+                                     video_frame_rate=config.FRAME_RATE)
+            for source in (config.LEFT_CAMERA_SOURCE,
+                           config.RIGHT_CAMERA_SOURCE)]
+    detectors = [HandDetector(staticImageMode=False,
+                              detectionCon=config.HAND_DETECTION_CONFIDENCE,
+                              trackCon=config.HAND_TRACKING_CONFIDENCE,
+                              img_width=width,
+                              img_height=height)
+                 for _ in range(2)]
+    try:
+        for cam in cams:
+            cam.start()
+        if phase == 'plane':
+            calibrator = KeyboardPlaneCalibrator(depth_estimator, width, height)
+            return calibrator.run_plane_calibration(*cams, *detectors)
+        calibrator = DepthCalibrator(depth_estimator, width, height)
+        return calibrator.run_depth_calibration(*cams, *detectors)
+    finally:
+        for cam in cams:
+            cam.stop()
+        for detector in detectors:
+            if hasattr(detector, 'close'):
+                detector.close()
+
+
 def run_calibration_process(ui_helper, pixel_width, pixel_height, config):
     """Ejecuta el proceso de calibración con el nuevo sistema profesional"""
     from src.calibration.calibration_config import CalibrationConfig
@@ -148,10 +214,10 @@ def run_calibration_process(ui_helper, pixel_width, pixel_height, config):
             # Mostrar interfaz detallada de calibración completa
             window_name = 'Calibracion Completa - Detalles'
             cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-            cv2.resizeWindow(window_name, 950, 700)
+            cv2.resizeWindow(window_name, 950, 740)
             cv2.moveWindow(window_name, 100, 50)
             
-            info_frame = np.zeros((700, 950, 3), dtype=np.uint8)
+            info_frame = np.zeros((740, 950, 3), dtype=np.uint8)
             
             while True:
                 display_frame = info_frame.copy()
@@ -354,6 +420,11 @@ def run_calibration_process(ui_helper, pixel_width, pixel_height, config):
                            (190, y_pos),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 1)
                 
+                y_pos += 30
+                cv2.putText(display_frame, "[P] Profundidad (Fase 3)    [K] Plano del teclado", 
+                           (160, y_pos),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 200, 255), 1)
+                
                 y_pos += 30
                 cv2.putText(display_frame, "[ESC] Volver al menu principal", 
                            (260, y_pos),
@@ -404,6 +475,15 @@ def run_calibration_process(ui_helper, pixel_width, pixel_height, config):
                     recalibrate_phase2_only = False
                     break  # Salir del while para continuar con calibración
                 
+                elif key in (ord('p'), ord('P'), ord('k'), ord('K')):
+                    # Fase 3 / plano del teclado sobre la calibración actual
+                    cv2.destroyWindow(window_name)
+                    phase = 'depth' if key in (ord('p'), ord('P')) else 'plane'
+                    run_surface_calibration(config, phase)
+                    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+                    cv2.resizeWindow(window_name, 950, 740)
+                    cv2.moveWindow(window_name, 100, 50)
+                
                 elif key == 27:  # ESC
                     cv2.destroyWindow(window_name)
                     return False
@@ -729,12 +809,102 @@ def run_calibration_process(ui_helper, pixel_width, pixel_height, config):
         traceback.print_exc()
         return False
 
+def open_stereo_camera(config, stereo_cam=None):
+    """
+    Retorna el par estéreo capturando, reutilizando el de la visita
+    anterior al menú si sigue abierto y con las mismas cámaras.
+
+    Las dos cámaras se abren en paralelo y se espera su primer frame (no
+    tiempos fijos); se informa el tiempo hasta el primer frame de cada una.
+
+    Args:
+        config: StereoConfig
+        stereo_cam: Par de la visita anterior (pausado) o None
+
+    Returns:
+        StereoVideoThread, MultiProcessStereoCapture o StereoSessionReplay
+        ya iniciado
+    """
+    if config.REPLAY_SESSION_DIR:
+        # sesión grabada en lugar de las cámaras (determinista)
+        if stereo_cam is not None:
+            stereo_cam.stop()
+        stereo_cam = StereoSessionReplay(config.REPLAY_SESSION_DIR,
+                                         realtime=config.REPLAY_REALTIME)
+        stereo_cam.start()
+        return stereo_cam
+
+    if config.MULTIPROCESS_CAPTURE:
+        # un proceso por cámara (captura + MediaPipe), sin compartir el GIL
+        if stereo_cam is not None:
+            stereo_cam.stop()
+        stereo_cam = MultiProcessStereoCapture(
+            left_source=config.LEFT_CAMERA_SOURCE,
+            right_source=config.RIGHT_CAMERA_SOURCE,
+            video_width=config.PIXEL_WIDTH,
+            video_height=config.PIXEL_HEIGHT,
+            video_frame_rate=config.FRAME_RATE,
+            detection_con=config.HAND_DETECTION_CONFIDENCE,
+            track_con=config.HAND_TRACKING_CONFIDENCE,
+            orientation=config.FRAME_ORIENTATION,
+            inference_scale=config.INFERENCE_SCALE)
+        stereo_cam.start()
+        return stereo_cam
+
+    if isinstance(stereo_cam, video_thread.StereoVideoThread) and \
+            stereo_cam.is_available() and \
+            stereo_cam.raw_mjpeg == config.RAW_MJPEG_CAPTURE and \
+            stereo_cam.left_source == config.LEFT_CAMERA_SOURCE and \
+            stereo_cam.right_source == config.RIGHT_CAMERA_SOURCE:
+        print("✓ Reutilizando cámaras ya abiertas")
+        stereo_cam.start()
+        return stereo_cam
+
+    if stereo_cam is not None:
+        stereo_cam.stop()
+
+    # par estéreo sincronizado: ambas cámaras se capturan en el mismo hilo
+    # (grab izq + grab der, luego retrieve) para que los dedos triangulados
+    # correspondan al mismo instante
+    bring_up_start = time.perf_counter()
+    stereo_cam = video_thread.StereoVideoThread(
+        left_source=config.LEFT_CAMERA_SOURCE,
+        right_source=config.RIGHT_CAMERA_SOURCE,
+        video_width=config.PIXEL_WIDTH,
+        video_height=config.PIXEL_HEIGHT,
+        video_frame_rate=config.FRAME_RATE,
+        buffer_all=False,
+        try_to_reconnect=config.CAMERA_RECONNECT,
+        reconnect_backoff=config.RECONNECT_BACKOFF,
+        reconnect_backoff_max=config.RECONNECT_BACKOFF_MAX,
+        max_reconnect_attempts=config.RECONNECT_MAX_ATTEMPTS,
+        raw_mjpeg=config.RAW_MJPEG_CAPTURE,
+        inference_scale=config.MJPEG_DECODE_SCALE)
+    bring_up_ms = (time.perf_counter() - bring_up_start) * 1000.0
+
+    for side, ttff_ms in stereo_cam.get_time_to_first_frame_ms().items():
+        if ttff_ms is None:
+            print(f"✗ Cámara {side}: sin frames (timeout {AppConfig.CAMERA_READY_TIMEOUT}s)")
+        else:
+            print(f"✓ Cámara {side}: primer frame en {ttff_ms:.0f} ms")
+    print(f"  Arranque de cámaras: {bring_up_ms:.0f} ms")
+
+    # start cameras
+    stereo_cam.start()
+    return stereo_cam
+
+
 def main():
+    # el par estéreo se conserva (pausado) entre visitas al menú
+    stereo_cam = None
     while True:  # <--- 1. BUCLE GLOBAL AGREGADO
         # Inicializar variables para limpieza segura
         fs = None
-        cam_left = None
-        cam_right = None
+        session_recorder = None
+        pipeline = None
+        modes = None
+        left_detector = right_detector = None
+        quality = None
         try:
             # Cargar configuración estéreo centralizada
             config = StereoConfig()
@@ -752,9 +922,6 @@ def main():
             
             # Detectar si es una opción de teoría
             if start_mode and start_mode.startswith("theory_"):
-                theory_mode = True
-                game_mode = False
-                
                 # Mapear la opción a la lección correspondiente
                 lesson_map = {
                     "theory_chords": "Acordes Básicos",   # O el ID que uses en lesson_manager
@@ -780,23 +947,22 @@ def main():
             if start_mode == "config_load":
                 print("Cargando calibración guardada...")
                 config.load_calibration()
-                game_mode = False # Inicia en modo libre
                 
             elif start_mode == "config_new":
                 print("Iniciando proceso de calibración...")
+                # la calibración abre las cámaras por su cuenta
+                if stereo_cam is not None:
+                    stereo_cam.stop()
+                    stereo_cam = None
                 run_calibration_process(ui_helper_menu, pixel_width, pixel_height, config)
-                game_mode = False
                 
             elif start_mode == "config_skip":
                 print("Usando valores por defecto (sin calibración)")
-                game_mode = False
             # ------------------------------
             # set up cameras
             # ------------------------------
 
             # cameras variables
-            left_camera_source = config.LEFT_CAMERA_SOURCE
-            right_camera_source = config.RIGHT_CAMERA_SOURCE
             pixel_width = config.PIXEL_WIDTH
             pixel_height = config.PIXEL_HEIGHT
 
@@ -818,37 +984,14 @@ def main():
             # Virtual Keyboard Center point distance (cms)
             vkb_center_point_camera_dist = config.VKB_CENTER_DISTANCE
 
-                # cam_resource = video_thread.VideoThread(
-                #     video_source=c_id,
-                #     video_width=pixel_width,
-                #     video_height=pixel_height,
-                #     video_frame_rate=frame_rate,
-                #     buffer_all=False,
-                #     try_to_reconnect=False
-                # )
-            # left camera 1
-            cam_left = video_thread.VideoThread(
-                video_source=left_camera_source,
-                video_width=pixel_width,
-                video_height=pixel_height,
-                video_frame_rate=frame_rate,
-                buffer_all=False,
-                try_to_reconnect=False)
-
-            # right camera 2
-            cam_right = video_thread.VideoThread(
-                video_source=right_camera_source,
-                video_width=pixel_width,
-                video_height=pixel_height,
-                video_frame_rate=frame_rate,
-                buffer_all=False,
-                try_to_reconnect=False)
-
-            # start cameras
-            cam_left.start()
-            cam_right.start()
-
-            time.sleep(1)
+            stereo_cam = open_stereo_camera(config, stereo_cam)
+            if config.REPLAY_SESSION_DIR:
+                pixel_width = stereo_cam.get_curr_config_widht()
+                pixel_height = stereo_cam.get_curr_config_height()
+
+            if config.RECORD_SESSION_DIR:
+                session_recorder = StereoSessionRecorder(
+                    config.RECORD_SESSION_DIR, video_frame_rate=frame_rate)
             
             # Intentar cargar DepthEstimator si existe calibración completa
             depth_estimator = None
@@ -881,42 +1024,25 @@ def main():
                         (pixel_width//2),
                         (pixel_height//2))        
             
-            if cam_left.is_available():
-                print('Name:{}'.format(main_window_name))
-                print('cam_left.resource.get(cv2.CAP_PROP_AUTO_EXPOSURE:{}'.
-                    format(cam_left.resource.get(cv2.CAP_PROP_AUTO_EXPOSURE)))
-                print('cam_left.resource.get(cv2.CAP_PROP_EXPOSURE:{}'.
-                    format(cam_left.resource.get(cv2.CAP_PROP_EXPOSURE)))
-                print('cam_left.resource.get(cv2.CAP_PROP_AUTOFOCUS):{}'.
-                    format(cam_left.resource.get(cv2.CAP_PROP_AUTOFOCUS)))
-                print('cam_left.resource.get(cv2.CAP_PROP_BUFFERSIZE):{}'.
-                    format(cam_left.resource.get(cv2.CAP_PROP_BUFFERSIZE)))
-                print('cam_left.resource.get(cv2.CAP_PROP_CODEC_PIXEL_FORMAT):{}'.
-                    format(cam_left.resource.get(cv2.CAP_PROP_CODEC_PIXEL_FORMAT)))
-
-                print('cam_left.resource.get(cv2.CAP_PROP_HW_DEVICE):{}'.
-                    format(cam_left.resource.get(cv2.CAP_PROP_HW_DEVICE)))
-                print('cam_left.resource.get(cv2.CAP_PROP_FRAME_COUNT):{:03f}'.
-                    format(cam_left.resource.get(cv2.CAP_PROP_FRAME_COUNT)))
-                    
-
-            if cam_right.is_available():
-                print('Name:{}'.format(main_window_name))
-                print('cam_right.resource.get(cv2.CAP_PROP_AUTO_EXPOSURE:{}'.
-                    format(cam_right.resource.get(cv2.CAP_PROP_AUTO_EXPOSURE)))
-                print('cam_right.resource.get(cv2.CAP_PROP_EXPOSURE:{}'.
-                    format(cam_right.resource.get(cv2.CAP_PROP_EXPOSURE)))
-                print('cam_right.resource.get(cv2.CAP_PROP_AUTOFOCUS):{}'.
-                    format(cam_right.resource.get(cv2.CAP_PROP_AUTOFOCUS)))
-                print('cam_right.resource.get(cv2.CAP_PROP_BUFFERSIZE):{}'.
-                    format(cam_right.resource.get(cv2.CAP_PROP_BUFFERSIZE)))
-                print('cam_right.resource.get(cv2.CAP_PROP_CODEC_PIXEL_FORMAT):{}'.
-                    format(cam_right.resource.get(cv2.CAP_PROP_CODEC_PIXEL_FORMAT)))
-
-                print('cam_right.resource.get(cv2.CAP_PROP_HW_DEVICE):{}'.
-                    format(cam_right.resource.get(cv2.CAP_PROP_HW_DEVICE)))
-                print('cam_right.resource.get(cv2.CAP_PROP_FRAME_COUNT):{:03f}'.
-                    format(cam_right.resource.get(cv2.CAP_PROP_FRAME_COUNT)))
+            if stereo_cam.is_available() and stereo_cam.resource_left is not None:
+                for side, resource in (('left', stereo_cam.resource_left),
+                                       ('right', stereo_cam.resource_right)):
+                    print('Name:{}'.format(main_window_name))
+                    print('cam_{}.resource.get(cv2.CAP_PROP_AUTO_EXPOSURE:{}'.
+                        format(side, resource.get(cv2.CAP_PROP_AUTO_EXPOSURE)))
+                    print('cam_{}.resource.get(cv2.CAP_PROP_EXPOSURE:{}'.
+                        format(side, resource.get(cv2.CAP_PROP_EXPOSURE)))
+                    print('cam_{}.resource.get(cv2.CAP_PROP_AUTOFOCUS):{}'.
+                        format(side, resource.get(cv2.CAP_PROP_AUTOFOCUS)))
+                    print('cam_{}.resource.get(cv2.CAP_PROP_BUFFERSIZE):{}'.
+                        format(side, resource.get(cv2.CAP_PROP_BUFFERSIZE)))
+                    print('cam_{}.resource.get(cv2.CAP_PROP_CODEC_PIXEL_FORMAT):{}'.
+                        format(side, resource.get(cv2.CAP_PROP_CODEC_PIXEL_FORMAT)))
+
+                    print('cam_{}.resource.get(cv2.CAP_PROP_HW_DEVICE):{}'.
+                        format(side, resource.get(cv2.CAP_PROP_HW_DEVICE)))
+                    print('cam_{}.resource.get(cv2.CAP_PROP_FRAME_COUNT):{:03f}'.
+                        format(side, resource.get(cv2.CAP_PROP_FRAME_COUNT)))
 
 
             # left_window_name = 'frame left'
@@ -950,69 +1076,14 @@ def main():
                                         KEYBOARD_WHIITE_N_KEYS)
             vk_right = vkb.VirtualKeyboard(pixel_width, pixel_height,
                                         KEYBOARD_WHIITE_N_KEYS)
+            overlay_left = HandOverlay(config.HAND_OVERLAY_LEFT)
+            overlay_right = HandOverlay(config.HAND_OVERLAY_RIGHT)
             
             # Inicializar sistemas
             rhythm_game = RhythmGame(num_keys=KEYBOARD_TOT_KEYS)
             lesson_manager = get_lesson_manager()
             theory_ui = TheoryUI(pixel_width * 2, pixel_height)
             config_ui = ConfigUI(pixel_width * 2, pixel_height)
-            km = kbm.KeyboardMap(depth_threshold=config.DEPTH_THRESHOLD)
-
-            # Variables de estado
-            game_mode = False
-            theory_mode = False
-            in_lesson = False
-            current_lesson = None
-            config_mode = False
-            
-            # Inicializar módulo de teoría
-            lesson_manager = get_lesson_manager()
-            theory_ui = TheoryUI(pixel_width * 2, pixel_height)
-            theory_mode = False  # False = otros modos, True = modo teoría
-            in_lesson = False  # True cuando está dentro de una lección
-            current_lesson = None
-            current_lesson_id = None
-            
-            # Inicializar UI de configuración
-            config_ui = ConfigUI(pixel_width * 2, pixel_height)
-            config_mode = False  # False = otros modos, True = modo configuración
-
-            # ACTIVAR MODO INICIAL
-
-            if initial_mode == "rhythm":
-                game_mode = True
-                theory_mode = False
-                print("Modo JUEGO DE RITMO iniciado desde el menú principal.")
-                rhythm_game.start_game(TUTORIAL_FACIL)
-
-            elif initial_mode == "free":
-                game_mode = False
-                theory_mode = False
-                print("Modo LIBRE iniciado desde el menú principal.")
-
-            elif initial_mode and initial_mode.startswith("theory_"):
-                theory_mode = True
-                game_mode = False
-                
-                # Extraer ID de la lección (ej: theory_chords -> chords)
-                # Esto asume que los archivos se llaman lesson_chords.py, lesson_intervals.py, etc.
-                target_lesson_id = initial_mode.replace("theory_", "")
-                
-                # Buscar la lección en el gestor
-                lesson = lesson_manager.get_lesson(target_lesson_id)
-                
-                if lesson:
-                    current_lesson = lesson
-                    current_lesson.start()
-                    in_lesson = True
-                    print(f"✓ Modo TEORÍA iniciado: Lección '{lesson.name}'")
-                else:
-                    print(f"⚠ No se encontró la lección '{target_lesson_id}'. Mostrando menú general.")
-                    theory_ui.reset_selection()
-
-            elif initial_mode == "config":
-                game_mode = False
-                print("Configuración terminada. Iniciando en modo libre.")
 
             # ------------------------------
             # set up keyboards map
@@ -1027,12 +1098,89 @@ def main():
                                         angle_height)
             angler.build_frame()
 
-            left_detector = HandDetector(staticImageMode=False,
-                                                    detectionCon=config.HAND_DETECTION_CONFIDENCE,
-                                                    trackCon=config.HAND_TRACKING_CONFIDENCE)
-            right_detector = HandDetector(staticImageMode=False,
-                                                    detectionCon=config.HAND_DETECTION_CONFIDENCE,
-                                                    trackCon=config.HAND_TRACKING_CONFIDENCE)
+            # banda estéreo: requiere la calibración (R, T, K de cada cámara)
+            stereo_band = config.HAND_STEREO_BAND and use_stereo_calibration
+            right_roi_mode = 'hands' if config.HAND_ROI_MODE else None
+            if stereo_band:
+                right_roi_mode = 'band'
+
+            if isinstance(stereo_cam, MultiProcessStereoCapture):
+                # MediaPipe corre en los procesos worker: los detectores
+                # solo leen los landmarks publicados en memoria compartida
+                left_detector, right_detector = stereo_cam.hand_detectors()
+            else:
+                if config.HAND_DETECTOR_BACKEND == 'tasks':
+                    # MediaPipe Tasks en modo LIVE_STREAM: findHands no
+                    # espera la inferencia, toma el último resultado
+                    left_detector, right_detector = [
+                        HandLandmarkerDetector(config.HAND_LANDMARKER_MODEL,
+                                               maxHands=config.MAX_HANDS,
+                                               detectionCon=config.HAND_DETECTION_CONFIDENCE,
+                                               trackCon=config.HAND_TRACKING_CONFIDENCE,
+                                               img_width=pixel_width,
+                                               img_height=pixel_height,
+                                               inference_scale=config.INFERENCE_SCALE)
+                        for _ in range(2)]
+                elif config.HAND_DETECTOR_BACKEND == 'contour':
+                    # piel + contornos en CPU, sin red neuronal
+                    left_detector, right_detector = [
+                        ContourHandDetector(maxHands=config.MAX_HANDS,
+                                            img_width=pixel_width,
+                                            img_height=pixel_height)
+                        for _ in range(2)]
+                else:
+                    # ROI de inferencia: la banda del teclado solo se conoce
+                    # en la cámara izquierda; la derecha sigue las cajas de
+                    # las manos o, con la banda estéreo, la región que
+                    # predicen las manos de la izquierda y la calibración
+                    left_detector = HandDetector(staticImageMode=False,
+                                                 detectionCon=config.HAND_DETECTION_CONFIDENCE,
+                                                 trackCon=config.HAND_TRACKING_CONFIDENCE,
+                                                 img_width=pixel_width,
+                                                 img_height=pixel_height,
+                                                 roi_mode=config.HAND_ROI_MODE,
+                                                 roi_margin=config.HAND_ROI_MARGIN,
+                                                 roi_reach=config.HAND_ROI_REACH,
+                                                 roi_full_frame_interval=config.HAND_ROI_FULL_FRAME_INTERVAL,
+                                                 inference_scale=config.INFERENCE_SCALE)
+                    keyboard_roi = (vk_left.kb_x0, vk_left.kb_y0,
+                                    vk_left.kb_x1, vk_left.kb_y1)
+                    if config.FRAME_ORIENTATION == 'coordinates':
+                        # el detector ve el frame de la cámara (sin flip)
+                        keyboard_roi = flip_box(keyboard_roi, pixel_width,
+                                                pixel_height)
+                    left_detector.setKeyboardROI(*keyboard_roi)
+                    right_detector = HandDetector(staticImageMode=False,
+                                                  detectionCon=config.HAND_DETECTION_CONFIDENCE,
+                                                  trackCon=config.HAND_TRACKING_CONFIDENCE,
+                                                  img_width=pixel_width,
+                                                  img_height=pixel_height,
+                                                  roi_mode=right_roi_mode,
+                                                  roi_margin=config.HAND_ROI_MARGIN,
+                                                  roi_full_frame_interval=config.HAND_ROI_FULL_FRAME_INTERVAL,
+                                                  inference_scale=config.INFERENCE_SCALE)
+                # inferencia cada N frames: entre medio las manos se propagan
+                # (el control de calidad también ajusta el intervalo)
+                if config.HAND_DETECTION_INTERVAL > 1 or \
+                        config.HAND_MAX_UNCERTAINTY_PX is not None or \
+                        config.ADAPTIVE_QUALITY:
+                    left_detector, right_detector = [
+                        HandTracker(detector,
+                                    detection_interval=config.HAND_DETECTION_INTERVAL,
+                                    motion_model=config.HAND_MOTION_MODEL,
+                                    max_uncertainty_px=config.HAND_MAX_UNCERTAINTY_PX,
+                                    optical_flow=config.HAND_OPTICAL_FLOW)
+                        for detector in (left_detector, right_detector)]
+                if config.FRAME_ORIENTATION == 'coordinates':
+                    # la captura convierte el frame de la cámara a RGB
+                    for detector in (left_detector, right_detector):
+                        detector.setInputRGB(True)
+                if config.ADAPTIVE_QUALITY:
+                    quality = QualityController(
+                        (left_detector, right_detector),
+                        target_fps=config.FRAME_RATE,
+                        max_hands=left_detector.maxHands,
+                        max_inference_scale=config.INFERENCE_SCALE)
 
             # ------------------------------
             # set up synth
@@ -1056,381 +1204,163 @@ def main():
             # fs.program_select(chan=0, sfid=sfid, bank=0, preset=103)
 
             # ------------------------------
-            # stabilize
+            # set up pipeline
             # ------------------------------
-            time.sleep(0.5)
+            # captura -> detección -> fusión -> teclado, cada etapa en su
+            # hilo: la detección del par N+1 se solapa con la fusión, el
+            # audio y el render del par N. El render y las teclas quedan
+            # en este hilo (HighGUI).
+            capture_stage = CaptureStage(
+                stereo_cam,
+                frame_wait_time=config.FRAME_WAIT_TIME,
+                recorder=session_recorder,
+                stop_at_end=bool(config.REPLAY_SESSION_DIR),
+                orientation=config.FRAME_ORIENTATION,
+                swap_display=camera_in_front_of_you)
+            pipeline = Pipeline(
+                [capture_stage,
+                 HandDetectionStage(
+                     left_detector, right_detector,
+                     depth_estimator if stereo_band else None,
+                     depth_range_cm=config.STEREO_BAND_DEPTH_RANGE,
+                     band_margin=config.STEREO_BAND_MARGIN,
+                     epipolar_tolerance=config.STEREO_EPIPOLAR_TOLERANCE),
+                 StereoFusionStage(
+                     depth_estimator if use_stereo_calibration else None,
+                     angler, camera_separation,
+                     index_tip_id=INDEX_TIP_ID,
+                     finger_filter=FingerFilterBank(
+                         config.FINGER_FILTER,
+                         timeout_s=config.FINGER_FILTER_TIMEOUT_S,
+                         min_cutoff=config.FINGER_FILTER_MIN_CUTOFF,
+                         beta=config.FINGER_FILTER_BETA,
+                         process_noise=config.FINGER_FILTER_PROCESS_NOISE,
+                         measurement_noise=(
+                             config.FINGER_FILTER_MEASUREMENT_NOISE))),
+                 KeyboardStage(km, vk_left, KEYBOARD_TOT_KEYS)],
+                queue_size=config.PIPELINE_QUEUE_SIZE)
+
+            # los modos se suscriben a la salida del teclado (audio) y
+            # aportan su parte del render
+            modes = ModeManager(
+                [FreeMode(fs, vk_left, octave_base),
+                 RhythmMode(fs, vk_left, octave_base, rhythm_game,
+                            TUTORIAL_FACIL),
+                 TheoryMode(fs, vk_left, octave_base, lesson_manager,
+                            theory_ui, (left_detector, right_detector)),
+                 ConfigMode(fs, vk_left, octave_base, config_ui, km)],
+                pipeline, KeyboardStage.name)
 
-            # variables
-            # ------------------------------
+            # ACTIVAR MODO INICIAL
+            if initial_mode == "rhythm":
+                modes.switch(RhythmMode.name)
+                print("Modo JUEGO DE RITMO iniciado desde el menú principal.")
 
-            # length of target queues, positive target frames required
-            # to reset set X,Y,Z,D
-            queue_len = 3
+            elif initial_mode and initial_mode.startswith("theory_"):
+                theory = modes.switch(TheoryMode.name)
 
-            # target queues
-            #fingers_left_queue, y1k = [], []
-            #fingers_right_queue, y2k = [], []
-            x_left_finger_screen_pos = 0
-            y_left_finger_screen_pos = 0
-            
+                # Extraer ID de la lección (ej: theory_chords -> chords)
+                # Esto asume que los archivos se llaman lesson_chords.py, lesson_intervals.py, etc.
+                target_lesson_id = initial_mode.replace("theory_", "")
+                if theory.open_lesson(target_lesson_id):
+                    print(f"✓ Modo TEORÍA iniciado: Lección '{theory.current_lesson.name}'")
+                else:
+                    print(f"⚠ No se encontró la lección '{target_lesson_id}'. Mostrando menú general.")
 
-            # mean values to stabilize the coordinates
-            # x1m, y1m, x2m, y2m = 0, 0, 0, 0
-            # X1_left_hand_ref, Y1_left_hand_ref = 0, 0
-            
-            # last positive target
-            # from camera baseline midpoint
-            X, Y, Z, D, = 0, 0, 0, 0
-            delta_y = 0
+            else:
+                modes.switch(FreeMode.name)
+                if initial_mode == "free":
+                    print("Modo LIBRE iniciado desde el menú principal.")
+                elif initial_mode == "config":
+                    print("Configuración terminada. Iniciando en modo libre.")
 
+            # variables
+            # ------------------------------
             cycles = 0
             fps = 0
             start = time.time()
             display_dashboard = config.DISPLAY_DASHBOARD_DEFAULT
-            finger_depths_dict = {}  # Inicializar para evitar referencias no definidas
-            
+
             # Inicializar UI Helper
             ui_helper = UIHelper(pixel_width * 2, pixel_height)  # Ancho total de ambas cámaras
             ui_helper.show_instructions = False
 
-            
-            # Optimización: cachear transformaciones de flip
+            pipeline.start()
             while True:
-                cycles += 1
-                # get frames - reducir wait en modo juego para mejor respuesta
-                wait_time = 0.0 if game_mode else 0.1  # Sin delay en modo juego
-                finished_left, frame_left = cam_left.next(black=True, wait=wait_time)
-                finished_right, frame_right = cam_right.next(black=True, wait=wait_time)
-
-                # Aplicar flip una sola vez al principio (Selfie point of view)
-                frame_left = cv2.flip(frame_left, -1)
-                frame_right = cv2.flip(frame_right, -1)
-
-                hands_left_image = fingers_left_image = []
-                hands_right_image = fingers_right_image = []
-
-                # Detect Hands PRIMERO (sin dibujar todavía)
-                hands_detected_left = left_detector.findHands(frame_left)
-                if hands_detected_left:
-                    hands_left_image, fingers_left_image = \
-                        left_detector.getFingerTipsPos()
+                # trabajo que consume el modo activo: la captura lo adjunta
+                # a los próximos pares y las etapas saltan el resto (los
+                # menús y la bienvenida solo cuestan captura y composición)
+                if ui_helper.show_instructions:
+                    requirements = COMPOSITION_REQUIREMENTS
                 else:
-                    hands_left_image = fingers_left_image = []
+                    requirements = modes.active.get_requirements()
+                capture_stage.requirements = requirements
+
+                # último par que completó todas las etapas (los más
+                # viejos se descartan si el render se atrasa)
+                packet = pipeline.get(timeout=config.FRAME_WAIT_TIME)
+                if packet is None:
+                    if pipeline.finished:
+                        # fin de la sesión reproducida
+                        break
+                    cv2.waitKey(1)
+                    continue
 
-                hands_detected_right = right_detector.findHands(frame_right)
-                if hands_detected_right:
-                    hands_right_image, fingers_right_image = \
-                        right_detector.getFingerTipsPos()
+                cycles += 1
+                mode = modes.active
+                frame_left, frame_right = packet.frame_left, packet.frame_right
+                if quality is not None and requirements.needs_detection:
+                    quality.observe_hands(max(len(packet.hands_left),
+                                              len(packet.hands_right)))
 
                 # Dibujar teclado PRIMERO (debajo de las manos)
-                vk_left.draw_virtual_keyboard(frame_left)
-                
-                # En modo juego: dibujar notas cayendo DESPUÉS del teclado pero ANTES de las manos
-                if game_mode:
-                    rhythm_game.update()
-                    frame_left = rhythm_game.draw(
-                        frame_left, 
-                        vk_left.kb_x0, 
-                        vk_left.kb_x1,
-                        vk_left.white_key_width
-                    )
-                
-                # Dibujar manos AL FINAL (encima del teclado y notas)
-                if hands_detected_left:
-                    left_detector.drawHands(frame_left)
-                    left_detector.drawTips(frame_left)
-
-                if hands_detected_right:
-                    #vk_right.draw_virtual_keyboard(frame_right)
-                    right_detector.drawHands(frame_right)
-                    right_detector.drawTips(frame_right)
-
-                # check 1: motion in both frames:
-                if (len(fingers_left_image) > 0 and len(fingers_right_image) > 0):
-
-                    fingers_dist = []
-                    finger_depths_dict = {}  # Dict para pasar profundidades a KeyboardMap
-                    
-                    # Rectificar imágenes si usamos calibración estéreo
-                    if use_stereo_calibration and depth_estimator:
-                        frame_left_rect, frame_right_rect = depth_estimator.rectify_images(frame_left, frame_right)
-                    else:
-                        frame_left_rect, frame_right_rect = frame_left, frame_right
-                    
-                    for finger_left, finger_right in \
-                        zip(fingers_left_image, fingers_right_image):
-                        
-                        if use_stereo_calibration and depth_estimator:
-                            # ========== MÉTODO PRECISO: Calibración Estéreo ==========
-                            try:
-                                # Obtener posiciones de dedos
-                                point_left = (finger_left[2], finger_left[3])
-                                point_right = (finger_right[2], finger_right[3])
-                                
-                                # Triangular con calibración completa
-                                result_3d = depth_estimator.triangulate_point(point_left, point_right)
-                                
-                                if result_3d is not None:
-                                    X_raw, Y_raw, Z_raw = result_3d
-                                    
-                                    # APLICAR FACTOR DE CORRECCIÓN DE PROFUNDIDAD (0.74)
-                                    # Basado en mediciones empíricas (43cm real / 58cm medido)
-                                    DEPTH_CORRECTION_FACTOR = 0.74
-                                    X_local = X_raw
-                                    Y_local = Y_raw
-                                    Z_local = Z_raw * DEPTH_CORRECTION_FACTOR
-                                    
-                                    # APLICAR SUAVIZADO TEMPORAL para reducir jitter
-                                    # Obtener ID único del dedo
-                                    finger_id = (finger_left[0], finger_left[1])
-                                    
-                                    # Inicializar buffer de suavizado si no existe
-                                    if not hasattr(depth_estimator, 'finger_position_history'):
-                                        depth_estimator.finger_position_history = {}
-                                    if finger_id not in depth_estimator.finger_position_history:
-                                        depth_estimator.finger_position_history[finger_id] = deque(maxlen=5)
-                                    
-                                    # Agregar posición actual al buffer
-                                    depth_estimator.finger_position_history[finger_id].append(
-                                        (X_local, Y_local, Z_local)
-                                    )
-                                    
-                                    # Calcular promedio de últimas 5 posiciones
-                                    if len(depth_estimator.finger_position_history[finger_id]) > 0:
-                                        history = np.array(list(depth_estimator.finger_position_history[finger_id]))
-                                        X_local, Y_local, Z_local = np.mean(history, axis=0)
-                                    
-                                    D_local = Z_local  # Profundidad = coordenada Z
-                                    depth_corrected = D_local
-                                else:
-                                    # Fallback si falla triangulación
-                                    X_local = Y_local = Z_local = D_local = 0
-                                    depth_corrected = 0
-                            except Exception as e:
-                                print(f"⚠ Error en triangulación estéreo: {e}")
-                                X_local = Y_local = Z_local = D_local = 0
-                                depth_corrected = 0
-                        else:
-                            # ========== MÉTODO ANTIGUO: Triangulación por ángulos ==========
-                            # get angles from camera centers
-                            xlangle, ylangle = angler.angles_from_center(
-                                x = finger_left[2], y = finger_left[3],
-                                top_left=True, degrees=True)
-                            xrangle, yrangle = angler.angles_from_center(
-                                x = finger_right[2], y = finger_right[3],
-                                top_left=True, degrees=True)
-
-                            # triangulate
-                            X_local, Y_local, Z_local, D_local = angler.location(
-                                camera_separation,
-                                (xlangle, ylangle),
-                                (xrangle, yrangle),
-                                center=True,
-                                degrees=True)
-                            # angle normalization
-                            delta_y = 0.006509695290859 * X_local * X_local + \
-                                0.039473684210526 * -1 * X_local # + vkb_center_point_camera_dist
-                            depth_corrected = D_local - delta_y
-                        
-                        fingers_dist.append(depth_corrected)
-                        
-                        # Guardar profundidad corregida para cada dedo
-                        finger_id = (finger_left[0], finger_left[1])
-                        finger_depths_dict[finger_id] = depth_corrected
-                        
-                        # if finger_left[0] == 0 and 
-                        if finger_left[0] == 0 and finger_left[1] == left_detector.mpHands.HandLandmark.INDEX_FINGER_TIP:
-                            x_left_finger_screen_pos =  finger_left[2]
-                            y_left_finger_screen_pos = finger_left[3]
-                            X = X_local
-                            Y = Y_local
-                            Z = Z_local
-                            D = D_local
-                            
-
-                    on_map, off_map = km.get_kayboard_map(
-                        virtual_keyboard=vk_left,
-                        fingertips_pos=fingers_left_image,
-                        finger_depths=finger_depths_dict,  # Pasar profundidades 3D
-                        keyboard_n_key=KEYBOARD_TOT_KEYS)
-                    
-                    if game_mode:
-                        # Verificar aciertos cuando se presiona una tecla - optimizado
-                        # Solo verificar teclas que están activas (más eficiente)
-                        active_keys = np.where(on_map)[0]
-                        for k_pos in active_keys:
-                            hit_result = rhythm_game.check_hit(k_pos)
-                            if hit_result:
-                                print(f"Tecla {k_pos}: {hit_result}")
-                                # Reproducir audio solo en modo juego
-                                fs.noteon(
-                                    chan=0,
-                                    key=vk_left.note_from_key(k_pos)+octave_base,
-                                    vel=127*2//3)
-                        
-                        # NOTA: El dibujo del juego ya se hace arriba, antes de las manos
-                    else:
-                        # Modo libre: reproducir audio en todas las teclas
-                        if np.any(on_map):
-                            for k_pos, on_key in enumerate(on_map):
-                                if on_key:
-                                    fs.noteon(
-                                        chan=0,
-                                        key=vk_left.note_from_key(k_pos)+octave_base,
-                                        vel=127*2//3)
-
-                        if np.any(off_map):
-                            for k_pos, off_key in enumerate(off_map):
-                                if off_key:
-                                    fs.noteoff(
-                                        chan=0,
-                                        key=vk_left.note_from_key(k_pos)+octave_base
-                                        )
-
-                # display camera centers
-                angler.frame_add_crosshairs(frame_left)
-                angler.frame_add_crosshairs(frame_right)
+                if requirements.needs_keyboard_render:
+                    vk_left.draw_virtual_keyboard(frame_left)
+
+                # notas del modo (juego de ritmo) DESPUÉS del teclado pero ANTES de las manos
+                frame_left = mode.draw_under_hands(frame_left)
+
+                # Dibujar manos AL FINAL (resultado de la detección de este par)
+                if requirements.needs_hands_render:
+                    overlay_left.draw(frame_left, packet.hands_left)
+
+                    if requirements.needs_right_render:
+                        #vk_right.draw_virtual_keyboard(frame_right)
+                        overlay_right.draw(frame_right, packet.hands_right)
+
+                    # display camera centers
+                    angler.frame_add_crosshairs(frame_left)
+                    if requirements.needs_right_render:
+                        angler.frame_add_crosshairs(frame_right)
 
                 # Actualizar UI Helper
                 ui_helper.update()
-                
-                # === MODO CONFIGURACIÓN ===
-                if config_mode:
-                    # Mostrar panel de configuración
-                    if camera_in_front_of_you:
-                        h_frames = np.concatenate((frame_right, frame_left), axis=1)
-                    else:
-                        h_frames = np.concatenate((frame_left, frame_right), axis=1)
-                    
-                    h_frames = config_ui.draw_config_panel(h_frames)
-                    cv2.imshow(main_window_name, h_frames)
-                    
-                    # Manejar teclas del panel de configuración
+
+                # Lección activa (modo teoría)
+                frame_left, frame_right = mode.draw_frames(frame_left, frame_right)
+
+                # Combinar frames antes de procesar UI (sin copia si se
+                # dibujó sobre las mitades de packet.display)
+                h_frames = compose_display(packet, frame_left, frame_right,
+                                           camera_in_front_of_you)
+
+                # Pantalla propia del modo (panel de configuración, menú de
+                # lecciones): maneja sus teclas y salta el resto del loop
+                screen = mode.draw_screen(h_frames)
+                if screen is not None:
+                    cv2.imshow(main_window_name, screen)
                     key = cv2.waitKey(1) & 0xFF
-                    
-                    # Navegación
-                    if key == 82 or key == ord('w') or key == ord('W'):  # Arriba
-                        config_ui.navigate_up()
-                    elif key == 84 or key == ord('s') or key == ord('S'):  # Abajo
-                        config_ui.navigate_down()
-                    
-                    # Ajustar valores
-                    elif key == 83 or key == ord('d') or key == ord('D'):  # Derecha (aumentar)
-                        config_ui.increase_value()
-                        # Aplicar cambios en tiempo real
-                        km.depth_threshold = AppConfig.DEPTH_THRESHOLD
-                        km.velocity_threshold = AppConfig.VELOCITY_THRESHOLD
-                        km.velocity_enabled = AppConfig.VELOCITY_ENABLED
-                        km.velocity_history_size = AppConfig.VELOCITY_HISTORY_SIZE
-                    elif key == 81 or key == ord('a') or key == ord('A'):  # Izquierda (disminuir)
-                        config_ui.decrease_value()
-                        # Aplicar cambios en tiempo real
-                        km.depth_threshold = AppConfig.DEPTH_THRESHOLD
-                        km.velocity_threshold = AppConfig.VELOCITY_THRESHOLD
-                        km.velocity_enabled = AppConfig.VELOCITY_ENABLED
-                        km.velocity_history_size = AppConfig.VELOCITY_HISTORY_SIZE
-                    
-                    # Presets (teclas 1-4)
-                    elif 49 <= key <= 52:  # Teclas 1-4
-                        preset_idx = key - 49
-                        if preset_idx < len(config_ui.presets):
-                            preset_key = config_ui.presets[preset_idx]['key']
-                            config_ui.apply_preset(preset_key)
-                            config_ui.selected_preset = preset_idx
-                            print(f"✓ Preset aplicado: {config_ui.presets[preset_idx]['name']}")
-                            # Aplicar cambios en tiempo real
-                            km.depth_threshold = AppConfig.DEPTH_THRESHOLD
-                            km.velocity_threshold = AppConfig.VELOCITY_THRESHOLD
-                            km.velocity_enabled = AppConfig.VELOCITY_ENABLED
-                            km.velocity_history_size = AppConfig.VELOCITY_HISTORY_SIZE
-                    
-                    # Salir
-                    elif key == ord('q') or key == ord('Q') or key == 27:  # Q o ESC
-                        config_mode = False
-                        config_ui.reset_selection()
-                        print("Modo configuración desactivado")
-                    
-                    continue  # Saltar el resto del loop principal
-                
-                # === MODO TEORÍA ===
-                if theory_mode:
-                    if in_lesson and current_lesson:
-                        # Ejecutar lección activa
-                        frame_left, frame_right, continue_lesson = current_lesson.run(
-                            frame_left, frame_right, vk_left, fs,
-                            left_detector, right_detector
-                        )
-                        
-                        if not continue_lesson:
-                            # Salir de la lección
-                            current_lesson.stop()
-                            in_lesson = False
-                            current_lesson = None
-                            print("Saliendo de la lección...")
-                    else:
-                        # Mostrar menú de lecciones
-                        lessons = lesson_manager.get_all_lessons()
-                        if camera_in_front_of_you:
-                            h_frames = np.concatenate((frame_right, frame_left), axis=1)
-                        else:
-                            h_frames = np.concatenate((frame_left, frame_right), axis=1)
-                        
-                        h_frames = theory_ui.draw_lesson_menu(h_frames, lessons)
-                        cv2.imshow(main_window_name, h_frames)
-                        
-                        # Manejar teclas del menú
-                        key = cv2.waitKey(1) & 0xFF
-                        # Flecha arriba (múltiples códigos para compatibilidad)
-                        if key == 82 or key == ord('w') or key == ord('W'):  # Flecha arriba o W
-                            theory_ui.navigate_up(len(lessons))
-                            print(f"Navegando: lección {theory_ui.get_selected_index() + 1}/{len(lessons)}")
-                        # Flecha abajo
-                        elif key == 84 or key == ord('s') or key == ord('S'):  # Flecha abajo o S
-                            theory_ui.navigate_down(len(lessons))
-                            print(f"Navegando: lección {theory_ui.get_selected_index() + 1}/{len(lessons)}")
-                        # Números 1-9 para selección directa
-                        elif 49 <= key <= 57:  # Teclas 1-9
-                            selected_idx = key - 49  # Convertir a índice (0-8)
-                            if 0 <= selected_idx < len(lessons):
-                                lesson_id, lesson = lessons[selected_idx]
-                                current_lesson = lesson
-                                current_lesson_id = lesson_id
-                                current_lesson.start()
-                                in_lesson = True
-                                print(f"Iniciando lección: {lesson.name}")
-                        # ENTER
-                        elif key == 13:  # ENTER
-                            selected_idx = theory_ui.get_selected_index()
-                            if 0 <= selected_idx < len(lessons):
-                                lesson_id, lesson = lessons[selected_idx]
-                                current_lesson = lesson
-                                current_lesson_id = lesson_id
-                                current_lesson.start()
-                                in_lesson = True
-                                print(f"Iniciando lección: {lesson.name}")
-                        elif key == ord('q') or key == ord('Q'):
-                            theory_mode = False
-                            theory_ui.reset_selection()
-                            print("Saliendo del modo teoría...")
-                        elif key == 27:  # ESC
-                            theory_mode = False
-                            theory_ui.reset_selection()
-                        elif key != 255:  # Mostrar código de cualquier otra tecla para debug
-                            print(f"Tecla presionada en menú teoría: código {key}")
-                        continue  # Saltar el resto del loop principal
-                
-                # Combinar frames antes de procesar UI
-                if camera_in_front_of_you:
-                    h_frames = np.concatenate((frame_right, frame_left), axis=1)
-                else:
-                    h_frames = np.concatenate((frame_left, frame_right), axis=1)
-                
+                    next_mode = mode.handle_key(key)
+                    if next_mode is not None and next_mode != mode.name:
+                        modes.switch(next_mode)
+                    continue
+
                 # Mostrar pantalla de bienvenida si es necesario
                 if ui_helper.show_instructions:
                     welcome_frame = np.zeros((pixel_height, pixel_width * 2, 3), dtype=np.uint8)
                     welcome_frame = ui_helper.draw_welcome_screen(welcome_frame)
                     cv2.imshow(main_window_name, welcome_frame)
-                    
+
                     # Esperar a que se presione una tecla para continuar
                     key = cv2.waitKey(1) & 0xFF
                     if key != 255:  # Cualquier tecla
@@ -1438,12 +1368,38 @@ def main():
                         ui_helper.frame_count = ui_helper.instructions_timeout  # No volver a mostrar
                     continue
 
+                X, Y, Z, D, delta_y = packet.target
                 if display_dashboard:
                     # Display dashboard data
-                    fps1 = int(cam_left.current_frame_rate)
-                    fps2 = int(cam_right.current_frame_rate)
+                    fps_pair = int(stereo_cam.current_frame_rate)
+                    skew_ms = stereo_cam.get_mean_skew_ms()
                     cps_avg = int(round_half_up(fps))  # Average Cycles per second
-                    text = 'X: {:3.1f}\nY: {:3.1f}\nZ: {:3.1f}\nD: {:3.1f}\nDr: {:3.1f}\nDepth Thr: {:.2f}\nFPS:{}/{}\nCPS:{}'.format(X, Y, Z, D, D-delta_y, km.depth_threshold, fps1, fps2, cps_avg)
+                    text = 'X: {:3.1f}\nY: {:3.1f}\nZ: {:3.1f}\nD: {:3.1f}\nDr: {:3.1f}\nDepth Thr: {:.2f}\nFPS:{}\nSkew:{:.1f}ms\nCPS:{}'.format(X, Y, Z, D, D-delta_y, km.depth_threshold, fps_pair, skew_ms, cps_avg)
+                    # fracción de frames con inferencia (HAND_DETECTION_INTERVAL)
+                    if hasattr(left_detector, 'getTrackingStats'):
+                        text += ' det:{:.0%}'.format(
+                            left_detector.getTrackingStats()['detection_rate'])
+                    if quality is not None:
+                        text += ' Q:{}'.format(quality.level)
+                    # backend 'tasks': demora del último resultado asíncrono
+                    if hasattr(left_detector, 'getAsyncStats'):
+                        text += ' async:{:.0f}ms'.format(
+                            left_detector.getAsyncStats()['lag_ms'])
+                    # tiempo medio de cada etapa y latencia captura -> render
+                    for name, stage_ms in pipeline.get_stage_times_ms().items():
+                        text += '\n{}: {:.1f}ms'.format(name[:3], stage_ms)
+                    text += '\nLat: {:.0f}ms'.format(pipeline.latency.mean_ms)
+                    # ahorro de inferencia por la ROI (izquierda | derecha)
+                    if getattr(left_detector, 'roi_mode', None):
+                        roi_stats = left_detector.getROIStats()
+                        text += '\nROI: {:.0f}% -{:.1f}ms'.format(
+                            roi_stats['area'] * 100, roi_stats['saved_ms'])
+                    if getattr(right_detector, 'roi_mode', None):
+                        roi_stats = right_detector.getROIStats()
+                        text += '{}{:.0f}% -{:.1f}ms'.format(
+                            ' | ' if getattr(left_detector, 'roi_mode', None)
+                            else '\nROI der: ',
+                            roi_stats['area'] * 100, roi_stats['saved_ms'])
                     lineloc = 0
                     lineheight = 30
                     for t in text.split('\n'):
@@ -1458,41 +1414,34 @@ def main():
                                     2,                          # line width
                                     cv2.LINE_AA,
                                     False)
-                    
+
                     # Re-combinar frames después de actualizar el izquierdo
-                    if camera_in_front_of_you:
-                        h_frames = np.concatenate((frame_right, frame_left), axis=1)
-                    else:
-                        h_frames = np.concatenate((frame_left, frame_right), axis=1)
+                    h_frames = compose_display(packet, frame_left, frame_right,
+                                               camera_in_front_of_you)
 
                 # Display current target
-                # if fingers_left_queue:
-                #     frame_add_crosshairs(frame_left, x1m, y1m, 24)
-                #     frame_add_crosshairs(frame_right, x2m, y2m, 24)
-
-                # if fingers_left_queue:
-                #     frame_add_crosshairs(frame_left, x1m, y1m, 24)
-                #     frame_add_crosshairs(frame_right, x2m, y2m, 24)
-                # if X > 0 and Y > 0:
+                x_left_finger_screen_pos, y_left_finger_screen_pos = packet.target_screen_pos
                 frame_add_crosshairs(frame_left, x_left_finger_screen_pos, y_left_finger_screen_pos, 24)
                 # Pendiente : ...frame_add_crosshairs(frame_right, x_left_finger_screen_pos, y_left_finger_screen_pos, 24)
 
-
+                # Aviso de cámara perdida / reconectando
+                h_frames = ui_helper.draw_camera_status(
+                    h_frames, stereo_cam.get_status())
 
                 # Display frames
                 cv2.imshow(main_window_name, h_frames)
 
-
-
                 if (cycles % 10 == 0):
                     # End time
                     end = time.time()
                     # Time elapsed
                     seconds = end - start
-                    # print ("Time taken : {0} seconds".format(seconds))
                     # Calculate frames per second
                     fps = 10 / seconds
                     start = time.time()
+                    # calidad de la detección según el ritmo medido
+                    if quality is not None:
+                        quality.update(fps, pipeline.get_stage_times_ms())
 
                 # Detect control keys
                 key = cv2.waitKey(1) & 0xFF
@@ -1502,9 +1451,9 @@ def main():
                 elif key == ord('q'):
                     break
                 elif key == ord('c') or key == ord('C'):  # ========== MODO CONFIGURACIÓN ==========
-                    # Solo toggle si NO estamos en config_mode, theory_mode o game_mode
-                    if not config_mode and not theory_mode and not game_mode:
-                        config_mode = True
+                    # Solo desde el modo libre (no en juego ni teoría)
+                    if mode.name == FreeMode.name:
+                        modes.switch(ConfigMode.name)
                         print("\n=== MODO CONFIGURACIÓN ACTIVADO ===")
                         print("Controles:")
                         print("  W/S o ↑/↓: Navegar parámetros")
@@ -1513,29 +1462,18 @@ def main():
                         print("  Q/ESC: Salir")
                         print("=====================================\n")
                 elif key == ord('d'):
-                    if display_dashboard:
-                        display_dashboard = False
-                    else:
-                        display_dashboard = True
+                    display_dashboard = not display_dashboard
                 elif key == ord('g'):  # ========== NUEVA TECLA ==========
-                    game_mode = True
-                    rhythm_game.start_game(TUTORIAL_FACIL)
+                    modes.switch(RhythmMode.name)
                     print("¡Juego de ritmo iniciado! Presiona 'f' para volver al modo libre")
                     ui_helper.reset_instructions()  # Mostrar instrucciones del juego
                 elif key == ord('f'):  # ========== NUEVA TECLA ==========
-                    # Detener juego si está activo
-                    if game_mode and rhythm_game.is_playing:
-                        rhythm_game.stop_game()
-                    game_mode = False
-                    theory_mode = False
+                    # Detiene el juego si está activo (exit del modo)
+                    modes.switch(FreeMode.name)
                     print("Modo libre activado")
                     ui_helper.reset_instructions()  # Mostrar instrucciones del modo libre
                 elif key == ord('l'):  # ========== MODO TEORÍA ==========
-                    theory_mode = True
-                    game_mode = False
-                    if rhythm_game.is_playing:
-                        rhythm_game.stop_game()
-                    theory_ui.reset_selection()
+                    modes.switch(TheoryMode.name)
                     print("¡Modo Teoría activado! Selecciona una lección. Presiona Q para salir.")
                 elif key == ord('t'):  # Subir nivel de mesa (ESTÉREO: aumentar umbral de profundidad)
                     new_threshold = km.depth_threshold + 0.2
@@ -1548,18 +1486,16 @@ def main():
                 elif key == ord('p'):  # Mostrar profundidades detectadas
                     if display_dashboard:
                         print(f"Profundidades detectadas (D - delta_y):")
-                        for fid, depth in finger_depths_dict.items():
+                        for fid, depth in packet.finger_depths.items():
                             print(f"  Dedo {fid}: {depth:.2f} cm")
-                elif key == 27 and in_lesson:  # ESC dentro de lección
-                    if current_lesson:
-                        current_lesson.stop()
-                    in_lesson = False
-                    current_lesson = None
-                    print("Volviendo al menú de lecciones...")
-                elif in_lesson and current_lesson:  # Pasar teclas a la lección activa
-                    current_lesson.handle_key(key, fs, octave_base)
-                elif key != 255:
-                    print('KEY PRESS:', [chr(key)])
+                else:
+                    # teclas del modo (p. ej. la lección activa)
+                    next_mode = mode.handle_key(key)
+                    if next_mode is None:
+                        if key != 255:
+                            print('KEY PRESS:', [chr(key)])
+                    elif next_mode != mode.name:
+                        modes.switch(next_mode)
 
         # ------------------------------
         # full error catch
@@ -1571,28 +1507,39 @@ def main():
         # close all
         # ------------------------------
 
+        # stop pipeline threads (antes del synth: el audio corre en ellos)
+        if pipeline is not None:
+            pipeline.stop()
+        if modes is not None:
+            modes.close()
+        # HandLandmarker (backend 'tasks') tiene su propio hilo de inferencia
+        for detector in (left_detector, right_detector):
+            if hasattr(detector, 'close'):
+                detector.close()
+
         # Fluidsynth
         try:
             fs.delete()
         except Exception:
             pass
-        # close camera1
+        # pause stereo cameras (se reutilizan al volver del menú)
         try:
-            cam_left.stop()
-        except Exception:
-            pass
-
-        # close camera2
-        try:
-            cam_right.stop()
+            stereo_cam.pause()
         except Exception:
             pass
+        # close session recorder
+        if session_recorder is not None:
+            session_recorder.close()
 
         # kill frames
         cv2.destroyAllWindows()
 
-        # done
-        print('DONE')
+    # close stereo cameras
+    if stereo_cam is not None:
+        stereo_cam.stop()
+
+    # done
+    print('DONE')
 
 
 # ------------------------------
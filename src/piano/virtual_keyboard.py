@@ -193,6 +193,13 @@ class VirtualKeyboard():
             return True
         return False
 
+    def intersect_many(self, points):
+        """intersect para (N, 2) puntos a la vez: retorna una máscara (N,)"""
+        points = np.asarray(points).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+        return (x > self.kb_x0) & (x < self.kb_x1) & \
+            (y > self.kb_y0) & (y < self.kb_y1)
+
     # def find_key(self, x_pos):
     #     print('find_key:x_pos {}'.format(x_pos))
     #     key = (x_pos/self.white_key_width)
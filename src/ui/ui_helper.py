@@ -7,6 +7,7 @@ Módulo de ayuda para interfaz de usuario mejorada
 import cv2
 import numpy as np
 from src.vision.stereo_config import StereoConfig
+from src.vision.video_thread import CameraStatus
 
 
 class UIHelper:
@@ -187,6 +188,39 @@ class UIHelper:
         
         return frame
     
+    def draw_camera_status(self, frame, status):
+        """
+        Dibuja un aviso cuando las cámaras no están transmitiendo
+        
+        Args:
+            frame: Frame donde dibujar
+            status: CameraStatus de la captura
+        """
+        if status == CameraStatus.STREAMING:
+            return frame
+        
+        if status == CameraStatus.RECONNECTING:
+            text = "Camara desconectada - reconectando..."
+            color = (0, 165, 255)
+        else:
+            text = "Camara no disponible"
+            color = (0, 0, 255)
+        
+        font_scale = 1.0
+        (text_width, text_height), baseline = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)
+        text_x = (frame.shape[1] - text_width) // 2
+        text_y = frame.shape[0] // 2
+        
+        cv2.rectangle(frame,
+                     (text_x - 20, text_y - text_height - 20),
+                     (text_x + text_width + 20, text_y + 20),
+                     (0, 0, 0), -1)
+        cv2.putText(frame, text, (text_x, text_y),
+                   cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, 2)
+        
+        return frame
+    
     def update(self):
         """Actualiza contador interno"""
         self.frame_count += 1
@@ -1,11 +1,32 @@
 # vision module init
+from .hand_backend import BaseHandDetector, HandDetection
 from .hand_detector import HandDetector
+from .hand_landmarks import HandLandmarks
+from .hand_tracker import HandTracker
+from .hand_overlay import HandOverlay
+from .hand_landmarker_detector import HandLandmarkerDetector
+from .contour_hand_detector import ContourHandDetector
+from .quality_controller import QualityController
 from .keyboard_mapper import KeyboardMap
-from .video_thread import VideoThread
+from .video_thread import VideoThread, StereoVideoThread, CameraStatus
+from .session_recorder import (StereoSessionRecorder, StereoSessionReplay,
+                               ReplayVideoThread)
+from .multiprocess_capture import MultiProcessStereoCapture, SharedFrameRing
+from .pipeline import Pipeline, PipelineStage, LatestQueue, FramePacket
 from .angles import Frame_Angles
 from .depth_estimator import DepthEstimator, load_depth_estimator
+from .depth_correction import DepthCorrection
+from .finger_filter import FingerFilterBank
+from .keyboard_plane import KeyboardPlane
 from .algorithms import AlgorithmManager, BaseAlgorithm
 
-__all__ = ['HandDetector', 'KeyboardMap', 'VideoThread', 
+__all__ = ['BaseHandDetector', 'HandDetection', 'HandDetector',
+           'HandLandmarks', 'HandTracker', 'HandOverlay', 'HandLandmarkerDetector',
+           'ContourHandDetector', 'QualityController', 'KeyboardMap',
+           'VideoThread', 'StereoVideoThread', 'CameraStatus',
+           'StereoSessionRecorder', 'StereoSessionReplay', 'ReplayVideoThread',
+           'MultiProcessStereoCapture', 'SharedFrameRing',
+           'Pipeline', 'PipelineStage', 'LatestQueue', 'FramePacket',
            'Frame_Angles', 'DepthEstimator', 'load_depth_estimator',
+           'DepthCorrection', 'FingerFilterBank', 'KeyboardPlane',
            'AlgorithmManager', 'BaseAlgorithm']
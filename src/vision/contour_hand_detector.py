@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detector de manos liviano por color de piel y contornos (sin red neuronal)
+
+ContourHandDetector segmenta la piel en YCrCb, toma los contornos más
+grandes como manos y busca las yemas como máximos locales de la distancia
+del contorno al centro de la palma (máximo de la transformada de
+distancia). Cuesta una fracción de MediaPipe en CPU, pero:
+- no distingue qué dedo es cada yema (se ordenan de izquierda a derecha),
+- sin dedos extendidos encuentra menos de 5 yemas (las que faltan quedan
+  en el centro de la palma y bajan la confianza de la mano),
+- no estima la lateralidad (-1) ni el resto del esqueleto (la palma),
+- depende de la iluminación y de un fondo sin tonos de piel.
+
+Implementa BaseHandDetector; main.py lo usa con
+StereoConfig.HAND_DETECTOR_BACKEND = 'contour'.
+"""
+
+import cv2
+import numpy as np
+
+from src.vision.hand_backend import BaseHandDetector, HandDetection
+from src.vision.hand_landmarks import N_LANDMARKS, FINGER_TIP_IDS, TIPS
+
+
+class ContourHandDetector(BaseHandDetector):
+    """Backend de piel + contornos"""
+
+    def __init__(self, maxHands=2, img_width=640, img_height=480,
+                 process_scale=0.5, skin_lower=(0, 133, 77),
+                 skin_upper=(255, 173, 127), min_area_ratio=0.01,
+                 finger_ratio=1.6):
+        """
+        Args:
+            maxHands: Máximo de manos (los contornos de piel más grandes)
+            img_width, img_height: Tamaño del frame de los landmarks (píxeles)
+            process_scale: Escala de la imagen que se segmenta
+            skin_lower, skin_upper: Rango de piel en YCrCb
+            min_area_ratio: Área mínima de una mano (fracción del frame)
+            finger_ratio: Distancia mínima de una yema al centro de la
+                palma, en radios de la palma
+        """
+        super().__init__(maxHands, img_width, img_height)
+        self.process_scale = process_scale
+        self.skin_lower = np.array(skin_lower, np.uint8)
+        self.skin_upper = np.array(skin_upper, np.uint8)
+        self.min_area_ratio = min_area_ratio
+        self.finger_ratio = finger_ratio
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self.mask = None   # última máscara de piel (diagnóstico)
+
+    def detect(self, frame):
+        if self.process_scale < 1.0:
+            frame = cv2.resize(frame, None, fx=self.process_scale,
+                               fy=self.process_scale,
+                               interpolation=cv2.INTER_AREA)
+        to_ycrcb = cv2.COLOR_RGB2YCrCb if self.input_rgb else \
+            cv2.COLOR_BGR2YCrCb
+        mask = cv2.inRange(cv2.cvtColor(frame, to_ycrcb),
+                           self.skin_lower, self.skin_upper)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
+        self.mask = mask
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_NONE)
+        min_area = self.min_area_ratio * mask.size
+        contours = [c for c in contours if cv2.contourArea(c) >= min_area]
+        contours = sorted(contours, key=cv2.contourArea,
+                          reverse=True)[:self.maxHands]
+
+        points = np.zeros((len(contours), N_LANDMARKS, 3), np.float32)
+        handedness = np.zeros((len(contours), 2), np.float32)
+        for hand_id, contour in enumerate(contours):
+            center, radius = self._palm(contour)
+            tips = self._fingertips(contour[:, 0, :].astype(np.float32),
+                                    center, radius, mask.shape)
+            points[hand_id, :, :2] = center
+            points[hand_id, TIPS, :2][:len(tips)] = tips
+            handedness[hand_id] = (-1, len(tips) / len(FINGER_TIP_IDS))
+        # de la imagen segmentada a píxeles del frame completo
+        points[:, :, :2] *= (self.img_width / mask.shape[1],
+                             self.img_height / mask.shape[0])
+        self.landmarks.fill_from_arrays(points, handedness)
+        return HandDetection.from_landmarks(self.landmarks)
+
+    @staticmethod
+    def _palm(contour):
+        """Centro y radio de la palma: máximo de la transformada de distancia"""
+        x, y, w, h = cv2.boundingRect(contour)
+        hand_mask = np.zeros((h + 2, w + 2), np.uint8)
+        cv2.drawContours(hand_mask, [contour - (x - 1, y - 1)], -1, 255,
+                         cv2.FILLED)
+        distance = cv2.distanceTransform(hand_mask, cv2.DIST_L2, 3)
+        _, radius, _, (cx, cy) = cv2.minMaxLoc(distance)
+        return np.array((cx + x - 1, cy + y - 1), np.float32), radius
+
+    def _fingertips(self, contour, center, radius, shape):
+        """
+        Yemas: máximos locales de la distancia al centro, lejos de la palma
+        y del borde de la imagen (el antebrazo entra por el borde).
+
+        Returns:
+            ndarray: (k, 2) con k <= 5, ordenadas por x
+        """
+        distance = np.hypot(*(contour - center).T)
+        window = max(len(contour) // 40, 3)
+        # máximo en una ventana circular alrededor de cada punto
+        padded = np.concatenate([distance[-window:], distance,
+                                 distance[:window]])
+        local_max = np.lib.stride_tricks.sliding_window_view(
+            padded, 2 * window + 1).max(axis=1)
+        height, width = shape
+        inside = ((contour[:, 0] > 2) & (contour[:, 0] < width - 3) &
+                  (contour[:, 1] > 2) & (contour[:, 1] < height - 3))
+        candidates = np.flatnonzero((distance >= local_max) & inside &
+                                    (distance > self.finger_ratio * radius))
+
+        tips = []
+        for index in candidates[np.argsort(-distance[candidates])]:
+            # una yema por dedo: separadas al menos un radio de palma
+            if all(np.hypot(*(contour[index] - tip)) > radius for tip in tips):
+                tips.append(contour[index])
+                if len(tips) == len(FINGER_TIP_IDS):
+                    break
+        tips = np.array(tips, np.float32).reshape(-1, 2)
+        return tips[np.argsort(tips[:, 0])]
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Corrección de profundidad variable en el espacio (Fase 3)
+
+La corrección es un factor que multiplica Z y depende de la posición
+triangulada: un polinomio de grado bajo en (x, y, z) ajustado por mínimos
+cuadrados a las mediciones de la Fase 3 (factor = Z real / Z medida). Con
+grado 0 es el factor único de siempre (la media de los cocientes).
+
+Al cargar, el polinomio se evalúa una vez sobre una grilla 3D que cubre el
+volumen medido (DepthCorrection.bake); en tiempo de ejecución la
+corrección de todas las yemas es una interpolación trilineal vectorizada
+en esa grilla. Fuera del volumen se usa el borde más cercano (el
+polinomio no se extrapola).
+
+Las posiciones van en cm, en el sistema de la cámara sin voltear (el de
+la Fase 3): StereoFusionStage deshace el flip del punto de vista antes de
+triangular, así la grilla se lee en la misma posición en que se midió.
+"""
+
+import itertools
+
+import numpy as np
+
+
+GRID_SHAPE = (9, 9, 17)        # puntos de la grilla en x, y, z
+BOUNDS_MARGIN_CM = 5.0         # margen alrededor de las muestras
+MAX_DEGREE = 2
+
+# esquinas de la celda (8, 3) para la interpolación trilineal
+_CORNERS = np.array(list(itertools.product((0, 1), repeat=3)))
+
+
+def polynomial_exponents(degree):
+    """Exponentes (i, j, k) de los monomios x^i y^j z^k con i+j+k <= grado"""
+    exponents = []
+    for total in range(degree + 1):
+        for i in range(total, -1, -1):
+            for j in range(total - i, -1, -1):
+                exponents.append((i, j, total - i - j))
+    return exponents
+
+
+class DepthCorrection:
+    """Factor de Z en función de (x, y, z), interpolado en una grilla"""
+
+    def __init__(self, coefficients=(1.0,), degree=0, center=(0, 0, 0),
+                 scale=(1, 1, 1), bounds=None, grid_shape=GRID_SHAPE):
+        """
+        Args:
+            coefficients: Coeficientes de polynomial_exponents(degree)
+            degree: Grado del polinomio
+            center: Centro de la normalización (cm)
+            scale: Escala de la normalización (cm)
+            bounds: ((x0, y0, z0), (x1, y1, z1)) volumen de la grilla en
+                cm; None = center ± 2 * scale
+            grid_shape: Puntos de la grilla en x, y, z (>= 2 cada uno)
+        """
+        self.degree = int(degree)
+        self.exponents = np.array(polynomial_exponents(self.degree))
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        if len(self.coefficients) != len(self.exponents):
+            raise ValueError(f"coefficients inválido: se esperaban "
+                             f"{len(self.exponents)} para grado {degree}")
+        self.center = np.asarray(center, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        if bounds is None:
+            bounds = (self.center - 2 * self.scale,
+                      self.center + 2 * self.scale)
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.bake(grid_shape)
+
+    @classmethod
+    def constant(cls, factor):
+        """Corrección uniforme (el factor único de siempre)"""
+        return cls(coefficients=(factor,), degree=0)
+
+    @classmethod
+    def fit(cls, measured, real_z, degree=MAX_DEGREE,
+            margin_cm=BOUNDS_MARGIN_CM):
+        """
+        Ajusta el polinomio por mínimos cuadrados.
+
+        El grado baja hasta que haya al menos dos muestras por coeficiente
+        (con pocas mediciones queda el factor único).
+
+        Args:
+            measured: Posiciones trianguladas sin corregir (N, 3) en cm
+            real_z: Profundidad real de cada muestra (N,) en cm
+            degree: Grado máximo
+            margin_cm: Margen de la grilla alrededor de las muestras
+
+        Returns:
+            DepthCorrection
+        """
+        measured = np.asarray(measured, dtype=np.float64).reshape(-1, 3)
+        real_z = np.asarray(real_z, dtype=np.float64).reshape(-1)
+        if len(measured) == 0 or len(measured) != len(real_z):
+            raise ValueError(f"muestras inválidas: {len(measured)} "
+                             f"posiciones, {len(real_z)} profundidades")
+        if np.any(measured[:, 2] <= 0):
+            raise ValueError("Z medida debe ser positiva")
+        while degree > 0 and \
+                2 * len(polynomial_exponents(degree)) > len(measured):
+            degree -= 1
+
+        center = measured.mean(axis=0)
+        scale = np.maximum(measured.std(axis=0), 1.0)
+        ratios = real_z / measured[:, 2]
+        terms = cls._terms(measured, center, scale, degree)
+        coefficients = np.linalg.lstsq(terms, ratios, rcond=None)[0]
+        bounds = (measured.min(axis=0) - margin_cm,
+                  measured.max(axis=0) + margin_cm)
+        return cls(coefficients, degree, center, scale, bounds)
+
+    @classmethod
+    def from_dict(cls, data, factor=0.74):
+        """
+        Corrección guardada en calibration.json (sección depth_correction).
+
+        Args:
+            data: Diccionario de to_dict, o None
+            factor: Factor único si no hay modelo (calibraciones previas)
+        """
+        if not data:
+            return cls.constant(factor)
+        return cls(data['coefficients'], data['degree'], data['center'],
+                   data['scale'], data.get('bounds'))
+
+    def to_dict(self):
+        """Modelo serializable a JSON"""
+        return {'type': 'polynomial',
+                'degree': self.degree,
+                'coefficients': self.coefficients.tolist(),
+                'center': self.center.tolist(),
+                'scale': self.scale.tolist(),
+                'bounds': self.bounds.tolist()}
+
+    @staticmethod
+    def _terms(points, center, scale, degree):
+        normalized = (points - center) / scale
+        exponents = np.array(polynomial_exponents(degree))
+        return np.prod(normalized[:, None, :] ** exponents[None], axis=2)
+
+    def evaluate(self, points):
+        """Factor del polinomio en cada punto (N, 3), sin la grilla"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        return self._terms(points, self.center, self.scale,
+                           self.degree) @ self.coefficients
+
+    def bake(self, grid_shape=GRID_SHAPE):
+        """Evalúa el polinomio en la grilla (una vez, al cargar)"""
+        self.grid_shape = tuple(max(int(n), 2) for n in grid_shape)
+        axes = [np.linspace(lo, hi, n) for lo, hi, n in
+                zip(self.bounds[0], self.bounds[1], self.grid_shape)]
+        grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1)
+        self.grid = self.evaluate(grid.reshape(-1, 3)).reshape(
+            self.grid_shape)
+        self.step = (self.bounds[1] - self.bounds[0]) / \
+            (np.array(self.grid_shape) - 1)
+        # índice plano de las 8 esquinas de una celda respecto de la base
+        self._strides = np.array([self.grid_shape[1] * self.grid_shape[2],
+                                  self.grid_shape[2], 1])
+        self._offsets = _CORNERS @ self._strides
+        self._flat = self.grid.ravel()
+
+    def factors(self, points):
+        """
+        Factor de Z en cada punto por interpolación trilineal.
+
+        Args:
+            points: Posiciones (N, 3) en cm
+
+        Returns:
+            np.ndarray: (N,) factores
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        upper = np.array(self.grid_shape) - 1
+        cell = np.clip((points - self.bounds[0]) / self.step, 0, upper)
+        base = np.minimum(cell.astype(np.int64), upper - 1)
+        fraction = cell - base
+        values = self._flat[(base @ self._strides)[:, None] +
+                            self._offsets]                        # (N, 8)
+        weights = np.where(_CORNERS, fraction[:, None, :],
+                           1.0 - fraction[:, None, :])
+        weights = weights[..., 0] * weights[..., 1] * weights[..., 2]
+        return np.sum(weights * values, axis=1)
+
+    def apply(self, points):
+        """Corrige Z de los puntos (N, 3) en el lugar y los devuelve"""
+        if len(points):
+            points[:, 2] *= self.factors(points)
+        return points
@@ -9,19 +9,23 @@ import cv2
 import numpy as np
 import json
 from pathlib import Path
-from scipy import linalg
-from collections import deque
+
+from .depth_correction import DepthCorrection
+from .finger_filter import FingerFilterBank
+from .keyboard_plane import KeyboardPlane
 
 
 class DepthEstimator:
     """
     Estima profundidad 3D usando calibración estéreo completa
-    Rectifica imágenes y triangula puntos para obtener coordenadas (X, Y, Z)
+    Rectifica los puntos (landmarks) y los triangula para obtener
+    coordenadas (X, Y, Z); las imágenes completas solo se rectifican a
+    pedido (vistas de depuración)
     """
     
     def __init__(self, calibration_file):
         """
-        Carga calibración y prepara mapas de rectificación
+        Carga calibración y prepara las matrices de proyección rectificadas
         
         Args:
             calibration_file: Path o str con ruta a calibration.json
@@ -46,13 +50,20 @@ class DepthEstimator:
         self.T_world_right = None  # Traslación cámara der respecto al mundo
         
         # Factor de corrección de profundidad (calibrado empíricamente)
-        # Basado en mediciones reales vs estimadas
+        # Basado en mediciones reales vs estimadas; la corrección aplicada
+        # es depth_correction (varía con la posición, Fase 3)
         self.DEPTH_CORRECTION_FACTOR = 0.74
+        self.depth_correction = DepthCorrection.constant(
+            self.DEPTH_CORRECTION_FACTOR)
+        
+        # Plano del teclado (profundidad de presión = distancia al plano)
+        self.keyboard_plane = None
         
         # Sistema de suavizado temporal (para reducir jitter)
         self.smoothing_enabled = True
         self.smoothing_window = 5  # Últimos N frames
-        self.position_history = {}  # {landmark_id: deque([(x,y,z), ...], maxlen=N)}
+        self.position_filter = FingerFilterBank('mean', timeout_s=None,
+                                                window=self.smoothing_window)
         
         # Parámetros de rectificación
         self.R1 = None
@@ -61,7 +72,14 @@ class DepthEstimator:
         self.P2 = None
         self.Q = None
         
-        # Mapas de rectificación (calculados una sola vez)
+        # Matrices de la DLT (calculadas una sola vez): proyección
+        # mundo -> imagen original (K @ [R | T]) y transformación del
+        # sistema rectificado (P1/P2) al mundo, para puntos de rectify_points
+        self.P0_dlt = None
+        self.P1_dlt = None
+        self.rect_to_world = None
+        
+        # Mapas de rectificación (se generan al primer rectify_images)
         self.mapx_left = None
         self.mapy_left = None
         self.mapx_right = None
@@ -72,9 +90,8 @@ class DepthEstimator:
         
         # Cargar calibración
         self._load_calibration()
-        
-        # Generar mapas de rectificación
-        self._generate_rectification_maps()
+        self.P0_dlt, self.P1_dlt = self._get_projection_matrices_for_DLT()
+        self.rect_to_world = self._get_rect_to_world()
     
     def _load_calibration(self):
         """Carga todos los parámetros desde calibration.json"""
@@ -112,6 +129,9 @@ class DepthEstimator:
         # Obtener resolución desde image_size (ancho, alto)
         if 'image_size' in left_cam:
             self.image_size = tuple(left_cam['image_size'])
+        elif 'image_width' in left_cam:
+            self.image_size = (left_cam['image_width'],
+                               left_cam['image_height'])
         else:
             # Fallback: inferir desde matriz K
             self.image_size = (int(self.K_left[0, 2] * 2), int(self.K_left[1, 2] * 2))
@@ -150,13 +170,26 @@ class DepthEstimator:
         if 'depth_correction' in data:
             depth_corr = data['depth_correction']
             self.DEPTH_CORRECTION_FACTOR = depth_corr.get('factor', 0.74)
+            self.depth_correction = DepthCorrection.from_dict(
+                depth_corr.get('model'), self.DEPTH_CORRECTION_FACTOR)
             print(f"  ✓ Factor de corrección de profundidad cargado: {self.DEPTH_CORRECTION_FACTOR:.4f}")
+            if self.depth_correction.degree > 0:
+                print(f"  ✓ Corrección espacial de grado {self.depth_correction.degree} "
+                      f"(grilla {'x'.join(map(str, self.depth_correction.grid_shape))})")
         else:
             # Usar valor por defecto si no hay Fase 3
             self.DEPTH_CORRECTION_FACTOR = 0.74
+            self.depth_correction = DepthCorrection.constant(
+                self.DEPTH_CORRECTION_FACTOR)
             print(f"  ⚠ Factor de corrección no encontrado, usando por defecto: {self.DEPTH_CORRECTION_FACTOR:.4f}")
             print("    Ejecuta Fase 3 (Calibración de Profundidad) para mejorar precisión")
         
+        # Plano del teclado (KeyboardPlaneCalibrator)
+        if data.get('keyboard_plane'):
+            self.keyboard_plane = KeyboardPlane.from_dict(data['keyboard_plane'])
+            print(f"  ✓ Plano del teclado cargado ({self.keyboard_plane.num_points} puntos, "
+                  f"RMS {self.keyboard_plane.rms_cm:.2f} cm)")
+        
         print(f"✓ Calibración cargada desde: {self.calibration_file}")
         print(f"  Baseline: {self.baseline_cm:.2f} cm")
         print(f"  Resolución: {self.image_size[0]}x{self.image_size[1]}")
@@ -190,7 +223,9 @@ class DepthEstimator:
     
     def rectify_images(self, img_left, img_right):
         """
-        Rectifica un par de imágenes estéreo
+        Rectifica un par de imágenes estéreo (dos cv2.remap del frame
+        completo: solo para vistas de depuración; la triangulación usa
+        rectify_points). Los mapas se generan en la primera llamada.
         
         Args:
             img_left: Imagen de cámara izquierda (BGR)
@@ -199,6 +234,9 @@ class DepthEstimator:
         Returns:
             tuple: (img_left_rect, img_right_rect) imágenes rectificadas
         """
+        if self.mapx_left is None:
+            self._generate_rectification_maps()
+        
         img_left_rect = cv2.remap(
             img_left,
             self.mapx_left,
@@ -275,7 +313,118 @@ class DepthEstimator:
         
         return P0, P1
     
-    def triangulate_point_DLT(self, point_left, point_right):
+    def _get_rect_to_world(self):
+        """
+        Transformación del sistema de la cámara izquierda rectificada al
+        mundo.
+        
+        P1 y P2 de stereoRectify proyectan puntos en ese sistema
+        (X_rect = R1 @ X_izq); la DLT de puntos rectificados se resuelve
+        con ellas y el resultado se lleva al mundo para devolver las mismas
+        coordenadas que con _get_projection_matrices_for_DLT:
+        X_mundo = R_izq^T @ (R1^T @ X_rect - T_izq).
+        
+        Returns:
+            np.ndarray: Matriz 3x4 [R | t] (float64)
+        """
+        R_world = self.R_world_left.astype(np.float64).T
+        R = R_world @ self.R1.astype(np.float64).T
+        t = -R_world @ self.T_world_left.astype(np.float64)
+        return np.hstack([R, t])
+    
+    def rectify_points(self, points, is_left=True):
+        """
+        Corrige la distorsión y rectifica puntos de la imagen original con
+        una sola llamada a cv2.undistortPoints (inversa exacta de los mapas
+        de rectify_images, sin remapear la imagen)
+        
+        Args:
+            points: Puntos (x, y) en la imagen original, forma (N, 2)
+            is_left: True si es cámara izquierda, False si derecha
+        
+        Returns:
+            np.ndarray: (N, 2) float32 en la imagen rectificada
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        if len(points) == 0:
+            return points.reshape(0, 2)
+        if is_left:
+            K, D, R, P = self.K_left, self.D_left, self.R1, self.P1
+        else:
+            K, D, R, P = self.K_right, self.D_right, self.R2, self.P2
+        return cv2.undistortPoints(points, K, D, R=R, P=P).reshape(-1, 2)
+    
+    def triangulate_many(self, points_left, points_right, rectify=True,
+                         correct=True):
+        """
+        Triangula N correspondencias a la vez con DLT (una sola llamada a
+        cv2.triangulatePoints, que resuelve el sistema 4x4 de cada punto
+        por SVD) con las matrices de proyección calculadas al cargar la
+        calibración.
+        
+        Args:
+            points_left: Puntos (x, y) en la imagen izquierda original, (N, 2)
+            points_right: Puntos correspondientes en la derecha, (N, 2)
+            rectify: True = rectificar los puntos (rectify_points) y
+                triangular en las imágenes rectificadas; False = usar las
+                coordenadas tal cual con K @ [R | T] (sin corregir la
+                distorsión, como triangulate_point)
+            correct: Aplicar la corrección de profundidad (depth_correction);
+                False = Z tal cual se triangula (Fase 3)
+        
+        Returns:
+            tuple: (points, valid) con points (N, 3) en cm (Z corregida) y
+            valid (N,) bool: False si el punto queda
+            detrás de la cámara o la solución es degenerada (fila en 0)
+        """
+        points_left = np.asarray(points_left, dtype=np.float64).reshape(-1, 2)
+        points_right = np.asarray(points_right, dtype=np.float64).reshape(-1, 2)
+        if len(points_left) != len(points_right):
+            raise ValueError("Las listas deben tener la misma longitud")
+        if rectify:
+            points_left = self.rectify_points(points_left, is_left=True)
+            points_right = self.rectify_points(points_right, is_left=False)
+            return self._triangulate_dlt(self.P1, self.P2, points_left,
+                                         points_right, self.rect_to_world,
+                                         correct)
+        return self._triangulate_dlt(self.P0_dlt, self.P1_dlt, points_left,
+                                     points_right, correct=correct)
+    
+    def _triangulate_dlt(self, P0, P1, points_left, points_right,
+                         to_world=None, correct=True):
+        """
+        DLT por lotes (ver triangulate_many); to_world: matriz 3x4 que
+        lleva los puntos triangulados al mundo (None = ya lo están)
+        """
+        n = len(points_left)
+        if n == 0:
+            return np.zeros((0, 3)), np.zeros(0, dtype=bool)
+        
+        # Punto 3D en coordenadas homogéneas, (4, N)
+        X_homogeneous = cv2.triangulatePoints(
+            np.asarray(P0, dtype=np.float64), np.asarray(P1, dtype=np.float64),
+            np.asarray(points_left, dtype=np.float64).reshape(-1, 2).T,
+            np.asarray(points_right, dtype=np.float64).reshape(-1, 2).T)
+        W = X_homogeneous[3]
+        valid = np.abs(W) > 1e-12
+        points = np.zeros((n, 3))
+        points[valid] = (X_homogeneous[:3, valid] / W[valid]).T
+        if to_world is not None:
+            points = points @ to_world[:, :3].T + to_world[:, 3]
+        
+        # Validar que Z sea positivo (delante de la cámara)
+        valid &= points[:, 2] > 0
+        points[~valid] = 0.0
+        
+        # Metros a centímetros y corrección de profundidad (la única vez
+        # que se aplica: grilla trilineal de depth_correction)
+        points *= 100.0
+        if correct:
+            self.depth_correction.apply(points)
+        return points, valid
+    
+    def triangulate_point_DLT(self, point_left, point_right, rectified=False,
+                              correct=True):
         """
         Triangula un punto 3D usando Direct Linear Transform (DLT)
         Método más robusto que usa matrices de proyección directamente
@@ -284,59 +433,28 @@ class DepthEstimator:
         igual que el repositorio StereoVision funcional.
         
         Args:
-            point_left: (x, y) en imagen izquierda rectificada
-            point_right: (x, y) en imagen derecha rectificada
+            point_left: (x, y) en imagen izquierda
+            point_right: (x, y) en imagen derecha
+            rectified: True si los puntos vienen de rectify_points; False
+                para coordenadas de imagen sin corregir la distorsión
+            correct: Aplicar la corrección de profundidad
         
         Returns:
             tuple: (X, Y, Z) coordenadas 3D en cm, o None si falla
         """
-        # Obtener matrices de proyección CORRECTAS
-        # P0 = K_left @ [I | 0] (cámara izquierda como origen)
-        # P1 = K_right @ [R | T] (cámara derecha en el mundo)
-        P0, P1 = self._get_projection_matrices_for_DLT()
-        
-        # Construir sistema de ecuaciones A
-        x1, y1 = point_left
-        x2, y2 = point_right
-        
-        A = np.array([
-            y1 * P0[2, :] - P0[1, :],
-            P0[0, :] - x1 * P0[2, :],
-            y2 * P1[2, :] - P1[1, :],
-            P1[0, :] - x2 * P1[2, :]
-        ], dtype=np.float32)
-        
-        # Resolver usando SVD (Singular Value Decomposition)
-        # La solución es el vector singular correspondiente al menor valor singular
-        try:
-            B = A.T @ A
-            U, s, Vh = linalg.svd(B, full_matrices=False)
-            
-            # Punto 3D en coordenadas homogéneas
-            X_homogeneous = Vh[3, :]
-            
-            # Convertir a coordenadas cartesianas (dividir por W)
-            X = X_homogeneous[0] / X_homogeneous[3]
-            Y = X_homogeneous[1] / X_homogeneous[3]
-            Z = X_homogeneous[2] / X_homogeneous[3]
-            
-            # Validar que Z sea positivo (delante de la cámara)
-            if Z <= 0:
-                return None
-            
-            # Convertir de metros a centímetros
-            X_cm = X * 100
-            Y_cm = Y * 100
-            Z_cm = Z * 100
-            
-            # Aplicar factor de corrección de profundidad
-            Z_cm_corrected = Z_cm * self.DEPTH_CORRECTION_FACTOR
-            
-            return (X_cm, Y_cm, Z_cm_corrected)
-            
-        except Exception as e:
-            print(f"Error en triangulación DLT: {e}")
+        if rectified:
+            points, valid = self._triangulate_dlt(
+                self.P1, self.P2, [point_left], [point_right],
+                self.rect_to_world, correct)
+        else:
+            # P0 = K_left @ [I | 0] (cámara izquierda como origen)
+            # P1 = K_right @ [R | T] (cámara derecha en el mundo)
+            points, valid = self._triangulate_dlt(
+                self.P0_dlt, self.P1_dlt, [point_left], [point_right],
+                correct=correct)
+        if not valid[0]:
             return None
+        return tuple(points[0])
     
     def triangulate_point(self, point_left, point_right, method='DLT'):
         """
@@ -410,28 +528,24 @@ class DepthEstimator:
     
     def batch_triangulate(self, points_left, points_right):
         """
-        Triangula múltiples puntos de manera eficiente
+        Triangula múltiples puntos (ver triangulate_many): rectifica solo
+        los puntos y triangula en las imágenes rectificadas
         
         Args:
-            points_left: Lista de (x, y) en imagen izquierda
-            points_right: Lista de (x, y) en imagen derecha
+            points_left: Lista de (x, y) en imagen izquierda original
+            points_right: Lista de (x, y) en imagen derecha original
         
         Returns:
             list: Lista de (X, Y, Z) o None para puntos inválidos
         """
-        if len(points_left) != len(points_right):
-            raise ValueError("Las listas deben tener la misma longitud")
-        
-        results = []
-        for pt_left, pt_right in zip(points_left, points_right):
-            result = self.triangulate_point(pt_left, pt_right)
-            results.append(result)
-        
-        return results
+        points, valid = self.triangulate_many(points_left, points_right)
+        return [tuple(point) if ok else None
+                for point, ok in zip(points, valid)]
     
     def rectify_point(self, point, is_left=True):
         """
         Rectifica un punto 2D de imagen original a imagen rectificada
+        (ver rectify_points)
         
         Args:
             point: (x, y) en imagen original
@@ -440,18 +554,91 @@ class DepthEstimator:
         Returns:
             tuple: (x_rect, y_rect) en imagen rectificada
         """
-        x, y = point
+        x_rect, y_rect = self.rectify_points([point], is_left)[0]
+        return (float(x_rect), float(y_rect))
+    
+    def epipolar_segments(self, points_left, depth_range_cm):
+        """
+        Proyecta en la imagen derecha los rayos de puntos de la izquierda
+        entre dos profundidades: el punto correspondiente en la derecha
+        cae sobre ese segmento de su línea epipolar.
         
-        if is_left:
-            mapx, mapy = self.mapx_left, self.mapy_left
-        else:
-            mapx, mapy = self.mapx_right, self.mapy_right
+        Usa las mismas matrices de proyección que triangulate_point_DLT
+        (P = K @ [R | T], sin distorsión), es decir, las mismas
+        coordenadas de imagen.
         
-        # Obtener coordenadas rectificadas usando mapas
-        x_rect = mapx[int(y), int(x)]
-        y_rect = mapy[int(y), int(x)]
+        Args:
+            points_left: Puntos (x, y) en la imagen izquierda, forma (N, 2)
+            depth_range_cm: (mínima, máxima) profundidad de trabajo en cm,
+                medida sobre el eje óptico de la cámara izquierda
         
-        return (x_rect, y_rect)
+        Returns:
+            np.ndarray: (N, 2, 2) con los extremos cercano y lejano (x, y)
+            de cada segmento en la imagen derecha
+        """
+        points = np.asarray(points_left, dtype=np.float64).reshape(-1, 2)
+        P1 = self.P1_dlt
+        R0 = self.R_world_left.astype(np.float64)
+        T0 = self.T_world_left.astype(np.float64)
+        
+        # Rayos en coordenadas de la cámara izquierda (z = 1)
+        homogeneous = np.hstack([points, np.ones((len(points), 1))])
+        rays = np.linalg.solve(self.K_left.astype(np.float64), homogeneous.T)
+        
+        ends = []
+        for depth_cm in depth_range_cm:
+            # Cámara izquierda -> mundo (metros, como la calibración)
+            X_cam = rays * (depth_cm / 100.0)
+            X_world = R0.T @ (X_cam - T0)
+            projected = P1 @ np.vstack([X_world, np.ones((1, len(points)))])
+            ends.append((projected[:2] / projected[2]).T)
+        return np.stack(ends, axis=1)
+    
+    def right_search_band(self, points_left, depth_range_cm, margin=0):
+        """
+        Región de la imagen derecha donde pueden aparecer los puntos de la
+        izquierda dentro del rango de profundidad de trabajo.
+        
+        Args:
+            points_left: Puntos (x, y) en la imagen izquierda (p. ej. las
+                esquinas de las cajas de las manos)
+            depth_range_cm: (mínima, máxima) profundidad en cm
+            margin: Margen alrededor de la región (píxeles)
+        
+        Returns:
+            tuple: (x0, y0, x1, y1) en píxeles sin recortar a la imagen, o
+            None si no hay puntos
+        """
+        if len(points_left) == 0:
+            return None
+        ends = self.epipolar_segments(points_left, depth_range_cm).reshape(-1, 2)
+        x0, y0 = ends.min(axis=0) - margin
+        x1, y1 = ends.max(axis=0) + margin
+        return (float(x0), float(y0), float(x1), float(y1))
+    
+    def epipolar_distance(self, points_left, points_right, depth_range_cm):
+        """
+        Distancia de cada punto de la derecha al segmento epipolar de su
+        punto de la izquierda. Una correspondencia válida queda a pocos
+        píxeles; una detección de otra mano o un falso positivo, lejos.
+        
+        Args:
+            points_left: Puntos (x, y) en la imagen izquierda, forma (N, 2)
+            points_right: Puntos correspondientes en la derecha, forma (N, 2)
+            depth_range_cm: (mínima, máxima) profundidad en cm
+        
+        Returns:
+            np.ndarray: (N,) distancias en píxeles
+        """
+        points_right = np.asarray(points_right, dtype=np.float64).reshape(-1, 2)
+        ends = self.epipolar_segments(points_left, depth_range_cm)
+        near, far = ends[:, 0], ends[:, 1]
+        segment = far - near
+        length_sq = np.maximum(np.sum(segment ** 2, axis=1), 1e-9)
+        t = np.clip(np.sum((points_right - near) * segment, axis=1) / length_sq,
+                    0.0, 1.0)
+        closest = near + t[:, None] * segment
+        return np.linalg.norm(points_right - closest, axis=1)
     
     def enable_smoothing(self, enabled=True, window_size=5):
         """
@@ -462,9 +649,12 @@ class DepthEstimator:
             window_size: Número de frames a promediar (3-10 recomendado)
         """
         self.smoothing_enabled = enabled
-        self.smoothing_window = window_size
+        if window_size != self.smoothing_window:
+            self.smoothing_window = window_size
+            self.position_filter = FingerFilterBank(
+                'mean', timeout_s=None, window=window_size)
         if not enabled:
-            self.position_history.clear()
+            self.position_filter.reset()
     
     def smooth_position(self, position_3d, landmark_id=0):
         """
@@ -480,17 +670,9 @@ class DepthEstimator:
         if not self.smoothing_enabled or position_3d is None:
             return position_3d
         
-        # Inicializar buffer para este landmark si no existe
-        if landmark_id not in self.position_history:
-            self.position_history[landmark_id] = deque(maxlen=self.smoothing_window)
-        
-        # Agregar nueva posición al buffer
-        self.position_history[landmark_id].append(position_3d)
-        
-        # Calcular promedio de las últimas N posiciones
-        history = np.array(list(self.position_history[landmark_id]))
-        smoothed = np.mean(history, axis=0)
-        
+        # Promedio de las últimas N posiciones (FingerFilterBank 'mean')
+        smoothed = self.position_filter.update([landmark_id], [position_3d],
+                                               timestamp=0.0)[0]
         return tuple(smoothed)
     
     def reset_smoothing(self, landmark_id=None):
@@ -502,10 +684,9 @@ class DepthEstimator:
                         Si es None, limpia todos.
         """
         if landmark_id is not None:
-            if landmark_id in self.position_history:
-                del self.position_history[landmark_id]
+            self.position_filter.remove(landmark_id)
         else:
-            self.position_history.clear()
+            self.position_filter.reset()
 
 
 # Función auxiliar para cargar rápidamente
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banco de filtros temporales de las posiciones 3D de las yemas
+
+FingerFilterBank guarda el estado de todas las yemas seguidas en arreglos
+contiguos (una fila por yema) y las actualiza juntas con un paso
+vectorizado por frame. Cada yema se identifica por una clave (p. ej.
+(hand_id, landmark_id)); las que no se actualizan durante `timeout_s` se
+descartan y su fila se reutiliza.
+
+Modos (FILTER_MODES):
+- 'one_euro': filtro One Euro (Casiez et al., 2012). Pasabajos cuyo corte
+  sube con la velocidad: quieto filtra fuerte (menos jitter), en
+  movimiento casi no retrasa.
+- 'kalman': Kalman de velocidad constante. Las tres coordenadas comparten
+  dinámica y ruido, así que una covarianza 2x2 por yema alcanza.
+- 'mean': media de las últimas `window` posiciones (el suavizado previo;
+  mismo jitter que los otros con más retraso).
+
+Las posiciones van en cm y los tiempos en segundos.
+"""
+
+import numpy as np
+
+
+FILTER_MODES = ('one_euro', 'kalman', 'mean')
+
+
+class FingerFilterBank:
+    """Filtros de todas las yemas seguidas, actualizados en un solo paso"""
+
+    def __init__(self, mode='one_euro', timeout_s=0.5, capacity=10,
+                 min_cutoff=1.0, beta=0.2, d_cutoff=1.0,
+                 process_noise=200.0, measurement_noise=0.1, window=5):
+        """
+        Args:
+            mode: Filtro (ver FILTER_MODES)
+            timeout_s: Descartar las yemas sin medición durante este tiempo
+                (segundos); None = nunca
+            capacity: Yemas iniciales (crece si hace falta)
+            min_cutoff: Corte en reposo (Hz, One Euro)
+            beta: Aumento del corte por cm/s de velocidad (One Euro)
+            d_cutoff: Corte del filtro de la velocidad (Hz, One Euro)
+            process_noise: Varianza de la aceleración (cm²/s⁴, Kalman)
+            measurement_noise: Varianza de la triangulación (cm², Kalman)
+            window: Posiciones promediadas (media)
+        """
+        if mode not in FILTER_MODES:
+            raise ValueError(f"mode inválido: {mode}")
+        if window < 1:
+            raise ValueError("window debe ser >= 1")
+        self.mode = mode
+        self.timeout_s = timeout_s
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.window = window
+
+        self.slots = {}           # clave -> fila
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Arreglos de estado para `capacity` yemas (conserva las filas)"""
+        old = getattr(self, 'position', None)
+        n_old = 0 if old is None else len(old)
+
+        def grow(array, shape, fill=0.0):
+            grown = np.full((capacity,) + shape, fill)
+            if n_old:
+                grown[:n_old] = array
+            return grown
+
+        self.position = grow(old, (3,))                 # salida filtrada
+        self.velocity = grow(getattr(self, 'velocity', None), (3,))
+        self.covariance = grow(getattr(self, 'covariance', None), (2, 2))
+        self.history = grow(getattr(self, 'history', None),
+                            (self.window, 3))
+        self.count = grow(getattr(self, 'count', None), (), 0).astype(int)
+        self.last_time = grow(getattr(self, 'last_time', None), ())
+        self.active = grow(getattr(self, 'active', None), (),
+                           False).astype(bool)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def reset(self):
+        """Olvida todas las yemas"""
+        self.slots.clear()
+        self.active[:] = False
+
+    def remove(self, key):
+        """Olvida una yema (sin efecto si no está)"""
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self.active[slot] = False
+
+    def evict(self, timestamp):
+        """
+        Descarta las yemas sin medición durante más de timeout_s.
+
+        Returns:
+            int: Yemas descartadas
+        """
+        if self.timeout_s is None or not self.slots:
+            return 0
+        stale = [key for key, slot in self.slots.items()
+                 if timestamp - self.last_time[slot] > self.timeout_s]
+        for key in stale:
+            self.remove(key)
+        return len(stale)
+
+    def _slot_for(self, key):
+        """Fila de la yema (nueva si no estaba)"""
+        slot = self.slots.get(key)
+        if slot is not None:
+            return slot, False
+        free = np.flatnonzero(~self.active)
+        if len(free) == 0:
+            self._allocate(2 * len(self.active))
+            free = np.flatnonzero(~self.active)
+        slot = int(free[0])
+        self.active[slot] = True
+        self.slots[key] = slot
+        return slot, True
+
+    def update(self, keys, positions, timestamp):
+        """
+        Filtra las mediciones de un frame.
+
+        Args:
+            keys: Clave de cada yema medida (N,)
+            positions: Posiciones medidas (N, 3) en cm
+            timestamp: Instante del frame (segundos)
+
+        Returns:
+            np.ndarray: (N, 3) posiciones filtradas; una yema nueva (o que
+            volvió tras el timeout) sale tal cual se midió
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.evict(timestamp)
+        slots, new = np.zeros(len(positions), int), np.zeros(len(positions),
+                                                             bool)
+        for i, key in enumerate(keys):
+            slots[i], new[i] = self._slot_for(key)
+
+        if new.any():
+            self._start(slots[new], positions[new])
+        tracked = slots[~new]
+        if len(tracked):
+            dt = np.maximum(timestamp - self.last_time[tracked], 1e-3)
+            measured = positions[~new]
+            if self.mode == 'one_euro':
+                self._one_euro(tracked, measured, dt)
+            elif self.mode == 'kalman':
+                self._kalman(tracked, measured, dt)
+            else:
+                self._mean(tracked, measured)
+        self.last_time[slots] = timestamp
+        return self.position[slots].copy()
+
+    def _start(self, slots, positions):
+        self.position[slots] = positions
+        self.velocity[slots] = 0.0
+        self.covariance[slots] = np.diag([self.measurement_noise, 1e4])
+        self.history[slots] = 0.0
+        self.history[slots, 0] = positions
+        self.count[slots] = 1
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Factor de suavizado de un pasabajos de primer orden"""
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _one_euro(self, slots, measured, dt):
+        previous = self.position[slots]
+        speed = (measured - previous) / dt[:, None]
+        alpha_d = self._alpha(self.d_cutoff, dt)[:, None]
+        velocity = self.velocity[slots] + alpha_d * (speed -
+                                                     self.velocity[slots])
+        cutoff = self.min_cutoff + self.beta * np.linalg.norm(velocity,
+                                                              axis=1)
+        alpha = self._alpha(cutoff, dt)[:, None]
+        self.velocity[slots] = velocity
+        self.position[slots] = previous + alpha * (measured - previous)
+
+    def _kalman(self, slots, measured, dt):
+        # predicción [posición, velocidad] con dt propio de cada yema
+        position = self.position[slots] + self.velocity[slots] * dt[:, None]
+        velocity = self.velocity[slots]
+        F = np.zeros((len(slots), 2, 2))
+        F[:, 0, 0] = F[:, 1, 1] = 1.0
+        F[:, 0, 1] = dt
+        Q = self.process_noise * np.stack(
+            [np.stack([dt ** 4 / 4, dt ** 3 / 2], axis=1),
+             np.stack([dt ** 3 / 2, dt ** 2], axis=1)], axis=1)
+        P = F @ self.covariance[slots] @ F.transpose(0, 2, 1) + Q
+
+        # corrección con la posición medida
+        gain = P[:, :, 0] / (P[:, 0, 0] + self.measurement_noise)[:, None]
+        innovation = measured - position
+        self.position[slots] = position + gain[:, 0, None] * innovation
+        self.velocity[slots] = velocity + gain[:, 1, None] * innovation
+        self.covariance[slots] = P - gain[:, :, None] * P[:, None, 0, :]
+
+    def _mean(self, slots, measured):
+        head = self.count[slots] % self.window
+        self.history[slots, head] = measured
+        self.count[slots] += 1
+        filled = np.minimum(self.count[slots], self.window)
+        self.position[slots] = (self.history[slots].sum(axis=1) /
+                                filled[:, None])
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Buffer circular de frames preasignado (sin asignaciones por frame)
+
+El hilo de captura escribe directamente en un slot con
+retrieve(image=slot) y el consumidor recibe una vista del slot junto con
+su número de secuencia, en lugar de una copia. Un slot prestado
+(borrow) no se sobrescribe hasta que el consumidor lo libera (release).
+
+Cada slot puede contener varios streams (1 para una cámara, 2 para un
+par estéreo), todos con el mismo número de secuencia; cada stream puede
+tener su propia forma (cámaras a distinta resolución).
+"""
+
+import threading
+import numpy as np
+
+
+class FrameRingBuffer:
+    """
+    Buffer circular de N slots con semántica borrow/release.
+
+    Modos:
+    - overwrite=True  (cámaras): gana el más reciente; si el consumidor es
+      lento los frames viejos se pisan.
+    - overwrite=False (archivos): FIFO sin pérdida; el escritor espera
+      mientras todos los slots tengan frames aún no consumidos.
+    """
+
+    def __init__(self, n_slots, frame_shape, n_streams=1,
+                 dtype=np.uint8, overwrite=True):
+        """
+        Args:
+            n_slots: Número de slots (mínimo 3: escritura + último + prestado)
+            frame_shape: (alto, ancho, canales) de cada frame, o una lista
+                         con la forma de cada stream
+            n_streams: Frames por slot (2 para un par estéreo)
+            dtype: Tipo de dato de los frames
+            overwrite: True = el más reciente gana, False = FIFO sin pérdida
+        """
+        if n_slots < 3:
+            raise ValueError("El buffer necesita al menos 3 slots")
+
+        shapes = _stream_shapes(frame_shape, n_streams)
+
+        self.n_slots = n_slots
+        self.n_streams = n_streams
+        self.dtype = np.dtype(dtype)
+        self.overwrite = overwrite
+
+        # misma forma: un solo arreglo (n_slots, n_streams, ...); si no, un
+        # arreglo por stream y frames = None
+        self.frames = None
+        self.stream_frames = None
+        if len(set(shapes)) == 1:
+            self.frames = self._allocate((n_slots, n_streams) + shapes[0],
+                                         dtype)
+        else:
+            self.stream_frames = [self._allocate((n_slots,) + shape, dtype)
+                                  for shape in shapes]
+        self.timestamps = self._allocate((n_slots, n_streams), np.float64)
+        self.seqs = self._allocate((n_slots,), np.int64)      # -1 = slot vacío
+        self.borrowed = self._allocate((n_slots,), np.int64)  # contador de préstamos
+        self.seqs[:] = -1
+
+        # estado escalar en un arreglo (compartible entre procesos, ver
+        # SharedFrameRing): writing, next_seq, latest_seq, consumed_seq, closed
+        self.state = self._allocate((5,), np.int64)
+        self.writing = -1         # slot que está escribiendo el productor
+        self.next_seq = 0         # secuencia del próximo frame escrito
+        self.latest_seq = -1      # último frame confirmado (commit)
+        self.consumed_seq = -1    # último frame liberado por el consumidor
+        self.closed = False
+
+        self.cond = self._make_condition()
+
+    def _allocate(self, shape, dtype):
+        """Reserva un arreglo del buffer (las subclases pueden usar memoria compartida)"""
+        return np.zeros(shape, dtype)
+
+    def _make_condition(self):
+        return threading.Condition()
+
+    @property
+    def frame_shape(self):
+        """Forma común de los frames (None si los streams difieren)"""
+        if self.frames is None:
+            return None
+        return self.frames.shape[2:]
+
+    @property
+    def stream_shapes(self):
+        """Forma de los frames de cada stream"""
+        if self.frames is None:
+            return [frames.shape[1:] for frames in self.stream_frames]
+        return [self.frames.shape[2:]] * self.n_streams
+
+    def _views(self, slot):
+        if self.frames is None:
+            return tuple(frames[slot] for frames in self.stream_frames)
+        return tuple(self.frames[slot])
+
+    writing = property(lambda self: int(self.state[0]),
+                       lambda self, value: self.state.__setitem__(0, value))
+    next_seq = property(lambda self: int(self.state[1]),
+                        lambda self, value: self.state.__setitem__(1, value))
+    latest_seq = property(lambda self: int(self.state[2]),
+                          lambda self, value: self.state.__setitem__(2, value))
+    consumed_seq = property(lambda self: int(self.state[3]),
+                            lambda self, value: self.state.__setitem__(3, value))
+    closed = property(lambda self: bool(self.state[4]),
+                      lambda self, value: self.state.__setitem__(4, value))
+
+    # ------------------------------
+    # Productor
+    # ------------------------------
+
+    def acquire_write(self, timeout=None):
+        """
+        Reserva un slot para escritura.
+
+        Returns:
+            tuple: (slot, views) con una vista por stream, o None si no hay
+                   slot libre (overwrite=True) o se agotó el timeout
+        """
+        with self.cond:
+            slot = self._find_writable_slot()
+            if slot is None and not self.overwrite:
+                self.cond.wait_for(
+                    lambda: self.closed or
+                    self._find_writable_slot() is not None,
+                    timeout)
+                slot = self._find_writable_slot()
+            if slot is None or self.closed:
+                return None
+            self.writing = slot
+            self.seqs[slot] = -1
+        return slot, self._views(slot)
+
+    def commit(self, slot, timestamps=None):
+        """
+        Publica el slot escrito y despierta a los consumidores.
+
+        Returns:
+            int: número de secuencia asignado
+        """
+        with self.cond:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.seqs[slot] = seq
+            if timestamps is not None:
+                self.timestamps[slot] = timestamps
+            self.writing = -1
+            self.latest_seq = seq
+            self.cond.notify_all()
+        return seq
+
+    def abort(self, slot):
+        """Descarta un slot reservado que no se pudo escribir"""
+        with self.cond:
+            self.seqs[slot] = -1
+            self.writing = -1
+            self.cond.notify_all()
+
+    def close(self):
+        """Marca el fin del stream y despierta a todos"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def resized(self, frame_shape):
+        """
+        Reemplazo del buffer para frames de otra forma (el driver entregó
+        otra resolución).
+
+        El buffer nuevo continúa la numeración de este, así los
+        consumidores que guardan la última secuencia (after_seq) siguen
+        recibiendo frames; este se cierra para despertar a quien esté
+        esperando en él. Las vistas prestadas siguen siendo válidas.
+
+        Args:
+            frame_shape: Forma nueva (o lista con la forma de cada stream)
+
+        Returns:
+            FrameRingBuffer: buffer vacío con la misma configuración
+        """
+        buffer = FrameRingBuffer(self.n_slots, frame_shape, self.n_streams,
+                                 self.dtype, self.overwrite)
+        with self.cond:
+            buffer.next_seq = self.next_seq
+            buffer.consumed_seq = self.consumed_seq
+        self.close()
+        return buffer
+
+    def _find_writable_slot(self):
+        # Nunca se pisa un slot prestado ni el último publicado (el
+        # consumidor puede estar por pedirlo)
+        candidates = []
+        for slot in range(self.n_slots):
+            seq = self.seqs[slot]
+            if self.borrowed[slot] or slot == self.writing:
+                continue
+            if seq == -1:
+                return slot
+            if seq == self.latest_seq and self.overwrite:
+                continue
+            if not self.overwrite and seq > self.consumed_seq:
+                continue
+            candidates.append((seq, slot))
+        if not candidates:
+            return None
+        # el más viejo primero
+        return min(candidates)[1]
+
+    # ------------------------------
+    # Consumidor
+    # ------------------------------
+
+    def borrow(self, after_seq=-1, timeout=0):
+        """
+        Presta un frame con secuencia mayor que after_seq.
+
+        En modo overwrite se entrega el más reciente; en modo FIFO el más
+        antiguo pendiente. La vista es válida hasta release(seq).
+
+        Args:
+            after_seq: Secuencia del último frame ya consumido
+            timeout: Segundos a esperar un frame nuevo (0 = no esperar,
+                     None = esperar indefinidamente)
+
+        Returns:
+            tuple: (seq, views, timestamps) o None si no hay frame nuevo
+        """
+        with self.cond:
+            slot = self._find_readable_slot(after_seq)
+            if slot is None and (timeout is None or timeout > 0):
+                self.cond.wait_for(
+                    lambda: self.closed or
+                    self._find_readable_slot(after_seq) is not None,
+                    timeout)
+                slot = self._find_readable_slot(after_seq)
+            if slot is None:
+                return None
+            self.borrowed[slot] += 1
+            seq = int(self.seqs[slot])
+            timestamps = tuple(self.timestamps[slot])
+        return seq, self._views(slot), timestamps
+
+    def release(self, seq):
+        """Devuelve al buffer el slot con la secuencia indicada"""
+        with self.cond:
+            for slot in range(self.n_slots):
+                if self.seqs[slot] == seq and self.borrowed[slot] > 0:
+                    self.borrowed[slot] -= 1
+                    break
+            self.consumed_seq = max(self.consumed_seq, seq)
+            self.cond.notify_all()
+
+    def wait_new(self, after_seq=-1, timeout=None):
+        """
+        Bloquea hasta que se publique un frame con secuencia mayor que
+        after_seq (o se cierre el stream / venza el timeout).
+
+        Returns:
+            bool: True si hay un frame nuevo disponible
+        """
+        with self.cond:
+            self.cond.wait_for(
+                lambda: self.closed or
+                self._find_readable_slot(after_seq) is not None,
+                timeout)
+            return self._find_readable_slot(after_seq) is not None
+
+    def slot_of(self, seq):
+        """Slot que contiene el frame con la secuencia indicada (o None)"""
+        with self.cond:
+            slots = np.flatnonzero(self.seqs == seq)
+            return int(slots[0]) if len(slots) else None
+
+    def has_pending(self, after_seq=-1):
+        """True si hay algún frame con secuencia mayor que after_seq"""
+        with self.cond:
+            return self._find_readable_slot(after_seq) is not None
+
+    def _find_readable_slot(self, after_seq):
+        best = None
+        for slot in range(self.n_slots):
+            seq = self.seqs[slot]
+            if seq <= after_seq or slot == self.writing:
+                continue
+            if best is None:
+                best = slot
+            elif self.overwrite and seq > self.seqs[best]:
+                best = slot
+            elif not self.overwrite and seq < self.seqs[best]:
+                best = slot
+        return best
+
+
+def _stream_shapes(frame_shape, n_streams):
+    """Forma de cada stream a partir de una forma común o una por stream"""
+    if len(frame_shape) and isinstance(frame_shape[0], (tuple, list)):
+        if len(frame_shape) != n_streams:
+            raise ValueError(f"Formas inválidas: {len(frame_shape)} para "
+                             f"{n_streams} streams")
+        return [tuple(shape) for shape in frame_shape]
+    return [tuple(frame_shape)] * n_streams
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Interfaz común de los detectores de manos (backends intercambiables)
+
+Un backend implementa detect(frame) y retorna un HandDetection: yemas
+(n, 5, 2) en píxeles, lateralidad y confianza por mano, más los landmarks
+completos como HandLandmarks. BaseHandDetector arma sobre detect() la
+interfaz que usan el pipeline, HandTracker y el render (findHands,
+getLandmarks, getResults, getFingerTipsPos, drawHands, drawTips), así que
+nadie fuera del backend necesita conocer el resultado nativo del modelo.
+getResults retorna una copia de los HandLandmarks, que el render dibuja
+con src.vision.hand_overlay.
+
+Backends: HandDetector (mp.solutions.hands), HandLandmarkerDetector
+(MediaPipe Tasks, asíncrono) y ContourHandDetector (piel y contornos, sin
+red neuronal).
+"""
+
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+
+from src.vision.hand_landmarks import HandLandmarks, HANDEDNESS_LABELS
+from src.vision.hand_overlay import draw_skeleton, draw_tips
+
+
+class HandDetection:
+    """Resultado de detect(frame) para un frame"""
+
+    def __init__(self, tips, handedness, confidence, landmarks):
+        """
+        Args:
+            tips: (n, 5, 2) yemas en píxeles, en el orden de FINGER_TIP_IDS
+            handedness: (n,) índice de lateralidad (0 = Left, -1 = sin dato)
+            confidence: (n,) confianza de cada mano (0-1)
+            landmarks: HandLandmarks con los 21 puntos de cada mano (los
+                backends sin esqueleto ponen la palma en los demás puntos)
+        """
+        self.tips = tips
+        self.handedness = handedness
+        self.confidence = confidence
+        self.landmarks = landmarks
+
+    def __len__(self):
+        return len(self.tips)
+
+    @classmethod
+    def from_landmarks(cls, landmarks):
+        """Vistas sobre los arreglos del detector (válidas hasta el próximo frame)"""
+        return cls(landmarks.tips[:, :, :2], landmarks.handedness,
+                   landmarks.scores, landmarks)
+
+
+class BaseHandDetector(ABC):
+    """
+    Clase base de los backends de detección de manos.
+
+    Cada backend debe implementar detect(frame) llenando self.landmarks;
+    el resto de la interfaz de HandDetector sale de esos arreglos.
+    """
+
+    # sin región de inferencia propia (ver HandDetector.ROI_MODES)
+    roi_mode = None
+    # frames de entrada en RGB en vez de BGR (ver setInputRGB)
+    input_rgb = False
+
+    def __init__(self, maxHands=2, img_width=640, img_height=480):
+        """
+        Args:
+            maxHands: Máximo de manos a detectar
+            img_width, img_height: Tamaño del frame de los landmarks (píxeles)
+        """
+        self.maxHands = maxHands
+        self.img_width = img_width
+        self.img_height = img_height
+        self.landmarks = HandLandmarks(maxHands)
+        self.keyboard_roi = None
+        self.search_band = None
+
+    @abstractmethod
+    def detect(self, frame):
+        """
+        Detecta las manos de un frame BGR (RGB con setInputRGB(True)).
+
+        Args:
+            frame: Imagen (puede estar reducida respecto de img_width x
+                img_height; los puntos salen en píxeles del frame completo)
+
+        Returns:
+            HandDetection
+        """
+        pass
+
+    # ---------- interfaz de HandDetector ----------
+
+    def findHands(self, img):
+        return len(self.detect(img)) > 0
+
+    def setKeyboardROI(self, x0, y0, x1, y1):
+        self.keyboard_roi = (x0, y0, x1, y1)
+
+    def setInputRGB(self, rgb):
+        """
+        Args:
+            rgb: True si los frames llegan ya en RGB (la captura convierte
+                el frame de la cámara en un solo paso, FRAME_ORIENTATION =
+                'coordinates'); False = BGR de OpenCV
+        """
+        self.input_rgb = rgb
+
+    def setSearchBand(self, roi):
+        # sin ROI: la banda estéreo solo descarta manos por geometría
+        self.search_band = roi
+
+    def getLandmarks(self):
+        return self.landmarks
+
+    def getResults(self):
+        # copia: el render dibuja mientras se detecta el próximo frame
+        return self.landmarks.copy()
+
+    def getHandBoxes(self):
+        return [tuple(box) for box in self.landmarks.boxes().tolist()]
+
+    def getFingerTipsPos(self):
+        hands = [SimpleNamespace(index=int(index), score=float(score),
+                                 label=HANDEDNESS_LABELS[index]
+                                 if 0 <= index < 2 else '')
+                 for index, score in zip(self.landmarks.handedness,
+                                         self.landmarks.scores)]
+        return [hands, self.landmarks.fingertips_list()]
+
+    def drawHands(self, img, results=None):
+        draw_skeleton(img, self.landmarks if results is None else results)
+
+    def drawTips(self, img, results=None):
+        draw_tips(img, self.landmarks if results is None else results)
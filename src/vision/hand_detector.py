@@ -10,11 +10,16 @@ hand.index y el primer campo del landmark (asumido como tip_id).
 @author: mherrera
 """
 
+import math
+import time
+
 import mediapipe as mp
 import cv2
 
+from src.vision.hand_backend import BaseHandDetector, HandDetection
+
 
-class HandDetector():
+class HandDetector(BaseHandDetector):
 
     # WRIST = 0
     # THUMB_CMC = 1  # Carpometacarpal Joint (CMC)
@@ -44,26 +49,65 @@ class HandDetector():
 
     # fingerTips = {THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, SMALL_TIP}
 
-    def __init__(self, staticImageMode=False, maxHands=2, detectionCon=0.5,
-                 trackCon=0.5, img_width=640, img_height=480):
+    # Regiones de inferencia (ROI): None = frame completo, 'keyboard' = banda
+    # del teclado más las manos encima, 'hands' = cajas de las manos del
+    # frame anterior, 'band' = región externa fijada con setSearchBand (la
+    # cámara derecha, a partir de las manos de la izquierda y la geometría
+    # estéreo). Sin manos en el frame anterior (tracking perdido) se busca
+    # en el frame completo.
+    ROI_MODES = (None, 'keyboard', 'hands', 'band')
 
+    def __init__(self, staticImageMode=False, maxHands=2, detectionCon=0.5,
+                 trackCon=0.5, img_width=640, img_height=480, roi_mode=None,
+                 roi_margin=40, roi_reach=160, roi_full_frame_interval=60,
+                 model_complexity=1, inference_scale=1.0):
+        """
+        Args:
+            model_complexity: Modelo de landmarks de MediaPipe (0 = liviano,
+                1 = completo)
+            inference_scale: Escala de la imagen que recibe MediaPipe
+                respecto de img_width x img_height (1.0 = sin reducir; una
+                copia ya reducida, p. ej. MJPEG crudo, solo se reduce lo que
+                falte). Los landmarks siguen en píxeles del frame completo
+            roi_mode: Región de inferencia (ver ROI_MODES)
+            roi_margin: Margen alrededor de la región (píxeles)
+            roi_reach: Alto sobre el teclado donde pueden estar las manos
+                (píxeles, modo 'keyboard')
+            roi_full_frame_interval: Cada cuántos frames con ROI se busca
+                en el frame completo (manos nuevas fuera de la región y
+                referencia de tiempos); 0 = nunca
+        """
+        if roi_mode not in self.ROI_MODES:
+            raise ValueError(f"roi_mode inválido: {roi_mode}")
+
+        # landmarks del último frame en arreglos preasignados (píxeles);
+        # maxHands puede bajar con configure() pero no superar esta capacidad
+        super().__init__(maxHands, img_width, img_height)
         self.mode = staticImageMode
-        self.maxHands = maxHands
         self.detectionCon = detectionCon
         self.trackCon = trackCon
-        self.img_width = img_width
-        self.img_height = img_height
+        self.model_complexity = model_complexity
+        self.inference_scale = inference_scale
+        self.pending_settings = None   # ver configure()
 
         self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(
-            static_image_mode=self.mode,
-            max_num_hands=self.maxHands,
-            min_detection_confidence=self.detectionCon,
-            min_tracking_confidence=self.trackCon)
-        self.mpDraw = mp.solutions.drawing_utils
+        self.hands = self._createHands()
 
         self.results = []
 
+        self.roi_mode = roi_mode
+        self.roi_margin = roi_margin
+        self.roi_reach = roi_reach
+        self.roi_full_frame_interval = roi_full_frame_interval
+        self.keyboard_roi = None   # (x0, y0, x1, y1) del teclado en píxeles
+        self.search_band = None    # región externa del modo 'band' (píxeles)
+        self.hand_boxes = []       # cajas de las manos de la última detección
+        self.roi = None            # región de la última inferencia (None = completa)
+        self.roi_frames = 0        # inferencias seguidas con ROI
+        self.roi_area = 1.0        # fracción del frame usada en la última inferencia
+        self.roi_ms = 0.0          # promedio (ms) de conversión + inferencia con ROI
+        self.full_ms = 0.0         # promedio (ms) con el frame completo
+
         self.fingerTips = [self.mpHands.HandLandmark.THUMB_TIP,
                            self.mpHands.HandLandmark.INDEX_FINGER_TIP,
                            self.mpHands.HandLandmark.MIDDLE_FINGER_TIP,
@@ -71,19 +115,217 @@ class HandDetector():
                            self.mpHands.HandLandmark.PINKY_TIP
                            ]
 
+    def _createHands(self):
+        return self.mpHands.Hands(
+            static_image_mode=self.mode,
+            max_num_hands=self.maxHands,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.detectionCon,
+            min_tracking_confidence=self.trackCon)
+
+    def configure(self, model_complexity=None, max_hands=None,
+                  inference_scale=None):
+        """
+        Cambia la calidad de la inferencia a partir del próximo findHands
+        (se aplica en el hilo que detecta; None = sin cambios).
+
+        Args:
+            model_complexity: Modelo de landmarks (0 o 1)
+            max_hands: Máximo de manos (hasta la capacidad inicial)
+            inference_scale: Escala de la imagen que recibe MediaPipe
+        """
+        self.pending_settings = {'model_complexity': model_complexity,
+                                 'max_hands': max_hands,
+                                 'inference_scale': inference_scale}
+
+    def getSettings(self):
+        """Calidad de inferencia vigente"""
+        return {'model_complexity': self.model_complexity,
+                'max_hands': self.maxHands,
+                'inference_scale': self.inference_scale}
+
+    def _applySettings(self):
+        settings, self.pending_settings = self.pending_settings, None
+        if settings['inference_scale'] is not None:
+            self.inference_scale = settings['inference_scale']
+        model_complexity = settings['model_complexity']
+        max_hands = settings['max_hands']
+        if max_hands is not None:
+            max_hands = max(1, min(max_hands, self.landmarks.max_hands))
+        if (model_complexity is not None and
+                model_complexity != self.model_complexity) or \
+                (max_hands is not None and max_hands != self.maxHands):
+            # el grafo de MediaPipe se arma con estos valores: recrearlo
+            if model_complexity is not None:
+                self.model_complexity = model_complexity
+            if max_hands is not None:
+                self.maxHands = max_hands
+            self.hands.close()
+            self.hands = self._createHands()
+            # los tiempos de referencia de la ROI ya no valen
+            self.roi_ms = self.full_ms = 0.0
+
     def setImageDims(self, width, height):
         self.__image_width = width
         self.__image_height = height
 
+    def setKeyboardROI(self, x0, y0, x1, y1):
+        """Banda del teclado virtual en píxeles (img_width x img_height)"""
+        self.keyboard_roi = (x0, y0, x1, y1)
+
+    def setSearchBand(self, roi):
+        """
+        Región de la próxima inferencia en modo 'band'.
+
+        Args:
+            roi: (x0, y0, x1, y1) en píxeles (img_width x img_height), o
+                None para buscar en el frame completo
+        """
+        self.search_band = roi
+    def _nextROI(self):
+        """
+        Región (x0, y0, x1, y1) en píxeles para la próxima inferencia, o
+        None para usar el frame completo.
+        """
+        if self.roi_mode is None:
+            return None
+        # la banda externa no depende de las manos propias del frame anterior
+        if self.roi_mode != 'band' and not self.hand_boxes:
+            return None
+        if self.roi_full_frame_interval and \
+                self.roi_frames >= self.roi_full_frame_interval:
+            return None
+
+        margin = self.roi_margin
+        if self.roi_mode == 'band':
+            if self.search_band is None:
+                return None
+            x0, y0, x1, y1 = (max(0, self.search_band[0]),
+                              max(0, self.search_band[1]),
+                              min(self.img_width, self.search_band[2]),
+                              min(self.img_height, self.search_band[3]))
+            # la banda se recalcula cada frame y tiembla unos píxeles:
+            # conservar la región mientras la banda quepa en ella (y no sea
+            # más del doble de lo necesario), MediaPipe rastrea mejor si la
+            # entrada no se mueve
+            needed = (x1 - x0 + 2 * margin) * (y1 - y0 + 2 * margin)
+            if self.roi is not None and self.roi[0] <= x0 and \
+                    self.roi[1] <= y0 and x1 <= self.roi[2] and \
+                    y1 <= self.roi[3] and (self.roi[2] - self.roi[0]) * \
+                    (self.roi[3] - self.roi[1]) <= 2 * needed:
+                return self.roi
+            roi = (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+        elif self.roi_mode == 'keyboard':
+            if self.keyboard_roi is None:
+                return None
+            x0, y0, x1, y1 = self.keyboard_roi
+            roi = (x0 - margin, y0 - self.roi_reach - margin,
+                   x1 + margin, y1 + margin)
+        else:
+            x0 = min(box[0] for box in self.hand_boxes)
+            y0 = min(box[1] for box in self.hand_boxes)
+            x1 = max(box[2] for box in self.hand_boxes)
+            y1 = max(box[3] for box in self.hand_boxes)
+            # conservar la región mientras las manos queden a medio margen
+            # del borde: MediaPipe rastrea mejor si la entrada no se mueve
+            keep = margin / 2
+            if self.roi is not None and self.roi[0] <= x0 - keep and \
+                    self.roi[1] <= y0 - keep and x1 + keep <= self.roi[2] and \
+                    y1 + keep <= self.roi[3]:
+                return self.roi
+            roi = (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+
+        # redondear hacia afuera: la región contiene a las cajas
+        x0, y0, x1, y1 = (max(0, math.floor(roi[0])),
+                          max(0, math.floor(roi[1])),
+                          min(self.img_width, math.ceil(roi[2])),
+                          min(self.img_height, math.ceil(roi[3])))
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        return (x0, y0, x1, y1)
+
+    def _mapToFrame(self, roi):
+        """Pasa los landmarks normalizados al recorte a todo el frame"""
+        x0, y0, x1, y1 = roi
+        offset_x, offset_y = x0 / self.img_width, y0 / self.img_height
+        scale_x = (x1 - x0) / self.img_width
+        scale_y = (y1 - y0) / self.img_height
+        for handLandmarks in self.results.multi_hand_landmarks:
+            for lm in handLandmarks.landmark:
+                lm.x = offset_x + lm.x * scale_x
+                lm.y = offset_y + lm.y * scale_y
+                lm.z = lm.z * scale_x
+
+    def getHandBoxes(self):
+        """Cajas (x0, y0, x1, y1) en píxeles de las manos de la última detección"""
+        return [tuple(box) for box in self.landmarks.boxes().tolist()]
+
+    def getROIStats(self):
+        """
+        Returns:
+            dict: modo, fracción del frame de la última inferencia,
+            promedios (ms) con ROI y con frame completo, y ahorro por
+            inferencia (0 hasta tener ambas referencias)
+        """
+        saved_ms = 0.0
+        if self.roi_ms > 0 and self.full_ms > 0:
+            saved_ms = self.full_ms - self.roi_ms
+        return {'mode': self.roi_mode, 'area': self.roi_area,
+                'roi_ms': self.roi_ms, 'full_ms': self.full_ms,
+                'saved_ms': saved_ms}
+
     def findHands(self, img):
 
+        if self.pending_settings is not None:
+            self._applySettings()
+
+        # reducción pendiente respecto de la imagen recibida
+        reduce = self.inference_scale * self.img_width / img.shape[1]
+
+        roi = self._nextROI()
+        if roi is not None:
+            # la imagen puede estar reducida (MJPEG crudo): escalar la región
+            scale_x = img.shape[1] / self.img_width
+            scale_y = img.shape[0] / self.img_height
+            px0, py0 = int(roi[0] * scale_x), int(roi[1] * scale_y)
+            px1, py1 = int(roi[2] * scale_x), int(roi[3] * scale_y)
+            # región efectiva en píxeles del frame completo
+            roi = (px0 / scale_x, py0 / scale_y, px1 / scale_x, py1 / scale_y)
+            img = img[py0:py1, px0:px1]
+
+        start = time.perf_counter()
+        if reduce < 1.0:
+            # landmarks normalizados: reducir no cambia su escala
+            img = cv2.resize(img, None, fx=reduce, fy=reduce,
+                             interpolation=cv2.INTER_AREA)
         # To improve performance, optionally mark the image as not writeable to
         # pass by reference.
         img.flags.writeable = False
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        imgRGB = img if self.input_rgb else cv2.cvtColor(img,
+                                                         cv2.COLOR_BGR2RGB)
         img.flags.writeable = True
 
         self.results = self.hands.process(imgRGB)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        if roi is None:
+            self.full_ms = elapsed_ms if self.full_ms == 0 else \
+                0.9 * self.full_ms + 0.1 * elapsed_ms
+            self.roi_frames = 0
+            self.roi_area = 1.0
+        else:
+            self.roi_ms = elapsed_ms if self.roi_ms == 0 else \
+                0.9 * self.roi_ms + 0.1 * elapsed_ms
+            self.roi_frames += 1
+            self.roi_area = ((roi[2] - roi[0]) * (roi[3] - roi[1]) /
+                             (self.img_width * self.img_height))
+            if self.results.multi_hand_landmarks:
+                self._mapToFrame(roi)
+        self.roi = roi
+        self.landmarks.fill_from_results(self.results, self.img_width,
+                                         self.img_height)
+        if self.roi_mode is not None:
+            self.hand_boxes = self.getHandBoxes()
 
         # print(results.multi_hand_landmark)
         found = False
@@ -94,16 +336,19 @@ class HandDetector():
             found = True
         return found
 
-    def drawHands(self, img):
-        # if self.results.multi_handedness:
-        #     print('multi_handedness:\n{}'.format(
-        #         self.results.multi_handedness))
+    def detect(self, frame):
+        """Detecta las manos (ver BaseHandDetector.detect)"""
+        self.findHands(frame)
+        return HandDetection.from_landmarks(self.landmarks)
 
-        if self.results.multi_hand_landmarks:
-            for handLandmarks in self.results.multi_hand_landmarks:
-                self.mpDraw.draw_landmarks(
-                    img, handLandmarks, self.mpHands.HAND_CONNECTIONS)
-        # return imgRGB
+    def getResults(self):
+        """
+        Landmarks de la última detección (copia), para dibujarlos más tarde
+        con drawHands/drawTips mientras el detector ya procesa otro frame
+        (pipeline por etapas). El resultado nativo de MediaPipe queda en
+        self.results.
+        """
+        return self.landmarks.copy()
 
     # # TODO: No es necesario pasar la img, solo por w+h???
     # def getJoints(self, img, handNo=0, draw=False):
@@ -127,35 +372,19 @@ class HandDetector():
     #                 img, handLandmarks,
     #                 self.mpHands.HAND_CONNECTIONS)
 
-    def drawTips(self, img):
-        if self.results.multi_hand_landmarks:
-            for id, handLandmarks in enumerate(
-                    self.results.multi_hand_landmarks):
-                # print('handLandmarks=id:{}'.format(id))
-                for indx_tips in self.fingerTips:
-                    cx = handLandmarks.landmark[indx_tips].x * \
-                        self.img_width
-                    cy = handLandmarks.landmark[indx_tips].y * \
-                        self.img_height
-                    cv2.circle(img, (int(cx), int(cy)),
-                               7, (255, 0, 0), cv2.FILLED)
-
-                # self.mpHands.HandLandmark.INDEX_FINGER_TIP].x
-
     # TODO: Obtener la referencia W y H una sola vez sin pasar la img
+    def getLandmarks(self):
+        """
+        Landmarks del último findHands como HandLandmarks: (n_hands, 21, 3)
+        float32 en píxeles, lateralidad, scores y vista de las yemas. Los
+        arreglos se reutilizan en el próximo findHands (usar copy() para
+        conservarlos).
+        """
+        return self.landmarks
+
     def getFingerTipsPos(self):
-        fingertips = []
-        if self.results.multi_hand_landmarks:
-            for hand_id, handLandmarks in enumerate(
-                    self.results.multi_hand_landmarks):
-                # print('handLandmarks=id:{}'.format(id))
-                for indx_tips in self.fingerTips:
-                    tip_id = indx_tips
-                    cx = handLandmarks.landmark[indx_tips].x * \
-                        self.img_width
-                    cy = handLandmarks.landmark[indx_tips].y * \
-                        self.img_height
-                    fingertips.append([hand_id, tip_id, cx, cy])
+        # [hand_id, tip_id, cx, cy] por yema, a partir de los arreglos
+        fingertips = self.landmarks.fingertips_list()
 
         hands = []
         if self.results.multi_handedness:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detector de manos asíncrono con MediaPipe Tasks (HandLandmarker)
+
+HandDetector usa mp.solutions.hands.Hands.process(), que bloquea al
+llamador durante toda la inferencia. HandLandmarkerDetector usa el
+HandLandmarker de MediaPipe Tasks en modo LIVE_STREAM: findHands(img)
+envía el frame con su timestamp (detect_async) y retorna enseguida con el
+último resultado completado, que llega por callback desde el hilo de
+MediaPipe. Si la inferencia anterior sigue en curso, MediaPipe descarta
+el frame nuevo (gana el más reciente, como en el pipeline).
+
+Implementa BaseHandDetector (detect y la interfaz de HandDetector que se
+arma sobre ella); main.py elige el backend con
+StereoConfig.HAND_DETECTOR_BACKEND. Requiere el modelo hand_landmarker.task
+(https://developers.google.com/mediapipe/solutions/vision/hand_landmarker).
+"""
+
+import threading
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from src.vision.hand_backend import BaseHandDetector, HandDetection
+from src.vision.hand_landmarks import HandLandmarks
+
+
+class HandLandmarkerDetector(BaseHandDetector):
+    """
+    Backend sobre HandLandmarker (LIVE_STREAM). Sin regiones de inferencia:
+    MediaPipe Tasks recorta por su cuenta alrededor de las manos rastreadas.
+    """
+
+    def __init__(self, model_path, maxHands=2, detectionCon=0.5,
+                 trackCon=0.5, img_width=640, img_height=480,
+                 inference_scale=1.0):
+        """
+        Args:
+            model_path: Ruta al modelo hand_landmarker.task
+            maxHands: Máximo de manos a detectar
+            detectionCon: Confianza para detectar mano (y su presencia)
+            trackCon: Confianza para rastrear mano
+            img_width, img_height: Tamaño del frame de los landmarks (píxeles)
+            inference_scale: Escala de la imagen que recibe MediaPipe
+                respecto de img_width x img_height (1.0 = sin reducir)
+        """
+        super().__init__(maxHands, img_width, img_height)
+        self.model_path = model_path
+        self.detectionCon = detectionCon
+        self.trackCon = trackCon
+        self.inference_scale = inference_scale
+
+        # el callback llena `completed`; detect lo copia a `landmarks`
+        self.lock = threading.Lock()
+        self.completed = HandLandmarks(maxHands)
+        self.completed_timestamp_ms = -1
+        self.result_timestamp_ms = -1   # frame del resultado entregado
+        self.last_timestamp_ms = -1     # último frame enviado
+        self.submitted = 0
+        self.completed_count = 0
+        self.lag_ms = 0.0               # promedio envío -> resultado (ms)
+
+        self.landmarker = self._createLandmarker()
+
+    def _createLandmarker(self):
+        vision = mp.tasks.vision
+        options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=self.maxHands,
+            min_hand_detection_confidence=self.detectionCon,
+            min_hand_presence_confidence=self.detectionCon,
+            min_tracking_confidence=self.trackCon,
+            result_callback=self._onResult)
+        return vision.HandLandmarker.create_from_options(options)
+
+    def close(self):
+        """Libera el HandLandmarker (termina su hilo de inferencia)"""
+        self.landmarker.close()
+
+    def detect(self, frame):
+        """
+        Envía el frame a MediaPipe y toma el último resultado completado
+        (puede ser de un frame anterior).
+        """
+        # timestamps en ms estrictamente crecientes (lo exige LIVE_STREAM)
+        timestamp_ms = max(int(time.perf_counter() * 1000.0),
+                           self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        reduce = self.inference_scale * self.img_width / frame.shape[1]
+        if reduce < 1.0:
+            # landmarks normalizados: reducir no cambia su escala
+            frame = cv2.resize(frame, None, fx=reduce, fy=reduce,
+                               interpolation=cv2.INTER_AREA)
+        imgRGB = frame if self.input_rgb else cv2.cvtColor(frame,
+                                                           cv2.COLOR_BGR2RGB)
+        self.landmarker.detect_async(
+            mp.Image(image_format=mp.ImageFormat.SRGB, data=imgRGB),
+            timestamp_ms)
+        self.submitted += 1
+
+        with self.lock:
+            if self.completed_timestamp_ms != self.result_timestamp_ms:
+                self.landmarks.fill_from_arrays(
+                    self.completed.points,
+                    np.stack([self.completed.handedness,
+                              self.completed.scores], axis=1))
+                self.result_timestamp_ms = self.completed_timestamp_ms
+        return HandDetection.from_landmarks(self.landmarks)
+
+    def _onResult(self, result, output_image, timestamp_ms):
+        """Callback de MediaPipe (hilo de inferencia)"""
+        with self.lock:
+            self.completed.fill_from_task_result(result, self.img_width,
+                                                 self.img_height)
+            self.completed_timestamp_ms = timestamp_ms
+            self.completed_count += 1
+            lag_ms = time.perf_counter() * 1000.0 - timestamp_ms
+            self.lag_ms = lag_ms if self.lag_ms == 0 else \
+                0.9 * self.lag_ms + 0.1 * lag_ms
+
+    def getAsyncStats(self):
+        """
+        Returns:
+            dict: frames enviados, resultados completados, fracción de
+            frames con resultado propio y demora media envío -> resultado (ms)
+        """
+        return {'submitted': self.submitted,
+                'completed': self.completed_count,
+                'completed_rate': self.completed_count / max(self.submitted, 1),
+                'lag_ms': self.lag_ms}
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Landmarks de las manos de un frame como arreglos NumPy
+
+HandLandmarks guarda los 21 landmarks de cada mano en un arreglo
+preasignado (max_hands, 21, 3) float32 en píxeles del frame (z escalado
+por el ancho, como x), más la lateralidad y su score. Las yemas son una
+vista del mismo arreglo (landmarks 4, 8, 12, 16 y 20 = [:, 4::4]).
+
+Lo llenan HandDetector (resultado de MediaPipe) y WorkerHandDetector
+(landmarks publicados por los workers); fusión, teclado y DepthEstimator
+lo leen sin armar listas por yema.
+"""
+
+import numpy as np
+
+
+N_LANDMARKS = 21
+
+# índices de las puntas de los dedos (THUMB_TIP ... PINKY_TIP)
+FINGER_TIP_IDS = (4, 8, 12, 16, 20)
+TIPS = slice(4, None, 4)   # las mismas yemas como slice (vista, no copia)
+INDEX_TIP_ID = 8           # HandLandmark.INDEX_FINGER_TIP
+
+# esqueleto de la mano (mp.solutions.hands.HAND_CONNECTIONS), para dibujar
+# sin depender del backend
+HAND_CONNECTIONS = ((0, 1), (0, 5), (0, 17), (1, 2), (2, 3), (3, 4), (5, 6),
+                    (5, 9), (6, 7), (7, 8), (9, 10), (9, 13), (10, 11),
+                    (11, 12), (13, 14), (13, 17), (14, 15), (15, 16),
+                    (17, 18), (18, 19), (19, 20))
+
+HANDEDNESS_LABELS = ('Left', 'Right')
+
+
+def flip_box(box, width, height):
+    """
+    Caja (x0, y0, x1, y1) en píxeles de un frame width x height, llevada al
+    mismo frame volteado con cv2.flip(img, -1) (y de vuelta).
+    """
+    x0, y0, x1, y1 = box
+    return (width - x1, height - y1, width - x0, height - y0)
+
+
+def flip_points(points, width, height):
+    """
+    Puntos (N, 2) en píxeles llevados al frame volteado con
+    cv2.flip(img, -1) (y de vuelta), como HandLandmarks.flip; retorna una
+    copia.
+    """
+    return np.array([width, height], np.float64) - np.asarray(points)
+
+
+class HandLandmarks:
+    """
+    Landmarks de hasta max_hands manos en arreglos preasignados.
+
+    El detector reutiliza su instancia en cada frame: quien necesite los
+    datos después del próximo findHands (p. ej. otra etapa del pipeline)
+    debe usar copy().
+    """
+
+    def __init__(self, max_hands=2):
+        self.max_hands = max_hands
+        self.buffer = np.zeros((max_hands, N_LANDMARKS, 3), np.float32)
+        self.handedness_buffer = np.zeros(max_hands, np.int32)  # 0 = Left
+        self.scores_buffer = np.zeros(max_hands, np.float32)
+        self.n_hands = 0
+
+    def __len__(self):
+        return self.n_hands
+
+    @property
+    def points(self):
+        """(n_hands, 21, 3) en píxeles (vista)"""
+        return self.buffer[:self.n_hands]
+
+    @property
+    def tips(self):
+        """(n_hands, 5, 3) yemas en el orden de FINGER_TIP_IDS (vista)"""
+        return self.buffer[:self.n_hands, TIPS]
+
+    @property
+    def handedness(self):
+        """(n_hands,) índice de lateralidad de MediaPipe (0 = Left)"""
+        return self.handedness_buffer[:self.n_hands]
+
+    @property
+    def scores(self):
+        return self.scores_buffer[:self.n_hands]
+
+    @property
+    def labels(self):
+        return [HANDEDNESS_LABELS[index] if 0 <= index < 2 else ''
+                for index in self.handedness]
+
+    def clear(self):
+        self.n_hands = 0
+        return self
+
+    def fill_from_results(self, results, width, height):
+        """
+        Copia el resultado de MediaPipe (landmarks normalizados al frame).
+
+        Args:
+            results: Resultado de mp.solutions.hands.Hands.process
+            width, height: Tamaño del frame en píxeles
+        """
+        self.n_hands = 0
+        if not results or not results.multi_hand_landmarks:
+            return self
+        hands = results.multi_hand_landmarks[:self.max_hands]
+        for hand_id, hand_landmarks in enumerate(hands):
+            self.buffer[hand_id] = [(lm.x, lm.y, lm.z)
+                                    for lm in hand_landmarks.landmark]
+            classification = \
+                results.multi_handedness[hand_id].classification[0]
+            self.handedness_buffer[hand_id] = classification.index
+            self.scores_buffer[hand_id] = classification.score
+        self.n_hands = len(hands)
+        self.buffer[:self.n_hands] *= (width, height, width)
+        return self
+
+    def fill_from_task_result(self, result, width, height):
+        """
+        Copia el resultado de MediaPipe Tasks (HandLandmarkerResult).
+
+        Args:
+            result: Resultado de HandLandmarker (hand_landmarks normalizados
+                y handedness como listas de Category)
+            width, height: Tamaño del frame en píxeles
+        """
+        self.n_hands = 0
+        if not result or not result.hand_landmarks:
+            return self
+        hands = result.hand_landmarks[:self.max_hands]
+        for hand_id, hand_landmarks in enumerate(hands):
+            self.buffer[hand_id] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks]
+            category = result.handedness[hand_id][0]
+            # el índice de Tasks no sigue la convención de mp.solutions:
+            # se toma la etiqueta
+            self.handedness_buffer[hand_id] = \
+                HANDEDNESS_LABELS.index(category.category_name) \
+                if category.category_name in HANDEDNESS_LABELS else -1
+            self.scores_buffer[hand_id] = category.score
+        self.n_hands = len(hands)
+        self.buffer[:self.n_hands] *= (width, height, width)
+        return self
+
+    def fill_from_arrays(self, points, handedness):
+        """
+        Copia landmarks ya en píxeles (p. ej. de un worker).
+
+        Args:
+            points: (n, 21, 3) en píxeles
+            handedness: (n, 2) con (índice de lateralidad, score)
+        """
+        n_hands = min(len(points), self.max_hands)
+        self.buffer[:n_hands] = points[:n_hands]
+        self.handedness_buffer[:n_hands] = handedness[:n_hands, 0]
+        self.scores_buffer[:n_hands] = handedness[:n_hands, 1]
+        self.n_hands = n_hands
+        return self
+
+    def flip(self, width, height):
+        """
+        Voltea los landmarks como cv2.flip(img, -1) voltea el frame (en el
+        lugar): la inferencia puede correr sobre el frame de la cámara y
+        solo las coordenadas pasan al punto de vista volteado. Es una
+        rotación de 180°, así que la lateralidad no cambia.
+
+        Args:
+            width, height: Tamaño del frame en píxeles
+        """
+        points = self.points
+        points[:, :, 0] = width - points[:, :, 0]
+        points[:, :, 1] = height - points[:, :, 1]
+        return self
+
+    def copy(self):
+        """Copia con el tamaño justo, independiente del detector"""
+        other = HandLandmarks(max(self.n_hands, 1))
+        other.buffer[:self.n_hands] = self.points
+        other.handedness_buffer[:self.n_hands] = self.handedness
+        other.scores_buffer[:self.n_hands] = self.scores
+        other.n_hands = self.n_hands
+        return other
+
+    def select(self, hand_ids):
+        """Copia con las manos `hand_ids` en ese orden"""
+        hand_ids = np.asarray(hand_ids, np.int64)
+        other = HandLandmarks(max(len(hand_ids), 1))
+        other.buffer[:len(hand_ids)] = self.buffer[hand_ids]
+        other.handedness_buffer[:len(hand_ids)] = \
+            self.handedness_buffer[hand_ids]
+        other.scores_buffer[:len(hand_ids)] = self.scores_buffer[hand_ids]
+        other.n_hands = len(hand_ids)
+        return other
+
+    def boxes(self):
+        """(n_hands, 4) cajas (x0, y0, x1, y1) en píxeles"""
+        points = self.points[:, :, :2]
+        return np.concatenate([points.min(axis=1), points.max(axis=1)],
+                              axis=1)
+
+    def tip_table(self):
+        """
+        Yemas aplanadas, en el orden de getFingerTipsPos.
+
+        Returns:
+            tuple: (hand_ids (N,), tip_ids (N,), xy (N, 2)) con N = 5 * n_hands
+        """
+        n_tips = len(FINGER_TIP_IDS)
+        hand_ids = np.repeat(np.arange(self.n_hands), n_tips)
+        tip_ids = np.tile(FINGER_TIP_IDS, self.n_hands)
+        return hand_ids, tip_ids, self.tips[:, :, :2].reshape(-1, 2)
+
+    def fingertips_list(self):
+        """Yemas como [hand_id, tip_id, x, y] (interfaz de getFingerTipsPos)"""
+        hand_ids, tip_ids, xy = self.tip_table()
+        return [[int(hand_id), int(tip_id), float(x), float(y)]
+                for hand_id, tip_id, (x, y) in zip(hand_ids, tip_ids, xy)]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Render de las manos (esqueleto, articulaciones y yemas) desde arreglos
+
+Dibuja directamente desde HandLandmarks (o un arreglo (n, 21, >=2) en
+píxeles), sin pasar por los protobufs de MediaPipe:
+- el esqueleto de todas las manos en una sola llamada a cv2.polylines,
+- articulaciones y yemas como segmentos de largo cero: una llamada a
+  cv2.polylines dibuja todos los círculos (un trazo de grosor 2r sobre un
+  punto es el mismo disco que cv2.circle de radio r).
+
+HandOverlay agrupa qué se dibuja en cada lado (StereoConfig.HAND_OVERLAY_LEFT
+y HAND_OVERLAY_RIGHT), p. ej. solo las yemas en la cámara derecha.
+"""
+
+import cv2
+import numpy as np
+
+from src.vision.hand_landmarks import HAND_CONNECTIONS, TIPS
+
+
+SKELETON_COLOR = (224, 224, 224)
+JOINT_COLOR = (0, 0, 255)
+TIP_COLOR = (255, 0, 0)
+JOINT_RADIUS = 3
+TIP_RADIUS = 7
+
+OVERLAY_PARTS = ('skeleton', 'tips')
+
+_CONNECTIONS = np.array(HAND_CONNECTIONS, np.intp)
+
+
+def _points(landmarks):
+    """(n, 21, 2) int32 en píxeles desde HandLandmarks o un arreglo"""
+    points = getattr(landmarks, 'points', landmarks)
+    return np.asarray(points)[:, :, :2].astype(np.int32)
+
+
+def draw_dots(img, xy, radius, color):
+    """Discos rellenos en los puntos xy (k, 2) con una sola llamada"""
+    if len(xy) == 0:
+        return img
+    segments = np.repeat(np.asarray(xy, np.int32).reshape(-1, 1, 2), 2, axis=1)
+    cv2.polylines(img, segments, False, color, 2 * radius)
+    return img
+
+
+def draw_skeleton(img, landmarks, joints=True):
+    """
+    Esqueleto de todas las manos.
+
+    Args:
+        img: Imagen BGR (se modifica)
+        landmarks: HandLandmarks o arreglo (n, 21, >=2) en píxeles
+        joints: Dibujar también las 21 articulaciones
+    """
+    points = _points(landmarks)
+    if len(points) == 0:
+        return img
+    cv2.polylines(img, points[:, _CONNECTIONS].reshape(-1, 2, 2), False,
+                  SKELETON_COLOR, 2)
+    if joints:
+        draw_dots(img, points.reshape(-1, 2), JOINT_RADIUS, JOINT_COLOR)
+    return img
+
+
+def draw_tips(img, landmarks):
+    """Yemas (landmarks 4, 8, 12, 16 y 20) de todas las manos"""
+    points = _points(landmarks)
+    return draw_dots(img, points[:, TIPS].reshape(-1, 2), TIP_RADIUS,
+                     TIP_COLOR)
+
+
+class HandOverlay:
+    """Qué se dibuja de las manos en un lado"""
+
+    def __init__(self, parts=OVERLAY_PARTS):
+        """
+        Args:
+            parts: Partes a dibujar: 'skeleton' (conexiones y
+                articulaciones) y/o 'tips'; vacío = nada
+        """
+        unknown = set(parts) - set(OVERLAY_PARTS)
+        if unknown:
+            raise ValueError(f"Partes de overlay inválidas: {unknown}")
+        self.skeleton = 'skeleton' in parts
+        self.tips = 'tips' in parts
+
+    @property
+    def enabled(self):
+        return self.skeleton or self.tips
+
+    def draw(self, img, landmarks):
+        """
+        Dibuja las manos de un frame.
+
+        Args:
+            img: Imagen BGR (se modifica)
+            landmarks: HandLandmarks o arreglo (n, 21, >=2) en píxeles
+        """
+        if not self.enabled or landmarks is None or len(landmarks) == 0:
+            return img
+        if self.skeleton:
+            draw_skeleton(img, landmarks)
+        if self.tips:
+            draw_tips(img, landmarks)
+        return img
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección por intervalos con propagación de las manos entre inferencias
+
+HandTracker envuelve un HandDetector y corre MediaPipe solo cada N frames
+(o cuando la incertidumbre predicha supera un límite). En los frames
+intermedios los landmarks se propagan con un modelo de movimiento:
+
+- 'constant_velocity': velocidad medida entre las dos últimas inferencias.
+- 'kalman': filtro de Kalman de velocidad constante. Todas las
+  coordenadas comparten dinámica y ruido, así que una sola covarianza 2x2
+  describe a todos los landmarks y su desvío es la incertidumbre (px).
+
+Opcionalmente las yemas se refinan con flujo óptico disperso
+(cv2.calcOpticalFlowPyrLK) entre el frame anterior y el actual; el resto
+de la mano se desplaza con la corrección media de sus yemas.
+
+Envuelve cualquier backend (BaseHandDetector) y expone la misma interfaz
+(detect, findHands, getLandmarks, getResults, drawHands, drawTips,
+getFingerTipsPos); el resto se delega al detector.
+"""
+
+import cv2
+import numpy as np
+
+from src.vision.hand_backend import HandDetection
+from src.vision.hand_landmarks import HandLandmarks, TIPS
+from src.vision.hand_overlay import draw_skeleton, draw_tips
+
+
+MOTION_MODELS = ('constant_velocity', 'kalman')
+
+
+class HandTracker:
+    """Detector de manos con inferencia cada N frames y propagación"""
+
+    def __init__(self, detector, detection_interval=1,
+                 motion_model='kalman', max_uncertainty_px=None,
+                 optical_flow=False, process_noise=4.0,
+                 measurement_noise=1.0, flow_noise=4.0,
+                 flow_max_error=30.0):
+        """
+        Args:
+            detector: HandDetector que corre la inferencia
+            detection_interval: Inferencia cada N frames (1 = siempre)
+            motion_model: Modelo de propagación (ver MOTION_MODELS)
+            max_uncertainty_px: Inferir antes si la incertidumbre predicha
+                supera este valor (píxeles); None = solo por intervalo
+            optical_flow: Refinar las yemas con flujo óptico Lucas-Kanade
+            process_noise: Varianza de la aceleración (px²/frame⁴, Kalman)
+            measurement_noise: Varianza de la inferencia (px², Kalman)
+            flow_noise: Varianza del flujo óptico (px², Kalman)
+            flow_max_error: Error máximo de LK para aceptar un punto
+        """
+        if motion_model not in MOTION_MODELS:
+            raise ValueError(f"motion_model inválido: {motion_model}")
+        if detection_interval < 1:
+            raise ValueError("detection_interval debe ser >= 1")
+
+        self.detector = detector
+        self.detection_interval = detection_interval
+        self.motion_model = motion_model
+        self.max_uncertainty_px = max_uncertainty_px
+        self.optical_flow = optical_flow
+        self.flow_noise = flow_noise
+        self.flow_max_error = flow_max_error
+
+        max_hands = detector.maxHands
+        self.landmarks = HandLandmarks(max_hands)
+        self.velocity = np.zeros((max_hands, 21, 2), np.float32)
+        self.last_measured = np.zeros((max_hands, 21, 2), np.float32)
+        self.accel_px = 0.0       # |Δvelocidad| entre inferencias (px/frame²)
+        self.frames_since_detection = 0
+        self.inferred = False     # True si el último frame corrió MediaPipe
+        self.prev_gray = None
+
+        # Kalman [posición, velocidad] por coordenada (dt = 1 frame)
+        self.F = np.array([[1.0, 1.0], [0.0, 1.0]])
+        self.Q = process_noise * np.array([[0.25, 0.5], [0.5, 1.0]])
+        self.R = measurement_noise
+        self.P = np.diag([measurement_noise, 100.0])
+
+        self.frames = 0
+        self.detections = 0
+
+    def __getattr__(self, name):
+        # roi_mode, setSearchBand, getROIStats, configure, ... del detector
+        if name == 'detector':
+            raise AttributeError(name)
+        return getattr(self.detector, name)
+
+    # ---------- planificación ----------
+
+    def uncertainty_px(self, frames_ahead=1):
+        """Incertidumbre predicha de los landmarks dentro de frames_ahead"""
+        t = self.frames_since_detection + frames_ahead
+        if self.motion_model == 'kalman':
+            P = self.P
+            for _ in range(frames_ahead):
+                P = self.F @ P @ self.F.T + self.Q
+            return float(np.sqrt(P[0, 0]))
+        # velocidad constante: error acumulado de una aceleración no modelada
+        return 0.5 * self.accel_px * t * (t + 1)
+
+    def should_detect(self):
+        """True si el próximo frame debe correr la inferencia"""
+        if len(self.landmarks) == 0:
+            return True   # sin manos que propagar (o tracking perdido)
+        if self.frames_since_detection + 1 >= self.detection_interval:
+            return True
+        return (self.max_uncertainty_px is not None and
+                self.uncertainty_px() > self.max_uncertainty_px)
+
+    # ---------- interfaz de HandDetector ----------
+
+    def findHands(self, img, hand_landmarks=None):
+        if hand_landmarks is not None:
+            # landmarks ya calculados (worker): sin propagación
+            found = self.detector.findHands(img, hand_landmarks)
+            self._copy_from(self.detector.getLandmarks())
+            return found
+
+        gray = None
+        if self.optical_flow:
+            gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY
+                                if getattr(self.detector, 'input_rgb', False)
+                                else cv2.COLOR_BGR2GRAY)
+
+        self.frames += 1
+        if self.should_detect():
+            if getattr(self.detector, 'roi_mode', None) == 'hands':
+                # la región de la inferencia sigue a las manos propagadas
+                self.detector.hand_boxes = self.getHandBoxes()
+            self.detector.findHands(img)
+            self._correct(self.detector.getLandmarks())
+            self.detections += 1
+            self.inferred = True
+        else:
+            previous_tips = self.landmarks.tips[:, :, :2].copy()
+            self._predict()
+            if gray is not None and self.prev_gray is not None and \
+                    self.prev_gray.shape == gray.shape:
+                self._refine_with_flow(self.prev_gray, gray, img.shape,
+                                       previous_tips)
+            self.frames_since_detection += 1
+            self.inferred = False
+        self.prev_gray = gray
+        return len(self.landmarks) > 0
+
+    def detect(self, frame):
+        """Detecta o propaga las manos (ver BaseHandDetector.detect)"""
+        self.findHands(frame)
+        return HandDetection.from_landmarks(self.landmarks)
+
+    def getLandmarks(self):
+        return self.landmarks
+
+    def getResults(self):
+        # copia: el render dibuja mientras se propaga el próximo frame
+        return self.landmarks.copy()
+
+    def getHandBoxes(self):
+        return [tuple(box) for box in self.landmarks.boxes().tolist()]
+
+    def getFingerTipsPos(self):
+        hands, _ = self.detector.getFingerTipsPos()
+        return [hands[:len(self.landmarks)], self.landmarks.fingertips_list()]
+
+    def getTrackingStats(self):
+        """
+        Returns:
+            dict: frames, inferencias, fracción de frames con inferencia e
+            incertidumbre predicha actual (px)
+        """
+        return {'frames': self.frames, 'detections': self.detections,
+                'detection_rate': self.detections / max(self.frames, 1),
+                'uncertainty_px': self.uncertainty_px(0)}
+
+    def drawHands(self, img, results=None):
+        draw_skeleton(img, self.landmarks if results is None else results)
+
+    def drawTips(self, img, results=None):
+        draw_tips(img, self.landmarks if results is None else results)
+
+    # ---------- modelo de movimiento ----------
+
+    def _correct(self, measured):
+        """Incorpora una inferencia de MediaPipe"""
+        n_hands = len(measured)
+        z = measured.points[:, :, :2]
+        same_hands = (n_hands == len(self.landmarks) and n_hands > 0 and
+                      np.array_equal(measured.handedness,
+                                     self.landmarks.handedness))
+        if not same_hands:
+            # manos nuevas o perdidas: reiniciar el modelo
+            self.velocity[:n_hands] = 0.0
+            self.accel_px = 0.0
+            self.P = np.diag([self.R, 100.0])
+        elif self.motion_model == 'kalman':
+            # predicción hasta este frame (la inferencia reemplaza a _predict)
+            self.P = self.F @ self.P @ self.F.T + self.Q
+            innovation = z - (self.landmarks.points[:, :, :2] +
+                              self.velocity[:n_hands])
+            gain = self.P[:, 0] / (self.P[0, 0] + self.R)
+            self.velocity[:n_hands] += gain[1] * innovation
+            self.P = self.P - np.outer(gain, self.P[0])
+        else:
+            # velocidad media desde la inferencia anterior
+            elapsed = self.frames_since_detection + 1
+            velocity = (z - self.last_measured[:n_hands]) / elapsed
+            self.accel_px = float(np.max(np.abs(
+                velocity - self.velocity[:n_hands]), initial=0.0)) / elapsed
+            self.velocity[:n_hands] = velocity
+
+        # la posición es la de la inferencia (el detector es la referencia)
+        self._copy_from(measured)
+        self.last_measured[:n_hands] = z
+        self.frames_since_detection = 0
+
+    def _copy_from(self, measured):
+        self.landmarks.fill_from_arrays(
+            measured.points, np.stack([measured.handedness,
+                                       measured.scores], axis=1))
+
+    def _predict(self):
+        """Propaga un frame con la velocidad actual"""
+        n_hands = len(self.landmarks)
+        self.landmarks.points[:, :, :2] += self.velocity[:n_hands]
+        if self.motion_model == 'kalman':
+            self.P = self.F @ self.P @ self.F.T + self.Q
+
+    def _refine_with_flow(self, prev_gray, gray, image_shape, previous_tips):
+        """
+        Corrige las yemas propagadas con flujo óptico Lucas-Kanade desde
+        su posición en el frame anterior (previous_tips, (n, 5, 2))
+        """
+        n_hands = len(self.landmarks)
+        # de píxeles del detector a píxeles de la imagen (puede estar reducida)
+        scale = np.array([image_shape[1] / self.detector.img_width,
+                          image_shape[0] / self.detector.img_height],
+                         np.float32)
+        tips = self.landmarks.tips[:, :, :2]
+        previous = previous_tips * scale
+        flowed, status, error = cv2.calcOpticalFlowPyrLK(
+            prev_gray, gray, previous.reshape(-1, 1, 2), None,
+            winSize=(15, 15), maxLevel=2)
+        if flowed is None:
+            return
+        valid = ((status.ravel() == 1) &
+                 (error.ravel() < self.flow_max_error)).reshape(n_hands, -1)
+        innovation = flowed.reshape(n_hands, -1, 2) / scale - tips
+
+        if self.motion_model == 'kalman':
+            gain = self.P[:, 0] / (self.P[0, 0] + self.flow_noise)
+        else:
+            gain = np.array([1.0, 1.0])
+        for hand_id in range(n_hands):
+            if not np.any(valid[hand_id]):
+                continue
+            # la mano entera sigue la corrección media de sus yemas
+            shift = innovation[hand_id][valid[hand_id]].mean(axis=0)
+            points = self.landmarks.points[hand_id, :, :2]
+            points += gain[0] * shift
+            tip_points = points[TIPS]   # vista
+            tip_points[valid[hand_id]] += gain[0] * (
+                innovation[hand_id][valid[hand_id]] - shift)
+            self.velocity[hand_id] += gain[1] * shift
+        if self.motion_model == 'kalman' and np.any(valid):
+            self.P = self.P - np.outer(gain, self.P[0])
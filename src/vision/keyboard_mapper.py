@@ -102,7 +102,8 @@ class KeyboardMapModular:
         
         Args:
             virtual_keyboard: Instancia de VirtualKeyboard
-            fingertips_pos: Lista de posiciones de dedos [(hand_id, tip_id, x, y), ...]
+            fingertips_pos: HandLandmarks de la cámara izquierda, o lista de
+                posiciones de dedos [(hand_id, tip_id, x, y), ...]
             finger_depths: Dict con profundidades {(hand_id, tip_id): depth_cm}
             keyboard_n_key: Número de teclas
             
@@ -124,51 +125,50 @@ class KeyboardMapModular:
         raw_detections = []
         current_time = time.time()
         
-        for fingertip_pos in fingertips_pos:
-            hand_id = fingertip_pos[0]
-            tip_id = fingertip_pos[1]
-            x_pos = fingertip_pos[2]
-            y_pos = fingertip_pos[3]
+        hand_ids, tip_ids, positions = self._tip_arrays(fingertips_pos)
+        
+        # Verificar intersección con teclado (todas las yemas a la vez):
+        # solo las que caen sobre el teclado buscan su tecla
+        for i in np.flatnonzero(virtual_keyboard.intersect_many(positions)):
+            finger_id = (int(hand_ids[i]), int(tip_ids[i]))
+            x_pos = float(positions[i, 0])
+            y_pos = float(positions[i, 1])
             
-            finger_id = (hand_id, tip_id)
+            key = virtual_keyboard.find_key(x_pos, y_pos)
             
-            # Verificar intersección con teclado
-            if virtual_keyboard.intersect((x_pos, y_pos)):
-                key = virtual_keyboard.find_key(x_pos, y_pos)
-                
-                if 0 <= key < keyboard_n_key:
-                    # Obtener profundidad
-                    if finger_id in finger_depths:
-                        depth = finger_depths[finger_id]
-                        
-                        # Actualizar historial de profundidad
-                        if finger_id not in self.finger_depth_history:
-                            self.finger_depth_history[finger_id] = deque(maxlen=self.velocity_history_size)
-                        self.finger_depth_history[finger_id].append(depth)
-                        
-                        # Calcular velocidad
-                        velocity = 0.0
-                        if len(self.finger_depth_history[finger_id]) >= 2:
-                            history = list(self.finger_depth_history[finger_id])
-                            velocity = history[-2] - history[-1]
-                        
-                        # Verificar condición básica de activación
-                        should_activate = False
-                        
-                        if self.velocity_enabled and len(self.finger_depth_history[finger_id]) >= 2:
-                            # Modo velocidad
-                            if depth <= self.depth_threshold and velocity >= self.velocity_threshold:
-                                should_activate = True
-                        else:
-                            # Modo clásico
-                            if depth <= self.depth_threshold:
-                                should_activate = True
-                        
-                        if should_activate:
-                            raw_detections.append((finger_id, key, depth, velocity, x_pos, y_pos))
+            if 0 <= key < keyboard_n_key:
+                # Obtener profundidad
+                if finger_id in finger_depths:
+                    depth = finger_depths[finger_id]
+                    
+                    # Actualizar historial de profundidad
+                    if finger_id not in self.finger_depth_history:
+                        self.finger_depth_history[finger_id] = deque(maxlen=self.velocity_history_size)
+                    self.finger_depth_history[finger_id].append(depth)
+                    
+                    # Calcular velocidad
+                    velocity = 0.0
+                    if len(self.finger_depth_history[finger_id]) >= 2:
+                        history = list(self.finger_depth_history[finger_id])
+                        velocity = history[-2] - history[-1]
+                    
+                    # Verificar condición básica de activación
+                    should_activate = False
+                    
+                    if self.velocity_enabled and len(self.finger_depth_history[finger_id]) >= 2:
+                        # Modo velocidad
+                        if depth <= self.depth_threshold and velocity >= self.velocity_threshold:
+                            should_activate = True
                     else:
-                        # Fallback sin profundidad
-                        raw_detections.append((finger_id, key, 0.0, 0.0, x_pos, y_pos))
+                        # Modo clásico
+                        if depth <= self.depth_threshold:
+                            should_activate = True
+                    
+                    if should_activate:
+                        raw_detections.append((finger_id, key, depth, velocity, x_pos, y_pos))
+                else:
+                    # Fallback sin profundidad
+                    raw_detections.append((finger_id, key, 0.0, 0.0, x_pos, y_pos))
         
         # FASE 2: Procesar detecciones a través de algoritmos modulares
         context = {
@@ -195,6 +195,18 @@ class KeyboardMapModular:
         
         return on_map, off_map
     
+    @staticmethod
+    def _tip_arrays(fingertips_pos):
+        """
+        Yemas como arreglos (hand_ids, tip_ids, posiciones (N, 2)), desde
+        HandLandmarks o desde la lista [(hand_id, tip_id, x, y), ...].
+        """
+        if hasattr(fingertips_pos, 'tip_table'):
+            return fingertips_pos.tip_table()
+        table = np.asarray(fingertips_pos, dtype=np.float64).reshape(-1, 4)
+        return (table[:, 0].astype(int), table[:, 1].astype(int),
+                table[:, 2:])
+    
     # ==================== MÉTODOS DE CONTROL ====================
     
     def enable_algorithm(self, name):
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Plano de la superficie donde se toca el teclado
+
+La superficie física se ajusta como un plano 3D (n · p + d = 0, |n| = 1)
+a puntos triangulados sobre ella: yemas apoyadas o las esquinas de un
+tablero de ajedrez colocado encima. La profundidad de presión de cada yema
+es su distancia con signo al plano (positiva del lado de las cámaras), así
+que la sensibilidad es la misma en todo el teclado y todas las yemas se
+resuelven con un producto matriz-vector.
+
+Las posiciones van en cm, en el sistema de DepthEstimator (cámara
+izquierda en el origen), trianguladas desde los frames de la cámara sin
+voltear: StereoFusionStage deshace el flip del punto de vista antes de
+triangular, así el plano y las yemas están en el mismo sistema.
+"""
+
+import numpy as np
+
+
+class KeyboardPlane:
+    """Plano del teclado y distancia con signo de las yemas"""
+
+    def __init__(self, normal, offset, rms_cm=0.0, num_points=0):
+        """
+        Args:
+            normal: Normal (3,) del plano (se normaliza)
+            offset: d de n · p + d = 0 (cm, con la normal normalizada)
+            rms_cm: Error cuadrático medio del ajuste (cm)
+            num_points: Puntos usados en el ajuste
+        """
+        normal = np.asarray(normal, dtype=np.float64).reshape(3)
+        length = np.linalg.norm(normal)
+        if length < 1e-9:
+            raise ValueError(f"normal inválida: {normal}")
+        self.normal = normal / length
+        self.offset = float(offset) / length
+        self.rms_cm = float(rms_cm)
+        self.num_points = int(num_points)
+
+    @classmethod
+    def fit(cls, points):
+        """
+        Ajusta el plano por mínimos cuadrados (SVD de los puntos
+        centrados); la normal queda apuntando hacia las cámaras.
+
+        Args:
+            points: Puntos (N, 3) sobre la superficie en cm, N >= 3 y no
+                alineados
+
+        Returns:
+            KeyboardPlane
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(points) < 3:
+            raise ValueError(f"puntos insuficientes: {len(points)} (mínimo 3)")
+        center = points.mean(axis=0)
+        _, singular, vh = np.linalg.svd(points - center, full_matrices=False)
+        if singular[1] < 1e-6 * max(singular[0], 1e-12):
+            raise ValueError("puntos alineados: no definen un plano")
+        normal = vh[2]
+        offset = -normal @ center
+        if offset < 0:
+            # las cámaras (origen) del lado positivo
+            normal, offset = -normal, -offset
+        residuals = (points - center) @ normal
+        return cls(normal, offset, np.sqrt(np.mean(residuals ** 2)),
+                   len(points))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Plano guardado en calibration.json (sección keyboard_plane)"""
+        return cls(data['normal'], data['offset_cm'], data.get('rms_cm', 0.0),
+                   data.get('num_points', 0))
+
+    def to_dict(self):
+        """Plano serializable a JSON"""
+        return {'normal': self.normal.tolist(),
+                'offset_cm': self.offset,
+                'rms_cm': self.rms_cm,
+                'num_points': self.num_points}
+
+    def signed_distance(self, points):
+        """
+        Distancia con signo de cada punto al plano.
+
+        Args:
+            points: Posiciones (N, 3) en cm
+
+        Returns:
+            np.ndarray: (N,) cm; > 0 sobre la superficie (lado de las
+            cámaras), < 0 atravesándola
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        return points @ self.normal + self.offset
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decodificación de MJPEG crudo a resolución reducida
+
+Las cámaras entregan MJPEG: normalmente OpenCV decodifica cada frame
+completo (640x480) aunque MediaPipe lo reduzca internamente. Con
+CAP_PROP_FORMAT = -1 se obtienen los bytes JPEG sin decodificar y aquí se
+decodifican en un pool de hilos (cv2.imdecode libera el GIL):
+
+- la copia para inferencia con IMREAD_REDUCED_COLOR_2/4 (el decodificador
+  JPEG escala en el dominio DCT: mucho más barato que decodificar y
+  después reducir),
+- la imagen completa solo cuando realmente se va a mostrar.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+# escala -> flag de decodificación reducida de OpenCV
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class CorruptFrameError(ValueError):
+    """JPEG dañado o truncado (frecuente en webcams USB)"""
+
+
+def reduced_shape(width, height, scale):
+    """Tamaño (alto, ancho, 3) de un JPEG decodificado a 1/scale"""
+    return (-(-height // scale), -(-width // scale), 3)
+
+
+def enable_raw_mjpeg(resource):
+    """
+    Configura el dispositivo para entregar los bytes MJPEG sin decodificar.
+
+    Returns:
+        bool: True si el backend soporta el modo crudo
+    """
+    if not resource.set(cv2.CAP_PROP_FORMAT, -1):
+        return False
+    return resource.get(cv2.CAP_PROP_FORMAT) == -1
+
+
+class MJPEGDecoder:
+    """
+    Pool de decodificación JPEG (completa o reducida a 1/2, 1/4, 1/8).
+    """
+
+    def __init__(self, n_workers=2, inference_scale=2):
+        """
+        Args:
+            n_workers: Hilos del pool (2 = izquierda y derecha en paralelo)
+            inference_scale: Reducción de la copia para inferencia (1, 2, 4 u 8)
+        """
+        if inference_scale not in REDUCED_DECODE_FLAGS:
+            raise ValueError(
+                f"Escala inválida: {inference_scale} "
+                f"(usa {sorted(REDUCED_DECODE_FLAGS)})")
+        self.inference_scale = inference_scale
+        self.pool = ThreadPoolExecutor(max_workers=n_workers,
+                                       thread_name_prefix='mjpeg')
+
+    def decode(self, data, scale=1):
+        """Decodifica un JPEG a 1/scale (None si los bytes no son válidos)"""
+        if data is None or data.size == 0:
+            return None
+        return cv2.imdecode(data, REDUCED_DECODE_FLAGS[scale])
+
+    def decode_many(self, buffers, scale=1):
+        """Decodifica varios JPEG en paralelo; retorna la lista de imágenes"""
+        futures = [self.pool.submit(self.decode, data, scale)
+                   for data in buffers]
+        return [future.result() for future in futures]
+
+    def decode_inference_into(self, buffers, views):
+        """
+        Decodifica a resolución de inferencia y copia en las vistas dadas
+        (slots del buffer circular).
+
+        Returns:
+            list: frames con el contenido: las mismas vistas, o las imágenes
+                  decodificadas si alguna no coincide con su vista (otra
+                  resolución)
+
+        Raises:
+            CorruptFrameError: si algún JPEG está dañado o truncado
+        """
+        frames = self.decode_many(buffers, self.inference_scale)
+        if any(frame is None for frame in frames):
+            raise CorruptFrameError("JPEG inválido: dañado o truncado")
+        if any(frame.shape != view.shape for frame, view in zip(frames, views)):
+            return frames
+        for frame, view in zip(frames, views):
+            np.copyto(view, frame)
+        return list(views)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
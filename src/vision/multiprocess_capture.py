@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Captura + detección de manos en procesos separados (uno por cámara)
+
+Con VideoThread/StereoVideoThread la captura y los dos findHands comparten
+un solo intérprete: el trabajo en Python del wrapper de MediaPipe y el
+dibujo con OpenCV compiten por el GIL. En este modo cada cámara tiene su
+propio proceso que captura, convierte a RGB y corre MediaPipe; el frame y
+los landmarks se publican en un buffer circular en memoria compartida
+(SharedFrameRing) y el proceso principal solo hace fusión, mapeo de
+teclas, audio y render.
+
+MultiProcessStereoCapture implementa la interfaz de StereoVideoThread y
+hand_detectors() entrega dos objetos con la interfaz de HandDetector
+(findHands/getFingerTipsPos/drawHands/drawTips) que leen los resultados
+ya calculados por los workers, de modo que main.py no cambia.
+"""
+
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from src.vision.frame_ring_buffer import FrameRingBuffer
+from src.vision.hand_landmarks import (HandLandmarks, N_LANDMARKS,
+                                       FINGER_TIP_IDS)
+from src.vision.hand_overlay import draw_skeleton, draw_tips
+from src.vision.video_thread import CameraStatus, open_video_resource
+
+
+
+# estado publicado por cada worker (arreglo `info` del ring)
+WORKER_STARTING = 0
+WORKER_STREAMING = 1
+WORKER_DEAD = 2
+
+
+# ------------------------------
+# Buffer circular en memoria compartida
+# ------------------------------
+
+
+class SharedFrameRing(FrameRingBuffer):
+    """
+    FrameRingBuffer cuyos arreglos viven en multiprocessing.shared_memory
+    y cuya condición es un multiprocessing.Condition: el productor
+    (worker) y el consumidor (proceso principal) pueden estar en procesos
+    distintos con la misma semántica borrow/release y sin copias.
+
+    Además de los frames, cada slot guarda los landmarks de las manos
+    detectadas en ese frame (en píxeles) y su lateralidad.
+    """
+
+    def __init__(self, n_slots, frame_shape, max_hands=2, overwrite=True,
+                 ctx=None):
+        """
+        Args:
+            n_slots: Número de slots (mínimo 3)
+            frame_shape: (alto, ancho, canales)
+            max_hands: Manos por frame
+            overwrite: True = el más reciente gana, False = FIFO sin pérdida
+            ctx: Contexto de multiprocessing (por defecto 'spawn')
+        """
+        self.max_hands = max_hands
+        self._ctx = ctx or mp.get_context('spawn')
+        self._layout = []
+        self._offset = 0
+
+        # primero se calcula el tamaño total (dry run), luego se reserva
+        self._shm = None
+        self._dry_run = True
+        super().__init__(n_slots, frame_shape, 1, np.uint8, overwrite)
+        self._allocate_extra()
+        size = self._offset
+
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._owner = True
+        self._attach_arrays()
+
+        # estado inicial (el dry run escribió en arreglos temporales)
+        self.seqs[:] = -1
+        self.borrowed[:] = 0
+        self.writing = -1
+        self.next_seq = 0
+        self.latest_seq = -1
+        self.consumed_seq = -1
+        self.closed = False
+        self.info[:] = 0
+        self.n_hands[:] = 0
+
+    def _allocate(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        # alineación a 8 bytes para todos los arreglos
+        self._offset = -(-self._offset // 8) * 8
+        self._layout.append((self._offset, shape, dtype))
+        self._offset += int(np.prod(shape)) * dtype.itemsize
+        if self._dry_run:
+            return np.zeros(shape, dtype)
+        return np.ndarray(shape, dtype, buffer=self._shm.buf,
+                          offset=self._layout[-1][0])
+
+    def _allocate_extra(self):
+        n_slots = self.n_slots
+        # landmarks en píxeles (x, y, z) de cada mano
+        self.landmarks = self._allocate(
+            (n_slots, self.max_hands, N_LANDMARKS, 3), np.float32)
+        # lateralidad: (índice de clase, score) de cada mano
+        self.handedness = self._allocate((n_slots, self.max_hands, 2),
+                                         np.float32)
+        self.n_hands = self._allocate((n_slots,), np.int64)
+        # estado del worker: status, frames capturados, fps x100
+        self.info = self._allocate((3,), np.int64)
+
+    def _make_condition(self):
+        return self._ctx.Condition()
+
+    def _attach_arrays(self):
+        arrays = [np.ndarray(shape, dtype, buffer=self._shm.buf, offset=offset)
+                  for offset, shape, dtype in self._layout]
+        (self.frames, self.timestamps, self.seqs, self.borrowed, self.state,
+         self.landmarks, self.handedness, self.n_hands, self.info) = arrays
+        self._dry_run = False
+
+    # multiprocessing: al pasar el ring a un proceso hijo se re-adjunta la
+    # misma memoria compartida por nombre
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('frames', 'timestamps', 'seqs', 'borrowed', 'state',
+                     'landmarks', 'handedness', 'n_hands', 'info', '_shm',
+                     '_ctx'):
+            state.pop(name, None)
+        state['_shm_name'] = self._shm.name
+        return state
+
+    def __setstate__(self, state):
+        shm_name = state.pop('_shm_name')
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=shm_name)
+        self._owner = False
+        self._attach_arrays()
+
+    def release_memory(self):
+        """Libera la memoria compartida (el dueño además la elimina)"""
+        if self._shm is None:
+            return
+        # soltar las vistas antes de cerrar el segmento
+        for name in ('frames', 'timestamps', 'seqs', 'borrowed', 'state',
+                     'landmarks', 'handedness', 'n_hands', 'info'):
+            setattr(self, name, None)
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+
+# ------------------------------
+# Worker (proceso hijo)
+# ------------------------------
+
+
+def camera_worker(video_source, ring, video_width, video_height,
+                  video_frame_rate, video_fourcc, buffer_all,
+                  detector_kwargs, stop_event, orientation='pixels'):
+    """
+    Proceso de una cámara: captura en el ring, flip + RGB + MediaPipe y
+    publica los landmarks (en coordenadas del frame volteado, igual que
+    main.py) en el mismo slot. Con orientation 'coordinates' MediaPipe
+    corre sobre el frame del ring y solo se voltean los landmarks; con
+    'source' la cámara ya entrega el frame volteado.
+    """
+    # import local: MediaPipe solo se carga en el proceso worker
+    from src.vision.hand_detector import HandDetector
+
+    resource = open_video_resource(video_source, video_width, video_height,
+                                   video_frame_rate, video_fourcc)
+    if not resource.isOpened():
+        ring.info[0] = WORKER_DEAD
+        ring.close()
+        return
+
+    height, width = ring.frame_shape[:2]
+    detector = HandDetector(staticImageMode=False, img_width=width,
+                            img_height=height, **detector_kwargs)
+    flipped = np.empty(ring.frame_shape, np.uint8) \
+        if orientation == 'pixels' else None
+    frame_count = 0
+    rate_start = time.time()
+    ring.info[0] = WORKER_STREAMING
+
+    while not stop_event.is_set():
+        slot = None
+        while not stop_event.is_set():
+            slot = ring.acquire_write(timeout=0.1 if buffer_all else None)
+            if slot is not None or not buffer_all:
+                break
+        if slot is None and buffer_all:
+            continue
+
+        if not resource.grab():
+            if slot is not None:
+                ring.abort(slot[0])
+            break
+        t_grab = time.perf_counter()
+        if slot is None:
+            continue
+
+        index, (view,) = slot
+        grabbed, frame = resource.retrieve(image=view)
+        if not grabbed:
+            ring.abort(index)
+            break
+        if frame is not view:
+            # otra resolución: escalar al tamaño del ring
+            cv2.resize(frame, (width, height), dst=view)
+
+        # detección sobre el frame volteado (punto de vista selfie)
+        if flipped is not None:
+            cv2.flip(view, -1, dst=flipped)
+        n_hands = 0
+        if detector.findHands(view if flipped is None else flipped):
+            landmarks = detector.getLandmarks()
+            if orientation == 'coordinates':
+                landmarks.flip(width, height)
+            n_hands = min(len(landmarks), ring.max_hands)
+            ring.landmarks[index, :n_hands] = landmarks.points[:n_hands]
+            ring.handedness[index, :n_hands, 0] = \
+                landmarks.handedness[:n_hands]
+            ring.handedness[index, :n_hands, 1] = landmarks.scores[:n_hands]
+        ring.n_hands[index] = n_hands
+
+        ring.commit(index, (t_grab,))
+        frame_count += 1
+        ring.info[1] = frame_count
+        if frame_count % 10 == 0:
+            ring.info[2] = int(1000.0 / (time.time() - rate_start))
+            rate_start = time.time()
+
+    resource.release()
+    ring.info[0] = WORKER_DEAD
+    ring.close()
+
+
+# ------------------------------
+# Resultados de un worker con la interfaz de HandDetector
+# ------------------------------
+
+
+class _Classification:
+    """Equivalente mínimo de la clasificación de lateralidad de MediaPipe"""
+
+    LABELS = ('Left', 'Right')
+
+    def __init__(self, index, score):
+        self.index = int(index)
+        self.score = float(score)
+        self.label = self.LABELS[self.index] if 0 <= self.index < 2 else ''
+
+
+class WorkerHandDetector:
+    """
+    Interfaz de HandDetector sobre los landmarks calculados por un worker.
+
+    findHands(img) no procesa la imagen: toma los landmarks del frame
+    entregado por el último next_new() de MultiProcessStereoCapture.
+    """
+
+    def __init__(self, capture, side):
+        self.capture = capture
+        self.side = side
+        self.landmarks = np.zeros((0, N_LANDMARKS, 3), np.float32)
+        self.handedness = np.zeros((0, 2), np.float32)
+        self.hand_landmarks = HandLandmarks(capture.rings[side].max_hands)
+        self.fingerTips = list(FINGER_TIP_IDS)
+
+    def findHands(self, img=None, hand_landmarks=None):
+        """
+        Args:
+            img: Ignorado (MediaPipe ya corrió en el worker)
+            hand_landmarks: (landmarks, lateralidad) copiados al recibir el
+                par; si es None se leen los del último next_new()
+        """
+        if hand_landmarks is None:
+            hand_landmarks = self.capture.get_hand_landmarks(self.side)
+        self.landmarks, self.handedness = hand_landmarks
+        self.hand_landmarks.fill_from_arrays(self.landmarks, self.handedness)
+        return len(self.landmarks) > 0
+
+    def getResults(self):
+        return self.landmarks
+
+    def getLandmarks(self):
+        return self.hand_landmarks
+
+    def getHandBoxes(self):
+        return [tuple(box) for box in self.hand_landmarks.boxes().tolist()]
+
+    def getFingerTipsPos(self):
+        fingertips = self.hand_landmarks.fingertips_list()
+        hands = [_Classification(index, score)
+                 for index, score in self.handedness]
+        return [hands, fingertips]
+
+    def drawHands(self, img, results=None):
+        draw_skeleton(img, self.landmarks if results is None else results)
+
+    def drawTips(self, img, results=None):
+        draw_tips(img, self.landmarks if results is None else results)
+
+
+# ------------------------------
+# Par estéreo multi-proceso (proceso principal)
+# ------------------------------
+
+
+class MultiProcessStereoCapture:
+    """
+    Par estéreo con un proceso worker por cámara (captura + MediaPipe).
+
+    Implementa la interfaz de StereoVideoThread. Cada par entregado es
+    (left, right, t_left, t_right, seq): con buffer_all=True (archivos o
+    sesiones grabadas) los frames se emparejan por orden y sin pérdida;
+    con cámaras se toma el último frame derecho disponible al llegar cada
+    frame izquierdo (el desfase se informa con get_mean_skew_ms()).
+    Los landmarks se publican en el punto de vista volteado; orientation
+    ('pixels', 'coordinates' o 'source', ver CaptureStage) decide si el
+    worker voltea el frame o solo los landmarks; inference_scale es la
+    escala de la imagen que recibe MediaPipe en el worker.
+    """
+
+    def __init__(self,
+                 left_source=2,
+                 right_source=1,
+                 video_width=640,
+                 video_height=480,
+                 video_frame_rate=30,
+                 buffer_all=False,
+                 buffer_slots=4,
+                 video_fourcc=cv2.VideoWriter_fourcc(*"MJPG"),
+                 max_hands=2,
+                 detection_con=0.5,
+                 track_con=0.5,
+                 orientation='pixels',
+                 inference_scale=1.0):
+
+        self.left_source = left_source
+        self.right_source = right_source
+        self.video_width = video_width
+        self.video_height = video_height
+        self.video_frame_rate = video_frame_rate
+        self.buffer_all = buffer_all
+        self.raw_mjpeg = False
+
+        self.ctx = mp.get_context('spawn')
+        self.stop_event = self.ctx.Event()
+        frame_shape = (video_height, video_width, 3)
+        self.rings = {
+            side: SharedFrameRing(buffer_slots, frame_shape, max_hands,
+                                  overwrite=not buffer_all, ctx=self.ctx)
+            for side in ('left', 'right')}
+
+        detector_kwargs = dict(maxHands=max_hands, detectionCon=detection_con,
+                               trackCon=track_con,
+                               inference_scale=inference_scale)
+        self.processes = {
+            side: self.ctx.Process(
+                target=camera_worker,
+                args=(source, self.rings[side], video_width, video_height,
+                      video_frame_rate, video_fourcc, buffer_all,
+                      detector_kwargs, self.stop_event, orientation),
+                name=f'camera_worker_{side}',
+                daemon=True)
+            for side, source in (('left', left_source),
+                                 ('right', right_source))}
+
+        # sin dispositivos en este proceso (diagnósticos de main.py)
+        self.resource_left = None
+        self.resource_right = None
+
+        self.frame_count = 0
+        self.frames_returned = 0
+        self.current_skew = 0.0
+        self.mean_skew = 0.0
+        self.last_seq = -1
+        self.last_right_seq = -1
+        self.borrowed = None          # {'left': seq, 'right': seq}
+        self.borrowed_frames = None
+        self.finished = False
+        self.started = False
+
+        self.black_frame = np.zeros(frame_shape, np.uint8)
+        self.black_frame.flags.writeable = False
+
+    # ------------------------------
+    # Interfaz de StereoVideoThread
+    # ------------------------------
+
+    def get_curr_config_fps(self):
+        return self.video_frame_rate
+
+    def get_curr_config_widht(self):
+        return self.video_width
+
+    def get_curr_config_height(self):
+        return self.video_height
+
+    def get_curr_frame_number(self):
+        return self.frame_count
+
+    def get_curr_skew_ms(self):
+        return self.current_skew * 1000.0
+
+    def get_mean_skew_ms(self):
+        return self.mean_skew * 1000.0
+
+    @property
+    def current_frame_rate(self):
+        return min(ring.info[2] for ring in self.rings.values()) / 100.0
+
+    def is_available(self):
+        if self.rings['left'].info is None:
+            return False
+        return all(ring.info[0] != WORKER_DEAD for ring in self.rings.values())
+
+    def get_status(self):
+        if self.finished or not self.is_available():
+            return CameraStatus.DEAD
+        return CameraStatus.STREAMING
+
+    def hand_detectors(self):
+        """Detectores (izquierdo, derecho) con la interfaz de HandDetector"""
+        return (WorkerHandDetector(self, 'left'),
+                WorkerHandDetector(self, 'right'))
+
+    def start(self):
+        if self.started:
+            return
+        for process in self.processes.values():
+            process.start()
+        self.started = True
+
+    def pause(self):
+        """Los workers no se pausan: se detienen (ver StereoVideoThread.pause)"""
+        self.stop()
+
+    def stop(self):
+        if self.rings['left'].info is None:
+            return
+        self.stop_event.set()
+        for ring in self.rings.values():
+            ring.close()
+        for process in self.processes.values():
+            if process.is_alive():
+                process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for ring in self.rings.values():
+            ring.release_memory()
+        self.borrowed = None
+        self.borrowed_frames = None
+
+    def _release_borrowed(self):
+        if self.borrowed is not None:
+            for side, seq in self.borrowed.items():
+                self.rings[side].release(seq)
+        self.borrowed = None
+        self.borrowed_frames = None
+
+    def get_display_pair(self):
+        if self.borrowed_frames is None:
+            return self.black_frame, self.black_frame
+        return self.borrowed_frames
+
+    def get_hand_landmarks(self, side):
+        """
+        Landmarks (n, 21, 3) en píxeles y lateralidad (n, 2) del frame de
+        `side` entregado por el último next_new() (copias).
+        """
+        if self.borrowed is None:
+            return (np.zeros((0, N_LANDMARKS, 3), np.float32),
+                    np.zeros((0, 2), np.float32))
+        ring = self.rings[side]
+        slot = ring.slot_of(self.borrowed[side])
+        n_hands = int(ring.n_hands[slot])
+        return (ring.landmarks[slot, :n_hands].copy(),
+                ring.handedness[slot, :n_hands].copy())
+
+    def next(self, black=True, wait=0):
+        return self.next_new(self.last_seq, timeout=wait, black=black)
+
+    def next_new(self, after_seq=-1, timeout=None, black=True):
+        """
+        Retorna (finished, (left, right, t_left, t_right, seq)) con el
+        próximo par; seq es la secuencia del frame izquierdo.
+        """
+        self._release_borrowed()
+
+        if black:
+            pair = (self.black_frame, self.black_frame, None, None, -1)
+        else:
+            pair = (None, None, None, None, -1)
+        if self.finished:
+            return self.finished, pair
+
+        left_ring, right_ring = self.rings['left'], self.rings['right']
+        deadline = None if timeout is None else time.perf_counter() + timeout
+
+        def remaining():
+            if deadline is None:
+                return None
+            return max(0.0, deadline - time.perf_counter())
+
+        # izquierdo nuevo (sin pérdida con buffer_all, el último si no)
+        if not left_ring.wait_new(after_seq, remaining()):
+            if left_ring.closed and not left_ring.has_pending(after_seq):
+                self.finished = True
+            return self.finished, pair
+
+        # derecho: el siguiente (buffer_all) o el más reciente
+        right_after = self.last_right_seq if self.buffer_all else -1
+        if not right_ring.wait_new(right_after, remaining()):
+            if right_ring.closed and not right_ring.has_pending(right_after):
+                self.finished = True
+            return self.finished, pair
+
+        seq, (frame_left,), (t_left,) = left_ring.borrow(after_seq)
+        right_seq, (frame_right,), (t_right,) = right_ring.borrow(right_after)
+        self.borrowed = {'left': seq, 'right': right_seq}
+        self.borrowed_frames = (frame_left, frame_right)
+        self.last_seq = seq
+        self.last_right_seq = right_seq
+
+        skew = abs(t_right - t_left)
+        self.current_skew = skew
+        self.mean_skew = skew if self.frames_returned == 0 else \
+            0.9 * self.mean_skew + 0.1 * skew
+        self.frames_returned += 1
+        self.frame_count = max(self.frame_count, seq + 1)
+
+        return self.finished, (frame_left, frame_right, t_left, t_right, seq)
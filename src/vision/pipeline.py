@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline por etapas con colas acotadas (gana el más reciente)
+
+Cada etapa corre en su propio hilo y se conecta con la siguiente por una
+LatestQueue: put() nunca bloquea y, si la etapa siguiente se atrasa, el
+paquete más viejo se descarta. Así la detección del par N+1 se solapa
+con la fusión, el teclado/audio y el render del par N, y la latencia no
+crece con una cola de frames viejos.
+
+La primera etapa es la fuente (process(None) produce un paquete nuevo).
+La salida de la última se lee con get() desde el hilo principal, donde
+debe quedarse el render (HighGUI). Los consumidores (p. ej. los modos de
+juego) se suscriben a la salida de una etapa con subscribe(); el callback
+corre en el hilo de esa etapa.
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+
+
+# una etapa lo retorna para terminar: su cola de salida se cierra y las
+# siguientes terminan al vaciar la suya (sin descartar paquetes)
+END_OF_STREAM = object()
+
+
+class LatestQueue:
+    """
+    Cola acotada entre dos etapas.
+
+    put() nunca bloquea al productor: si la cola está llena se descarta
+    el paquete más viejo (se cuenta en `dropped`).
+    """
+
+    def __init__(self, maxsize=1):
+        """
+        Args:
+            maxsize: Paquetes pendientes como máximo (1 = solo el último)
+        """
+        if maxsize < 1:
+            raise ValueError("La cola necesita al menos 1 lugar")
+        self.maxsize = maxsize
+        self.items = deque()
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def __len__(self):
+        with self.cond:
+            return len(self.items)
+
+    def put(self, item):
+        """
+        Encola un paquete.
+
+        Returns:
+            bool: True si se descartó un paquete viejo para hacerle lugar
+        """
+        with self.cond:
+            dropped = len(self.items) >= self.maxsize
+            if dropped:
+                self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+        return dropped
+
+    def get(self, timeout=None):
+        """
+        Retorna el paquete pendiente más viejo, o None si vence el timeout
+        o la cola se cerró vacía.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.items or self.closed, timeout)
+            if self.items:
+                return self.items.popleft()
+            return None
+
+    def close(self):
+        """Despierta a los consumidores; los paquetes pendientes se conservan"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class StageStats:
+    """Tiempos de una etapa: último y promedio móvil exponencial (ms)"""
+
+    def __init__(self, name, smoothing=0.1):
+        self.name = name
+        self.smoothing = smoothing
+        self.count = 0
+        self.last_ms = 0.0
+        self.mean_ms = 0.0
+        self.dropped = 0    # paquetes descartados a la entrada de la etapa
+
+    def add(self, elapsed_ms):
+        self.last_ms = elapsed_ms
+        if self.count == 0:
+            self.mean_ms = elapsed_ms
+        else:
+            self.mean_ms += self.smoothing * (elapsed_ms - self.mean_ms)
+        self.count += 1
+
+
+class FramePacket:
+    """
+    Datos de un par estéreo a medida que avanza por las etapas.
+
+    Cada etapa agrega sus resultados como atributos (p. ej. fingers_left,
+    finger_depths, on_map); `stage_ms` guarda lo que tardó cada una.
+    """
+
+    def __init__(self, seq, **fields):
+        self.seq = seq
+        self.created = time.perf_counter()
+        self.stage_ms = {}
+        self.__dict__.update(fields)
+
+
+class PipelineStage:
+    """
+    Etapa del pipeline.
+
+    Las subclases implementan process(packet) y retornan el paquete para
+    la etapa siguiente, None para descartarlo o END_OF_STREAM para
+    terminar. La fuente recibe packet=None. También se puede envolver una
+    función: PipelineStage('nombre', fn).
+    """
+
+    name = 'etapa'
+
+    def __init__(self, name=None, fn=None):
+        if name is not None:
+            self.name = name
+        self.fn = fn
+
+    def process(self, packet):
+        if self.fn is None:
+            raise NotImplementedError
+        return self.fn(packet)
+
+    def close(self):
+        """Libera recursos de la etapa al detener el pipeline"""
+        pass
+
+
+class Pipeline:
+    """
+    Etapas conectadas por LatestQueue, cada una en su propio hilo.
+
+    La cola i es la salida de la etapa i (y la entrada de la i+1); la
+    última la lee el hilo principal con get().
+    """
+
+    def __init__(self, stages, queue_size=1):
+        """
+        Args:
+            stages: Lista de PipelineStage; la primera es la fuente
+            queue_size: Paquetes pendientes entre etapas
+        """
+        names = [stage.name for stage in stages]
+        if not stages or len(set(names)) != len(names):
+            raise ValueError("El pipeline necesita etapas con nombres únicos")
+
+        self.stages = list(stages)
+        self.queues = [LatestQueue(queue_size) for _ in self.stages]
+        self.stats = {name: StageStats(name) for name in names}
+        self.latency = StageStats('latencia')  # de la fuente a get()
+        self.subscribers = {name: () for name in names}
+        self.subscribers_lock = threading.Lock()
+
+        self.threads = []
+        self._stop_event = threading.Event()
+        self.error = None
+        self.finished = False
+
+    def stage(self, name):
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def subscribe(self, stage_name, callback):
+        """Llama a callback(packet) con cada salida de la etapa (en su hilo)"""
+        with self.subscribers_lock:
+            # copia al escribir: el hilo de la etapa itera sin bloquear
+            self.subscribers[stage_name] = \
+                self.subscribers[stage_name] + (callback,)
+
+    def unsubscribe(self, stage_name, callback):
+        with self.subscribers_lock:
+            self.subscribers[stage_name] = tuple(
+                cb for cb in self.subscribers[stage_name] if cb != callback)
+
+    def start(self):
+        self._stop_event.clear()
+        self.finished = False
+        self.threads = [
+            threading.Thread(target=self._run_stage, args=(index,),
+                             name=f'pipeline-{stage.name}', daemon=True)
+            for index, stage in enumerate(self.stages)]
+        for thread in self.threads:
+            thread.start()
+
+    def _run_stage(self, index):
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        inbox = self.queues[index - 1] if index > 0 else None
+        outbox = self.queues[index]
+        try:
+            while not self._stop_event.is_set():
+                packet = None
+                if inbox is not None:
+                    packet = inbox.get(timeout=0.1)
+                    stats.dropped = inbox.dropped
+                    if packet is None:
+                        if inbox.closed:
+                            break
+                        continue
+
+                start = time.perf_counter()
+                result = stage.process(packet)
+                elapsed_ms = (time.perf_counter() - start) * 1000.0
+                stats.add(elapsed_ms)
+
+                if result is None:
+                    continue
+                if result is END_OF_STREAM:
+                    break
+                result.stage_ms[stage.name] = elapsed_ms
+                for callback in self.subscribers[stage.name]:
+                    callback(result)
+                outbox.put(result)
+        except Exception as e:
+            print(f"⚠ Error en la etapa '{stage.name}':")
+            print(traceback.format_exc())
+            self.error = e
+        finally:
+            outbox.close()
+
+    def get(self, timeout=None):
+        """
+        Retorna el último paquete de la etapa final, o None si vence el
+        timeout o el pipeline terminó (ver `finished`). Si una etapa falló,
+        relanza su excepción en el hilo que llama.
+        """
+        if self.error is not None:
+            raise self.error
+        output = self.queues[-1]
+        packet = output.get(timeout)
+        if packet is None and output.closed:
+            self.finished = True
+            if self.error is not None:
+                raise self.error
+            return None
+        if packet is not None:
+            self.latency.add((time.perf_counter() - packet.created) * 1000.0)
+        return packet
+
+    def get_stage_times_ms(self):
+        """Promedio de cada etapa (ms), en orden"""
+        return {stage.name: self.stats[stage.name].mean_ms
+                for stage in self.stages}
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        for queue in self.queues:
+            queue.close()
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        self.threads = []
+        for stage in self.stages:
+            stage.close()
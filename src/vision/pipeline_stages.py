@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Etapas del pipeline del piano virtual
+
+    captura -> deteccion -> fusion -> teclado -> (hilo principal: render)
+
+- CaptureStage: espera el próximo par nuevo, lo graba y lo voltea.
+- HandDetectionStage: MediaPipe sobre la copia de inferencia de cada lado.
+- StereoFusionStage: triangula las yemas (calibración estéreo o ángulos).
+- KeyboardStage: mapa de teclas presionadas/soltadas (on_map/off_map);
+  los modos de juego se suscriben a su salida para producir audio.
+
+Cada etapa solo lee su paquete y su propio estado, así pueden correr en
+hilos distintos sobre pares distintos.
+
+Cada paquete lleva los StageRequirements del modo activo al momento de la
+captura: las etapas saltan el trabajo que ese modo no consume (un menú o
+una pantalla superpuesta solo cuesta captura y composición).
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from .finger_filter import FingerFilterBank
+from .hand_landmarks import (HandLandmarks, FINGER_TIP_IDS, flip_box,
+                             flip_points)
+from .pipeline import PipelineStage, FramePacket, END_OF_STREAM
+
+
+class StageRequirements:
+    """
+    Trabajo de visión y render que consume un modo.
+
+    Las dependencias se completan solas: las teclas necesitan profundidad
+    y la profundidad necesita detección.
+    """
+
+    def __init__(self,
+                 needs_detection=True,
+                 needs_depth=True,
+                 needs_keys=True,
+                 needs_keyboard_render=True,
+                 needs_hands_render=True,
+                 needs_right_render=True):
+        """
+        Args:
+            needs_detection: Detectar manos (cámara izquierda)
+            needs_depth: Triangular las yemas (requiere la cámara derecha)
+            needs_keys: Calcular teclas presionadas (audio de los modos)
+            needs_keyboard_render: Dibujar el teclado virtual
+            needs_hands_render: Dibujar manos, yemas y cruces
+            needs_right_render: Dibujar sobre el frame derecho
+        """
+        self.needs_keys = needs_keys
+        self.needs_depth = needs_depth or needs_keys
+        self.needs_detection = needs_detection or self.needs_depth
+        self.needs_keyboard_render = needs_keyboard_render
+        self.needs_hands_render = needs_hands_render
+        self.needs_right_render = needs_right_render
+
+    @property
+    def needs_right_detection(self):
+        return self.needs_depth or (self.needs_detection and
+                                    self.needs_hands_render and
+                                    self.needs_right_render)
+
+    def __repr__(self):
+        flags = [name for name, value in vars(self).items() if value]
+        return 'StageRequirements({})'.format(', '.join(flags))
+
+
+# todo el trabajo (modos de juego) / solo captura y composición (menús)
+FULL_REQUIREMENTS = StageRequirements()
+COMPOSITION_REQUIREMENTS = StageRequirements(needs_detection=False,
+                                             needs_depth=False,
+                                             needs_keys=False,
+                                             needs_keyboard_render=False,
+                                             needs_hands_render=False,
+                                             needs_right_render=False)
+
+
+class CaptureStage(PipelineStage):
+    """
+    Fuente: próximo par del StereoVideoThread (o replay / multi-proceso).
+
+    Entrega frames propios (no vistas del ring buffer): display, la
+    ventana completa con ambas cámaras volteadas una sola vez directo en su
+    mitad, con frame_left/right como vistas de cada mitad para dibujar, e
+    infer_left/right para inferencia.
+
+    Orientación (punto de vista selfie = cv2.flip(img, -1)):
+    - 'pixels': la inferencia usa el frame volteado para mostrar (o la
+      copia reducida volteada en modo MJPEG crudo).
+    - 'coordinates': la inferencia usa el frame de la cámara convertido a
+      RGB en un solo paso (sin flip; los detectores con setInputRGB(True))
+      y HandDetectionStage voltea solo los landmarks (flip_landmarks).
+    - 'source': la cámara ya entrega el punto de vista volteado; nada se
+      voltea.
+
+    packet.display_flipped indica que los landmarks quedan en el punto de
+    vista volteado ('pixels' y 'coordinates'): la geometría estéreo
+    (calibrada sobre los frames de la cámara) los vuelve a voltear.
+    """
+
+    name = 'captura'
+
+    ORIENTATIONS = ('pixels', 'coordinates', 'source')
+
+    def __init__(self, stereo_cam, frame_wait_time=0.1, recorder=None,
+                 stop_at_end=False, orientation='pixels',
+                 swap_display=False):
+        """
+        Args:
+            stereo_cam: Par estéreo ya iniciado
+            frame_wait_time: Espera máxima de un par nuevo (segundos)
+            recorder: StereoSessionRecorder opcional (graba el par crudo)
+            stop_at_end: True = terminar el pipeline cuando la fuente se
+                agota (sesiones reproducidas)
+            orientation: 'pixels', 'coordinates' o 'source' (ver arriba)
+            swap_display: True = cámara derecha en la mitad izquierda de
+                display (CAMERA_IN_FRONT_OF_YOU)
+        """
+        if orientation not in self.ORIENTATIONS:
+            raise ValueError(f"orientation inválida: {orientation}")
+        super().__init__()
+        self.stereo_cam = stereo_cam
+        self.orientation = orientation
+        self.swap_display = swap_display
+        self.frame_wait_time = frame_wait_time
+        self.recorder = recorder
+        self.stop_at_end = stop_at_end
+        self.last_seq = -1
+        # requisitos del modo activo (los actualiza el hilo principal)
+        self.requirements = FULL_REQUIREMENTS
+        # landmarks calculados en los workers (MultiProcessStereoCapture)
+        self.shared_landmarks = hasattr(stereo_cam, 'get_hand_landmarks')
+
+    def process(self, packet):
+        requirements = self.requirements
+        start = time.perf_counter()
+        finished, (frame_left, frame_right, t_left, t_right, frame_seq) = \
+            self.stereo_cam.next_new(self.last_seq,
+                                     timeout=self.frame_wait_time,
+                                     black=True)
+        # frames para inferencia (reducidos en modo MJPEG crudo) y
+        # frames para mostrar (completos, decodificados solo aquí)
+        infer_left, infer_right = frame_left, frame_right
+        frame_left, frame_right = self.stereo_cam.get_display_pair()
+
+        hand_landmarks = None
+        if frame_seq >= 0:
+            self.last_seq = frame_seq
+            # grabar el par crudo (antes del flip)
+            if self.recorder is not None:
+                self.recorder.write(frame_left, frame_right,
+                                    t_left, t_right, frame_seq)
+            if self.shared_landmarks and requirements.needs_detection:
+                # copiar ahora: el slot se libera con el próximo next_new
+                hand_landmarks = {
+                    side: self.stereo_cam.get_hand_landmarks(side)
+                    for side in ('left', 'right')}
+        elif finished and self.stop_at_end:
+            return END_OF_STREAM
+        else:
+            # sin par nuevo (cámara perdida): no girar en vacío, pero
+            # seguir entregando frames negros para mostrar el estado
+            remaining = self.frame_wait_time - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+        # Aplicar flip una sola vez al principio (Selfie point of view)
+        raw_shape = frame_left.shape
+        display, frame_left, frame_right = self._compose(frame_left,
+                                                         frame_right)
+        flip_landmarks = False
+        if not requirements.needs_detection:
+            infer_left = infer_right = None
+        elif self.orientation == 'coordinates' and not self.shared_landmarks:
+            # frame de la cámara -> RGB propio en un paso; los workers ya
+            # publican los landmarks volteados
+            infer_left = cv2.cvtColor(infer_left, cv2.COLOR_BGR2RGB)
+            infer_right = cv2.cvtColor(infer_right, cv2.COLOR_BGR2RGB)
+            flip_landmarks = True
+        elif infer_left.shape != raw_shape:
+            if self.orientation == 'source':
+                infer_left, infer_right = infer_left.copy(), infer_right.copy()
+            else:
+                infer_left = cv2.flip(infer_left, -1)
+                infer_right = cv2.flip(infer_right, -1)
+        else:
+            infer_left, infer_right = frame_left, frame_right
+
+        return FramePacket(frame_seq, display=display, timestamp=t_left,
+                           frame_left=frame_left, frame_right=frame_right,
+                           infer_left=infer_left, infer_right=infer_right,
+                           flip_landmarks=flip_landmarks,
+                           display_flipped=self.orientation != 'source',
+                           hand_landmarks=hand_landmarks,
+                           requirements=requirements)
+
+    def _compose(self, frame_left, frame_right):
+        """
+        Voltea (o copia, con 'source') cada frame directo en su mitad de
+        la ventana: el mismo paso que deja de apuntar al ring buffer arma
+        la composición, sin np.concatenate en el render.
+
+        Returns:
+            tuple: (display, vista izquierda, vista derecha)
+        """
+        height, width = frame_left.shape[:2]
+        display = np.empty((height, 2 * width, 3), np.uint8)
+        first, second = display[:, :width], display[:, width:]
+        left, right = (second, first) if self.swap_display else \
+            (first, second)
+        for frame, half in ((frame_left, left), (frame_right, right)):
+            if self.orientation == 'source':
+                np.copyto(half, frame)
+            else:
+                cv2.flip(frame, -1, dst=half)
+        return display, left, right
+
+
+def compose_display(packet, frame_left, frame_right, swap=False):
+    """
+    Ventana con ambas cámaras para el render.
+
+    Si frame_left/right siguen siendo las mitades de packet.display (se
+    dibujó sobre ellas en el lugar) la retorna sin copiar; si el modo
+    reemplazó alguno, concatena como antes.
+
+    Args:
+        packet: FramePacket de CaptureStage
+        frame_left, frame_right: Frames ya dibujados
+        swap: Cámara derecha a la izquierda (mismo valor que
+            CaptureStage.swap_display)
+    """
+    if frame_left is packet.frame_left and frame_right is packet.frame_right:
+        return packet.display
+    pair = (frame_right, frame_left) if swap else (frame_left, frame_right)
+    return np.concatenate(pair, axis=1)
+
+
+def _display_size(packet):
+    """(ancho, alto) del frame de cada cámara"""
+    height, width = packet.frame_left.shape[:2]
+    return width, height
+
+
+def _landmarks_flipped(packet):
+    """True si los landmarks del paquete están en el punto de vista volteado"""
+    return getattr(packet, 'display_flipped', False) or \
+        getattr(packet, 'flip_landmarks', False)
+
+
+class HandDetectionStage(PipelineStage):
+    """
+    Detección de manos en ambos lados.
+
+    Agrega hands_left/right (HandLandmarks: landmarks en píxeles,
+    lateralidad y yemas como arreglos), hand_pairs ((k, 2) índices de mano
+    izquierda y derecha a triangular) y hand_results_left/right (resultado
+    del detector, None si no hubo manos o el modo no necesita ese lado).
+    El render dibuja hands_left/right con HandOverlay.
+
+    Con packet.flip_landmarks (FRAME_ORIENTATION = 'coordinates') los
+    detectores trabajan sobre el frame de la cámara y los landmarks se
+    voltean al punto de vista volteado. La banda estéreo y el
+    emparejamiento siempre usan el frame de la cámara (la calibración).
+
+    Sin banda estéreo las manos se emparejan en el orden de detección.
+    Con un DepthEstimator la cámara derecha solo busca en la región donde
+    pueden estar las manos de la izquierda según la geometría epipolar y el
+    rango de profundidad de trabajo; cada mano derecha se empareja con la
+    izquierda cuyas yemas quedan sobre sus segmentos epipolares y las que
+    no cumplen la geometría se descartan.
+    """
+
+    name = 'deteccion'
+
+    def __init__(self, left_detector, right_detector, depth_estimator=None,
+                 depth_range_cm=(20, 90), band_margin=30,
+                 epipolar_tolerance=25):
+        """
+        Args:
+            left_detector, right_detector: HandDetector (o WorkerHandDetector)
+            depth_estimator: DepthEstimator para la banda estéreo, o None
+            depth_range_cm: (mínima, máxima) profundidad de las manos (cm)
+            band_margin: Margen alrededor de la banda derecha (píxeles)
+            epipolar_tolerance: Distancia máxima de las yemas derechas a
+                sus segmentos epipolares (píxeles, mediana por mano)
+        """
+        super().__init__()
+        self.detectors = {'left': left_detector, 'right': right_detector}
+        self.depth_estimator = depth_estimator
+        self.depth_range_cm = depth_range_cm
+        self.band_margin = band_margin
+        self.epipolar_tolerance = epipolar_tolerance
+        self.rejected_hands = 0   # manos derechas fuera de la geometría
+
+    def process(self, packet):
+        requirements = packet.requirements
+        needed = {'left': requirements.needs_detection,
+                  'right': requirements.needs_right_detection}
+        for side, detector in self.detectors.items():
+            hands = HandLandmarks(1)
+            results = None
+            if needed[side] and self._search(side, packet):
+                # copia: el detector reutiliza sus arreglos en el próximo par
+                hands = detector.getLandmarks().copy()
+                results = detector.getResults()
+                if getattr(packet, 'flip_landmarks', False):
+                    # inferencia sobre el frame de la cámara
+                    hands.flip(*_display_size(packet))
+            setattr(packet, 'hands_' + side, hands)
+            setattr(packet, 'hand_results_' + side, results)
+
+        n_pairs = min(len(packet.hands_left), len(packet.hands_right))
+        if self.depth_estimator is not None and n_pairs > 0:
+            packet.hand_pairs = self._match_hands(packet.hands_left,
+                                                  packet.hands_right, packet)
+        else:
+            packet.hand_pairs = np.repeat(np.arange(n_pairs), 2).reshape(-1, 2)
+        return packet
+
+    def _search(self, side, packet):
+        """Corre el detector de un lado; retorna True si encontró manos"""
+        detector = self.detectors[side]
+        if packet.hand_landmarks is not None:
+            return detector.findHands(getattr(packet, 'infer_' + side),
+                                      packet.hand_landmarks[side])
+
+        if side == 'right' and self.depth_estimator is not None:
+            # sin manos a la izquierda no hay nada que triangular
+            if len(packet.hands_left) == 0:
+                return False
+            boxes = packet.hands_left.boxes()
+            corners = np.concatenate([boxes[:, [0, 1]], boxes[:, [2, 1]],
+                                      boxes[:, [0, 3]], boxes[:, [2, 3]]])
+            # la geometría epipolar es del frame de la cámara sin voltear
+            flipped = _landmarks_flipped(packet)
+            if flipped:
+                corners = flip_points(corners, *_display_size(packet))
+            band = self.depth_estimator.right_search_band(
+                corners, self.depth_range_cm, self.band_margin)
+            # la inferencia corre sobre el frame volteado salvo con
+            # flip_landmarks ('coordinates')
+            if band is not None and flipped and \
+                    not getattr(packet, 'flip_landmarks', False):
+                band = flip_box(band, *_display_size(packet))
+            detector.setSearchBand(band)
+        return detector.findHands(getattr(packet, 'infer_' + side))
+
+    def _match_hands(self, hands_left, hands_right, packet=None):
+        """
+        Empareja las manos derechas con las izquierdas por la distancia
+        epipolar (mediana) de sus yemas, en el frame de la cámara.
+
+        Returns:
+            np.ndarray: (k, 2) pares (mano izquierda, mano derecha) en el
+            orden de las manos izquierdas; sin las no emparejadas
+        """
+        n_left, n_right = len(hands_left), len(hands_right)
+        n_tips = len(FINGER_TIP_IDS)
+        # todas las combinaciones (izquierda, derecha) en una llamada
+        left_ids, right_ids = np.divmod(np.arange(n_left * n_right), n_right)
+        points_left = hands_left.tips[left_ids, :, :2].reshape(-1, 2)
+        points_right = hands_right.tips[right_ids, :, :2].reshape(-1, 2)
+        if packet is not None and _landmarks_flipped(packet):
+            size = _display_size(packet)
+            points_left = flip_points(points_left, *size)
+            points_right = flip_points(points_right, *size)
+        distances = self.depth_estimator.epipolar_distance(
+            points_left, points_right, self.depth_range_cm)
+        errors = np.median(distances.reshape(-1, n_tips), axis=1)
+
+        # asignación golosa: primero los pares de menor error
+        matched = {}
+        for pair in np.argsort(errors, kind='stable'):
+            if errors[pair] > self.epipolar_tolerance:
+                break
+            l_hand, r_hand = int(left_ids[pair]), int(right_ids[pair])
+            if l_hand not in matched and r_hand not in matched.values():
+                matched[l_hand] = r_hand
+        self.rejected_hands += n_right - len(matched)
+        return np.array(sorted(matched.items()), np.int64).reshape(-1, 2)
+
+
+class StereoFusionStage(PipelineStage):
+    """
+    Profundidad de cada yema presente en ambas cámaras.
+
+    Con DepthEstimator triangula con la calibración estéreo (la corrección
+    de profundidad la aplica el estimador) sobre las yemas en coordenadas
+    de la cámara (con packet.display_flipped se deshace el flip del punto
+    de vista, como en la calibración) y suaviza todas las yemas con un
+    FingerFilterBank; la profundidad de presión es la distancia con signo
+    al plano del teclado (KeyboardPlane) o, sin plano, Z. Sin calibración
+    usa la triangulación por ángulos. Agrega finger_depths ({(hand_id,
+    tip_id): profundidad}, hand_id de la mano izquierda), target (X, Y, Z,
+    D, delta_y) y target_screen_pos del índice de la primera mano; los tres
+    conservan el último valor cuando no hay dedos en ambas cámaras.
+    """
+
+    name = 'fusion'
+
+    def __init__(self, depth_estimator, angler, camera_separation,
+                 index_tip_id=8, finger_filter=None, keyboard_plane=None):
+        """
+        Args:
+            depth_estimator: DepthEstimator cargado, o None (ángulos)
+            angler: Frame_Angles para la triangulación por ángulos
+            camera_separation: Separación entre cámaras (cm)
+            index_tip_id: Landmark del índice (HandLandmark.INDEX_FINGER_TIP)
+            finger_filter: FingerFilterBank de las posiciones 3D (None =
+                One Euro con los valores por defecto)
+            keyboard_plane: KeyboardPlane para la profundidad de presión
+                (None = el de la calibración, si existe)
+        """
+        super().__init__()
+        self.depth_estimator = depth_estimator
+        self.angler = angler
+        self.camera_separation = camera_separation
+        self.index_tip_id = index_tip_id
+
+        self.finger_filter = (finger_filter if finger_filter is not None
+                              else FingerFilterBank())
+        if keyboard_plane is None:
+            keyboard_plane = getattr(depth_estimator, 'keyboard_plane', None)
+        self.keyboard_plane = keyboard_plane
+        self.finger_depths = {}
+        self.target = (0, 0, 0, 0, 0)
+        self.target_screen_pos = (0, 0)
+
+    def process(self, packet):
+        pairs = packet.hand_pairs
+        packet.both_sides = packet.requirements.needs_depth and len(pairs) > 0
+
+        # check 1: motion in both frames:
+        if packet.both_sides:
+            X, Y, Z, D, delta_y = self.target
+            finger_depths = {}  # Dict para pasar profundidades a KeyboardMap
+
+            # yemas de las manos emparejadas, (5 * k, 2) por cámara; con
+            # calibración se rectifican solo estos puntos y se triangulan
+            # todos en una llamada (triangulate_many)
+            points_left = packet.hands_left.tips[pairs[:, 0], :, :2]\
+                .reshape(-1, 2)
+            points_right = packet.hands_right.tips[pairs[:, 1], :, :2]\
+                .reshape(-1, 2)
+            finger_ids = list(zip(
+                np.repeat(pairs[:, 0], len(FINGER_TIP_IDS)).tolist(),
+                FINGER_TIP_IDS * len(pairs)))
+            if self.depth_estimator is not None:
+                points_3d, valid = self._triangulate_stereo(
+                    finger_ids, points_left, points_right, packet)
+                # profundidad de presión de todas las yemas: distancia al
+                # plano del teclado (un producto matriz-vector) o Z
+                if self.keyboard_plane is not None:
+                    press_depths = self.keyboard_plane.signed_distance(
+                        points_3d)
+                else:
+                    press_depths = points_3d[:, 2].copy()
+                press_depths[~valid] = 0.0
+
+            for i, finger_id in enumerate(finger_ids):
+                if self.depth_estimator is not None:
+                    # fallback (0, ...) si falla la triangulación
+                    X_local, Y_local, Z_local = points_3d[i]
+                    D_local = Z_local  # Profundidad = coordenada Z
+                    depth_corrected = press_depths[i]
+                else:
+                    X_local, Y_local, Z_local, D_local, delta_y = \
+                        self._triangulate_angles(points_left[i],
+                                                 points_right[i])
+                    depth_corrected = D_local - delta_y
+
+                # Guardar profundidad corregida para cada dedo
+                finger_depths[finger_id] = depth_corrected
+
+                if finger_id == (0, self.index_tip_id):
+                    self.target_screen_pos = (float(points_left[i, 0]),
+                                              float(points_left[i, 1]))
+                    X, Y, Z, D = X_local, Y_local, Z_local, D_local
+
+            self.finger_depths = finger_depths
+            self.target = (X, Y, Z, D, delta_y)
+
+        packet.finger_depths = self.finger_depths
+        packet.target = self.target
+        packet.target_screen_pos = self.target_screen_pos
+        return packet
+
+    def _triangulate_stereo(self, finger_ids, points_left, points_right,
+                            packet):
+        """
+        Triangula todas las yemas con la calibración y las filtra en un
+        paso.
+
+        Returns:
+            (points (N, 3), valid (N,)): posiciones suavizadas en cm; las
+            que fallaron quedan en 0
+        """
+        if _landmarks_flipped(packet):
+            # la calibración (distorsión, rectificación, corrección de
+            # profundidad y plano) es del frame de la cámara sin voltear
+            size = _display_size(packet)
+            points_left = flip_points(points_left, *size)
+            points_right = flip_points(points_right, *size)
+        try:
+            points_3d, valid = self.depth_estimator.triangulate_many(
+                points_left, points_right)
+        except Exception as e:
+            print(f"⚠ Error en triangulación estéreo: {e}")
+            return np.zeros((len(finger_ids), 3)), np.zeros(len(finger_ids),
+                                                             bool)
+
+        # SUAVIZADO TEMPORAL para reducir jitter (solo las válidas)
+        timestamp = getattr(packet, 'timestamp', None)
+        if timestamp is None:
+            timestamp = packet.created
+        if valid.any():
+            points_3d[valid] = self.finger_filter.update(
+                [key for key, ok in zip(finger_ids, valid) if ok],
+                points_3d[valid], timestamp)
+        return points_3d, valid
+
+    def _triangulate_angles(self, point_left, point_right):
+        """Retorna (X, Y, Z, D, delta_y) con la triangulación por ángulos"""
+        # get angles from camera centers
+        xlangle, ylangle = self.angler.angles_from_center(
+            x=point_left[0], y=point_left[1],
+            top_left=True, degrees=True)
+        xrangle, yrangle = self.angler.angles_from_center(
+            x=point_right[0], y=point_right[1],
+            top_left=True, degrees=True)
+
+        # triangulate
+        X_local, Y_local, Z_local, D_local = self.angler.location(
+            self.camera_separation,
+            (xlangle, ylangle),
+            (xrangle, yrangle),
+            center=True,
+            degrees=True)
+        # angle normalization
+        delta_y = 0.006509695290859 * X_local * X_local + \
+            0.039473684210526 * -1 * X_local
+        return X_local, Y_local, Z_local, D_local, delta_y
+
+
+class KeyboardStage(PipelineStage):
+    """
+    Teclas presionadas y soltadas a partir de las yemas y su profundidad.
+
+    Agrega on_map/off_map (arreglos por tecla), o None cuando no hay dedos
+    en ambas cámaras o el modo no toca. Los modos de juego se suscriben a
+    esta etapa.
+    """
+
+    name = 'teclado'
+
+    def __init__(self, keyboard_map, virtual_keyboard, n_keys):
+        super().__init__()
+        self.keyboard_map = keyboard_map
+        self.virtual_keyboard = virtual_keyboard
+        self.n_keys = n_keys
+
+    def process(self, packet):
+        packet.on_map = packet.off_map = None
+        if packet.both_sides and packet.requirements.needs_keys:
+            packet.on_map, packet.off_map = self.keyboard_map.get_kayboard_map(
+                virtual_keyboard=self.virtual_keyboard,
+                fingertips_pos=packet.hands_left,
+                finger_depths=packet.finger_depths,  # Pasar profundidades 3D
+                keyboard_n_key=self.n_keys)
+        return packet
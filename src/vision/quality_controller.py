@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Control adaptativo de la calidad de la detección de manos
+
+QualityController mira los ciclos por segundo (CPS) y el tiempo medio de
+cada etapa del pipeline. Si el ciclo queda por debajo del FPS objetivo y
+la detección es el cuello de botella, baja un nivel de calidad; si hay
+margen (la etapa más lenta usa poco del presupuesto por frame), sube uno.
+
+Cada nivel de QUALITY_LEVELS cambia una perilla respecto del anterior:
+modelo de landmarks, escala de la imagen de inferencia, máximo de manos
+(hasta las vistas recientemente) e intervalo entre inferencias
+(HandTracker). Entre cambios se espera `cooldown_s` para que los
+promedios de las etapas reflejen el nivel nuevo.
+
+Cada decisión se imprime y queda en `decisions` con su motivo.
+"""
+
+import time
+from collections import deque
+
+
+# 'seen' = las manos vistas en la ventana reciente (mínimo 1)
+QUALITY_LEVELS = (
+    {'model_complexity': 1, 'inference_scale': 1.0, 'max_hands': None,
+     'detection_interval': 1},
+    {'model_complexity': 0, 'inference_scale': 1.0, 'max_hands': None,
+     'detection_interval': 1},
+    {'model_complexity': 0, 'inference_scale': 0.75, 'max_hands': None,
+     'detection_interval': 1},
+    {'model_complexity': 0, 'inference_scale': 0.75, 'max_hands': 'seen',
+     'detection_interval': 1},
+    {'model_complexity': 0, 'inference_scale': 0.75, 'max_hands': 'seen',
+     'detection_interval': 2},
+    {'model_complexity': 0, 'inference_scale': 0.5, 'max_hands': 'seen',
+     'detection_interval': 2},
+    {'model_complexity': 0, 'inference_scale': 0.5, 'max_hands': 'seen',
+     'detection_interval': 3},
+)
+
+
+class QualityController:
+    """Sube o baja la calidad de los detectores según el ritmo del ciclo"""
+
+    def __init__(self, detectors, target_fps=30, max_hands=2,
+                 detection_stage='deteccion', levels=QUALITY_LEVELS,
+                 down_margin=0.1, up_budget=0.6, cooldown_s=3.0,
+                 hands_window=90, max_inference_scale=1.0, verbose=True):
+        """
+        Args:
+            detectors: Detectores a controlar (HandDetector o HandTracker;
+                las perillas que un detector no soporta se ignoran)
+            target_fps: Ciclos por segundo objetivo
+            max_hands: Máximo de manos de los niveles sin restricción
+            detection_stage: Nombre de la etapa de detección del pipeline
+            levels: Niveles de calidad, del mejor al más barato
+            down_margin: Bajar si CPS < target_fps * (1 - down_margin)
+            up_budget: Subir si la etapa más lenta usa menos de esta
+                fracción del presupuesto por frame (1000 / target_fps ms)
+            cooldown_s: Espera mínima entre cambios (segundos)
+            hands_window: Frames considerados para las manos vistas
+            max_inference_scale: Tope de la escala de inferencia de los
+                niveles (StereoConfig.INFERENCE_SCALE)
+            verbose: Imprimir cada decisión
+        """
+        self.detectors = list(detectors)
+        self.target_fps = target_fps
+        self.max_hands = max_hands
+        self.detection_stage = detection_stage
+        self.levels = levels
+        self.down_margin = down_margin
+        self.up_budget = up_budget
+        self.cooldown_s = cooldown_s
+        self.max_inference_scale = max_inference_scale
+        self.verbose = verbose
+
+        self.level = 0
+        self.hands_seen = deque(maxlen=hands_window)
+        self.seen_max_hands = max_hands   # congelado al restringir las manos
+        self.last_change = None
+        self.decisions = []
+
+    @property
+    def budget_ms(self):
+        return 1000.0 / self.target_fps
+
+    def settings(self, level=None):
+        """Perillas de un nivel con las manos resueltas"""
+        settings = dict(self.levels[self.level if level is None else level])
+        if settings['max_hands'] is None:
+            settings['max_hands'] = self.max_hands
+        elif settings['max_hands'] == 'seen':
+            settings['max_hands'] = self.seen_max_hands
+        settings['inference_scale'] = min(settings['inference_scale'],
+                                          self.max_inference_scale)
+        return settings
+
+    def observe_hands(self, n_hands):
+        """Manos detectadas en el frame (una cámara, la que más vea)"""
+        self.hands_seen.append(n_hands)
+
+    def update(self, cps, stage_ms, now=None):
+        """
+        Evalúa el último ritmo medido y cambia de nivel si corresponde.
+
+        Args:
+            cps: Ciclos por segundo medidos
+            stage_ms: Tiempo medio por etapa (Pipeline.get_stage_times_ms)
+            now: Tiempo actual (segundos); None = time.monotonic()
+
+        Returns:
+            dict: Decisión tomada (ver `decisions`) o None si no hubo cambio
+        """
+        now = time.monotonic() if now is None else now
+        if self.last_change is None:
+            # primer llamado: aplicar el nivel inicial y esperar promedios
+            self._apply()
+            self.last_change = now
+            return None
+        if now - self.last_change < self.cooldown_s or not stage_ms:
+            return None
+
+        detection_ms = stage_ms.get(self.detection_stage, 0.0)
+        slowest, slowest_ms = max(stage_ms.items(), key=lambda item: item[1])
+        if cps < self.target_fps * (1.0 - self.down_margin):
+            if self.level + 1 >= len(self.levels):
+                return None
+            # bajar la calidad solo sirve si la detección limita el ciclo
+            if slowest != self.detection_stage and \
+                    detection_ms <= self.budget_ms:
+                return None
+            reason = ('CPS {:.1f} < {:.0f}, {} {:.1f}ms (presupuesto '
+                      '{:.1f}ms)').format(cps, self.target_fps,
+                                          self.detection_stage, detection_ms,
+                                          self.budget_ms)
+            return self._change(self.level + 1, reason, now)
+        if self.level > 0 and slowest_ms < self.up_budget * self.budget_ms:
+            reason = ('margen: {} {:.1f}ms < {:.0%} de {:.1f}ms, '
+                      'CPS {:.1f}').format(slowest, slowest_ms,
+                                           self.up_budget, self.budget_ms, cps)
+            return self._change(self.level - 1, reason, now)
+        return None
+
+    def _change(self, level, reason, now):
+        previous = self.settings()
+        if self.levels[level]['max_hands'] == 'seen' and \
+                self.levels[self.level]['max_hands'] != 'seen':
+            # al restringir, las manos vistas con la capacidad completa
+            self.seen_max_hands = max(max(self.hands_seen, default=0), 1)
+        decision = {'time': now, 'from_level': self.level, 'to_level': level,
+                    'reason': reason, 'previous': previous}
+        self.level = level
+        self.last_change = now
+        decision['settings'] = self._apply()
+        self.decisions.append(decision)
+        if self.verbose:
+            changed = {key: value for key, value in decision['settings'].items()
+                       if previous.get(key) != value}
+            print('⚙ calidad {} -> {}: {} | {}'.format(
+                decision['from_level'], level, reason,
+                ', '.join(f'{key}={value}' for key, value in changed.items())))
+        return decision
+
+    def _apply(self):
+        settings = self.settings()
+        for detector in self.detectors:
+            if hasattr(detector, 'detection_interval'):
+                detector.detection_interval = settings['detection_interval']
+            if hasattr(detector, 'configure'):
+                detector.configure(
+                    model_complexity=settings['model_complexity'],
+                    max_hands=settings['max_hands'],
+                    inference_scale=settings['inference_scale'])
+        return settings
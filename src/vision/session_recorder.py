@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grabación y reproducción de sesiones estéreo
+
+Permite capturar una sesión real una sola vez y reproducirla después
+(ajuste de parámetros, benchmarks, máquinas sin cámaras).
+
+Formato en disco (una carpeta por sesión):
+    session.json    metadatos (resolución, FPS, número de pares)
+    index.csv       frame, seq, t_left, t_right
+    left/000000.jpg frames de la cámara izquierda
+    right/000000.jpg frames de la cámara derecha
+
+Las fuentes de reproducción implementan la misma interfaz que
+VideoThread (ReplayVideoThread, un lado) y StereoVideoThread
+(StereoSessionReplay, el par), de modo que main.py, DepthCalibrator y los
+tests las aceptan en lugar de las cámaras.
+"""
+
+import csv
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.vision.frame_ring_buffer import FrameRingBuffer
+from src.vision.video_thread import CameraStatus
+
+
+SESSION_FILE = 'session.json'
+INDEX_FILE = 'index.csv'
+SIDES = ('left', 'right')
+
+
+# ------------------------------
+# Grabación
+# ------------------------------
+
+
+class StereoSessionRecorder:
+    """
+    Graba pares estéreo sincronizados como JPEG + índice de timestamps.
+
+    La codificación JPEG se hace en un hilo aparte para no frenar el bucle
+    principal; si el disco no da abasto se descartan pares (y se cuentan).
+    """
+
+    def __init__(self, session_dir, video_frame_rate=30, jpeg_quality=90,
+                 max_pending=64):
+        """
+        Args:
+            session_dir: Carpeta destino (se crea si no existe)
+            video_frame_rate: FPS nominal de la captura (metadato)
+            jpeg_quality: Calidad JPEG (0-100)
+            max_pending: Pares en cola de escritura antes de descartar
+        """
+        self.session_dir = Path(session_dir)
+        self.video_frame_rate = video_frame_rate
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+
+        for side in SIDES:
+            (self.session_dir / side).mkdir(parents=True, exist_ok=True)
+
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frame_size = None
+
+        self.pending = queue.Queue(max_pending)
+        self.index_file = open(self.session_dir / INDEX_FILE, 'w', newline='')
+        self.index_writer = csv.writer(self.index_file)
+        self.index_writer.writerow(['frame', 'seq', 't_left', 't_right'])
+
+        self.writer_thread = threading.Thread(target=self._writer_loop,
+                                              daemon=True)
+        self.writer_thread.start()
+
+    def write(self, frame_left, frame_right, t_left, t_right, seq=-1):
+        """
+        Encola un par para grabar.
+
+        Los frames se copian: los que entrega el StereoVideoThread son
+        vistas del buffer circular y se reutilizan.
+
+        Returns:
+            bool: False si el par se descartó por cola llena
+        """
+        if self.frame_size is None:
+            self.frame_size = (frame_left.shape[1], frame_left.shape[0])
+        try:
+            self.pending.put_nowait((frame_left.copy(), frame_right.copy(),
+                                     t_left, t_right, seq))
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+    def close(self):
+        """Termina de escribir los pares pendientes y guarda los metadatos"""
+        self.pending.put(None)
+        self.writer_thread.join()
+        self.index_file.close()
+
+        width, height = self.frame_size if self.frame_size else (0, 0)
+        metadata = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'width': width,
+            'height': height,
+            'fps': self.video_frame_rate,
+            'num_frames': self.frames_written,
+            'dropped_frames': self.frames_dropped,
+            'format': 'jpeg',
+        }
+        with open(self.session_dir / SESSION_FILE, 'w') as f:
+            json.dump(metadata, f, indent=4)
+
+        print(f"✓ Sesión grabada en: {self.session_dir}")
+        print(f"  Pares: {self.frames_written} (descartados: {self.frames_dropped})")
+
+    def _writer_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            frame_left, frame_right, t_left, t_right, seq = item
+            name = f'{self.frames_written:06d}.jpg'
+            cv2.imwrite(str(self.session_dir / 'left' / name),
+                        frame_left, self.jpeg_params)
+            cv2.imwrite(str(self.session_dir / 'right' / name),
+                        frame_right, self.jpeg_params)
+            self.index_writer.writerow([self.frames_written, seq,
+                                        repr(float(t_left)),
+                                        repr(float(t_right))])
+            self.frames_written += 1
+
+
+# ------------------------------
+# Reproducción
+# ------------------------------
+
+
+def load_session_index(session_dir):
+    """
+    Lee metadatos e índice de una sesión grabada.
+
+    Returns:
+        tuple: (metadata dict, timestamps ndarray (N, 2) con t_left/t_right)
+    """
+    session_dir = Path(session_dir)
+    if not (session_dir / INDEX_FILE).exists():
+        raise FileNotFoundError(
+            f"❌ Sesión no encontrada (falta {INDEX_FILE}): {session_dir}")
+
+    metadata = {}
+    if (session_dir / SESSION_FILE).exists():
+        with open(session_dir / SESSION_FILE, 'r') as f:
+            metadata = json.load(f)
+
+    with open(session_dir / INDEX_FILE, 'r', newline='') as f:
+        rows = list(csv.DictReader(f))
+    timestamps = np.array([[float(r['t_left']), float(r['t_right'])]
+                           for r in rows], dtype=np.float64).reshape(-1, 2)
+    return metadata, timestamps
+
+
+class _SessionReplayBase:
+    """
+    Hilo de reproducción común: decodifica los JPEG de la sesión en un
+    buffer circular, a ritmo real (según los timestamps grabados) o tan
+    rápido como el consumidor los pida (sin pérdida).
+    """
+
+    def __init__(self, session_dir, sides, realtime=True, loop=False,
+                 buffer_slots=4):
+        self.session_dir = Path(session_dir)
+        self.sides = sides
+        self.realtime = realtime
+        self.loop_playback = loop
+        self.buffer_slots = buffer_slots
+
+        self.metadata, self.timestamps = load_session_index(self.session_dir)
+        self.num_frames = len(self.timestamps)
+
+        # resolución: metadatos o primer frame
+        self.video_width = self.metadata.get('width', 0)
+        self.video_height = self.metadata.get('height', 0)
+        if (not self.video_width or not self.video_height) and self.num_frames:
+            first = cv2.imread(self._frame_path(sides[0], 0))
+            self.video_height, self.video_width = first.shape[:2]
+        self.video_frame_rate = self.metadata.get('fps', 30)
+
+        # control states
+        self.frame_grab_run = False
+        self.frame_grab_on = False
+
+        # counts and amounts
+        self.frame_count = 0
+        self.frames_returned = 0
+        self.current_frame_rate = 0.0
+
+        self.last_seq = -1
+        self.borrowed_seq = None
+        self.finished = False
+        self.resource_available = self.num_frames > 0
+
+        # sin dispositivos reales (diagnósticos de main.py)
+        self.resource_left = None
+        self.resource_right = None
+
+        self.buffer = FrameRingBuffer(
+            self.buffer_slots,
+            (self.video_height, self.video_width, 3),
+            n_streams=len(sides),
+            overwrite=self.realtime)
+
+        self.black_frame = np.zeros((
+            self.video_height, self.video_width, 3), np.uint8)
+        self.black_frame.flags.writeable = False
+
+    def _frame_path(self, side, index):
+        return str(self.session_dir / side / f'{index:06d}.jpg')
+
+    def get_curr_config_fps(self):
+        return self.video_frame_rate
+
+    def get_curr_config_widht(self):
+        return self.video_width
+
+    def get_curr_config_height(self):
+        return self.video_height
+
+    def get_curr_frame_number(self):
+        return self.frame_count
+
+    def is_available(self):
+        return self.resource_available
+
+    def get_status(self):
+        if self.finished or not (self.resource_available or
+                                 self.buffer.has_pending(self.last_seq)):
+            return CameraStatus.DEAD
+        return CameraStatus.STREAMING
+
+    @property
+    def frame_condition(self):
+        return self.buffer.cond
+
+    def start(self):
+        self.frame_grab_run = True
+        self.thread = threading.Thread(target=self.loop)
+        self.thread.start()
+
+    def stop(self):
+        self.frame_grab_run = False
+        self.buffer.close()
+        while self.frame_grab_on:
+            time.sleep(0.01)
+        self.resource_available = False
+
+    def pause(self):
+        """Una reproducción no se reanuda: se detiene (ver StereoVideoThread.pause)"""
+        self.stop()
+
+    def loop(self):
+        self.frame_grab_on = True
+
+        local_loop_frame_counter = 0
+        local_loop_start_time = time.time()
+
+        index = 0
+        play_start = time.perf_counter()
+        t0 = self.timestamps[0].min() if self.num_frames else 0.0
+
+        while self.frame_grab_run and index < self.num_frames:
+            # ritmo real: esperar hasta el instante grabado del frame
+            if self.realtime:
+                delay = (self.timestamps[index].min() - t0) - \
+                    (time.perf_counter() - play_start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            slot = None
+            while self.frame_grab_run:
+                slot = self.buffer.acquire_write(
+                    timeout=None if self.realtime else 0.1)
+                if slot is not None or self.realtime:
+                    break
+            if slot is None:
+                index += 1
+                continue
+
+            slot_index, views = slot
+            for side, view in zip(self.sides, views):
+                frame = cv2.imread(self._frame_path(side, index))
+                if frame is None or frame.shape != view.shape:
+                    frame = np.zeros(view.shape, np.uint8) if frame is None \
+                        else cv2.resize(frame, (view.shape[1], view.shape[0]))
+                np.copyto(view, frame)
+
+            side_columns = [SIDES.index(side) for side in self.sides]
+            self.buffer.commit(slot_index, self.timestamps[index, side_columns])
+            self.frame_count += 1
+            local_loop_frame_counter += 1
+            index += 1
+
+            if local_loop_frame_counter >= 10:
+                self.current_frame_rate = \
+                    round(local_loop_frame_counter /
+                          (time.time()-local_loop_start_time), 2)
+                local_loop_frame_counter = 0
+                local_loop_start_time = time.time()
+
+            if index >= self.num_frames and self.loop_playback:
+                index = 0
+                play_start = time.perf_counter()
+
+        self.frame_grab_on = False
+        self.resource_available = False
+        self.buffer.close()
+
+    def _borrow_next(self, after_seq, timeout):
+        # liberar lo entregado en la llamada anterior
+        if self.borrowed_seq is not None:
+            self.buffer.release(self.borrowed_seq)
+            self.borrowed_seq = None
+
+        if self.finished:
+            return None
+        if not (self.is_available() or self.buffer.has_pending(after_seq)):
+            self.finished = True
+            return None
+
+        borrowed = self.buffer.borrow(after_seq, timeout)
+        if borrowed is not None:
+            self.borrowed_seq = self.last_seq = borrowed[0]
+            self.frames_returned += 1
+        return borrowed
+
+
+class ReplayVideoThread(_SessionReplayBase):
+    """
+    Reproduce un lado (izquierdo o derecho) de una sesión grabada con la
+    interfaz de VideoThread (start/next/next_new/stop/get_curr_config_fps).
+    """
+
+    def __init__(self, session_dir, side='left', realtime=True, loop=False,
+                 buffer_slots=4):
+        if side not in SIDES:
+            raise ValueError(f"Lado inválido: {side} (usa 'left' o 'right')")
+        super().__init__(session_dir, (side,), realtime, loop, buffer_slots)
+
+    def next(self, black=True, wait=0):
+        finished, frame, _ = self.next_new(self.last_seq, timeout=wait,
+                                           black=black)
+        return finished, frame
+
+    def next_new(self, after_seq=-1, timeout=None, black=True):
+        frame = self.black_frame if black else None
+        seq = -1
+        borrowed = self._borrow_next(after_seq, timeout)
+        if borrowed is not None:
+            seq, (frame,), _ = borrowed
+        return self.finished, frame, seq
+
+
+class StereoSessionReplay(_SessionReplayBase):
+    """
+    Reproduce una sesión completa con la interfaz de StereoVideoThread.
+
+    Los timestamps entregados son los grabados, por lo que la reproducción
+    es determinista (mismos pares, mismo desfase medido).
+    """
+
+    def __init__(self, session_dir, realtime=True, loop=False,
+                 buffer_slots=4):
+        super().__init__(session_dir, SIDES, realtime, loop, buffer_slots)
+        self.borrowed_pair = None
+        skews = np.abs(self.timestamps[:, 1] - self.timestamps[:, 0])
+        self.mean_skew = float(skews.mean()) if len(skews) else 0.0
+        self.current_skew = 0.0
+
+    def get_curr_skew_ms(self):
+        return self.current_skew * 1000.0
+
+    def get_mean_skew_ms(self):
+        return self.mean_skew * 1000.0
+
+    def next(self, black=True, wait=0):
+        return self.next_new(self.last_seq, timeout=wait, black=black)
+
+    def get_display_pair(self):
+        """Frames del último par entregado (ver StereoVideoThread.get_display_pair)"""
+        if self.borrowed_pair is None:
+            return self.black_frame, self.black_frame
+        return self.borrowed_pair
+
+    def next_new(self, after_seq=-1, timeout=None, black=True):
+        self.borrowed_pair = None
+        if black:
+            pair = (self.black_frame, self.black_frame, None, None, -1)
+        else:
+            pair = (None, None, None, None, -1)
+        borrowed = self._borrow_next(after_seq, timeout)
+        if borrowed is not None:
+            seq, (frame_left, frame_right), (t_left, t_right) = borrowed
+            self.current_skew = abs(t_right - t_left)
+            pair = (frame_left, frame_right, t_left, t_right, seq)
+            self.borrowed_pair = (frame_left, frame_right)
+        return self.finished, pair
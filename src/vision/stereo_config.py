@@ -21,6 +21,12 @@ class StereoConfig:
     PIXEL_WIDTH = 640               # Ancho en píxeles
     PIXEL_HEIGHT = 480              # Alto en píxeles
     FRAME_RATE = 30                 # FPS objetivo
+    FRAME_ORIENTATION = 'pixels'    # Punto de vista volteado (selfie): 'pixels' (flip de
+                                     # ambos frames y la inferencia los usa), 'coordinates'
+                                     # (inferencia sobre el frame de la cámara en RGB; solo
+                                     # se voltean los landmarks) o 'source' (la cámara ya
+                                     # entrega la imagen volteada, p. ej. con v4l2-ctl
+                                     # --set-ctrl=horizontal_flip=1,vertical_flip=1)
     
     # ==================== CALIBRACIÓN ÓPTICA ====================
     # Logi C920s HD Pro Webcam
@@ -52,10 +58,52 @@ class StereoConfig:
     HAND_DETECTION_CONFIDENCE = 0.75  # Confianza para detectar mano
     HAND_TRACKING_CONFIDENCE = 0.5    # Confianza para rastrear mano
     MAX_HANDS = 2                     # Máximo de manos a detectar
+    HAND_DETECTOR_BACKEND = 'solutions' # 'solutions' (mp.solutions.hands, bloqueante),
+                                      # 'tasks' (HandLandmarker asíncrono: toma el último
+                                      # resultado completado; sin ROI) o 'contour'
+                                      # (piel + contornos: liviano, sin identidad de dedos)
+    HAND_LANDMARKER_MODEL = 'models/hand_landmarker.task' # Modelo del backend 'tasks'
+    INFERENCE_SCALE = 1.0             # Escala de la imagen que recibe MediaPipe respecto de
+                                      # PIXEL_WIDTH x PIXEL_HEIGHT (0.5 = 320x240); landmarks,
+                                      # teclas y triangulación siguen en píxeles completos
+                                      # (backends 'solutions' y 'tasks')
+    HAND_ROI_MODE = None              # Región de inferencia: None (frame completo),
+                                      # 'keyboard' (teclado + manos encima) o 'hands'
+                                      # (cajas del frame anterior); la cámara derecha
+                                      # usa 'hands' si se activa
+    HAND_ROI_MARGIN = 40              # Margen alrededor de la región (píxeles)
+    HAND_ROI_REACH = 160              # Alto sobre el teclado para las manos (píxeles)
+    HAND_ROI_FULL_FRAME_INTERVAL = 60 # Búsqueda en frame completo cada N frames (0 = nunca)
+    HAND_STEREO_BAND = False          # Cámara derecha: buscar solo donde pueden estar las
+                                      # manos de la izquierda (geometría epipolar) y
+                                      # descartar las que no la cumplen; requiere
+                                      # calibración estéreo
+    STEREO_BAND_DEPTH_RANGE = (20, 90) # Profundidad de trabajo de las manos (cm)
+    STEREO_BAND_MARGIN = 30           # Margen alrededor de la banda derecha (píxeles)
+    STEREO_EPIPOLAR_TOLERANCE = 25    # Distancia máxima a la línea epipolar (píxeles)
+    FINGER_FILTER = 'one_euro'        # Suavizado 3D de las yemas: 'one_euro', 'kalman' o
+                                      # 'mean' (promedio de 5, más retraso)
+    FINGER_FILTER_TIMEOUT_S = 0.5     # Olvidar una yema sin medición durante este tiempo
+    FINGER_FILTER_MIN_CUTOFF = 1.0    # One Euro: corte en reposo (Hz; menor = menos jitter)
+    FINGER_FILTER_BETA = 0.2          # One Euro: aumento del corte por cm/s (mayor = menos retraso)
+    FINGER_FILTER_PROCESS_NOISE = 200.0     # Kalman: varianza de la aceleración (cm²/s⁴)
+    FINGER_FILTER_MEASUREMENT_NOISE = 0.1   # Kalman: varianza de la triangulación (cm²)
+    HAND_DETECTION_INTERVAL = 1       # Inferencia de MediaPipe cada N frames (1 = siempre);
+                                      # entre inferencias las manos se propagan
+    HAND_MOTION_MODEL = 'kalman'      # Propagación: 'kalman' o 'constant_velocity'
+    HAND_MAX_UNCERTAINTY_PX = None    # Inferir antes si la incertidumbre predicha supera
+                                      # este valor (píxeles); None = solo por intervalo
+    HAND_OPTICAL_FLOW = False         # Refinar las yemas propagadas con flujo óptico
+    ADAPTIVE_QUALITY = False          # Bajar/subir modelo, escala de inferencia, máximo de
+                                      # manos e intervalo de inferencia según los CPS
+                                      # medidos contra FRAME_RATE (backend 'solutions')
     
     # ==================== UI ====================
     CAMERA_IN_FRONT_OF_YOU = True   # Vista frontal (True) o lateral (False)
     DISPLAY_DASHBOARD_DEFAULT = False  # Mostrar dashboard por defecto
+    HAND_OVERLAY_LEFT = ('skeleton', 'tips')  # Qué dibujar de las manos en cada cámara:
+    HAND_OVERLAY_RIGHT = ('skeleton', 'tips') # 'skeleton' y/o 'tips'; () = nada (la
+                                              # derecha es solo visual en juego libre)
     
     # ==================== RUTA DE AUDIO ====================
     SOUNDFONT_PATH = r"C:\CodingWindows\IHC_Proyecto_Fork\IHCProyecto\utils\fluid\FluidR3_GM.sf2"
@@ -79,7 +127,10 @@ class StereoConfig:
     KEYBOARD_ALPHA = 0.5            # Transparencia del teclado virtual
     
     # ==================== CORRECCIÓN DE PROFUNDIDAD ====================
-    # Coeficientes para corrección de profundidad (delta_y)
+    # Coeficientes para corrección de profundidad (delta_y); solo la
+    # triangulación por ángulos (sin calibración estéreo). Con calibración
+    # la profundidad de presión es la distancia al plano del teclado
+    # (KeyboardPlaneCalibrator) y no necesita corrección por posición
     DEPTH_CORRECTION_A = 0.006509695290859  # Coeficiente cuadrático
     DEPTH_CORRECTION_B = 0.039473684210526  # Coeficiente lineal
     
@@ -97,11 +148,31 @@ class StereoConfig:
     
     # ==================== PROCESAMIENTO ====================
     QUEUE_LENGTH = 3                # Longitud de cola para estabilización
-    FRAME_WAIT_TIME = 0.1           # Tiempo de espera entre frames (segundos)
-    FRAME_WAIT_TIME_GAME = 0.0      # Tiempo de espera en modo juego (sin delay)
+    FRAME_WAIT_TIME = 0.1           # Espera máxima de un par nuevo (segundos);
+                                     # normalmente el par llega antes (evento)
+    FRAME_WAIT_TIME_GAME = 0.0      # (legacy) espera en modo juego con next()
     FRAME_WAIT_TIME_SETUP = 0.01    # Tiempo de espera en setup
-    CAMERA_INIT_WAIT = 0.5          # Tiempo de espera para inicializar cámaras
-    STABILIZATION_WAIT = 0.5        # Tiempo de espera para estabilización
+    
+    # ==================== PIPELINE POR ETAPAS ====================
+    PIPELINE_QUEUE_SIZE = 1         # Paquetes en cola entre etapas (gana el más reciente)
+    
+    # ==================== EJECUCIÓN MULTI-PROCESO ====================
+    MULTIPROCESS_CAPTURE = False    # Un proceso por cámara (captura + MediaPipe) con memoria compartida
+    
+    # ==================== DECODIFICACIÓN MJPEG ====================
+    RAW_MJPEG_CAPTURE = False       # Leer MJPEG crudo y decodificar reducido para inferencia
+    MJPEG_DECODE_SCALE = 2          # Reducción de la copia de inferencia (2 = 1/2, 4 = 1/4)
+    
+    # ==================== RECONEXIÓN DE CÁMARAS ====================
+    CAMERA_RECONNECT = True         # Reabrir las cámaras en segundo plano si se pierden
+    RECONNECT_BACKOFF = 0.5         # Primera espera entre reintentos (segundos)
+    RECONNECT_BACKOFF_MAX = 8.0     # Espera máxima (se duplica en cada fallo)
+    RECONNECT_MAX_ATTEMPTS = 0      # Reintentos seguidos antes de darla por muerta (0 = sin límite)
+    
+    # ==================== GRABACIÓN / REPLAY ====================
+    RECORD_SESSION_DIR = None       # Carpeta donde grabar la sesión (None = no grabar)
+    REPLAY_SESSION_DIR = None       # Sesión grabada a reproducir en lugar de las cámaras
+    REPLAY_REALTIME = True          # True = ritmo real, False = tan rápido como sea posible
     
     # ==================== UI ====================
     INSTRUCTIONS_TIMEOUT = 300      # Frames antes de ocultar instrucciones (10s a 30fps)
@@ -9,18 +9,243 @@ Idea y código original:
 
 @author: mherrera
 """
+import os
 import time
 import threading
-import queue
+from enum import Enum
 import cv2
 import numpy as np
 
+from src.vision.frame_ring_buffer import FrameRingBuffer
+from src.vision.mjpeg_decoder import (MJPEGDecoder, CorruptFrameError,
+                                     enable_raw_mjpeg, reduced_shape)
+
+
+class CameraStatus(Enum):
+    """Estado de la captura, para mostrar en la UI"""
+    STREAMING = 'streaming'         # entregando frames
+    RECONNECTING = 'reconnecting'   # dispositivo perdido, reintentando en segundo plano
+    DEAD = 'dead'                   # sin más frames (EOF, detenida o sin reintentos)
+
+
+# ------------------------------
+# Camera setup
+# ------------------------------
+
+
+def open_video_resource(video_source, video_width, video_height,
+                        video_frame_rate, video_fourcc):
+    """
+    Abre y configura un dispositivo (o archivo) de video.
+
+    Compartido por VideoThread y StereoVideoThread para que ambas cámaras
+    queden configuradas exactamente igual.
+    """
+    resource = cv2.VideoCapture(video_source)
+
+    # Optimización para máximo FPS
+    # Reducir buffer size para menor latencia
+    resource.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    # Configurar resolución y FPS
+    resource.set(cv2.CAP_PROP_FRAME_WIDTH, video_width)
+    resource.set(cv2.CAP_PROP_FRAME_HEIGHT, video_height)
+    resource.set(cv2.CAP_PROP_FPS, video_frame_rate)
+    resource.set(cv2.CAP_PROP_FOURCC, video_fourcc)
+    # Desactivar auto-exposición y autofocus para mejor rendimiento
+    resource.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Modo manual
+    resource.set(cv2.CAP_PROP_AUTOFOCUS, 0)  # Desactivar autofocus
+
+    return resource
+
+
+def wait_first_frame(resource, timeout):
+    """
+    Espera hasta que el dispositivo entregue su primer frame válido.
+
+    Reemplaza las esperas fijas tras abrir la cámara: se espera solo lo
+    que el dispositivo realmente necesita (con un límite).
+
+    Returns:
+        bool: True si llegó un frame antes del timeout
+    """
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if resource.grab():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def open_ready_video_resource(video_source, video_width, video_height,
+                              video_frame_rate, video_fourcc, ready_timeout):
+    """
+    Abre un dispositivo y espera su primer frame.
+
+    Los archivos de video están listos en cuanto se abren (no se consume
+    su primer frame).
+
+    Returns:
+        tuple: (resource, time_to_first_frame) con el tiempo en segundos
+               desde la apertura, o None si no está disponible
+    """
+    start = time.perf_counter()
+    resource = open_video_resource(video_source, video_width, video_height,
+                                   video_frame_rate, video_fourcc)
+    if not resource.isOpened():
+        return resource, None
+    is_file = isinstance(video_source, str) and os.path.isfile(video_source)
+    if not is_file and not wait_first_frame(resource, ready_timeout):
+        return resource, None
+    return resource, time.perf_counter() - start
+
+
+# ------------------------------
+# Reconnect supervisor
+# ------------------------------
+
+
+class _CaptureSupervisor:
+    """
+    Hilo supervisor común a VideoThread y StereoVideoThread.
+
+    Corre el bucle de captura (loop) y, si el dispositivo se pierde y
+    try_to_reconnect está activo, lo reabre en segundo plano con backoff
+    exponencial. Mientras tanto next() sigue devolviendo el relleno al
+    instante: el bucle de render/audio nunca espera una reconexión.
+
+    Las subclases implementan _open_resources() -> bool,
+    _release_resources() y loop().
+    """
+
+    def _init_supervisor(self, try_to_reconnect, reconnect_backoff,
+                         reconnect_backoff_max, max_reconnect_attempts):
+        self.try_to_reconnect = try_to_reconnect
+        self.reconnect_backoff = reconnect_backoff
+        self.reconnect_backoff_max = reconnect_backoff_max
+        self.max_reconnect_attempts = max_reconnect_attempts  # 0 = sin límite
+        self.reconnect_attempts = 0
+        self.reconnect_count = 0
+        self._stop_event = threading.Event()
+        self._pausing = False
+
+    def _initial_status(self):
+        if self.resource_available:
+            return CameraStatus.STREAMING
+        if self.try_to_reconnect:
+            return CameraStatus.RECONNECTING
+        return CameraStatus.DEAD
+
+    def get_status(self):
+        return self.status
+
+    def start(self):
+
+        # ya corriendo (p. ej. cámara reutilizada)
+        if self.frame_grab_on:
+            return
+
+        # set run state
+        self.frame_grab_run = True
+        self.frame_grab_on = True
+        self._stop_event.clear()
+
+        # start thread
+        self.thread = threading.Thread(target=self._supervise, daemon=True)
+        self.thread.start()
+
+    def pause(self):
+        """
+        Detiene la captura dejando los dispositivos abiertos, para
+        reanudarla con start() sin volver a abrirlos (p. ej. al volver del
+        menú principal).
+        """
+        self._pausing = True
+        self.frame_grab_run = False
+        self._stop_event.set()
+
+        # let loop stop
+        while self.frame_grab_on:
+            time.sleep(0.01)
+        self._pausing = False
+
+    def stop(self):
+
+        # set loop kill state
+        self.frame_grab_run = False
+        self._stop_event.set()
+        self.buffer.close()
+
+        # let loop stop
+        while self.frame_grab_on:
+            time.sleep(0.01)
+
+        # stop camera if not already stopped
+        self._release_resources()
+
+        self.resource_available = False
+        self.status = CameraStatus.DEAD
+
+    def _supervise(self):
+        try:
+            self._supervise_capture()
+        finally:
+            # pase lo que pase en el hilo, pause()/stop() no quedan esperando
+            if not self._pausing:
+                self.resource_available = False
+                self.status = CameraStatus.DEAD
+                self.buffer.close()
+            self.frame_grab_on = False
+
+    def _supervise_capture(self):
+        delay = self.reconnect_backoff
+
+        while self.frame_grab_run:
+            if self.resource_available:
+                self.status = CameraStatus.STREAMING
+                try:
+                    self.loop()
+                except Exception as e:
+                    # error inesperado en la captura: como un dispositivo
+                    # perdido (se reconecta o queda DEAD)
+                    print(f'⚠ Error en la captura: {e}')
+                    self.resource_available = False
+
+            if self._pausing:
+                # pausa: dispositivos abiertos y buffer intacto
+                return
+
+            if not self.frame_grab_run or not self.try_to_reconnect:
+                break
+
+            # dispositivo perdido: reabrir con backoff exponencial
+            self.status = CameraStatus.RECONNECTING
+            self._release_resources()
+            if self._stop_event.wait(delay):
+                break
+
+            self.reconnect_attempts += 1
+            print('reconnecting... (intento {}, espera {:.1f}s)'.format(
+                self.reconnect_attempts, delay))
+            if self._open_resources():
+                self.reconnect_count += 1
+                self.reconnect_attempts = 0
+                delay = self.reconnect_backoff
+                print('✓ cámara reconectada')
+            else:
+                self._release_resources()
+                delay = min(delay * 2, self.reconnect_backoff_max)
+                if self.max_reconnect_attempts and \
+                        self.reconnect_attempts >= self.max_reconnect_attempts:
+                    print('✗ cámara perdida: se agotaron los reintentos')
+                    break
+
+
 # ------------------------------
 # Camera Tread
 # ------------------------------
 
 
-class VideoThread:
+class VideoThread(_CaptureSupervisor):
 
     def __init__(self,
                  video_source=2,  # device, stream or file
@@ -29,7 +254,11 @@ class VideoThread:
                  video_frame_rate=30,
                  buffer_all=False,
                  video_fourcc=cv2.VideoWriter_fourcc(*"MJPG"),
-                 try_to_reconnect=False):
+                 try_to_reconnect=False,
+                 buffer_slots=4,
+                 reconnect_backoff=0.5,
+                 reconnect_backoff_max=8.0,
+                 max_reconnect_attempts=0):
 
         self.video_source = video_source
         self.video_width = video_width
@@ -38,16 +267,16 @@ class VideoThread:
         self.video_fourcc = video_fourcc
 
         self.buffer_all = buffer_all
-        self.try_to_reconnect = try_to_reconnect
-
+        self._init_supervisor(try_to_reconnect, reconnect_backoff,
+                              reconnect_backoff_max, max_reconnect_attempts)
 
 
         # ------------------------------
         # System Variables
         # ------------------------------
 
-        # buffer setup
-        self.buffer_length = 1
+        # buffer setup (slots preasignados del buffer circular)
+        self.buffer_slots = buffer_slots
 
         # control states
         self.frame_grab_run = False
@@ -58,53 +287,38 @@ class VideoThread:
         self.frames_returned = 0
         self.current_frame_rate = 0.0
         self.loop_start_time = 0
-        self.last_try_reconnection_time = 0
 
-        # buffer
-        if self.buffer_all:
-            self.buffer = queue.Queue(self.buffer_length)
-        else:
-            # last frame only
-            self.buffer = queue.Queue(1)
+        # frame prestado actualmente por next() (se libera en la siguiente llamada)
+        self.last_seq = -1
+        self.borrowed_seq = None
     
         self.finished = False
 
         # camera setup - usar configuración centralizada si está disponible
         try:
             from src.config.app_config import AppConfig
-            self.video_init_wait_time = AppConfig.CAMERA_INIT_WAIT
+            self.video_ready_timeout = AppConfig.CAMERA_READY_TIMEOUT
         except ImportError:
-            self.video_init_wait_time = 0.5  # Fallback
-
-        self.resource = cv2.VideoCapture(self.video_source)
-        
-        # Optimización para máximo FPS
-        # Reducir buffer size para menor latencia
-        self.resource.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-        # Configurar resolución y FPS
-        self.resource.set(cv2.CAP_PROP_FRAME_WIDTH, self.video_width)
-        self.resource.set(cv2.CAP_PROP_FRAME_HEIGHT, self.video_height)
-        self.resource.set(cv2.CAP_PROP_FPS, self.video_frame_rate)
-        self.resource.set(cv2.CAP_PROP_FOURCC, self.video_fourcc)
-        # Desactivar auto-exposición y autofocus para mejor rendimiento
-        self.resource.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Modo manual
-        self.resource.set(cv2.CAP_PROP_AUTOFOCUS, 0)  # Desactivar autofocus
-        
-        time.sleep(self.video_init_wait_time)
-    
-        if not self.resource.isOpened(): 
-            self.resource_available = False
-        else:
-            self.resource_available = True
-            # get the actual cam configuration 
-            self.video_width = int(self.resource.get(cv2.CAP_PROP_FRAME_WIDTH))
-            self.video_height = int(self.resource.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            self.video_frame_rate = self.resource.get(cv2.CAP_PROP_FPS)
-            self.video_fourcc = self.resource.get(cv2.CAP_PROP_FOURCC)
+            self.video_ready_timeout = 5.0  # Fallback
 
-        # black frame (filler)
+        self.time_to_first_frame = None
+        self.resource = None
+        self._open_resources()
+        self.status = self._initial_status()
+
+        # buffer circular: el driver escribe directo en los slots
+        # (buffer_all = archivos, FIFO sin pérdida)
+        self.buffer = FrameRingBuffer(
+            self.buffer_slots,
+            (self.video_height, self.video_width, 3),
+            n_streams=1,
+            overwrite=not self.buffer_all)
+
+        # black frame (filler) - compartido y de solo lectura: se entrega
+        # por referencia, nunca se copia
         self.black_frame = np.zeros((
             self.video_height, self.video_width, 3), np.uint8)
+        self.black_frame.flags.writeable = False
 
     def get_curr_config_fps(self):
         return self.video_frame_rate
@@ -118,172 +332,609 @@ class VideoThread:
     def get_curr_frame_number(self):
         return self.frame_count
 
-    def reconnect(self):
-        self.stop()
-
-        self.__init__(
-            buffer_all=self.buffer_all,
-            video_source=self.video_source,
-            video_width=self.video_width,
-            video_height=self.video_height,
-            video_frame_rate=self.video_frame_rate,
-            video_fourcc=self.video_fourcc,
-            try_to_reconnect=self.try_to_reconnect
-        )        
-        
-        self.start()
-        print('reconnecting...')
-        
     def is_available(self):
         return self.resource_available
 
-    def start(self):
-
-        # set run state
-        self.frame_grab_run = True
-
-        # start thread
-        self.thread = threading.Thread(target=self.loop)
-        self.thread.start()
-
-    def stop(self):
-
-        #print('########## stop')
-
-        # set loop kill state
-        self.frame_grab_run = False
-
-        # let loop stop
-        while self.frame_grab_on:
-            time.sleep(0.1)
+    def _open_resources(self):
+        self.resource, self.time_to_first_frame = open_ready_video_resource(
+            self.video_source, self.video_width, self.video_height,
+            self.video_frame_rate, self.video_fourcc,
+            self.video_ready_timeout)
+    
+        if self.time_to_first_frame is None:
+            self.resource_available = False
+        else:
+            self.resource_available = True
+            # get the actual cam configuration 
+            self.video_width = int(self.resource.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.video_height = int(self.resource.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.video_frame_rate = self.resource.get(cv2.CAP_PROP_FPS)
+            self.video_fourcc = self.resource.get(cv2.CAP_PROP_FOURCC)
+        return self.resource_available
 
-        # stop camera if not already stopped
+    def _release_resources(self):
         if self.resource:
             try:
                 self.resource.release()
             except Exception:
                 pass
         self.resource = None
-        
-        self.resource_available = False
-        
-        # drop buffer
-        self.buffer = None
-        # set recconection time
-        self.last_try_reconnection_time = 0
 
     def loop(self):
 
-        # load start frame
-        frame = self.black_frame
-        if not self.buffer.full():
-            self.buffer.put(frame, False)
-
         # status
-        self.frame_grab_on = True
         self.loop_start_time = time.time()
 
         # frame rate
         local_loop_frame_counter = 0
         local_loop_start_time = time.time()
 
-        while self.resource.grab():
-            # external shut down
-            if not self.frame_grab_run:
+        while self.frame_grab_run:
+            # true buffered mode (for files, no loss): esperar slot libre
+            # antes del grab, así una pausa/stop no descarta un frame ya leído
+            # false buffered mode (for camera, loss allowed): si todos los
+            # slots están prestados se descarta el frame
+            slot = None
+            while self.frame_grab_run:
+                slot = self.buffer.acquire_write(
+                    timeout=0.1 if self.buffer_all else None)
+                if slot is not None or not self.buffer_all:
+                    break
+            if slot is None and self.buffer_all:
+                continue
+
+            if not self.resource.grab():
+                if slot is not None:
+                    self.buffer.abort(slot[0])
                 break
+            t_grab = time.perf_counter()
+            if slot is None:
+                continue
+
+            index, (view,) = slot
+            grabbed, frame = self.resource.retrieve(image=view)
+            if not grabbed:
+                self.buffer.abort(index)
+                break
+
+            if frame is not view:
+                # el driver entregó otra resolución: re-dimensionar el
+                # buffer una sola vez (las vistas prestadas siguen vivas y
+                # la numeración continúa)
+                self.buffer.abort(index)
+                self.buffer = self.buffer.resized(frame.shape)
+                index, (view,) = self.buffer.acquire_write()
+                np.copyto(view, frame)
 
-            # true buffered mode (for files, no loss)
-            if self.buffer_all:
+            self.buffer.commit(index, (t_grab,))
+            self.frame_count += 1
+            local_loop_frame_counter += 1
+
+            # update frame read rate
+            if local_loop_frame_counter >= 10:
+                self.current_frame_rate = \
+                    round(local_loop_frame_counter/
+                          (time.time()-local_loop_start_time), 2)
+                local_loop_frame_counter = 0
+                local_loop_start_time = time.time()
 
-                # buffer is full, pause and loop
-                if self.buffer.full():
-                    time.sleep(1/self.video_frame_rate)
 
-                # or load buffer with next frame
-                else:
-                    grabbed, frame = self.resource.retrieve()
-                    # grabbed, frame = self.resource.read()
-                    if not grabbed:
-                        break
+        # fin del stream o dispositivo perdido (el supervisor decide)
+        self.loop_start_time = 0
+        if self.frame_grab_run:
+            self.resource_available = False
 
-                    self.buffer.put(frame, False)
-                    self.frame_count += 1
-                    local_loop_frame_counter += 1
-            # false buffered mode (for camera, loss allowed)
+    def borrow_frame(self, after_seq=-1, wait=0):
+        """
+        Presta el frame más reciente (o el siguiente, con buffer_all) cuya
+        secuencia sea mayor que after_seq, sin copiarlo.
+
+        La vista pertenece al buffer circular: es válida hasta
+        release_frame(seq) y no se sobrescribe mientras esté prestada.
+
+        Returns:
+            tuple: (seq, frame) o (-1, None) si no hay frame nuevo
+        """
+        borrowed = self.buffer.borrow(after_seq, wait)
+        if borrowed is None:
+            return -1, None
+        seq, (frame,), _ = borrowed
+        return seq, frame
+
+    def release_frame(self, seq):
+        """Devuelve al buffer circular un frame prestado con borrow_frame"""
+        if seq is not None and seq >= 0:
+            self.buffer.release(seq)
+
+    @property
+    def frame_condition(self):
+        """
+        threading.Condition que se notifica con cada frame nuevo.
+
+        Para esperar un frame conviene usar wait_new_frame() o next_new().
+        """
+        return self.buffer.cond
+
+    def wait_new_frame(self, after_seq=-1, timeout=None):
+        """Bloquea hasta que haya un frame más nuevo que after_seq"""
+        return self.buffer.wait_new(after_seq, timeout)
+
+    def next(self, black=True, wait=0):
+        """
+        Retorna (finished, frame) con el siguiente frame no entregado aún.
+
+        El frame es una vista del buffer circular (sin copia) válida hasta
+        la próxima llamada a next(); si no hay frame nuevo se retorna el
+        relleno negro compartido (de solo lectura) o None.
+        """
+        finished, frame, _ = self.next_new(self.last_seq, timeout=wait,
+                                           black=black)
+        return finished, frame
+
+    def next_new(self, after_seq=-1, timeout=None, black=True):
+        """
+        Retorna (finished, frame, seq) solo con frames más nuevos que
+        after_seq (la secuencia del último frame procesado por el llamador).
+
+        Espera en la condición del buffer hasta que llegue un frame nuevo,
+        así el bucle de procesamiento se sincroniza con la cámara sin
+        busy-wait y sin procesar dos veces el mismo frame. Si vence el
+        timeout se retorna el relleno con seq = -1.
+
+        Args:
+            after_seq: Secuencia del último frame consumido (-1 = ninguno)
+            timeout: Segundos máximos de espera (None = sin límite)
+            black: Relleno negro (True) o None (False)
+        """
+
+        # liberar el frame entregado en la llamada anterior
+        self.release_frame(self.borrowed_seq)
+        self.borrowed_seq = None
+
+        # black frame default (por referencia, sin copia)
+        if black:
+            frame = self.black_frame
+        # no frame default
+        else:
+            frame = None
+        seq = -1
+
+        # reconectando: sin espera, el relleno sale al instante
+        # (la reconexión corre en el hilo supervisor)
+        if not self.finished:
+            if self.status == CameraStatus.STREAMING or \
+                    self.buffer.has_pending(after_seq):
+                if self.status != CameraStatus.STREAMING:
+                    timeout = 0
+                borrowed_seq, borrowed = self.borrow_frame(after_seq, timeout)
+                if borrowed is not None:
+                    frame = borrowed
+                    seq = self.borrowed_seq = self.last_seq = borrowed_seq
+                    self.frames_returned += 1
+            elif self.status == CameraStatus.DEAD:
+                self.finished = True
+
+        return self.finished, frame, seq
+
+
+# ------------------------------
+# Stereo Camera Thread
+# ------------------------------
+
+
+class StereoVideoThread(_CaptureSupervisor):
+    """
+    Captura sincronizada de un par estéreo.
+
+    Con dos VideoThread independientes los frames izquierdo y derecho pueden
+    llegar con decenas de ms de diferencia y la profundidad de los dedos
+    "tiembla" cuando la mano se mueve. Aquí un único hilo llama grab() en
+    ambos dispositivos seguidos y recién después retrieve(), de modo que
+    cada par entregado corresponde (casi) al mismo instante.
+
+    Cada par se entrega como la tupla (left, right, t_left, t_right, seq),
+    donde t_left/t_right son los instantes (time.perf_counter) en que se
+    completó el grab() de cada cámara y seq es el número de par.
+
+    Con dos archivos de video como fuente (y buffer_all=True para no perder
+    frames) el emparejamiento se puede probar sin cámaras.
+
+    Con try_to_reconnect=True, si cualquiera de las dos cámaras se pierde
+    el par se reabre en segundo plano (ver _CaptureSupervisor) y
+    get_status() pasa a CameraStatus.RECONNECTING.
+
+    Con raw_mjpeg=True se leen los bytes MJPEG sin decodificar: los frames
+    entregados por next() son la copia reducida para inferencia (1/2 o 1/4,
+    ver MJPEGDecoder) y get_display_pair() decodifica el par completo solo
+    cuando se va a mostrar. Si el backend no soporta el modo crudo se usa
+    la captura normal.
+    """
+
+    def __init__(self,
+                 left_source=2,   # device, stream or file
+                 right_source=1,  # device, stream or file
+                 video_width=640,
+                 video_height=480,
+                 video_frame_rate=30,
+                 buffer_all=False,
+                 buffer_slots=4,
+                 video_fourcc=cv2.VideoWriter_fourcc(*"MJPG"),
+                 try_to_reconnect=False,
+                 reconnect_backoff=0.5,
+                 reconnect_backoff_max=8.0,
+                 max_reconnect_attempts=0,
+                 raw_mjpeg=False,
+                 inference_scale=2):
+
+        self.left_source = left_source
+        self.right_source = right_source
+        self.video_width = video_width
+        self.video_height = video_height
+        self.video_frame_rate = video_frame_rate
+        self.video_fourcc = video_fourcc
+
+        self.buffer_all = buffer_all
+        self.buffer_slots = buffer_slots
+        self._init_supervisor(try_to_reconnect, reconnect_backoff,
+                              reconnect_backoff_max, max_reconnect_attempts)
+
+        # modo MJPEG crudo (se confirma al abrir los dispositivos)
+        self.raw_mjpeg = raw_mjpeg
+        self.inference_scale = inference_scale if raw_mjpeg else 1
+
+        # ------------------------------
+        # System Variables
+        # ------------------------------
+
+        # control states
+        self.frame_grab_run = False
+        self.frame_grab_on = False
+
+        # counts and amounts
+        self.frame_count = 0
+        self.frames_returned = 0
+        self.frames_dropped = 0      # pares MJPEG dañados descartados
+        self.current_frame_rate = 0.0
+        self.loop_start_time = 0
+
+        # desfase entre cámaras (segundos)
+        self.current_skew = 0.0   # último par
+        self.mean_skew = 0.0      # media móvil exponencial
+        self.max_skew = 0.0       # peor caso observado
+
+        # par prestado actualmente por next()
+        self.last_seq = -1
+        self.borrowed_seq = None
+        self.borrowed_frames = None
+        self.display_cache = (None, None, None)  # (seq, left, right)
+
+        self.finished = False
+
+        # camera setup - usar configuración centralizada si está disponible
+        try:
+            from src.config.app_config import AppConfig
+            self.video_ready_timeout = AppConfig.CAMERA_READY_TIMEOUT
+        except ImportError:
+            self.video_ready_timeout = 5.0  # Fallback
+
+        # tiempo hasta el primer frame de cada cámara (segundos, None = falló)
+        self.time_to_first_frame = {'left': None, 'right': None}
+        self.resource_left = None
+        self.resource_right = None
+        self._open_resources()
+        self.status = self._initial_status()
+
+        # buffer circular de pares: un slot = (izquierdo, derecho), a la
+        # resolución de inferencia en modo MJPEG crudo
+        self.decoder = None
+        frame_shape = (self.video_height, self.video_width, 3)
+        if self.raw_mjpeg:
+            self.decoder = MJPEGDecoder(n_workers=2,
+                                        inference_scale=self.inference_scale)
+            frame_shape = reduced_shape(self.video_width, self.video_height,
+                                        self.inference_scale)
+        self.buffer = FrameRingBuffer(
+            self.buffer_slots,
+            frame_shape,
+            n_streams=2,
+            overwrite=not self.buffer_all)
+        # bytes MJPEG de cada slot (para decodificar el par completo)
+        self.raw_frames = [None] * self.buffer_slots
+
+        # black frame (filler) - compartido y de solo lectura
+        self.black_frame = np.zeros(frame_shape, np.uint8)
+        self.black_frame.flags.writeable = False
+        self.black_display_frame = self.black_frame
+        if self.raw_mjpeg:
+            self.black_display_frame = np.zeros((
+                self.video_height, self.video_width, 3), np.uint8)
+            self.black_display_frame.flags.writeable = False
+
+    def get_curr_config_fps(self):
+        return self.video_frame_rate
+
+    def get_curr_config_widht(self):
+        return self.video_width
+
+    def get_curr_config_height(self):
+        return self.video_height
+
+    def get_curr_frame_number(self):
+        return self.frame_count
+
+    def get_curr_skew_ms(self):
+        """Desfase |t_right - t_left| del último par, en milisegundos"""
+        return self.current_skew * 1000.0
+
+    def get_mean_skew_ms(self):
+        """Desfase medio (media móvil exponencial), en milisegundos"""
+        return self.mean_skew * 1000.0
+
+    def get_time_to_first_frame_ms(self):
+        """Tiempo hasta el primer frame de cada cámara, en milisegundos"""
+        return {side: None if t is None else t * 1000.0
+                for side, t in self.time_to_first_frame.items()}
+
+    def is_available(self):
+        return self.resource_available
+
+    def _open_resources(self):
+        # ambas cámaras se abren y configuran en paralelo: el arranque
+        # dura lo que necesite la más lenta, no la suma
+        opened = {}
+
+        def bring_up(side, source):
+            opened[side] = open_ready_video_resource(
+                source, self.video_width, self.video_height,
+                self.video_frame_rate, self.video_fourcc,
+                self.video_ready_timeout)
+
+        worker = threading.Thread(target=bring_up,
+                                  args=('left', self.left_source))
+        worker.start()
+        bring_up('right', self.right_source)
+        worker.join()
+
+        self.resource_left, self.time_to_first_frame['left'] = opened['left']
+        self.resource_right, self.time_to_first_frame['right'] = opened['right']
+
+        self.left_available = self.time_to_first_frame['left'] is not None
+        self.right_available = self.time_to_first_frame['right'] is not None
+        self.resource_available = self.left_available and self.right_available
+
+        if self.left_available:
+            # get the actual cam configuration (la izquierda manda)
+            self.video_width = int(self.resource_left.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.video_height = int(self.resource_left.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.video_frame_rate = self.resource_left.get(cv2.CAP_PROP_FPS)
+            self.video_fourcc = self.resource_left.get(cv2.CAP_PROP_FOURCC)
+
+        if self.raw_mjpeg and self.resource_available:
+            raw_left = enable_raw_mjpeg(self.resource_left)
+            raw_right = raw_left and enable_raw_mjpeg(self.resource_right)
+            if not raw_right:
+                # sin soporte: volver a la decodificación normal
+                print('⚠ MJPEG crudo no soportado: decodificación completa')
+                if raw_left:
+                    self.resource_left.set(cv2.CAP_PROP_FORMAT, cv2.CV_8UC3)
+                self.raw_mjpeg = False
+                self.inference_scale = 1
+        return self.resource_available
+
+    def _release_resources(self):
+        for resource in (self.resource_left, self.resource_right):
+            if resource:
+                try:
+                    resource.release()
+                except Exception:
+                    pass
+        self.resource_left = None
+        self.resource_right = None
+
+    def loop(self):
+
+        # status
+        self.loop_start_time = time.time()
+
+        # frame rate
+        local_loop_frame_counter = 0
+        local_loop_start_time = time.time()
+
+        while self.frame_grab_run:
+            # reservar slot antes del grab (con buffer_all se espera, sin
+            # pérdida: una pausa/stop no descarta un par ya leído)
+            slot = None
+            while self.frame_grab_run:
+                slot = self.buffer.acquire_write(
+                    timeout=0.1 if self.buffer_all else None)
+                if slot is not None or not self.buffer_all:
+                    break
+            if slot is None and self.buffer_all:
+                continue
+
+            # grab() de ambas cámaras seguidos: fija el instante de captura
+            # antes de pagar el costo de decodificar (retrieve)
+            grabbed_left = self.resource_left.grab()
+            t_left = time.perf_counter()
+            grabbed_right = self.resource_right.grab()
+            t_right = time.perf_counter()
+
+            if not (grabbed_left and grabbed_right):
+                if slot is not None:
+                    self.buffer.abort(slot[0])
+                break
+
+            # todos los slots prestados: el par se descarta
+            if slot is None:
+                continue
+
+            index, (view_left, view_right) = slot
+            if self.raw_mjpeg:
+                # bytes MJPEG: solo se decodifica la copia reducida para
+                # inferencia (ambos lados en paralelo)
+                retrieved_left, raw_left = self.resource_left.retrieve()
+                retrieved_right, raw_right = self.resource_right.retrieve()
+                if not (retrieved_left and retrieved_right):
+                    self.buffer.abort(index)
+                    break
+                try:
+                    frame_left, frame_right = \
+                        self.decoder.decode_inference_into(
+                            (raw_left, raw_right), (view_left, view_right))
+                except CorruptFrameError:
+                    # se descarta el par y la captura sigue
+                    self.buffer.abort(index)
+                    self.frames_dropped += 1
+                    continue
             else:
-                grabbed, frame = self.resource.retrieve()
-                # grabbed, frame = self.resource.read()
-                if not grabbed:
+                # decodificar directo en el slot (sin asignar frames nuevos)
+                retrieved_left, frame_left = \
+                    self.resource_left.retrieve(image=view_left)
+                retrieved_right, frame_right = \
+                    self.resource_right.retrieve(image=view_right)
+                if not (retrieved_left and retrieved_right):
+                    self.buffer.abort(index)
                     break
 
-                # open a spot in the buffer
-                if self.buffer.full():
-                    self.buffer.get()
+            if frame_left is not view_left or frame_right is not view_right:
+                # resolución distinta a la configurada: ajustar el buffer
+                # (cada cámara con su propia forma)
+                self.buffer.abort(index)
+                self.buffer = self.buffer.resized(
+                    [frame_left.shape, frame_right.shape])
+                index, (view_left, view_right) = self.buffer.acquire_write()
+                np.copyto(view_left, frame_left)
+                np.copyto(view_right, frame_right)
+
+            if self.raw_mjpeg:
+                self.raw_frames[index] = (raw_left, raw_right)
 
-                self.buffer.put(frame, False)
-                self.frame_count += 1
-                local_loop_frame_counter += 1
+            # desfase medido entre las dos capturas
+            skew = abs(t_right - t_left)
+            self.current_skew = skew
+            self.mean_skew = skew if self.frame_count == 0 else \
+                0.9 * self.mean_skew + 0.1 * skew
+            self.max_skew = max(self.max_skew, skew)
+
+            self.buffer.commit(index, (t_left, t_right))
+
+            self.frame_count += 1
+            local_loop_frame_counter += 1
 
             # update frame read rate
             if local_loop_frame_counter >= 10:
                 self.current_frame_rate = \
-                    round(local_loop_frame_counter/
+                    round(local_loop_frame_counter /
                           (time.time()-local_loop_start_time), 2)
                 local_loop_frame_counter = 0
                 local_loop_start_time = time.time()
 
-
-        # shut down
+        # fin del stream o cámara perdida (el supervisor decide)
         self.loop_start_time = 0
-        self.frame_grab_on = False
-        self.resource_available = False
+        if self.frame_grab_run:
+            self.resource_available = False
 
-        
-        # self.stop()
+    def stop(self):
+        super().stop()
+        if self.decoder is not None:
+            self.decoder.close()
+
+    def get_display_pair(self):
+        """
+        Retorna (left, right) a resolución completa del par entregado por
+        el último next()/next_new(), para mostrar y dibujar.
+
+        Sin raw_mjpeg son los mismos frames entregados. Con raw_mjpeg el
+        par se decodifica completo recién aquí (en paralelo, una sola vez
+        por par); si no hay par prestado se retorna el relleno negro.
+        """
+        seq = self.borrowed_seq
+        if seq is None:
+            return self.black_display_frame, self.black_display_frame
+        if not self.raw_mjpeg:
+            return self.borrowed_frames
+
+        if self.display_cache[0] != seq:
+            slot = self.buffer.slot_of(seq)
+            if slot is None:
+                # par del buffer anterior a un cambio de resolución
+                return self.borrowed_frames
+            left, right = self.decoder.decode_many(self.raw_frames[slot])
+            self.display_cache = (seq, left, right)
+        return self.display_cache[1], self.display_cache[2]
+
+    def borrow_pair(self, after_seq=-1, wait=0):
+        """
+        Presta el par más reciente (o el siguiente, con buffer_all) cuya
+        secuencia sea mayor que after_seq, sin copiarlo.
+
+        Returns:
+            tuple: (left, right, t_left, t_right, seq) o None
+        """
+        borrowed = self.buffer.borrow(after_seq, wait)
+        if borrowed is None:
+            return None
+        seq, (frame_left, frame_right), (t_left, t_right) = borrowed
+        return frame_left, frame_right, t_left, t_right, seq
+
+    def release_pair(self, seq):
+        """Devuelve al buffer circular un par prestado con borrow_pair"""
+        if seq is not None and seq >= 0:
+            self.buffer.release(seq)
+
+    @property
+    def frame_condition(self):
+        """threading.Condition que se notifica con cada par nuevo"""
+        return self.buffer.cond
+
+    def wait_new_pair(self, after_seq=-1, timeout=None):
+        """Bloquea hasta que haya un par más nuevo que after_seq"""
+        return self.buffer.wait_new(after_seq, timeout)
 
     def next(self, black=True, wait=0):
-
-        # black frame default
+        """
+        Retorna (finished, (left, right, t_left, t_right, seq)) con el
+        siguiente par no entregado aún.
+
+        Los frames son vistas del buffer circular válidas hasta la próxima
+        llamada a next(). Si no hay un par nuevo se retorna el relleno
+        (negro compartido de solo lectura, o None) con
+        t_left = t_right = None y seq = -1.
+        """
+        return self.next_new(self.last_seq, timeout=wait, black=black)
+
+    def next_new(self, after_seq=-1, timeout=None, black=True):
+        """
+        Retorna (finished, (left, right, t_left, t_right, seq)) solo con
+        pares más nuevos que after_seq, esperando en la condición del
+        buffer hasta que llegue uno (o venza el timeout).
+        """
+
+        # liberar el par entregado en la llamada anterior
+        self.release_pair(self.borrowed_seq)
+        self.borrowed_seq = None
+        self.borrowed_frames = None
+
+        # black frame default (por referencia, sin copia)
         if black:
-            frame = self.black_frame.copy()
+            pair = (self.black_frame, self.black_frame, None, None, -1)
         # no frame default
         else:
-            frame = None
+            pair = (None, None, None, None, -1)
 
-        # # can't open camera by index or loss connection or EOF
-        # if not self.is_available(): 
-        #     print('not available:{}'.format(self.video_source))
+        # reconectando: el relleno sale al instante, sin esperar
         if not self.finished:
-            # if self.is_available():
-                # print('########## self.buffer.qsize():{}'.format(self.buffer.qsize()))
-                # print('########## self.buffer.empty():{}'.format(self.buffer.empty()))
-                    
-            if self.is_available() or not self.buffer.empty(): 
-                try:
-                    #print('\t########## self.buffer.qsize():{}'.format(self.buffer.qsize()))
-                    frame = self.buffer.get(timeout=wait)
+            if self.status == CameraStatus.STREAMING or \
+                    self.buffer.has_pending(after_seq):
+                if self.status != CameraStatus.STREAMING:
+                    timeout = 0
+                borrowed = self.borrow_pair(after_seq, timeout)
+                if borrowed is not None:
+                    pair = borrowed
+                    self.borrowed_seq = self.last_seq = borrowed[4]
+                    self.borrowed_frames = (borrowed[0], borrowed[1])
                     self.frames_returned += 1
-                except queue.Empty:
-                    # print('Queue Empty!')
-                    # print(traceback.format_exc())
-                    pass
-            # elif not self.buffer.empty(): 
-            #     print('\t@@@@@@@@@@@@@@@@@ self.is_available() and self.buffer.empty()')
-            elif self.try_to_reconnect:
-                if self.last_try_reconnection_time == 0: 
-                    self.last_try_reconnection_time = time.time()
-                else:
-                    if time.time() - self.last_try_reconnection_time >= 10.0:
-                        self.reconnect()
-                        if self.is_available(): 
-                            self.last_try_reconnection_time = 0
-                        else:
-                            self.last_try_reconnection_time = time.time()
-            else:
-                #print('\t########## STOP: self.buffer.qsize():{}'.format(self.buffer.qsize()))
+            elif self.status == CameraStatus.DEAD:
                 self.finished = True
-                #self.stop()
-    
-            #print('\n')
 
-        return self.finished, frame
+        return self.finished, pair
@@ -10,5 +10,32 @@ __all__ = [
     'test_imports',
     'test_detection',
     'check_calibration_status',
-    'camtest'
+    'camtest',
+    'test_stereo_sync',
+    'test_frame_ring_buffer',
+    'test_session_replay',
+    'test_camera_reconnect',
+    'test_mjpeg_decode',
+    'benchmark_mjpeg_decode',
+    'test_multiprocess_capture',
+    'benchmark_multiprocess',
+    'test_pipeline',
+    'test_hand_roi',
+    'test_stereo_band',
+    'test_hand_landmarks',
+    'test_hand_tracker',
+    'benchmark_detection_interval',
+    'test_hand_landmarker_detector',
+    'test_quality_controller',
+    'test_hand_backends',
+    'benchmark_hand_backends',
+    'test_hand_overlay',
+    'test_frame_orientation',
+    'test_inference_scale',
+    'benchmark_inference_scale',
+    'test_point_rectification',
+    'test_triangulate_many',
+    'test_finger_filter',
+    'test_depth_correction',
+    'test_keyboard_plane'
 ]
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: inferencia de MediaPipe cada N frames (HandTracker)
+Reproduce una sesión grabada por las etapas de detección, fusión y
+teclado (sin hilos, par por par) y compara cada configuración contra la
+referencia que infiere en todos los frames:
+- ciclos por segundo (CPS),
+- precisión y recall de las teclas presionadas (inicio de la pulsación,
+  con tolerancia de ±TOLERANCE_FRAMES frames),
+- error cuadrático medio de las yemas de la cámara izquierda (px).
+
+Sin calibración estéreo la profundidad se triangula por ángulos. Sin
+carpeta se graba una sesión sintética (sin manos: solo mide CPS).
+
+Uso: python -m tests.benchmark_detection_interval [carpeta_de_sesion] [max_pares]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision import angles
+from src.vision.depth_estimator import load_depth_estimator
+from src.vision.hand_detector import HandDetector
+from src.vision.hand_tracker import HandTracker
+from src.vision.keyboard_mapper import KeyboardMap
+from src.vision.pipeline import FramePacket
+from src.vision.pipeline_stages import (HandDetectionStage, StereoFusionStage,
+                                        KeyboardStage, FULL_REQUIREMENTS)
+from src.vision.session_recorder import StereoSessionReplay
+from src.vision.stereo_config import StereoConfig
+from src.piano.virtual_keyboard import VirtualKeyboard
+from tests.benchmark_multiprocess import record_synthetic_session
+
+
+TOLERANCE_FRAMES = 2
+
+# (etiqueta, argumentos de HandTracker); None = referencia sin tracker
+CONFIGURATIONS = [
+    ('referencia (N=1)', None),
+    ('N=2 kalman', dict(detection_interval=2, motion_model='kalman')),
+    ('N=3 kalman', dict(detection_interval=3, motion_model='kalman')),
+    ('N=4 kalman', dict(detection_interval=4, motion_model='kalman')),
+    ('N=6 kalman', dict(detection_interval=6, motion_model='kalman')),
+    ('N=3 vel. constante', dict(detection_interval=3,
+                                motion_model='constant_velocity')),
+    ('N=3 kalman + flujo', dict(detection_interval=3, motion_model='kalman',
+                                optical_flow=True)),
+    ('N=6 kalman + flujo', dict(detection_interval=6, motion_model='kalman',
+                                optical_flow=True)),
+    ('N≤8 incertidumbre 6px', dict(detection_interval=8,
+                                   motion_model='kalman',
+                                   max_uncertainty_px=6.0)),
+]
+
+
+def _load_depth_estimator():
+    try:
+        return load_depth_estimator()
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        print(f"  Sin calibración estéreo ({e}): triangulación por ángulos")
+        return None
+
+
+def run_configuration(session_dir, tracker_args, depth_estimator, max_pairs,
+                      detector_args=None):
+    """
+    Corre la sesión con una configuración.
+
+    Args:
+        detector_args: Argumentos extra de HandDetector (p. ej.
+            inference_scale)
+
+    Returns:
+        tuple: (pares, segundos, {seq: teclas que se presionan},
+                {seq: yemas izquierdas (n, 5, 2)},
+                {seq: {(mano, dedo): profundidad corregida}})
+    """
+    config = StereoConfig
+    cam = StereoSessionReplay(session_dir, realtime=False)
+    width, height = cam.get_curr_config_widht(), cam.get_curr_config_height()
+
+    detectors = []
+    for _ in range(2):
+        detector = HandDetector(img_width=width, img_height=height,
+                                detectionCon=config.HAND_DETECTION_CONFIDENCE,
+                                trackCon=config.HAND_TRACKING_CONFIDENCE,
+                                **(detector_args or {}))
+        if tracker_args is not None:
+            detector = HandTracker(detector, **tracker_args)
+        detectors.append(detector)
+
+    angler = angles.Frame_Angles(width, height, config.ANGLE_WIDTH,
+                                 config.ANGLE_HEIGHT)
+    angler.build_frame()
+    keyboard_map = KeyboardMap(depth_threshold=config.DEPTH_THRESHOLD)
+    stages = [HandDetectionStage(*detectors),
+              StereoFusionStage(depth_estimator, angler,
+                                config.CAMERA_SEPARATION),
+              KeyboardStage(keyboard_map,
+                            VirtualKeyboard(width, height,
+                                            config.KEYBOARD_WHITE_KEYS),
+                            config.KEYBOARD_TOTAL_KEYS)]
+
+    onsets, tips, depths = {}, {}, {}
+    pairs, start, last_seq = 0, None, -1
+    cam.start()
+    while pairs < max_pairs:
+        finished, (frame_left, frame_right, _, _, seq) = \
+            cam.next_new(last_seq, timeout=5)
+        if finished:
+            break
+        if seq < 0:
+            continue
+        if start is None:
+            start = time.perf_counter()
+        last_seq = seq
+
+        frame_left = cv2.flip(frame_left, -1)
+        frame_right = cv2.flip(frame_right, -1)
+        packet = FramePacket(seq, infer_left=frame_left,
+                             infer_right=frame_right, frame_left=frame_left,
+                             frame_right=frame_right, hand_landmarks=None,
+                             requirements=FULL_REQUIREMENTS)
+        for stage in stages:
+            packet = stage.process(packet)
+        if packet.on_map is not None:
+            onsets[seq] = set(np.flatnonzero(packet.on_map).tolist())
+        tips[seq] = packet.hands_left.tips[:, :, :2].copy()
+        if packet.both_sides:
+            depths[seq] = dict(packet.finger_depths)
+        pairs += 1
+    elapsed = time.perf_counter() - start if start else 0.0
+    cam.stop()
+    return pairs, elapsed, onsets, tips, depths
+
+
+def _onset_events(onsets):
+    """(seq, tecla) de cada tecla que se presiona"""
+    return [(seq, key) for seq, keys in onsets.items() for key in keys]
+
+
+def _matched(events, reference):
+    """Eventos con una pulsación de la misma tecla a ±TOLERANCE_FRAMES"""
+    return sum(any((seq + d, key) in reference
+                   for d in range(-TOLERANCE_FRAMES, TOLERANCE_FRAMES + 1))
+               for seq, key in events)
+
+
+def compare(result, reference):
+    """
+    Returns:
+        tuple: (precisión, recall, RMSE de yemas en px) contra la referencia;
+        None donde no hay datos para calcularlo
+    """
+    events = _onset_events(result[2])
+    reference_events = _onset_events(reference[2])
+    precision = (_matched(events, set(reference_events)) / len(events)
+                 if events else None)
+    recall = (_matched(reference_events, set(events)) / len(reference_events)
+              if reference_events else None)
+
+    squared = [np.square(tips - reference[3][seq]).sum(axis=-1).ravel()
+               for seq, tips in result[3].items()
+               if seq in reference[3] and tips.shape == reference[3][seq].shape]
+    squared = np.concatenate(squared) if squared else np.empty(0)
+    rmse = float(np.sqrt(squared.mean())) if len(squared) else None
+    return precision, recall, rmse
+
+
+def _fmt(value, pattern):
+    return pattern.format(value) if value is not None else '   -  '
+
+
+def main():
+    max_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    tmp = None
+    if len(sys.argv) > 1:
+        session_dir = sys.argv[1]
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        session_dir = tmp.name
+        print("Grabando sesión sintética...")
+        record_synthetic_session(session_dir)
+
+    print("\n" + "="*78)
+    print("BENCHMARK: INFERENCIA CADA N FRAMES CON PROPAGACIÓN")
+    print("="*78)
+    print(f"  Sesión: {session_dir}")
+    depth_estimator = _load_depth_estimator()
+    print(f"\n  {'configuración':<24} {'CPS':>6} {'inferencia':>10} "
+          f"{'precisión':>9} {'recall':>7} {'RMSE px':>8}")
+
+    reference = None
+    for label, tracker_args in CONFIGURATIONS:
+        result = run_configuration(session_dir, tracker_args,
+                                   depth_estimator, max_pairs)
+        pairs, elapsed = result[:2]
+        cps = pairs / elapsed if elapsed > 0 else 0.0
+        if reference is None:
+            reference = result
+        precision, recall, rmse = compare(result, reference)
+        interval = tracker_args['detection_interval'] if tracker_args else 1
+        print(f"  {label:<24} {cps:6.1f} {'1/' + str(interval):>10} "
+              f"{_fmt(precision, '{:9.0%}')} {_fmt(recall, '{:7.0%}')} "
+              f"{_fmt(rmse, '{:8.2f}')}")
+    print(f"\n  Pulsaciones de referencia: {len(_onset_events(reference[2]))}")
+    print("="*78 + "\n")
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: backends de detección de manos sobre una sesión grabada
+Corre detect(frame) de cada backend sobre los frames de una cámara y
+compara contra MediaPipe (mp.solutions, modelo completo):
+- latencia por frame (media y percentil 95),
+- fracción de frames con manos y acuerdo con la referencia,
+- error de las yemas (px): por dedo para los backends con identidad de
+  dedos; para los de contornos, distancia de cada yema de referencia a la
+  yema más cercana del backend.
+
+Sin carpeta se graba una sesión sintética (sin manos: solo latencias).
+
+Uso: python -m tests.benchmark_hand_backends [carpeta_de_sesion] [max_frames] [left|right]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.contour_hand_detector import ContourHandDetector
+from src.vision.hand_detector import HandDetector
+from src.vision.session_recorder import load_session_index
+from src.vision.stereo_config import StereoConfig
+from tests.benchmark_multiprocess import record_synthetic_session
+
+
+def make_backends(width, height):
+    """(nombre, detector, tiene identidad de dedos); el primero es la referencia"""
+    backends = [
+        ('mediapipe', HandDetector(img_width=width, img_height=height), True),
+        ('mediapipe liviano', HandDetector(img_width=width, img_height=height,
+                                           model_complexity=0), True),
+        ('contornos', ContourHandDetector(img_width=width, img_height=height),
+         False),
+    ]
+    if os.path.exists(StereoConfig.HAND_LANDMARKER_MODEL):
+        # asíncrono: mide el envío, el resultado es de un frame anterior
+        from src.vision.hand_landmarker_detector import HandLandmarkerDetector
+        backends.append(('tasks (asíncrono)', HandLandmarkerDetector(
+            StereoConfig.HAND_LANDMARKER_MODEL, img_width=width,
+            img_height=height), True))
+    return backends
+
+
+def load_frames(session_dir, side, max_frames):
+    metadata, _ = load_session_index(session_dir)
+    frames = []
+    for index in range(min(metadata['num_frames'], max_frames)):
+        frame = cv2.imread(os.path.join(session_dir, side,
+                                        '%06d.jpg' % index))
+        if frame is None:
+            break
+        # misma orientación que main.py
+        frames.append(cv2.flip(frame, -1))
+    return frames, metadata['width'], metadata['height']
+
+
+def run_backend(detector, frames):
+    """Returns: (latencias ms (N,), yemas por frame [(n, 5, 2)])"""
+    latencies, tips = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        detection = detector.detect(frame)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        tips.append(np.array(detection.tips, np.float32))
+    return np.array(latencies), tips
+
+
+def tip_error(tips, reference, finger_identity):
+    """Error medio (px) en los frames con la misma cantidad de manos"""
+    errors = []
+    for hands, reference_hands in zip(tips, reference):
+        if len(hands) != len(reference_hands) or len(hands) == 0:
+            continue
+        # emparejar manos por el centro de sus yemas
+        centers = hands.mean(axis=1)
+        reference_centers = reference_hands.mean(axis=1)
+        order = np.argmin(np.linalg.norm(
+            reference_centers[:, None] - centers[None], axis=-1), axis=1)
+        for reference_tips, hand_tips in zip(reference_hands, hands[order]):
+            if finger_identity:
+                errors.append(np.linalg.norm(hand_tips - reference_tips,
+                                             axis=-1))
+            else:
+                errors.append(np.linalg.norm(
+                    reference_tips[:, None] - hand_tips[None],
+                    axis=-1).min(axis=1))
+    return float(np.concatenate(errors).mean()) if errors else None
+
+
+def main():
+    max_frames = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    side = sys.argv[3] if len(sys.argv) > 3 else 'left'
+    tmp = None
+    if len(sys.argv) > 1:
+        session_dir = sys.argv[1]
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        session_dir = tmp.name
+        print("Grabando sesión sintética...")
+        record_synthetic_session(session_dir)
+
+    frames, width, height = load_frames(session_dir, side, max_frames)
+    print("\n" + "="*78)
+    print("BENCHMARK: BACKENDS DE DETECCIÓN DE MANOS")
+    print("="*78)
+    print(f"  Sesión: {session_dir} ({side}, {len(frames)} frames "
+          f"{width}x{height})\n")
+    print(f"  {'backend':<20} {'media ms':>8} {'p95 ms':>7} {'con manos':>9} "
+          f"{'acuerdo':>8} {'yemas px':>9}")
+
+    reference = None
+    for name, detector, finger_identity in make_backends(width, height):
+        detector.detect(frames[0])   # no contar la carga del modelo
+        latencies, tips = run_backend(detector, frames)
+        if hasattr(detector, 'close'):
+            detector.close()
+        if reference is None:
+            reference = tips
+        with_hands = np.mean([len(hands) > 0 for hands in tips])
+        agreement = np.mean([len(hands) == len(reference_hands)
+                             for hands, reference_hands in zip(tips, reference)])
+        error = tip_error(tips, reference, finger_identity)
+        error_text = f"{error:9.1f}" if error is not None else '        -'
+        print(f"  {name:<20} {latencies.mean():8.2f} "
+              f"{np.percentile(latencies, 95):7.2f} {with_hands:9.0%} "
+              f"{agreement:8.0%} {error_text}")
+    print("\n  yemas px: contornos = distancia a la yema más cercana "
+          "(sin identidad de dedos)")
+    print("="*78 + "\n")
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: resolución de inferencia (StereoConfig.INFERENCE_SCALE)
+Reproduce una sesión grabada por las etapas de detección, fusión y
+teclado con MediaPipe infiriendo sobre copias reducidas del frame y
+compara cada escala contra la referencia a resolución completa:
+- ciclos por segundo (CPS) de punta a punta,
+- precisión y recall de las teclas presionadas,
+- error cuadrático medio de las yemas de la cámara izquierda (px del
+  frame completo),
+- diferencia media de la profundidad corregida de cada dedo (cm).
+
+Con calibración estéreo agrega el costo teórico en profundidad: cuánto
+cambia Z si la disparidad se equivoca en un píxel de la imagen de
+inferencia (1 / escala píxeles del frame completo).
+
+Sin carpeta se graba una sesión sintética (sin manos: solo mide CPS).
+
+Uso: python -m tests.benchmark_inference_scale [carpeta_de_sesion] [max_pares]
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.benchmark_detection_interval import (_fmt, _load_depth_estimator,
+                                                _onset_events, compare,
+                                                run_configuration)
+from tests.benchmark_multiprocess import record_synthetic_session
+
+
+SCALES = (1.0, 0.75, 0.5, 0.375)
+DEPTHS_CM = (30.0, 45.0, 60.0)
+
+
+def depth_difference(depths, reference):
+    """Diferencia media |Z - Z_ref| (cm) de los dedos vistos en ambas"""
+    differences = [abs(value - reference[seq][finger])
+                   for seq, fingers in depths.items() if seq in reference
+                   for finger, value in fingers.items()
+                   if finger in reference[seq]]
+    return float(np.mean(differences)) if differences else None
+
+
+def depth_step_cm(depth_estimator, depth_cm, disparity_error_px):
+    """
+    Cambio de Z al desplazar la yema derecha `disparity_error_px` píxeles
+    (frame completo) para un punto frente a la cámara izquierda.
+    """
+    P0, P1 = depth_estimator._get_projection_matrices_for_DLT()
+    point = np.array([0.0, 0.0, depth_cm / 100.0, 1.0])
+    left, right = P0 @ point, P1 @ point
+    left, right = left[:2] / left[2], right[:2] / right[2]
+    z = depth_estimator.triangulate_point(left, right)[2]
+    shifted = depth_estimator.triangulate_point(
+        left, right + [disparity_error_px, 0])[2]
+    return abs(shifted - z)
+
+
+def main():
+    max_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    tmp = None
+    if len(sys.argv) > 1:
+        session_dir = sys.argv[1]
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        session_dir = tmp.name
+        print("Grabando sesión sintética...")
+        record_synthetic_session(session_dir)
+
+    print("\n" + "="*78)
+    print("BENCHMARK: RESOLUCIÓN DE INFERENCIA")
+    print("="*78)
+    print(f"  Sesión: {session_dir}")
+    depth_estimator = _load_depth_estimator()
+    print(f"\n  {'escala':<8} {'CPS':>6} {'precisión':>9} {'recall':>7} "
+          f"{'RMSE px':>8} {'ΔZ cm':>7}")
+
+    reference = None
+    for scale in SCALES:
+        result = run_configuration(session_dir, None, depth_estimator,
+                                   max_pairs,
+                                   detector_args={'inference_scale': scale})
+        pairs, elapsed = result[:2]
+        cps = pairs / elapsed if elapsed > 0 else 0.0
+        if reference is None:
+            reference = result
+        precision, recall, rmse = compare(result, reference)
+        difference = depth_difference(result[4], reference[4])
+        print(f"  {scale:<8.3g} {cps:6.1f} {_fmt(precision, '{:9.0%}')} "
+              f"{_fmt(recall, '{:7.0%}')} {_fmt(rmse, '{:8.2f}')} "
+              f"{_fmt(difference, '{:7.2f}')}")
+    print(f"\n  Pulsaciones de referencia: {len(_onset_events(reference[2]))}")
+
+    if depth_estimator is not None:
+        print("\n  Error de Z por 1 px de disparidad en la imagen de "
+              "inferencia (cm):")
+        print(f"  {'escala':<8} " + " ".join(f"{'Z=' + format(z, '.0f'):>7}"
+                                            for z in DEPTHS_CM))
+        for scale in SCALES:
+            steps = [depth_step_cm(depth_estimator, z, 1.0 / scale)
+                     for z in DEPTHS_CM]
+            print(f"  {scale:<8.3g} " + " ".join(f"{step:7.2f}"
+                                                for step in steps))
+    print("="*78 + "\n")
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
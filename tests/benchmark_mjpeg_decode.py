@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de decodificación MJPEG: completa vs reducida (1/2, 1/4)
+Decodifica todos los JPEG de una carpeta (p. ej. left/ de una sesión
+grabada con StereoSessionRecorder) y compara el tiempo por frame de:
+- decodificación completa (lo que hace retrieve() con MJPG),
+- decodificación completa + cv2.resize a 1/2 (alternativa ingenua),
+- IMREAD_REDUCED_COLOR_2 / _4 (copia para inferencia),
+en un hilo y en el pool de MJPEGDecoder (izquierda + derecha en paralelo).
+
+Sin carpeta se generan JPEG sintéticos de 640x480.
+
+Uso: python -m tests.benchmark_mjpeg_decode [carpeta_con_jpegs] [repeticiones]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.mjpeg_decoder import MJPEGDecoder, REDUCED_DECODE_FLAGS
+
+
+def load_jpegs(folder):
+    """Lee los bytes de todos los .jpg de la carpeta (sin decodificar)"""
+    paths = sorted(Path(folder).glob('*.jpg'))
+    return [np.fromfile(str(path), np.uint8) for path in paths]
+
+
+def synthetic_jpegs(n_frames=60, width=640, height=480):
+    """JPEG de prueba con textura (ruido suavizado, similar a una escena)"""
+    rng = np.random.default_rng(0)
+    jpegs = []
+    for _ in range(n_frames):
+        noise = rng.integers(0, 255, (height // 8, width // 8, 3), np.uint8)
+        frame = cv2.resize(noise, (width, height),
+                           interpolation=cv2.INTER_CUBIC)
+        jpegs.append(cv2.imencode('.jpg', frame,
+                                  [cv2.IMWRITE_JPEG_QUALITY, 90])[1])
+    return jpegs
+
+
+def _time_per_frame(fn, jpegs, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for data in jpegs:
+            fn(data)
+    return (time.perf_counter() - start) * 1000.0 / (repeats * len(jpegs))
+
+
+def benchmark_decode(jpegs, repeats=3):
+    """
+    Mide el tiempo medio de decodificación por frame.
+
+    Returns:
+        dict: nombre del método -> ms por frame
+    """
+    results = {}
+    results['completa'] = _time_per_frame(
+        lambda data: cv2.imdecode(data, cv2.IMREAD_COLOR), jpegs, repeats)
+    results['completa + resize 1/2'] = _time_per_frame(
+        lambda data: cv2.resize(cv2.imdecode(data, cv2.IMREAD_COLOR), None,
+                                fx=0.5, fy=0.5,
+                                interpolation=cv2.INTER_AREA),
+        jpegs, repeats)
+    for scale in (2, 4):
+        flag = REDUCED_DECODE_FLAGS[scale]
+        results[f'reducida 1/{scale}'] = _time_per_frame(
+            lambda data, flag=flag: cv2.imdecode(data, flag), jpegs, repeats)
+
+    # pool: pares (izquierda, derecha) decodificados en paralelo
+    pairs = list(zip(jpegs[0::2], jpegs[1::2]))
+    for scale in (1, 2):
+        decoder = MJPEGDecoder(n_workers=2, inference_scale=scale)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for pair in pairs:
+                decoder.decode_many(pair, scale)
+        elapsed = time.perf_counter() - start
+        decoder.close()
+        label = 'pool par completo' if scale == 1 else f'pool par 1/{scale}'
+        results[label] = elapsed * 1000.0 / (repeats * max(len(pairs), 1))
+
+    return results
+
+
+def main():
+    if len(sys.argv) > 1:
+        jpegs = load_jpegs(sys.argv[1])
+        source = sys.argv[1]
+    else:
+        jpegs = synthetic_jpegs()
+        source = 'JPEG sintéticos 640x480'
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    if not jpegs:
+        print(f"✗ No hay archivos .jpg en: {source}")
+        return
+
+    height, width = cv2.imdecode(jpegs[0], cv2.IMREAD_COLOR).shape[:2]
+    print("\n" + "="*70)
+    print("BENCHMARK DE DECODIFICACIÓN MJPEG")
+    print("="*70)
+    print(f"  Origen: {source} ({len(jpegs)} frames, {width}x{height})")
+    print(f"  Repeticiones: {repeats}\n")
+
+    results = benchmark_decode(jpegs, repeats)
+    baseline = results['completa']
+    for label, ms in results.items():
+        # un par son dos frames: se compara contra dos decodificaciones
+        frames = 2 if label.startswith('pool') else 1
+        unit = 'par' if frames == 2 else 'frame'
+        print(f"  {label:<24} {ms:7.2f} ms/{unit:<5}  "
+              f"({frames * baseline / ms:4.1f}x vs completa en serie)")
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: captura + detección en un proceso vs un proceso por cámara
+Procesa una sesión grabada (StereoSessionRecorder) tan rápido como sea
+posible y compara los pares por segundo de:
+- un solo proceso: StereoSessionReplay + dos HandDetector en serie,
+- multi-proceso: MultiProcessStereoCapture (un worker por cámara con
+  captura, RGB y MediaPipe; frames y landmarks en memoria compartida).
+
+En ambos casos el proceso principal también voltea y dibuja las manos,
+como main.py. Sin carpeta se graba una sesión sintética de 640x480.
+
+Uso: python -m tests.benchmark_multiprocess [carpeta_de_sesion] [max_pares]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.hand_detector import HandDetector
+from src.vision.multiprocess_capture import MultiProcessStereoCapture
+from src.vision.session_recorder import (StereoSessionRecorder,
+                                         StereoSessionReplay,
+                                         load_session_index)
+
+
+def record_synthetic_session(session_dir, n_pairs=120, width=640, height=480):
+    """Sesión de prueba: textura suave que se desplaza (sin manos)"""
+    rng = np.random.default_rng(0)
+    texture = cv2.resize(rng.integers(0, 255, (height // 8, width // 4, 3),
+                                      np.uint8),
+                         (width * 2, height), interpolation=cv2.INTER_CUBIC)
+    recorder = StereoSessionRecorder(session_dir, video_frame_rate=30)
+    for i in range(n_pairs):
+        x = (i * 4) % width
+        frame = np.ascontiguousarray(texture[:, x:x + width])
+        t = i / 30.0
+        recorder.write(frame, frame, t, t)
+        # la cola de escritura es acotada: dar tiempo al hilo de disco
+        while recorder.pending.qsize() > 32:
+            time.sleep(0.01)
+    recorder.close()
+
+
+def _consume(cam, next_pair, left_detector, right_detector, max_pairs,
+             detect_in_process):
+    """Consume pares hasta el final; retorna (pares, segundos)"""
+    pairs = 0
+    start = None
+    last_seq = -1
+    while pairs < max_pairs:
+        finished, (frame_left, frame_right, _, _, seq) = \
+            next_pair(last_seq)
+        if finished:
+            break
+        if seq < 0:
+            continue
+        if start is None:
+            # no contar el arranque (procesos, modelos)
+            start = time.perf_counter()
+        last_seq = seq
+
+        frame_left = cv2.flip(frame_left, -1)
+        frame_right = cv2.flip(frame_right, -1)
+        for detector, frame in ((left_detector, frame_left),
+                                (right_detector, frame_right)):
+            if detector.findHands(frame if detect_in_process else None):
+                detector.getFingerTipsPos()
+                detector.drawHands(frame)
+                detector.drawTips(frame)
+        pairs += 1
+    elapsed = time.perf_counter() - start if start else 0.0
+    return pairs, elapsed
+
+
+def benchmark_single_process(session_dir, max_pairs):
+    cam = StereoSessionReplay(session_dir, realtime=False)
+    width, height = cam.get_curr_config_widht(), cam.get_curr_config_height()
+    left_detector = HandDetector(img_width=width, img_height=height)
+    right_detector = HandDetector(img_width=width, img_height=height)
+    cam.start()
+    result = _consume(cam,
+                      lambda seq: cam.next_new(seq, timeout=5),
+                      left_detector, right_detector, max_pairs,
+                      detect_in_process=True)
+    cam.stop()
+    return result
+
+
+def benchmark_multi_process(session_dir, max_pairs):
+    metadata, _ = load_session_index(session_dir)
+    cam = MultiProcessStereoCapture(
+        left_source=os.path.join(session_dir, 'left', '%06d.jpg'),
+        right_source=os.path.join(session_dir, 'right', '%06d.jpg'),
+        video_width=metadata['width'],
+        video_height=metadata['height'],
+        buffer_all=True)
+    left_detector, right_detector = cam.hand_detectors()
+    cam.start()
+    result = _consume(cam,
+                      lambda seq: cam.next_new(seq, timeout=30),
+                      left_detector, right_detector, max_pairs,
+                      detect_in_process=False)
+    cam.stop()
+    return result
+
+
+def main():
+    max_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    tmp = None
+    if len(sys.argv) > 1:
+        session_dir = sys.argv[1]
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        session_dir = tmp.name
+        print("Grabando sesión sintética...")
+        record_synthetic_session(session_dir)
+
+    print("\n" + "="*70)
+    print("BENCHMARK: UN PROCESO vs UN PROCESO POR CÁMARA")
+    print("="*70)
+    print(f"  Sesión: {session_dir}\n")
+
+    for label, benchmark in (('un proceso', benchmark_single_process),
+                             ('multi-proceso', benchmark_multi_process)):
+        pairs, elapsed = benchmark(session_dir, max_pairs)
+        rate = pairs / elapsed if elapsed > 0 else 0.0
+        print(f"  {label:<14} {pairs:5d} pares en {elapsed:6.2f}s "
+              f"→ {rate:6.1f} pares/s")
+    print("="*70 + "\n")
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
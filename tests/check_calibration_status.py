@@ -145,10 +145,13 @@ def check_calibration():
             print(f"\n✓ Calibración de Profundidad COMPLETA:")
             print(f"  Factor de corrección: {depth['factor']:.4f}")
             print(f"  Mediciones realizadas: {depth['num_samples']}")
+            if depth.get('model'):
+                print(f"  Modelo espacial: polinomio de grado {depth['model']['degree']}")
             
             if 'measurements' in depth and len(depth['measurements']) > 0:
                 print(f"\n  Mediciones detalladas:")
-                for i, (real_cm, measured_cm) in enumerate(depth['measurements'], 1):
+                pairs = [(m['real_cm'], m['measured_cm']) for m in depth['measurements']]
+                for i, (real_cm, measured_cm) in enumerate(pairs, 1):
                     error_cm = abs(real_cm - (measured_cm * depth['factor']))
                     error_pct = (error_cm / real_cm) * 100
                     print(f"    {i}. Real: {real_cm:.1f} cm | Medido: {measured_cm:.1f} cm | "
@@ -157,7 +160,7 @@ def check_calibration():
                 
                 # Estadísticas
                 errors = [abs(real - (measured * depth['factor'])) 
-                         for real, measured in depth['measurements']]
+                         for real, measured in pairs]
                 avg_error = np.mean(errors)
                 max_error = np.max(errors)
                 print(f"\n  Estadísticas de error:")
@@ -168,7 +171,16 @@ def check_calibration():
         else:
             print("\n❌ Calibración de Profundidad: NO COMPLETADA")
             print("   Se usará factor por defecto (0.74)")
-            print("   Para mejor precisión, ejecuta: python -m src.main → [P]")
+            print("   Para mejor precisión, ejecuta: python -m src.main → NUEVA CALIBRACIÓN → [P]")
+        
+        # Plano del teclado
+        if data.get('keyboard_plane'):
+            plane = data['keyboard_plane']
+            print(f"\n✓ Plano del teclado: {plane['num_points']} puntos, "
+                  f"RMS {plane['rms_cm']:.2f} cm")
+        else:
+            print("\n⚠ Plano del teclado: NO CALIBRADO (presión por Z)")
+            print("   Para calibrarlo: python -m src.main → NUEVA CALIBRACIÓN → [K]")
         
         # IDs de cámaras
         if 'camera_ids' in data:
@@ -199,7 +211,7 @@ def check_calibration():
             print("   Fase 1: ✓ Cámaras individuales calibradas")
             print("   Fase 2: ✓ Calibración estéreo completada")
             print("   Fase 3: ❌ Falta calibración de profundidad")
-            print("\n   📝 Para mayor precisión: python -m src.main → [P]")
+            print("\n   📝 Para mayor precisión: python -m src.main → NUEVA CALIBRACIÓN → [P]")
             print("   ℹ️  Sistema funcionará con factor por defecto (0.74)")
         elif has_phase1:
             print("\n⚠️  CALIBRACIÓN INCOMPLETA")
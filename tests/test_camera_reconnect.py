@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test del supervisor de reconexión de cámaras
+Verifica que next() no se bloquee mientras la cámara se reconecta, que el
+estado (CameraStatus) se informe correctamente, que la reconexión ocurra
+en segundo plano y que un error inesperado en la captura no deje el hilo
+muerto en STREAMING (stop() retorna). Usa un video sintético como "cámara" (al llegar al EOF
+se pierde y el supervisor la reabre). No requiere cámaras.
+
+Uso: python -m tests.test_camera_reconnect
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.video_thread import VideoThread, CameraStatus
+
+
+WIDTH, HEIGHT = 160, 120
+NUM_FRAMES = 5
+
+
+def _write_video(path):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30,
+                             (WIDTH, HEIGHT))
+    for i in range(NUM_FRAMES):
+        writer.write(np.full((HEIGHT, WIDTH, 3), 50 + i * 10, np.uint8))
+    writer.release()
+
+
+def test_missing_camera_returns_filler_immediately():
+    """Sin dispositivo: RECONNECTING, relleno al instante y luego DEAD"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cam = VideoThread(video_source=os.path.join(tmp, 'no_existe.avi'),
+                          video_width=WIDTH, video_height=HEIGHT,
+                          try_to_reconnect=True, reconnect_backoff=0.05,
+                          reconnect_backoff_max=0.1, max_reconnect_attempts=2)
+        assert cam.get_status() == CameraStatus.RECONNECTING
+        cam.start()
+
+        start = time.perf_counter()
+        finished, frame, seq = cam.next_new(-1, timeout=1.0)
+        elapsed = time.perf_counter() - start
+
+        # no se espera el timeout ni la reconexión
+        assert elapsed < 0.05
+        assert not finished and seq == -1 and not frame.any()
+
+        # se agotan los reintentos: la cámara queda muerta
+        deadline = time.time() + 10
+        while cam.get_status() != CameraStatus.DEAD and time.time() < deadline:
+            time.sleep(0.05)
+        assert cam.get_status() == CameraStatus.DEAD
+        finished, _, _ = cam.next_new(-1, timeout=1.0)
+        assert finished
+        cam.stop()
+    print("✓ Relleno inmediato mientras se reconecta")
+
+
+def test_lost_camera_reconnects_in_background():
+    """El video "se pierde" en el EOF y el supervisor lo reabre solo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cam.avi')
+        _write_video(path)
+
+        cam = VideoThread(video_source=path, video_width=WIDTH,
+                          video_height=HEIGHT, buffer_all=True,
+                          try_to_reconnect=True, reconnect_backoff=0.05,
+                          reconnect_backoff_max=0.1)
+        assert cam.get_status() == CameraStatus.STREAMING
+        cam.start()
+
+        statuses = set()
+        frames = 0
+        last_seq = -1
+        deadline = time.time() + 10
+        while frames < 2 * NUM_FRAMES and time.time() < deadline:
+            finished, frame, seq = cam.next_new(last_seq, timeout=0.5)
+            assert not finished
+            statuses.add(cam.get_status())
+            if seq >= 0:
+                last_seq = seq
+                frames += 1
+        cam.stop()
+
+        # dos pasadas completas del video, con una reconexión en medio
+        assert frames == 2 * NUM_FRAMES
+        assert cam.reconnect_count >= 1
+        assert CameraStatus.STREAMING in statuses
+        assert cam.get_status() == CameraStatus.DEAD
+    print("✓ Reconexión en segundo plano")
+
+
+def test_capture_error_marks_camera_dead():
+    """Una excepción en loop() deja la cámara DEAD y stop() no se cuelga"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cam.avi')
+        _write_video(path)
+
+        cam = VideoThread(video_source=path, video_width=WIDTH,
+                          video_height=HEIGHT, buffer_all=True)
+
+        def broken_loop():
+            raise RuntimeError("fallo simulado")
+        cam.loop = broken_loop
+        cam.start()
+        cam.thread.join(timeout=2)
+        assert not cam.thread.is_alive()
+        assert not cam.frame_grab_on
+        assert cam.get_status() == CameraStatus.DEAD
+        finished, _, _ = cam.next_new(-1, timeout=1.0)
+        assert finished
+
+        start = time.perf_counter()
+        cam.stop()
+        assert time.perf_counter() - start < 1.0
+    print("✓ Error en la captura: cámara DEAD sin colgar stop()")
+
+
+if __name__ == '__main__':
+    test_missing_camera_returns_filler_immediately()
+    test_lost_camera_reconnects_in_background()
+    test_capture_error_marks_camera_dead()
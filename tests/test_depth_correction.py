@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la corrección de profundidad espacial (DepthCorrection)
+Con muestras sintéticas y la calibración del repositorio verifica que:
+- el ajuste de grado 0 sea el factor único de siempre (media de Z real /
+  Z medida) y que con pocas muestras el grado baje solo,
+- un factor que varía en (x, y, z) se recupere y la grilla trilineal
+  reproduzca el polinomio dentro del volumen (y el borde fuera de él),
+- el modelo sobreviva a calibration.json (to_dict / from_dict) y una
+  calibración sin modelo use el factor guardado,
+- DepthEstimator aplique la corrección una sola vez (correct=False da la
+  Z cruda) y DepthCalibrator ajuste el modelo con sus mediciones,
+- StereoFusionStage lea la grilla en la posición de la cámara (la de la
+  calibración) aunque los landmarks lleguen volteados,
+- y mida la corrección de 10 yemas con la grilla contra el polinomio.
+No requiere cámaras.
+
+Uso: python -m tests.test_depth_correction
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.calibration.depth_calibrator import DepthCalibrator
+from src.vision.depth_correction import DepthCorrection, polynomial_exponents
+from src.vision.depth_estimator import DepthEstimator
+from src.vision.hand_landmarks import FINGER_TIP_IDS
+from src.vision.pipeline_stages import StereoFusionStage
+from tests.test_point_rectification import (_fusion_packet, _project_distorted,
+                                            _world_points)
+from tests.test_stereo_band import CALIBRATION_FILE
+
+
+def _true_factor(points):
+    """Factor sintético: más corrección lejos y hacia los bordes"""
+    x, y, z = points.T
+    return 0.9 + 0.002 * (z - 40) - 0.00004 * x ** 2 + 0.0006 * y
+
+
+def _samples(n=60, seed=0):
+    """Posiciones medidas (cm) y Z real para el factor sintético"""
+    rng = np.random.default_rng(seed)
+    measured = np.column_stack([rng.uniform(-20, 20, n),
+                                rng.uniform(-10, 10, n),
+                                rng.uniform(25, 55, n)])
+    return measured, measured[:, 2] * _true_factor(measured)
+
+
+def test_constant_fit():
+    """Grado 0 = media de los cocientes; pocas muestras bajan el grado"""
+    assert len(polynomial_exponents(0)) == 1
+    assert len(polynomial_exponents(1)) == 4
+    assert len(polynomial_exponents(2)) == 10
+
+    measured = np.array([[0, 0, 32.5], [1, 0, 37.0], [0, 1, 44.3],
+                         [2, 1, 46.2]])
+    real = np.array([30.0, 35.0, 40.0, 45.0])
+    model = DepthCorrection.fit(measured, real)
+    assert model.degree == 0
+    assert np.isclose(model.coefficients[0], np.mean(real / measured[:, 2]))
+    assert np.allclose(model.factors(measured), model.coefficients[0])
+    try:
+        DepthCorrection.fit(measured, real[:2])
+        assert False, "debía rechazar largos distintos"
+    except ValueError:
+        pass
+    print(f"✓ Grado 0 con 4 muestras: factor {model.coefficients[0]:.4f}")
+
+
+def test_spatial_fit_and_grid():
+    """El polinomio recupera el factor y la grilla lo reproduce"""
+    measured, real = _samples()
+    model = DepthCorrection.fit(measured, real)
+    assert model.degree == 2
+
+    check, _ = _samples(n=200, seed=1)
+    polynomial = model.evaluate(check)
+    assert np.abs(polynomial - _true_factor(check)).max() < 1e-6
+    grid = model.factors(check)
+    grid_error = np.abs(grid - polynomial).max()
+    assert grid_error < 2e-3, grid_error
+
+    corrected = model.apply(check.copy())
+    assert np.allclose(corrected[:, :2], check[:, :2])
+    assert np.allclose(corrected[:, 2], check[:, 2] * grid)
+
+    constant = DepthCorrection.fit(measured, real, degree=0)
+    single_error = np.abs(constant.apply(check.copy())[:, 2] -
+                          check[:, 2] * _true_factor(check)).mean()
+    spatial_error = np.abs(corrected[:, 2] -
+                           check[:, 2] * _true_factor(check)).mean()
+    assert spatial_error < single_error / 10
+
+    # fuera del volumen: el valor del borde
+    outside = np.array([[0.0, 0.0, 500.0]])
+    edge = np.array([[0.0, 0.0, model.bounds[1][2]]])
+    assert np.isclose(model.factors(outside)[0], model.factors(edge)[0])
+    print(f"✓ Corrección espacial: error {spatial_error:.3f} cm "
+          f"(factor único {single_error:.3f} cm), grilla vs polinomio "
+          f"{grid_error:.1e}")
+
+
+def test_serialization():
+    """to_dict / from_dict por JSON y calibraciones sin modelo"""
+    measured, real = _samples()
+    model = DepthCorrection.fit(measured, real)
+    loaded = DepthCorrection.from_dict(json.loads(json.dumps(
+        model.to_dict())))
+    assert loaded.degree == model.degree
+    assert np.array_equal(loaded.grid, model.grid)
+
+    legacy = DepthCorrection.from_dict(None, factor=0.9557)
+    assert legacy.degree == 0
+    assert np.allclose(legacy.factors(measured), 0.9557)
+    print("✓ Modelo guardado y cargado de calibration.json")
+
+
+def test_estimator_applies_once():
+    """El estimador corrige una vez; correct=False da la Z cruda"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    measured, real = _samples()
+    estimator.depth_correction = DepthCorrection.fit(measured, real)
+
+    points = _world_points(n=10, seed=2)
+    left = _project_distorted(estimator, points, True)
+    right = _project_distorted(estimator, points, False)
+    raw, valid = estimator.triangulate_many(left, right, correct=False)
+    corrected, _ = estimator.triangulate_many(left, right)
+    assert valid.all()
+    assert np.allclose(raw, points * 100.0, atol=0.05)
+    assert np.allclose(corrected[:, 2], raw[:, 2] *
+                       estimator.depth_correction.factors(raw))
+    unrectified, _ = estimator.triangulate_many(left, right, rectify=False,
+                                                correct=False)
+    single = estimator.triangulate_point_DLT(left[0], right[0],
+                                             correct=False)
+    assert np.allclose(single, unrectified[0])
+
+    # Fase 3 con las mismas muestras
+    calibrator = DepthCalibrator(estimator)
+    calibrator.measurements = [(r, m[2]) for r, m in zip(real, measured)]
+    calibrator.samples = [tuple(m) for m in measured]
+    calibrator.correction_factor = calibrator._calculate_correction_factor()
+    fitted = calibrator._fit_correction_model()
+    assert fitted.degree == 2
+    assert np.allclose(fitted.coefficients,
+                       estimator.depth_correction.coefficients)
+    print("✓ Corrección aplicada una vez en el estimador")
+
+
+def test_fusion_reads_camera_position():
+    """Con landmarks volteados la grilla se lee en la posición real"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    measured, _ = _samples()
+    # factor asimétrico en x: leerlo en la posición espejada se notaría
+    real = measured[:, 2] * (0.9 + 0.004 * measured[:, 0])
+    estimator.depth_correction = DepthCorrection.fit(measured, real,
+                                                     degree=1)
+
+    points = _world_points(n=len(FINGER_TIP_IDS), seed=4)
+    expected = points * 100.0
+    expected[:, 2] *= 0.9 + 0.004 * expected[:, 0]
+    for flipped in (False, True):
+        fusion = StereoFusionStage(estimator, None, camera_separation=9)
+        packet = fusion.process(_fusion_packet(estimator, points, flipped))
+        depths = [packet.finger_depths[(0, tip)] for tip in FINGER_TIP_IDS]
+        assert np.allclose(depths, expected[:, 2], atol=0.05), \
+            (flipped, depths, expected[:, 2])
+    print("✓ Corrección leída en la posición de la cámara")
+
+
+def test_cost_per_frame():
+    """Corregir 10 yemas: grilla trilineal vs polinomio"""
+    measured, real = _samples()
+    model = DepthCorrection.fit(measured, real)
+    tips = _samples(n=10, seed=3)[0]
+    n = 2000
+    start = time.perf_counter()
+    for _ in range(n):
+        model.factors(tips)
+    grid_ms = (time.perf_counter() - start) / n * 1000
+    start = time.perf_counter()
+    for _ in range(n):
+        model.evaluate(tips)
+    polynomial_ms = (time.perf_counter() - start) / n * 1000
+    print(f"✓ 10 yemas: grilla {grid_ms:.4f} ms, polinomio "
+          f"{polynomial_ms:.4f} ms")
+
+
+if __name__ == '__main__':
+    test_constant_fit()
+    test_spatial_fit_and_grid()
+    test_serialization()
+    test_estimator_applies_once()
+    test_fusion_reads_camera_position()
+    test_cost_per_frame()
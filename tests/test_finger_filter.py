@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test del banco de filtros de las yemas (FingerFilterBank)
+Con una pulsación sintética (2 cm en 0.1 s a 30 FPS, ruido de 0.2 cm)
+verifica que:
+- One Euro y Kalman tengan menos error en movimiento que el promedio de 5
+  posiciones (suavizado anterior) sin más jitter en reposo,
+- las yemas se actualicen juntas en un paso, con su propio dt, y que una
+  yema nueva salga tal cual se midió,
+- las yemas sin medición se descarten tras timeout_s y las filas crezcan y
+  se reutilicen,
+- StereoFusionStage filtre todas las yemas con el banco usando el
+  timestamp del paquete,
+- DepthEstimator.smooth_position conserve el promedio móvil.
+No requiere cámaras.
+
+Uso: python -m tests.test_finger_filter
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.depth_estimator import DepthEstimator
+from src.vision.finger_filter import FingerFilterBank, FILTER_MODES
+from src.vision.hand_landmarks import FINGER_TIP_IDS
+from src.vision.pipeline_stages import StereoFusionStage
+from tests.test_point_rectification import _fusion_packet, _world_points
+from tests.test_stereo_band import CALIBRATION_FILE
+
+
+FPS = 30
+KEY = (0, 8)
+
+
+def _press(seed=0):
+    """Tiempos, posición real y medida (cm) de dos pulsaciones de 2 cm"""
+    t = np.arange(0, 3, 1 / FPS)
+    z = np.full_like(t, 40.0)
+    for t0 in (1.0, 2.0):
+        z -= (np.clip((t - t0) / 0.1, 0, 1) -
+              np.clip((t - t0 - 0.4) / 0.1, 0, 1)) * 2.0
+    truth = np.column_stack([np.full_like(t, 5.0), np.full_like(t, 3.0), z])
+    rng = np.random.default_rng(seed)
+    return t, truth, truth + rng.normal(0, 0.2, truth.shape)
+
+
+def _run(bank, t, measured, truth):
+    """(jitter en reposo, error medio en movimiento) de Z en cm"""
+    out = np.array([bank.update([KEY], measured[i:i + 1], t[i])[0]
+                    for i in range(len(t))])
+    rest = (t > 0.4) & (t < 0.95)
+    moving = (t >= 1.0) & (t < 1.3)
+    jitter = np.std(out[rest, 2] - truth[rest, 2])
+    error = np.abs(out[moving, 2] - truth[moving, 2]).mean()
+    return jitter, error
+
+
+def test_jitter_and_lag():
+    """Menos error en movimiento que el promedio, sin más jitter"""
+    t, truth, measured = _press()
+    results = {mode: _run(FingerFilterBank(mode), t, measured, truth)
+               for mode in FILTER_MODES}
+    mean_jitter, mean_error = results['mean']
+    for mode in ('one_euro', 'kalman'):
+        jitter, error = results[mode]
+        assert jitter <= mean_jitter * 1.1, (mode, jitter, mean_jitter)
+        assert error < mean_error * 0.9, (mode, error, mean_error)
+    raw = np.std(measured[(t > 0.4) & (t < 0.95), 2] - 40.0)
+    print(f"✓ Jitter / error en movimiento (cm), crudo {raw:.3f}: " +
+          ", ".join(f"{mode} {j:.3f} / {e:.3f}"
+                    for mode, (j, e) in results.items()))
+
+
+def test_vectorized_update():
+    """Varias yemas en un paso, cada una con su dt"""
+    t, truth, measured = _press()
+    keys = [(0, tip) for tip in FINGER_TIP_IDS]
+    offsets = np.arange(len(keys))[:, None] * [2.0, 0.0, 1.0]
+    for mode in FILTER_MODES:
+        bank = FingerFilterBank(mode, capacity=2)
+        singles = [FingerFilterBank(mode) for _ in keys]
+        for i in range(len(t)):
+            batch = bank.update(keys, measured[i] + offsets, t[i])
+            for k, single in enumerate(singles):
+                expected = single.update([KEY], measured[i:i + 1] +
+                                         offsets[k], t[i])
+                assert np.allclose(batch[k], expected[0])
+        assert len(bank) == len(keys) and len(bank.active) >= len(keys)
+
+    # una yema nueva sale tal cual; las demás siguen filtradas
+    bank = FingerFilterBank('one_euro')
+    bank.update([KEY], [[0.0, 0.0, 40.0]], 0.0)
+    out = bank.update([KEY, (1, 8)], [[0.0, 0.0, 42.0], [1.0, 2.0, 3.0]],
+                      1 / FPS)
+    assert 40.0 < out[0, 2] < 42.0
+    assert np.array_equal(out[1], [1.0, 2.0, 3.0])
+    print("✓ Actualización vectorizada == un filtro por yema")
+
+
+def test_eviction():
+    """Yemas sin medición se descartan tras timeout_s"""
+    bank = FingerFilterBank('kalman', timeout_s=0.5, capacity=1)
+    bank.update([(0, 4), (0, 8)], [[0, 0, 40], [1, 0, 40]], 0.0)
+    bank.update([(0, 8)], [[1, 0, 41]], 0.3)
+    assert (0, 4) in bank and len(bank) == 2
+    assert bank.evict(0.6) == 1
+    assert (0, 4) not in bank and (0, 8) in bank
+
+    # vuelve tras el timeout: arranca de nuevo sin arrastrar el estado
+    out = bank.update([(0, 4)], [[9.0, 9.0, 30.0]], 2.0)
+    assert np.array_equal(out[0], [9.0, 9.0, 30.0])
+    assert (0, 8) not in bank and len(bank) == 1
+    assert len(bank.active) == 2     # reutiliza las filas libres
+
+    never = FingerFilterBank('mean', timeout_s=None)
+    never.update([KEY], [[0, 0, 40]], 0.0)
+    assert never.evict(1e6) == 0 and KEY in never
+    try:
+        FingerFilterBank('median')
+        assert False, "debía rechazar el modo"
+    except ValueError:
+        pass
+    print("✓ Descarte por timeout y reutilización de filas")
+
+
+def test_fusion_stage_filter():
+    """La fusión filtra todas las yemas con el timestamp del paquete"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    points = _world_points(n=len(FINGER_TIP_IDS), seed=1)
+    bank = FingerFilterBank('one_euro')
+    fusion = StereoFusionStage(estimator, None, camera_separation=9,
+                               finger_filter=bank)
+
+    packet = _fusion_packet(estimator, points)
+    packet.timestamp = 10.0
+    first = fusion.process(packet).finger_depths
+    expected = points[:, 2] * 100.0 * estimator.DEPTH_CORRECTION_FACTOR
+    assert np.allclose([first[(0, tip)] for tip in FINGER_TIP_IDS],
+                       expected, atol=0.05)
+    assert len(bank) == len(FINGER_TIP_IDS)
+    assert np.all(bank.last_time[list(bank.slots.values())] == 10.0)
+
+    # las yemas se alejan 3 cm: la salida queda entre la anterior y la nueva
+    moved = points + [0.0, 0.0, 0.03]
+    packet = _fusion_packet(estimator, moved)
+    packet.timestamp = 10.0 + 1 / FPS
+    second = fusion.process(packet).finger_depths
+    farther = moved[:, 2] * 100.0 * estimator.DEPTH_CORRECTION_FACTOR
+    depths = np.array([second[(0, tip)] for tip in FINGER_TIP_IDS])
+    assert np.all((depths > expected) & (depths < farther)), depths
+    print(f"✓ Fusión filtrada: {np.mean(depths - expected):.2f} cm de "
+          f"{np.mean(farther - expected):.2f} cm en el primer frame")
+
+
+def test_depth_estimator_smoothing():
+    """smooth_position sigue siendo el promedio de las últimas N"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    positions = [(i, 0.0, 2.0 * i) for i in range(8)]
+    out = [estimator.smooth_position(p, landmark_id=3) for p in positions]
+    for i, smoothed in enumerate(out):
+        window = positions[max(0, i - 4):i + 1]
+        assert np.allclose(smoothed, np.mean(window, axis=0))
+
+    estimator.reset_smoothing(3)
+    assert estimator.smooth_position((1, 1, 1), 3) == (1, 1, 1)
+    estimator.enable_smoothing(False)
+    assert estimator.smooth_position((5, 5, 5), 3) == (5, 5, 5)
+    print("✓ DepthEstimator.smooth_position: promedio de 5 posiciones")
+
+
+if __name__ == '__main__':
+    test_jitter_and_lag()
+    test_vectorized_update()
+    test_eviction()
+    test_fusion_stage_filter()
+    test_depth_estimator_smoothing()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la orientación de los frames (StereoConfig.FRAME_ORIENTATION)
+Verifica que:
+- detectar sobre el frame de la cámara (en RGB) y voltear los landmarks
+  dé las mismas yemas que detectar sobre el frame volteado,
+- CaptureStage voltee cada cámara una sola vez directo en su mitad de la
+  ventana (display) en los tres modos, entregue la inferencia en RGB sin
+  flip con 'coordinates' y compose_display no copie si se dibujó en el
+  lugar,
+- HandDetectionStage calcule la banda estéreo y el emparejamiento en el
+  frame de la cámara en los tres modos, y entregue la banda en el frame
+  donde corre la inferencia derecha.
+No requiere cámaras ni MediaPipe.
+
+Uso: python -m tests.test_frame_orientation
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.contour_hand_detector import ContourHandDetector
+from src.vision.depth_estimator import DepthEstimator
+from src.vision.hand_landmarks import flip_box, flip_points
+from src.vision.pipeline import FramePacket
+from src.vision.pipeline_stages import (CaptureStage, HandDetectionStage,
+                                        FULL_REQUIREMENTS, compose_display)
+from tests.test_hand_backends import _hand_image
+from tests.test_stereo_band import (CALIBRATION_FILE, DEPTH_RANGE,
+                                    _FakeDetector, _hand_points)
+
+
+WIDTH, HEIGHT = 640, 480
+
+
+def test_landmark_flip():
+    """Flip de coordenadas == inferencia sobre el frame volteado"""
+    img, _ = _hand_image()
+    camera_frame = cv2.flip(img, -1)    # la cámara entrega la mano invertida
+
+    detector = ContourHandDetector(img_width=WIDTH, img_height=HEIGHT)
+    expected = detector.detect(cv2.flip(camera_frame, -1)).tips[0].copy()
+
+    detector.setInputRGB(True)
+    detector.detect(cv2.cvtColor(camera_frame, cv2.COLOR_BGR2RGB))
+    flipped = detector.getLandmarks().flip(WIDTH, HEIGHT).tips[0, :, :2]
+    flipped = flipped[np.argsort(flipped[:, 0])]
+    error = np.hypot(*(flipped - expected).T)
+    # la segmentación corre a media escala: ~2 px de diferencia
+    assert np.all(error < 3), error
+
+    box = (10, 20, 110, 220)
+    assert flip_box(box, WIDTH, HEIGHT) == (530, 260, 630, 460)
+    assert flip_box(flip_box(box, WIDTH, HEIGHT), WIDTH, HEIGHT) == box
+    print(f"✓ Yemas volteadas por coordenadas a {error.max():.1f} px")
+
+
+class _FakeStereoCam:
+    """Par fijo de ruido (sin simetrías que oculten un flip o un cruce)"""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        self.left, self.right = rng.integers(0, 256, (2, HEIGHT, WIDTH, 3),
+                                             dtype=np.uint8)
+        self.seq = -1
+
+    def next_new(self, after_seq=-1, timeout=None, black=True):
+        self.seq += 1
+        return False, (self.left, self.right, 0.0, 0.0, self.seq)
+
+    def get_display_pair(self):
+        return self.left, self.right
+
+
+def test_capture_orientations():
+    """Composición en display y frames de inferencia por modo"""
+    cam = _FakeStereoCam()
+    flipped_left = cv2.flip(cam.left, -1)
+    flipped_right = cv2.flip(cam.right, -1)
+
+    packet = CaptureStage(cam).process(None)
+    assert packet.display.shape == (HEIGHT, 2 * WIDTH, 3)
+    assert np.array_equal(packet.display[:, :WIDTH], flipped_left)
+    assert np.array_equal(packet.display[:, WIDTH:], flipped_right)
+    assert np.shares_memory(packet.frame_left, packet.display)
+    assert packet.infer_left is packet.frame_left
+    assert not packet.flip_landmarks
+
+    # dibujar en el lugar no copia; reemplazar un frame concatena
+    cv2.circle(packet.frame_left, (50, 50), 5, (0, 0, 255), cv2.FILLED)
+    assert compose_display(packet, packet.frame_left,
+                           packet.frame_right) is packet.display
+    assert tuple(packet.display[50, 50]) == (0, 0, 255)
+    replaced = compose_display(packet, packet.frame_left.copy(),
+                               packet.frame_right)
+    assert replaced is not packet.display
+    assert np.array_equal(replaced, packet.display)
+
+    packet = CaptureStage(cam, orientation='coordinates',
+                          swap_display=True).process(None)
+    assert np.array_equal(packet.display[:, :WIDTH], flipped_right)
+    assert np.array_equal(packet.frame_left, flipped_left)
+    assert np.array_equal(packet.infer_left,
+                          cv2.cvtColor(cam.left, cv2.COLOR_BGR2RGB))
+    assert packet.flip_landmarks
+    assert compose_display(packet, packet.frame_left, packet.frame_right,
+                           swap=True) is packet.display
+
+    packet = CaptureStage(cam, orientation='source').process(None)
+    assert np.array_equal(packet.frame_left, cam.left)
+    assert not np.shares_memory(packet.frame_left, cam.left)
+    assert packet.infer_left is packet.frame_left
+
+    try:
+        CaptureStage(cam, orientation='mirror')
+        assert False, "debía rechazar una orientación desconocida"
+    except ValueError:
+        pass
+    print("✓ CaptureStage: un flip por cámara directo en la ventana")
+
+
+def _packet(seq, orientation):
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    return FramePacket(seq, infer_left='L', infer_right='R',
+                       frame_left=frame, frame_right=frame,
+                       flip_landmarks=orientation == 'coordinates',
+                       display_flipped=orientation != 'source',
+                       hand_landmarks=None, requirements=FULL_REQUIREMENTS)
+
+
+def test_stage_flips_landmarks_and_band():
+    """Misma geometría estéreo en los tres modos de orientación"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    left_a, right_a = _hand_points(estimator, -10.0, 40.0)
+    left_b, right_b = _hand_points(estimator, 6.0, 50.0)
+    # yemas en el frame de la cámara (el de la calibración)
+    hands_left = [left_a, left_b]
+    hands_right = [right_b, right_a, right_a + [0, 80]]
+
+    def to_display(points):
+        return flip_points(points, WIDTH, HEIGHT)
+
+    results = {}
+    for orientation in CaptureStage.ORIENTATIONS:
+        # 'pixels': los detectores ven el frame volteado
+        seen = to_display if orientation == 'pixels' else \
+            (lambda points: points)
+        left = _FakeDetector([seen(tips) for tips in hands_left])
+        right = _FakeDetector([seen(tips) for tips in hands_right])
+        stage = HandDetectionStage(left, right, estimator,
+                                   depth_range_cm=DEPTH_RANGE)
+        packet = stage.process(_packet(0, orientation))
+        results[orientation] = (packet, right.band)
+
+    camera, camera_band = results['source']
+    for orientation in ('pixels', 'coordinates'):
+        packet, band = results[orientation]
+        # landmarks en el punto de vista volteado
+        assert np.allclose(packet.hands_left.points[..., :2],
+                           to_display(camera.hands_left.points[..., :2]))
+        assert packet.hand_pairs.tolist() == [[0, 1], [1, 0]]
+    assert camera.hand_pairs.tolist() == [[0, 1], [1, 0]]
+    # banda en el frame donde corre la inferencia derecha
+    assert np.allclose(results['coordinates'][1], camera_band)
+    assert np.allclose(results['pixels'][1],
+                       flip_box(camera_band, WIDTH, HEIGHT))
+    print("✓ HandDetectionStage: banda y emparejamiento en el frame de la "
+          "cámara")
+
+
+if __name__ == '__main__':
+    test_landmark_flip()
+    test_capture_orientations()
+    test_stage_flips_landmarks_and_band()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test del buffer circular de frames (FrameRingBuffer)
+Verifica la semántica borrow/release, que los consumidores reciban vistas
+(no copias), que el modo FIFO no pierda frames y que al re-dimensionar
+el buffer (otra resolución, distinta por stream) la numeración continúe y
+los consumidores en espera despierten. No requiere cámaras.
+
+Uso: python -m tests.test_frame_ring_buffer
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.frame_ring_buffer import FrameRingBuffer
+
+
+SHAPE = (4, 6, 3)
+
+
+def _write(ring, value, timestamp=0.0):
+    slot, views = ring.acquire_write()
+    for view in views:
+        view[:] = value
+    return ring.commit(slot, (timestamp,) * ring.n_streams)
+
+
+def test_borrow_returns_view_of_latest():
+    """El consumidor recibe una vista del slot más reciente, sin copia"""
+    ring = FrameRingBuffer(3, SHAPE)
+    for value in range(5):
+        _write(ring, value, timestamp=value * 0.1)
+
+    seq, (frame,), timestamps = ring.borrow()
+    assert seq == 4
+    assert frame[0, 0, 0] == 4
+    assert timestamps == (0.4,)
+    assert np.shares_memory(frame, ring.frames)
+
+    # no hay frames más nuevos que el prestado
+    assert ring.borrow(after_seq=seq) is None
+    ring.release(seq)
+    print("✓ borrow entrega vistas del último frame")
+
+
+def test_borrowed_slot_is_not_overwritten():
+    """Un slot prestado no se pisa aunque el productor siga escribiendo"""
+    ring = FrameRingBuffer(3, SHAPE)
+    _write(ring, 7)
+    seq, (frame,), _ = ring.borrow()
+
+    for value in range(20):
+        _write(ring, 100 + value)
+
+    assert frame[0, 0, 0] == 7
+    ring.release(seq)
+
+    seq, (frame,), _ = ring.borrow(after_seq=seq)
+    assert frame[0, 0, 0] == 119
+    ring.release(seq)
+    print("✓ los slots prestados quedan protegidos")
+
+
+def test_fifo_mode_does_not_drop_frames():
+    """En modo FIFO (archivos) el consumidor recibe todos los frames en orden"""
+    ring = FrameRingBuffer(3, SHAPE, overwrite=False)
+    n_frames = 30
+
+    def producer():
+        for value in range(n_frames):
+            slot = ring.acquire_write(timeout=5)
+            assert slot is not None
+            index, (view,) = slot
+            view[:] = value
+            ring.commit(index)
+        ring.close()
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+
+    received = []
+    last_seq = -1
+    while True:
+        borrowed = ring.borrow(after_seq=last_seq, timeout=1)
+        if borrowed is None:
+            break
+        seq, (frame,), _ = borrowed
+        received.append(int(frame[0, 0, 0]))
+        ring.release(seq)
+        last_seq = seq
+
+    thread.join()
+    assert received == list(range(n_frames))
+    print("✓ modo FIFO sin pérdida de frames")
+
+
+def test_stereo_slots_share_sequence():
+    """Con dos streams ambos frames del slot comparten secuencia"""
+    ring = FrameRingBuffer(4, SHAPE, n_streams=2)
+    slot, (left, right) = ring.acquire_write()
+    left[:] = 1
+    right[:] = 2
+    ring.commit(slot, (1.0, 1.002))
+
+    seq, (left, right), (t_left, t_right) = ring.borrow()
+    assert seq == 0
+    assert left[0, 0, 0] == 1 and right[0, 0, 0] == 2
+    assert t_right - t_left > 0
+    ring.release(seq)
+    print("✓ pares estéreo con secuencia común")
+
+
+def test_wait_new_wakes_on_commit():
+    """wait_new bloquea hasta que el productor publica un frame nuevo"""
+    ring = FrameRingBuffer(3, SHAPE)
+    _write(ring, 1)
+
+    # no hay nada más nuevo que el frame 0: vence el timeout
+    assert not ring.wait_new(after_seq=0, timeout=0.05)
+
+    timer = threading.Timer(0.05, _write, args=(ring, 2))
+    timer.start()
+    assert ring.wait_new(after_seq=0, timeout=2)
+    timer.join()
+
+    seq, (frame,), _ = ring.borrow(after_seq=0)
+    assert seq == 1 and frame[0, 0, 0] == 2
+    ring.release(seq)
+    print("✓ wait_new despierta con cada frame nuevo")
+
+
+def test_resized_continues_sequence():
+    """El buffer re-dimensionado sigue la numeración y despierta a los que esperan"""
+    ring = FrameRingBuffer(3, SHAPE, n_streams=2)
+    _write(ring, 1)
+    _write(ring, 2)
+    last_seq, _, _ = ring.borrow()
+    ring.release(last_seq)
+
+    # un consumidor bloqueado en el buffer viejo
+    woke = []
+    waiter = threading.Thread(
+        target=lambda: woke.append(ring.wait_new(last_seq, timeout=5)))
+    waiter.start()
+
+    # la cámara derecha entrega otra resolución que la izquierda
+    right_shape = (8, 12, 3)
+    resized = ring.resized([SHAPE, right_shape])
+    waiter.join(timeout=2)
+    assert not waiter.is_alive() and woke == [False]
+    assert ring.closed and not resized.closed
+    assert resized.frame_shape is None
+    assert resized.stream_shapes == [SHAPE, right_shape]
+
+    slot, (left, right) = resized.acquire_write()
+    assert left.shape == SHAPE and right.shape == right_shape
+    left[:] = 3
+    right[:] = 4
+    resized.commit(slot, (1.0, 1.0))
+
+    # el consumidor que guardó last_seq recibe el frame nuevo
+    seq, (left, right), _ = resized.borrow(after_seq=last_seq)
+    assert seq == last_seq + 1
+    assert left[0, 0, 0] == 3 and right[0, 0, 0] == 4
+    resized.release(seq)
+    print("✓ re-dimensionar continúa la numeración")
+
+
+if __name__ == '__main__':
+    test_borrow_returns_view_of_latest()
+    test_borrowed_slot_is_not_overwritten()
+    test_fifo_mode_does_not_drop_frames()
+    test_stereo_slots_share_sequence()
+    test_wait_new_wakes_on_commit()
+    test_resized_continues_sequence()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la interfaz común de detectores (BaseHandDetector.detect)
+Con una mano dibujada (palma, cinco dedos y antebrazo color piel) verifica
+que:
+- ContourHandDetector encuentre las cinco yemas cerca de la punta de cada
+  dedo, también sobre la copia reducida del frame, y baje la confianza
+  con los dedos cerrados,
+- HandDetector y HandTracker respondan detect(frame) con el mismo
+  resultado (yemas, lateralidad, confianza) que findHands/getLandmarks,
+- la interfaz de HandDetector (yemas, dibujo) funcione sobre cualquier
+  backend.
+No requiere cámaras.
+
+Uso: python -m tests.test_hand_backends
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mediapipe.framework.formats import landmark_pb2
+
+from src.vision.contour_hand_detector import ContourHandDetector
+from src.vision.hand_detector import HandDetector
+from src.vision.hand_landmarks import FINGER_TIP_IDS
+from src.vision.hand_tracker import HandTracker
+
+
+WIDTH, HEIGHT = 640, 480
+SKIN = (140, 170, 220)       # BGR dentro del rango de piel en YCrCb
+PALM, FINGER_LENGTH, FINGER_WIDTH = (320, 300), 130, 18
+
+
+def _hand_image(fingers=True):
+    """Frame con una mano; retorna (imagen, puntas de los dedos (5, 2))"""
+    img = np.full((HEIGHT, WIDTH, 3), 30, np.uint8)
+    cv2.circle(img, PALM, 50, SKIN, cv2.FILLED)
+    cv2.rectangle(img, (280, 330), (360, HEIGHT - 1), SKIN, cv2.FILLED)
+    ends = []
+    for angle in np.deg2rad((-150, -115, -90, -65, -35)):
+        end = (int(PALM[0] + FINGER_LENGTH * np.cos(angle)),
+               int(PALM[1] + FINGER_LENGTH * np.sin(angle)))
+        ends.append(end)
+        if fingers:
+            cv2.line(img, PALM, end, SKIN, FINGER_WIDTH)
+    return img, np.array(ends, np.float32)
+
+
+def test_contour_backend():
+    """Yemas del backend de contornos en píxeles del frame completo"""
+    img, ends = _hand_image()
+    detector = ContourHandDetector(img_width=WIDTH, img_height=HEIGHT)
+    detection = detector.detect(img)
+    assert len(detection) == 1 and detection.tips.shape == (1, 5, 2)
+    error = np.hypot(*(detection.tips[0] - ends).T)
+    # la yema queda en el borde del dedo: a medio ancho de la punta
+    assert np.all(error < FINGER_WIDTH), error
+    assert detection.confidence[0] == 1.0 and detection.handedness[0] == -1
+
+    # misma mano en la copia reducida: mismos píxeles del frame completo
+    reduced = cv2.resize(img, (WIDTH // 2, HEIGHT // 2),
+                         interpolation=cv2.INTER_AREA)
+    tips_reduced = detector.detect(reduced).tips[0]
+    assert np.all(np.hypot(*(tips_reduced - ends).T) < FINGER_WIDTH * 1.5)
+
+    # puño: sin yemas lejos de la palma, baja la confianza
+    fist, _ = _hand_image(fingers=False)
+    detection = detector.detect(fist)
+    assert len(detection) == 1 and detection.confidence[0] < 0.5
+    assert len(detector.detect(np.zeros_like(img))) == 0
+    print(f"✓ Contornos: 5 yemas a {error.max():.1f} px de las puntas")
+
+
+def test_protocol_across_backends():
+    """detect(frame) y la interfaz de HandDetector sobre cada backend"""
+    img, _ = _hand_image()
+
+    # HandDetector con un modelo falso (una mano en el centro)
+    mediapipe_detector = HandDetector(img_width=WIDTH, img_height=HEIGHT)
+    hand = landmark_pb2.NormalizedLandmarkList()
+    for i in range(21):
+        hand.landmark.add(x=0.5 + 0.01 * (i % 5), y=0.5 + 0.01 * (i // 5))
+    mediapipe_detector.hands = SimpleNamespace(
+        process=lambda image: SimpleNamespace(
+            multi_hand_landmarks=[hand],
+            multi_handedness=[SimpleNamespace(classification=[
+                SimpleNamespace(index=1, score=0.9, label='Right')])]))
+
+    backends = {'mediapipe': mediapipe_detector,
+                'contornos': ContourHandDetector(img_width=WIDTH,
+                                                 img_height=HEIGHT)}
+    backends['tracker'] = HandTracker(
+        ContourHandDetector(img_width=WIDTH, img_height=HEIGHT),
+        detection_interval=2)
+    for name, detector in backends.items():
+        detection = detector.detect(img)
+        landmarks = detector.getLandmarks()
+        assert len(detection) == 1, name
+        assert np.array_equal(detection.tips, landmarks.tips[:, :, :2]), name
+        assert np.array_equal(detection.handedness, landmarks.handedness)
+        hands, fingertips = detector.getFingerTipsPos()
+        assert len(hands) == 1 and [f[1] for f in fingertips] == \
+            list(FINGER_TIP_IDS), name
+        canvas = img.copy()
+        detector.drawHands(canvas, detector.getResults())
+        detector.drawTips(canvas, detector.getResults())
+        assert not np.array_equal(canvas, img), name
+    assert mediapipe_detector.getFingerTipsPos()[0][0].label == 'Right'
+    print(f"✓ detect(frame) en {len(backends)} backends")
+
+
+if __name__ == '__main__':
+    test_contour_backend()
+    test_protocol_across_backends()
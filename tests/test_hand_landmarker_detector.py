@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test del backend asíncrono de MediaPipe Tasks (HandLandmarkerDetector)
+Reemplaza el HandLandmarker por uno falso que entrega el resultado desde
+otro hilo cuando el test lo libera y verifica que:
+- el resultado de Tasks pase a píxeles con la lateralidad por etiqueta,
+- findHands no espere la inferencia y tome el último resultado completado,
+- los timestamps enviados sean estrictamente crecientes,
+- getFingerTipsPos tenga el formato de HandDetector.
+No requiere cámaras ni el modelo hand_landmarker.task.
+
+Uso: python -m tests.test_hand_landmarker_detector
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mediapipe.tasks.python.components.containers.category import Category
+from mediapipe.tasks.python.components.containers.landmark import \
+    NormalizedLandmark
+from mediapipe.tasks.python.vision.hand_landmarker import HandLandmarkerResult
+
+from src.vision.hand_landmarks import HandLandmarks, FINGER_TIP_IDS
+from src.vision.hand_landmarker_detector import HandLandmarkerDetector
+
+
+WIDTH, HEIGHT = 640, 480
+
+
+def _task_result(hands):
+    """HandLandmarkerResult con manos (etiqueta, score, x0, y0)"""
+    return HandLandmarkerResult(
+        handedness=[[Category(index=0, score=score, category_name=label)]
+                    for label, score, _, _ in hands],
+        hand_landmarks=[[NormalizedLandmark(x=x0 + 0.01 * (i % 5),
+                                            y=y0 + 0.02 * (i // 5),
+                                            z=-0.01 * i)
+                         for i in range(21)]
+                        for _, _, x0, y0 in hands],
+        hand_world_landmarks=[])
+
+
+class _FakeLandmarker:
+    """HandLandmarker falso: responde desde otro hilo al liberarlo"""
+
+    def __init__(self, callback, result):
+        self.callback = callback
+        self.result = result
+        self.timestamps = []
+        self.release = threading.Event()
+        self.threads = []
+
+    def detect_async(self, image, timestamp_ms):
+        self.timestamps.append(timestamp_ms)
+
+        def infer():
+            self.release.wait(timeout=5)
+            self.callback(self.result, image, timestamp_ms)
+        thread = threading.Thread(target=infer)
+        thread.start()
+        self.threads.append(thread)
+
+    def finish(self):
+        self.release.set()
+        for thread in self.threads:
+            thread.join()
+        self.release.clear()
+
+    def close(self):
+        self.finish()
+
+
+class _FakeLandmarkerDetector(HandLandmarkerDetector):
+    result = None
+
+    def _createLandmarker(self):
+        return _FakeLandmarker(self._onResult, self.result)
+
+
+def test_task_result_to_pixels():
+    """Landmarks en píxeles y lateralidad según la etiqueta de Tasks"""
+    landmarks = HandLandmarks(max_hands=2).fill_from_task_result(
+        _task_result([('Right', 0.9, 0.5, 0.4), ('Left', 0.8, 0.2, 0.5)]),
+        WIDTH, HEIGHT)
+    assert len(landmarks) == 2 and landmarks.labels == ['Right', 'Left']
+    assert np.allclose(landmarks.scores, [0.9, 0.8])
+    assert np.allclose(landmarks.points[0, 8],
+                       [(0.5 + 0.03) * WIDTH, (0.4 + 0.02) * HEIGHT,
+                        -0.08 * WIDTH])
+    empty = HandLandmarks(2).fill_from_task_result(
+        HandLandmarkerResult([], [], []), WIDTH, HEIGHT)
+    assert len(empty) == 0
+    print("✓ Resultado de Tasks en píxeles")
+
+
+def test_latest_completed_result():
+    """findHands no espera: entrega el último resultado completado"""
+    _FakeLandmarkerDetector.result = _task_result([('Left', 0.9, 0.3, 0.3)])
+    detector = _FakeLandmarkerDetector('modelo.task', img_width=WIDTH,
+                                       img_height=HEIGHT)
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+
+    start = time.perf_counter()
+    found = detector.findHands(frame)
+    elapsed = time.perf_counter() - start
+    # la inferencia sigue pendiente: sin resultado y sin bloquear
+    assert not found and elapsed < 1.0
+
+    detector.landmarker.finish()
+    assert detector.findHands(frame)
+    first = detector.landmarker.timestamps[0]
+    assert detector.result_timestamp_ms == first
+    # dos envíos en el mismo milisegundo no repiten el timestamp
+    detector.findHands(frame)
+    timestamps = detector.landmarker.timestamps
+    assert all(b > a for a, b in zip(timestamps, timestamps[1:]))
+
+    hands, fingertips = detector.getFingerTipsPos()
+    assert [hand.label for hand in hands] == ['Left']
+    assert [f[:2] for f in fingertips] == [[0, tip] for tip in FINGER_TIP_IDS]
+    assert abs(fingertips[1][2] - (0.3 + 0.03) * WIDTH) < 1e-3
+    stats = detector.getAsyncStats()
+    assert stats['submitted'] == 3 and stats['completed'] == 1
+    detector.close()
+    print(f"✓ findHands sin bloquear ({elapsed * 1000:.1f} ms), "
+          f"último resultado completado")
+
+
+if __name__ == '__main__':
+    test_task_result_to_pixels()
+    test_latest_completed_result()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de HandLandmarks (landmarks de las manos como arreglos NumPy)
+Verifica que:
+- el resultado de MediaPipe pase a (n_hands, 21, 3) en píxeles con
+  lateralidad y scores, y que las yemas sean una vista del mismo arreglo,
+- la tabla de yemas coincida con la lista de getFingerTipsPos,
+- copy() y select() no compartan memoria con el detector,
+- KeyboardMap dé las mismas teclas con HandLandmarks que con la lista.
+No requiere cámaras.
+
+Uso: python -m tests.test_hand_landmarks
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mediapipe.framework.formats import landmark_pb2
+
+from src.vision.hand_landmarks import HandLandmarks, FINGER_TIP_IDS
+from src.vision.keyboard_mapper import KeyboardMap
+from src.piano.virtual_keyboard import VirtualKeyboard
+
+
+WIDTH, HEIGHT = 640, 480
+
+
+def _results(hands):
+    """Resultado de MediaPipe con landmarks normalizados (x, y, z)"""
+    multi_hand_landmarks, multi_handedness = [], []
+    for index, score, points in hands:
+        hand = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in points:
+            hand.landmark.add(x=x, y=y, z=z)
+        multi_hand_landmarks.append(hand)
+        multi_handedness.append(SimpleNamespace(classification=[
+            SimpleNamespace(index=index, score=score,
+                            label=('Left', 'Right')[index])]))
+    return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks,
+                           multi_handedness=multi_handedness)
+
+
+def _hand(x0, y0):
+    """21 landmarks normalizados en una grilla que arranca en (x0, y0)"""
+    return [(x0 + 0.01 * (i % 5), y0 + 0.02 * (i // 5), -0.01 * i)
+            for i in range(21)]
+
+
+def test_fill_from_results():
+    """Píxeles, lateralidad, vista de yemas y tabla de yemas"""
+    landmarks = HandLandmarks(max_hands=2)
+    landmarks.fill_from_results(
+        _results([(1, 0.9, _hand(0.5, 0.4)), (0, 0.8, _hand(0.2, 0.5))]),
+        WIDTH, HEIGHT)
+
+    assert len(landmarks) == 2 and landmarks.points.dtype == np.float32
+    assert landmarks.labels == ['Right', 'Left']
+    assert np.allclose(landmarks.scores, [0.9, 0.8])
+    assert np.allclose(landmarks.points[0, 8],
+                       [(0.5 + 0.03) * WIDTH, (0.4 + 0.02) * HEIGHT,
+                        -0.08 * WIDTH])
+    # las yemas son una vista: sin copias por frame
+    assert np.shares_memory(landmarks.tips, landmarks.buffer)
+    assert np.array_equal(landmarks.tips, landmarks.points[:, FINGER_TIP_IDS])
+
+    hand_ids, tip_ids, xy = landmarks.tip_table()
+    fingertips = landmarks.fingertips_list()
+    assert [f[:2] for f in fingertips] == \
+        [[h, t] for h in range(2) for t in FINGER_TIP_IDS]
+    assert np.allclose(xy, [f[2:] for f in fingertips])
+    assert hand_ids.tolist() == [f[0] for f in fingertips]
+    assert tip_ids.tolist() == [f[1] for f in fingertips]
+
+    x0, y0, x1, y1 = landmarks.boxes()[1]
+    assert np.allclose([x0, y0, x1, y1],
+                       [0.2 * WIDTH, 0.5 * HEIGHT, 0.24 * WIDTH, 0.58 * HEIGHT])
+
+    # un frame sin manos vacía los arreglos
+    landmarks.fill_from_results(SimpleNamespace(multi_hand_landmarks=None),
+                                WIDTH, HEIGHT)
+    assert len(landmarks) == 0 and landmarks.tips.shape == (0, 5, 3)
+    print("✓ Landmarks en píxeles con vista de yemas")
+
+
+def test_copy_and_select():
+    """Las copias sobreviven al próximo frame del detector"""
+    landmarks = HandLandmarks(max_hands=2)
+    landmarks.fill_from_results(
+        _results([(1, 0.9, _hand(0.5, 0.4)), (0, 0.8, _hand(0.2, 0.5))]),
+        WIDTH, HEIGHT)
+    copied = landmarks.copy()
+    swapped = landmarks.select([1, 0])
+    landmarks.fill_from_results(_results([(0, 0.5, _hand(0.1, 0.1))]),
+                                WIDTH, HEIGHT)
+
+    assert len(copied) == 2 and copied.labels == ['Right', 'Left']
+    assert not np.shares_memory(copied.buffer, landmarks.buffer)
+    assert np.allclose(swapped.points[0], copied.points[1])
+    assert swapped.labels == ['Left', 'Right']
+    print("✓ copy() y select() independientes del detector")
+
+
+def test_keyboard_map_accepts_landmarks():
+    """KeyboardMap: mismas teclas con HandLandmarks que con la lista"""
+    virtual_keyboard = VirtualKeyboard(WIDTH, HEIGHT, 14)
+    # índice sobre el teclado, el resto de la mano fuera
+    y_key = (virtual_keyboard.kb_y0 + virtual_keyboard.kb_y1) / 2
+    x_key = virtual_keyboard.kb_x0 + 2.5 * virtual_keyboard.white_key_width
+    points = np.zeros((1, 21, 3), np.float32)
+    points[0, 8, :2] = (x_key, y_key)
+    landmarks = HandLandmarks(1).fill_from_arrays(points,
+                                                  np.array([[0, 0.9]]))
+    finger_depths = {(0, tip): 1.0 for tip in FINGER_TIP_IDS}
+
+    maps = []
+    for fingertips_pos in (landmarks, landmarks.fingertips_list()):
+        keyboard_map = KeyboardMap(depth_threshold=2.5)
+        keyboard_map.velocity_enabled = False
+        maps.append(keyboard_map.get_kayboard_map(
+            virtual_keyboard, fingertips_pos, finger_depths,
+            keyboard_n_key=24))
+    (on_arrays, off_arrays), (on_list, off_list) = maps
+    assert np.flatnonzero(on_arrays).tolist() == \
+        [virtual_keyboard.find_key(x_key, y_key)]
+    assert np.array_equal(on_arrays, on_list)
+    assert np.array_equal(off_arrays, off_list)
+    print(f"✓ KeyboardMap con arreglos: tecla {np.flatnonzero(on_arrays)[0]}")
+
+
+if __name__ == '__main__':
+    test_fill_from_results()
+    test_copy_and_select()
+    test_keyboard_map_accepts_landmarks()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la región de inferencia (ROI) de HandDetector
+Reemplaza el modelo de MediaPipe por uno falso que "ve" una mano en una
+posición fija del frame y verifica que:
+- sin manos previas se busque en el frame completo,
+- con manos, la inferencia use el recorte del teclado o de las manos,
+- los landmarks vuelvan a coordenadas del frame completo (también con
+  la copia de inferencia reducida del modo MJPEG crudo),
+- se vuelva al frame completo al perder la mano y cada N frames,
+- el modo 'band' use la región fijada desde afuera y conserve el recorte
+  mientras la banda tiemble dentro de él.
+No requiere cámaras.
+
+Uso: python -m tests.test_hand_roi
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mediapipe.framework.formats import landmark_pb2
+
+from src.vision.hand_detector import HandDetector
+
+
+WIDTH, HEIGHT = 640, 480
+# la mano ocupa este rectángulo del frame completo (píxeles)
+HAND_BOX = (300, 100, 380, 250)
+KEYBOARD = (112, 156, 528, 276)
+
+
+class _FakeHands:
+    """Modelo falso: ubica la mano en HAND_BOX según el recorte recibido"""
+
+    def __init__(self):
+        self.shapes = []
+        self.roi = None       # recorte que le pasa el detector (píxeles)
+        self.visible = True
+
+    def process(self, image):
+        self.shapes.append(image.shape[:2])
+        if not self.visible:
+            return SimpleNamespace(multi_hand_landmarks=None,
+                                   multi_handedness=None)
+        x0, y0, x1, y1 = self.roi or (0, 0, WIDTH, HEIGHT)
+        hand = landmark_pb2.NormalizedLandmarkList()
+        for i in range(21):
+            # landmarks repartidos en HAND_BOX, normalizados al recorte
+            x = HAND_BOX[0] + (HAND_BOX[2] - HAND_BOX[0]) * (i % 5) / 4
+            y = HAND_BOX[1] + (HAND_BOX[3] - HAND_BOX[1]) * (i // 5) / 4
+            hand.landmark.add(x=(x - x0) / (x1 - x0), y=(y - y0) / (y1 - y0))
+        handedness = SimpleNamespace(classification=[
+            SimpleNamespace(index=0, score=0.9, label='Left')])
+        return SimpleNamespace(multi_hand_landmarks=[hand],
+                               multi_handedness=[handedness])
+
+
+def _detector(roi_mode, interval=60):
+    detector = HandDetector(img_width=WIDTH, img_height=HEIGHT,
+                            roi_mode=roi_mode, roi_margin=20, roi_reach=100,
+                            roi_full_frame_interval=interval)
+    detector.hands = _FakeHands()
+    detector.setKeyboardROI(*KEYBOARD)
+    return detector
+
+
+def _detect(detector, frame):
+    """findHands informando al modelo falso el recorte que se le pasa"""
+    detector.hands.roi = detector._nextROI()
+    found = detector.findHands(frame)
+    return found, detector.getFingerTipsPos()[1]
+
+
+def _assert_tips_in_frame(fingertips):
+    # punta del índice (landmark 8): columna 3, fila 1 de la grilla
+    index_tip = [tip for tip in fingertips if tip[1] == 8][0]
+    assert abs(index_tip[2] - (HAND_BOX[0] + 0.75 * 80)) < 1.5, index_tip
+    assert abs(index_tip[3] - (HAND_BOX[1] + 0.25 * 150)) < 1.5, index_tip
+
+
+def test_keyboard_roi():
+    """Recorte de la banda del teclado y landmarks de vuelta al frame"""
+    detector = _detector('keyboard')
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+
+    found, fingertips = _detect(detector, frame)
+    assert found and detector.roi is None           # sin tracking: completo
+    assert detector.hands.shapes[-1] == (HEIGHT, WIDTH)
+
+    found, fingertips = _detect(detector, frame)
+    assert found
+    expected = (KEYBOARD[2] + 20 - (KEYBOARD[0] - 20),
+                KEYBOARD[3] + 20 - (KEYBOARD[1] - 100 - 20))
+    assert detector.hands.shapes[-1] == (expected[1], expected[0])
+    _assert_tips_in_frame(fingertips)
+    assert 0 < detector.getROIStats()['area'] < 1
+    print(f"✓ ROI del teclado: {detector.roi_area * 100:.0f}% del frame")
+
+
+def test_hands_roi_and_fallback():
+    """Recorte de las manos, pérdida del tracking y búsqueda periódica"""
+    detector = _detector('hands', interval=3)
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+
+    _detect(detector, frame)
+    found, fingertips = _detect(detector, frame)
+    hand_w, hand_h = HAND_BOX[2] - HAND_BOX[0], HAND_BOX[3] - HAND_BOX[1]
+    assert detector.hands.shapes[-1] == (hand_h + 40, hand_w + 40)
+    _assert_tips_in_frame(fingertips)
+
+    # la región se conserva mientras la mano no se acerque al borde
+    roi = detector.roi
+    _detect(detector, frame)
+    assert detector.roi == roi
+
+    # búsqueda completa después de 3 frames seguidos con ROI
+    _detect(detector, frame)
+    assert detector.roi == roi
+    _detect(detector, frame)
+    assert detector.roi is None
+
+    # mano perdida: el siguiente frame busca en el frame completo
+    _detect(detector, frame)
+    detector.hands.visible = False
+    found, _ = _detect(detector, frame)
+    assert not found and detector.roi is not None
+    detector.hands.visible = True
+    _detect(detector, frame)
+    assert detector.roi is None
+    assert detector.getROIStats()['full_ms'] > 0
+    print("✓ ROI de las manos con vuelta al frame completo")
+
+
+def test_band_roi():
+    """Región externa (banda estéreo): se usa aunque no haya manos previas"""
+    detector = _detector('band')
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+
+    _detect(detector, frame)
+    assert detector.roi is None                     # banda sin fijar
+    detector.setSearchBand((-50, 60, 420, 300))
+    detector.hands.visible = False
+    _detect(detector, frame)
+    detector.hands.visible = True
+    found, fingertips = _detect(detector, frame)
+    # banda + margen, recortada al frame
+    assert found and detector.roi == (0, 40, 440, 320)
+    assert detector.hands.shapes[-1] == (280, 440)
+    _assert_tips_in_frame(fingertips)
+    print("✓ ROI de la banda externa")
+
+
+def test_band_roi_hysteresis():
+    """La banda que tiembla unos píxeles no mueve el recorte"""
+    detector = _detector('band')
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    band = np.array([200, 60, 460, 300])
+
+    detector.setSearchBand(tuple(band))
+    _detect(detector, frame)
+    roi = detector.roi
+    assert roi == (180, 40, 480, 320)
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        detector.setSearchBand(tuple(band + rng.integers(-15, 16, 4)))
+        found, fingertips = _detect(detector, frame)
+        assert found and detector.roi == roi
+    assert set(detector.hands.shapes[-20:]) == {(280, 300)}
+    _assert_tips_in_frame(fingertips)
+
+    # la banda sale de la región: se recalcula
+    detector.setSearchBand((240, 60, 500, 300))
+    _detect(detector, frame)
+    assert detector.roi == (220, 40, 520, 320)
+
+    # la banda se achica mucho (una sola mano cerca): también
+    detector.setSearchBand((280, 100, 400, 260))
+    _detect(detector, frame)
+    assert detector.roi == (260, 80, 420, 280)
+    print("✓ Banda con temblor: recorte estable")
+
+
+def test_roi_on_reduced_frame():
+    """Copia de inferencia a 1/2: el recorte se escala, los landmarks no"""
+    detector = _detector('hands')
+    frame = np.zeros((HEIGHT // 2, WIDTH // 2, 3), np.uint8)
+
+    _detect(detector, frame)
+    found, fingertips = _detect(detector, frame)
+    hand_w, hand_h = HAND_BOX[2] - HAND_BOX[0], HAND_BOX[3] - HAND_BOX[1]
+    assert detector.hands.shapes[-1] == ((hand_h + 40) // 2,
+                                         (hand_w + 40) // 2)
+    _assert_tips_in_frame(fingertips)
+    print("✓ ROI sobre la copia reducida")
+
+
+if __name__ == '__main__':
+    test_keyboard_roi()
+    test_hands_roi_and_fallback()
+    test_band_roi()
+    test_band_roi_hysteresis()
+    test_roi_on_reduced_frame()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de HandTracker (inferencia cada N frames con propagación)
+Usa un detector falso cuya mano se mueve en línea recta y verifica que:
+- la inferencia corra cada N frames y, entre medio, los landmarks se
+  propaguen cerca de la posición real (velocidad constante y Kalman),
+- la incertidumbre predicha adelante la inferencia,
+- el modelo se reinicie cuando cambian las manos,
+- el flujo óptico corrija las yemas cuando la mano cambia de velocidad.
+No requiere cámaras ni MediaPipe.
+
+Uso: python -m tests.test_hand_tracker
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.hand_landmarks import HandLandmarks, TIPS
+from src.vision.hand_tracker import HandTracker
+
+
+WIDTH, HEIGHT = 640, 480
+
+
+def _hand_at(x0, y0):
+    """21 landmarks en una grilla de 5 columnas desde (x0, y0)"""
+    points = np.zeros((21, 3), np.float32)
+    points[:, 0] = x0 + 12.0 * (np.arange(21) % 5)
+    points[:, 1] = y0 + 15.0 * (np.arange(21) // 5)
+    return points
+
+
+class _FakeDetector:
+    """Detector con una mano en trajectory(frame) (None = sin mano)"""
+
+    def __init__(self, trajectory):
+        self.trajectory = trajectory
+        self.frame = 0          # lo avanza el test
+        self.calls = []
+        self.maxHands = 2
+        self.img_width, self.img_height = WIDTH, HEIGHT
+        self.mpHands = SimpleNamespace(HAND_CONNECTIONS={(0, 1), (1, 2)})
+        self.landmarks = HandLandmarks(self.maxHands)
+
+    def findHands(self, img, hand_landmarks=None):
+        self.calls.append(self.frame)
+        origin = self.trajectory(self.frame)
+        if origin is None:
+            self.landmarks.clear()
+        else:
+            self.landmarks.fill_from_arrays(_hand_at(*origin)[None],
+                                            np.array([[1, 0.9]]))
+        return len(self.landmarks) > 0
+
+    def getLandmarks(self):
+        return self.landmarks
+
+    def getFingerTipsPos(self):
+        return [[1] * len(self.landmarks), self.landmarks.fingertips_list()]
+
+
+def _run(tracker, detector, n_frames, image=None):
+    """Corre n_frames; retorna el error máximo de las yemas por frame"""
+    errors = []
+    for frame in range(n_frames):
+        detector.frame = frame
+        img = image(frame) if image else np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+        tracker.findHands(img)
+        origin = detector.trajectory(frame)
+        if origin is not None and len(tracker.getLandmarks()):
+            truth = _hand_at(*origin)[TIPS, :2]
+            tips = tracker.getLandmarks().tips[0, :, :2]
+            errors.append(float(np.abs(tips - truth).max()))
+    return errors
+
+
+def test_interval_and_propagation():
+    """Inferencia cada N frames; la propagación sigue a la mano"""
+    for model in ('constant_velocity', 'kalman'):
+        detector = _FakeDetector(lambda f: (100 + 4.0 * f, 200 - 2.0 * f))
+        tracker = HandTracker(detector, detection_interval=3,
+                              motion_model=model)
+        errors = _run(tracker, detector, 30)
+
+        assert detector.calls == list(range(0, 30, 3)), detector.calls
+        stats = tracker.getTrackingStats()
+        assert stats['detections'] == 10 and stats['frames'] == 30
+        # tras unas inferencias la velocidad converge a la real
+        assert max(errors[12:]) < 1.0, (model, errors)
+        # sin propagar, el error entre inferencias sería de hasta 8 px
+        print(f"✓ {model}: inferencia 1/3, error máx {max(errors[12:]):.2f} px")
+
+
+def test_uncertainty_trigger():
+    """La incertidumbre predicha adelanta la inferencia"""
+    detector = _FakeDetector(lambda f: (100 + 4.0 * f, 200.0))
+    tracker = HandTracker(detector, detection_interval=10,
+                          motion_model='kalman', max_uncertainty_px=4.0,
+                          process_noise=1.0)
+    _run(tracker, detector, 30)
+    gaps = np.diff(detector.calls)
+    assert 1 < gaps.max() < 10, detector.calls
+    assert tracker.uncertainty_px(0) <= 4.0
+
+    # velocidad constante: la incertidumbre crece con la aceleración medida
+    detector = _FakeDetector(lambda f: (100 + 0.5 * f * f, 200.0))
+    tracker = HandTracker(detector, detection_interval=10,
+                          motion_model='constant_velocity',
+                          max_uncertainty_px=5.0)
+    _run(tracker, detector, 40)
+    # la primera aceleración se mide en la segunda inferencia
+    assert tracker.accel_px > 0 and np.diff(detector.calls[1:]).max() < 10
+    print(f"✓ Inferencia adelantada por incertidumbre: "
+          f"intervalo máx {gaps.max()} frames")
+
+
+def test_reset_on_hand_change():
+    """Sin manos no se propaga y la mano nueva no hereda la velocidad"""
+    detector = _FakeDetector(
+        lambda f: None if 6 <= f < 8 else (100 + 5.0 * f, 200.0))
+    tracker = HandTracker(detector, detection_interval=3,
+                          motion_model='constant_velocity')
+    _run(tracker, detector, 8)
+    # frame 6 sin mano: se infiere en cada frame hasta volver a verla
+    assert detector.calls[-3:] == [3, 6, 7]
+    assert len(tracker.getLandmarks()) == 0
+
+    detector.trajectory = lambda f: (300.0, 100.0)
+    _run(tracker, detector, 1)
+    detector.frame = 1
+    tracker.findHands(np.zeros((HEIGHT, WIDTH, 3), np.uint8))
+    assert np.allclose(tracker.velocity[0], 0.0)
+    assert np.allclose(tracker.getLandmarks().points[0, :, :2],
+                       _hand_at(300.0, 100.0)[:, :2])
+    print("✓ Reinicio del modelo al cambiar las manos")
+
+
+def test_optical_flow_refinement():
+    """El flujo óptico sigue a la mano cuando la predicción se equivoca"""
+    rng = np.random.default_rng(0)
+    texture = cv2.GaussianBlur(
+        rng.integers(0, 255, (HEIGHT + 100, WIDTH + 100, 3), np.uint8),
+        (5, 5), 0)
+
+    def origin(frame):
+        # quieta hasta el frame 4 y después 3 px/frame a la derecha
+        return (200 + 3.0 * max(frame - 4, 0), 150.0)
+
+    def image(frame):
+        dx = int(origin(frame)[0] - 200)
+        return np.ascontiguousarray(texture[50:50 + HEIGHT,
+                                            50 - dx:50 - dx + WIDTH])
+
+    errors = {}
+    for optical_flow in (False, True):
+        detector = _FakeDetector(origin)
+        tracker = HandTracker(detector, detection_interval=8,
+                              motion_model='constant_velocity',
+                              optical_flow=optical_flow)
+        errors[optical_flow] = _run(tracker, detector, 8, image)
+    assert max(errors[False]) >= 9.0
+    assert max(errors[True]) < 1.0, errors[True]
+    print(f"✓ Flujo óptico: error máx {max(errors[True]):.2f} px "
+          f"(sin flujo {max(errors[False]):.1f} px)")
+
+
+if __name__ == '__main__':
+    test_interval_and_propagation()
+    test_uncertainty_trigger()
+    test_reset_on_hand_change()
+    test_optical_flow_refinement()
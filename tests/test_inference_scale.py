@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la resolución de inferencia (StereoConfig.INFERENCE_SCALE)
+Con modelos falsos de MediaPipe verifica que:
+- HandDetector reduzca la imagen a la escala pedida respecto del frame
+  completo: sin reducir dos veces la copia del MJPEG crudo, sin agrandar
+  una copia más chica y reduciendo también el recorte de la ROI,
+- los landmarks queden en píxeles del frame completo en todos los casos,
+- HandLandmarkerDetector envíe la imagen reducida y entregue los
+  landmarks en píxeles del frame completo,
+- QualityController no suba la escala de sus niveles por encima de la
+  configurada.
+No requiere cámaras ni el modelo hand_landmarker.task.
+
+Uso: python -m tests.test_inference_scale
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.hand_detector import HandDetector
+from src.vision.quality_controller import QualityController, QUALITY_LEVELS
+from tests.test_hand_landmarker_detector import (_FakeLandmarkerDetector,
+                                                 _task_result)
+from tests.test_hand_roi import (_FakeHands, _assert_tips_in_frame, _detect,
+                                 KEYBOARD, WIDTH, HEIGHT)
+from tests.test_quality_controller import _FakeTracker
+
+
+def test_hand_detector_scale():
+    """Reducción respecto del frame completo y landmarks en píxeles completos"""
+    detector = HandDetector(img_width=WIDTH, img_height=HEIGHT,
+                            inference_scale=0.5)
+    detector.hands = fake = _FakeHands()
+
+    cases = [((HEIGHT, WIDTH), (240, 320)),          # frame completo
+             ((HEIGHT // 2, WIDTH // 2), (240, 320)),  # MJPEG reducido 1/2
+             ((HEIGHT // 4, WIDTH // 4), (120, 160))]  # nunca se agranda
+    for frame_shape, expected in cases:
+        frame = np.zeros(frame_shape + (3,), np.uint8)
+        found, fingertips = _detect(detector, frame)
+        assert found and fake.shapes[-1] == expected, (frame_shape,
+                                                       fake.shapes[-1])
+        _assert_tips_in_frame(fingertips)
+
+    # ROI del teclado: se reduce el recorte
+    detector = HandDetector(img_width=WIDTH, img_height=HEIGHT,
+                            roi_mode='keyboard', roi_margin=20, roi_reach=100,
+                            inference_scale=0.5)
+    detector.hands = fake = _FakeHands()
+    detector.setKeyboardROI(*KEYBOARD)
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    _detect(detector, frame)
+    found, fingertips = _detect(detector, frame)
+    x0, y0, x1, y1 = detector.roi
+    assert found and fake.shapes[-1] == (round((y1 - y0) / 2),
+                                         round((x1 - x0) / 2))
+    _assert_tips_in_frame(fingertips)
+    print(f"✓ HandDetector infiere a {fake.shapes[0][1]}x{fake.shapes[0][0]} "
+          f"con landmarks en {WIDTH}x{HEIGHT}")
+
+
+def test_tasks_scale():
+    """Tasks recibe la imagen reducida; landmarks en píxeles completos"""
+    _FakeLandmarkerDetector.result = _task_result([('Left', 0.9, 0.3, 0.3)])
+    detector = _FakeLandmarkerDetector('modelo.task', img_width=WIDTH,
+                                       img_height=HEIGHT, inference_scale=0.5)
+    sizes = []
+    callback = detector.landmarker.callback
+    detector.landmarker.callback = lambda result, image, timestamp_ms: (
+        sizes.append((image.height, image.width)),
+        callback(result, image, timestamp_ms))
+
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    detector.findHands(frame)
+    detector.landmarker.finish()
+    assert detector.findHands(frame)
+    assert sizes == [(240, 320)]
+    index_tip = detector.getLandmarks().points[0, 8]
+    assert np.allclose(index_tip[:2], [(0.3 + 0.03) * WIDTH,
+                                       (0.3 + 0.02) * HEIGHT])
+    detector.close()
+    print("✓ HandLandmarkerDetector envía 320x240 con landmarks en 640x480")
+
+
+def test_quality_levels_capped():
+    """Los niveles de calidad no superan la escala configurada"""
+    controller = QualityController([_FakeTracker()], max_inference_scale=0.5,
+                                   verbose=False)
+    scales = [controller.settings(level)['inference_scale']
+              for level in range(len(QUALITY_LEVELS))]
+    assert scales == [min(level['inference_scale'], 0.5)
+                      for level in QUALITY_LEVELS]
+    assert max(scales) == 0.5
+    assert QualityController([_FakeTracker()]).settings(0)[
+        'inference_scale'] == 1.0
+    print(f"✓ Escalas de los niveles con tope 0.5: {scales}")
+
+
+if __name__ == '__main__':
+    test_hand_detector_scale()
+    test_tasks_scale()
+    test_quality_levels_capped()
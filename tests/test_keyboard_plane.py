@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test del plano del teclado (KeyboardPlane, KeyboardPlaneCalibrator)
+Con la calibración del repositorio verifica que:
+- el ajuste recupere un plano inclinado a partir de puntos con ruido, con
+  la normal hacia las cámaras, y rechace puntos insuficientes o alineados,
+- la distancia con signo de todas las yemas sea su altura sobre la
+  superficie,
+- las esquinas de un tablero sintético apoyado en la superficie,
+  trianguladas por KeyboardPlaneCalibrator, den el mismo plano,
+- el plano se guarde en calibration.json y DepthEstimator lo cargue,
+- StereoFusionStage entregue la altura sobre el plano como profundidad,
+  también con los landmarks en el punto de vista volteado,
+- y mida la distancia de 10 yemas (un producto matriz-vector).
+No requiere cámaras.
+
+Uso: python -m tests.test_keyboard_plane
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.calibration.plane_calibrator import KeyboardPlaneCalibrator
+from src.vision.depth_correction import DepthCorrection
+from src.vision.depth_estimator import DepthEstimator
+from src.vision.hand_landmarks import FINGER_TIP_IDS
+from src.vision.keyboard_plane import KeyboardPlane
+from src.vision.pipeline_stages import StereoFusionStage
+from tests.test_point_rectification import (_fusion_packet, _project_distorted,
+                                            HEIGHT, WIDTH)
+from tests.test_stereo_band import CALIBRATION_FILE
+
+
+# superficie inclinada 25° frente a las cámaras (cm)
+TILT = np.radians(25.0)
+NORMAL = np.array([0.0, -np.cos(TILT), -np.sin(TILT)])
+ORIGIN = np.array([0.0, 8.0, 45.0])
+BOARD_SIZE = (7, 7)
+
+
+def _surface_points(uv):
+    """Puntos (cm) de la superficie en coordenadas (u, v) del plano"""
+    u_axis = np.array([1.0, 0.0, 0.0])
+    v_axis = np.cross(NORMAL, u_axis)
+    return ORIGIN + uv[:, :1] * u_axis + uv[:, 1:] * v_axis
+
+
+def _true_plane():
+    normal = -NORMAL if NORMAL @ ORIGIN > 0 else NORMAL
+    return normal, -normal @ ORIGIN
+
+
+def test_fit():
+    """Plano inclinado recuperado con la normal hacia las cámaras"""
+    rng = np.random.default_rng(0)
+    points = _surface_points(rng.uniform(-15, 15, (40, 2)))
+    noisy = points + rng.normal(0, 0.1, points.shape)
+    plane = KeyboardPlane.fit(noisy)
+    normal, offset = _true_plane()
+    assert np.degrees(np.arccos(plane.normal @ normal)) < 1.0
+    assert abs(plane.offset - offset) < 0.3
+    assert plane.offset > 0 and plane.num_points == 40
+    assert 0.05 < plane.rms_cm < 0.15
+
+    for bad in (points[:2], np.outer(np.arange(5.0), [1.0, 0.0, 0.0]) +
+                ORIGIN):
+        try:
+            KeyboardPlane.fit(bad)
+            assert False, "debía rechazar los puntos"
+        except ValueError:
+            pass
+    print(f"✓ Plano ajustado con 40 puntos (RMS {plane.rms_cm:.3f} cm)")
+
+
+def test_signed_distance():
+    """La distancia con signo es la altura sobre la superficie"""
+    plane = KeyboardPlane.fit(_surface_points(
+        np.array([[-10, -5], [10, -5], [0, 8], [5, 5]], float)))
+    rng = np.random.default_rng(1)
+    heights = rng.uniform(-2, 6, 10)
+    surface = _surface_points(rng.uniform(-15, 15, (10, 2)))
+    tips = surface + heights[:, None] * plane.normal
+    assert np.allclose(plane.signed_distance(tips), heights)
+    # del lado de las cámaras es positiva
+    assert plane.signed_distance(np.zeros(3))[0] > 0
+
+    loaded = KeyboardPlane.from_dict(json.loads(json.dumps(plane.to_dict())))
+    assert np.allclose(loaded.signed_distance(tips), heights)
+
+    n = 5000
+    start = time.perf_counter()
+    for _ in range(n):
+        plane.signed_distance(tips)
+    batch_ms = (time.perf_counter() - start) / n * 1000
+    start = time.perf_counter()
+    for _ in range(n // 10):
+        [float(plane.normal @ tip + plane.offset) for tip in tips]
+    loop_ms = (time.perf_counter() - start) / (n // 10) * 1000
+    print(f"✓ Distancia de 10 yemas: {batch_ms:.4f} ms "
+          f"(una por una {loop_ms:.4f} ms)")
+
+
+def _render_board(estimator, is_left):
+    """Tablero BOARD_SIZE apoyado en la superficie visto por una cámara"""
+    square_px, margin = 40, 40
+    cols, rows = BOARD_SIZE[0] + 1, BOARD_SIZE[1] + 1
+    board = np.full((rows * square_px + 2 * margin,
+                     cols * square_px + 2 * margin), 255, np.uint8)
+    for r in range(rows):
+        for c in range(cols):
+            if (r + c) % 2 == 0:
+                y, x = margin + r * square_px, margin + c * square_px
+                board[y:y + square_px, x:x + square_px] = 0
+    # 3 cm por cuadro, centrado en ORIGIN
+    h, w = board.shape
+    corners_px = np.array([[0, 0], [w, 0], [w, h], [0, h]], np.float32)
+    uv = (corners_px - [w / 2, h / 2]) * (3.0 / square_px)
+    world = _surface_points(uv) / 100.0
+    image_corners = _project_distorted(estimator, world, is_left)
+    H = cv2.getPerspectiveTransform(corners_px,
+                                    image_corners.astype(np.float32))
+    gray = cv2.warpPerspective(board, H, (WIDTH, HEIGHT),
+                               borderValue=160)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def test_chessboard_plane():
+    """Las esquinas del tablero triangulado dan el plano de la superficie"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    estimator.depth_correction = DepthCorrection.constant(1.0)   # Z real
+    calibrator = KeyboardPlaneCalibrator(estimator, WIDTH, HEIGHT,
+                                         board_size=BOARD_SIZE)
+    points = calibrator.chessboard_points(_render_board(estimator, True),
+                                          _render_board(estimator, False))
+    assert len(points) == BOARD_SIZE[0] * BOARD_SIZE[1], len(points)
+    plane = KeyboardPlane.fit(points)
+    normal, offset = _true_plane()
+    angle = np.degrees(np.arccos(plane.normal @ normal))
+    assert angle < 3.0, angle
+    assert abs(plane.offset - offset) < 1.0, (plane.offset, offset)
+
+    blank = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    assert len(calibrator.chessboard_points(blank, blank)) == 0
+    print(f"✓ Plano del tablero: {angle:.2f}° de la superficie, "
+          f"RMS {plane.rms_cm:.2f} cm")
+
+
+def test_estimator_loads_plane():
+    """El plano guardado en calibration.json se carga con la calibración"""
+    with open(CALIBRATION_FILE) as f:
+        data = json.load(f)
+    plane = KeyboardPlane(NORMAL, -NORMAL @ ORIGIN, 0.1, 12)
+    data['keyboard_plane'] = plane.to_dict()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'calibration.json')
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        estimator = DepthEstimator(path)
+    assert np.allclose(estimator.keyboard_plane.normal, plane.normal)
+    assert DepthEstimator(CALIBRATION_FILE).keyboard_plane is None
+    print("✓ DepthEstimator carga el plano del teclado")
+
+
+def test_fusion_stage_heights():
+    """La fusión entrega la altura de cada yema sobre el plano"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    rng = np.random.default_rng(2)
+    heights = np.array([0.0, 0.5, 1.5, 3.0, 6.0])
+    surface = _surface_points(rng.uniform(-10, 10, (len(FINGER_TIP_IDS), 2)))
+    normal, offset = _true_plane()
+    tips_cm = surface + heights[:, None] * normal
+
+    # el plano se mide en el sistema ya corregido del estimador
+    raw = tips_cm.copy()
+    raw[:, 2] /= estimator.DEPTH_CORRECTION_FACTOR
+    plain = StereoFusionStage(estimator, None, camera_separation=9)
+    estimator.keyboard_plane = KeyboardPlane(normal, offset)
+    fusion = StereoFusionStage(estimator, None, camera_separation=9)
+    assert fusion.keyboard_plane is estimator.keyboard_plane
+    packet = fusion.process(_fusion_packet(estimator, raw / 100.0))
+    depths = [packet.finger_depths[(0, tip)] for tip in FINGER_TIP_IDS]
+    assert np.allclose(depths, heights, atol=0.05), depths
+    assert np.isclose(packet.target[2], tips_cm[FINGER_TIP_IDS.index(8), 2],
+                      atol=0.05)
+
+    # landmarks del frame volteado (FRAME_ORIENTATION 'pixels'): el plano
+    # medido sobre los frames de la cámara sigue valiendo
+    flipped = StereoFusionStage(estimator, None, camera_separation=9)
+    packet = flipped.process(_fusion_packet(estimator, raw / 100.0,
+                                            flipped=True))
+    assert np.allclose([packet.finger_depths[(0, tip)]
+                        for tip in FINGER_TIP_IDS], heights, atol=0.05)
+
+    # sin plano: Z como antes
+    assert plain.keyboard_plane is None
+    packet = plain.process(_fusion_packet(estimator, raw / 100.0))
+    assert np.allclose([packet.finger_depths[(0, tip)]
+                        for tip in FINGER_TIP_IDS], tips_cm[:, 2], atol=0.05)
+    print(f"✓ Fusión: alturas {np.round(depths, 2).tolist()} cm")
+
+
+if __name__ == '__main__':
+    test_fit()
+    test_signed_distance()
+    test_chessboard_plane()
+    test_estimator_loads_plane()
+    test_fusion_stage_heights()
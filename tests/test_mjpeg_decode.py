@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la captura MJPEG cruda con decodificación reducida
+Verifica que en modo raw_mjpeg el StereoVideoThread entregue la copia de
+inferencia a 1/2 de resolución y que get_display_pair() decodifique el par
+completo con el mismo contenido. Un JPEG dañado descarta solo ese par
+sin detener la captura. Usa dos videos MJPG sintéticos (el backend
+FFMPEG entrega los paquetes JPEG igual que una cámara). No requiere cámaras.
+
+Uso: python -m tests.test_mjpeg_decode
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.mjpeg_decoder import (MJPEGDecoder, CorruptFrameError,
+                                      reduced_shape)
+from src.vision.video_thread import CameraStatus, StereoVideoThread
+
+
+N_FRAMES = 10
+WIDTH, HEIGHT = 160, 120
+
+
+def _write_video(path, offset):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"),
+                             30, (WIDTH, HEIGHT))
+    for i in range(N_FRAMES):
+        writer.write(np.full((HEIGHT, WIDTH, 3), offset + i * 10, np.uint8))
+    writer.release()
+
+
+def test_reduced_decode_shapes():
+    """IMREAD_REDUCED_COLOR_2/4 entregan 1/2 y 1/4 de la resolución"""
+    frame = np.full((HEIGHT, WIDTH, 3), 90, np.uint8)
+    _, data = cv2.imencode('.jpg', frame)
+
+    decoder = MJPEGDecoder(inference_scale=4)
+    full, half, quarter = [decoder.decode(data, scale) for scale in (1, 2, 4)]
+    decoder.close()
+
+    assert full.shape == (HEIGHT, WIDTH, 3)
+    assert half.shape == reduced_shape(WIDTH, HEIGHT, 2)
+    assert quarter.shape == reduced_shape(WIDTH, HEIGHT, 4)
+    assert abs(float(quarter.mean()) - 90) < 3
+    print("✓ Decodificación reducida 1/2 y 1/4")
+
+
+def test_raw_mjpeg_stereo_capture():
+    """Copia reducida para inferencia + par completo solo a demanda"""
+    with tempfile.TemporaryDirectory() as tmp:
+        left_path = os.path.join(tmp, 'left.avi')
+        right_path = os.path.join(tmp, 'right.avi')
+        _write_video(left_path, offset=20)
+        _write_video(right_path, offset=120)
+
+        cam = StereoVideoThread(left_source=left_path,
+                                right_source=right_path,
+                                video_width=WIDTH,
+                                video_height=HEIGHT,
+                                buffer_all=True,
+                                raw_mjpeg=True,
+                                inference_scale=2)
+        assert cam.raw_mjpeg
+        cam.start()
+
+        received = 0
+        last_seq = -1
+        while True:
+            finished, pair = cam.next_new(last_seq, timeout=1)
+            if finished:
+                break
+            left, right, _, _, seq = pair
+            if seq < 0:
+                continue
+            last_seq = seq
+
+            assert left.shape == (HEIGHT // 2, WIDTH // 2, 3)
+            display_left, display_right = cam.get_display_pair()
+            assert display_left.shape == (HEIGHT, WIDTH, 3)
+
+            expected_left, expected_right = 20 + seq * 10, 120 + seq * 10
+            assert abs(float(left.mean()) - expected_left) < 3
+            assert abs(float(right.mean()) - expected_right) < 3
+            assert abs(float(display_left.mean()) - expected_left) < 3
+            assert abs(float(display_right.mean()) - expected_right) < 3
+            received += 1
+        cam.stop()
+
+    assert received == N_FRAMES
+    print(f"✓ {received} pares MJPEG crudos decodificados")
+
+
+def test_corrupt_frame_is_dropped():
+    """Un JPEG dañado descarta ese par; la captura sigue y stop() retorna"""
+    frame = np.full((HEIGHT, WIDTH, 3), 90, np.uint8)
+    _, data = cv2.imencode('.jpg', frame)
+    decoder = MJPEGDecoder(inference_scale=2)
+    views = [np.zeros(reduced_shape(WIDTH, HEIGHT, 2), np.uint8)
+             for _ in range(2)]
+    truncated = data[:data.size // 4]
+    assert decoder.decode(truncated, 2) is None
+    try:
+        decoder.decode_inference_into((data, truncated), views)
+        assert False, "debía rechazar el JPEG truncado"
+    except CorruptFrameError:
+        pass
+    frames = decoder.decode_inference_into((data, data), views)
+    assert all(frame is view for frame, view in zip(frames, views))
+    decoder.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        left_path = os.path.join(tmp, 'left.avi')
+        right_path = os.path.join(tmp, 'right.avi')
+        _write_video(left_path, offset=20)
+        _write_video(right_path, offset=120)
+
+        cam = StereoVideoThread(left_source=left_path,
+                                right_source=right_path,
+                                video_width=WIDTH,
+                                video_height=HEIGHT,
+                                buffer_all=True,
+                                raw_mjpeg=True,
+                                inference_scale=2)
+        # el 5º par llega dañado (decode devuelve None)
+        calls = itertools.count()
+        decode = cam.decoder.decode
+
+        def flaky_decode(data, scale=1):
+            if scale == cam.inference_scale and next(calls) == 8:
+                return None
+            return decode(data, scale)
+        cam.decoder.decode = flaky_decode
+        cam.start()
+
+        received = 0
+        last_seq = -1
+        while True:
+            finished, pair = cam.next_new(last_seq, timeout=1)
+            if finished:
+                break
+            if pair[4] >= 0:
+                last_seq = pair[4]
+                received += 1
+        assert cam.get_status() == CameraStatus.DEAD
+
+        start = time.perf_counter()
+        cam.stop()
+        assert time.perf_counter() - start < 1.0
+
+    assert cam.frames_dropped == 1
+    assert received == N_FRAMES - 1
+    print(f"✓ JPEG dañado descartado: {received} pares entregados")
+
+
+if __name__ == '__main__':
+    test_reduced_decode_shapes()
+    test_raw_mjpeg_stereo_capture()
+    test_corrupt_frame_is_dropped()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test del pipeline por etapas
+Verifica las colas acotadas (gana el más reciente), que dos etapas lentas
+se solapen en hilos distintos, las suscripciones de los modos de juego,
+la propagación del fin de una sesión reproducida y de los errores de una
+etapa, y que los requisitos de cada modo salten la detección, la
+triangulación y las teclas cuando no se consumen. No requiere cámaras, MediaPipe ni fluidsynth.
+
+Uso: python -m tests.test_pipeline
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.hand_landmarks import HandLandmarks
+from src.vision.pipeline import (LatestQueue, Pipeline, PipelineStage,
+                                 FramePacket, END_OF_STREAM)
+from src.vision.pipeline_stages import (CaptureStage, HandDetectionStage,
+                                        StereoFusionStage, KeyboardStage,
+                                        StageRequirements, FULL_REQUIREMENTS,
+                                        COMPOSITION_REQUIREMENTS)
+from src.vision.session_recorder import (StereoSessionRecorder,
+                                         StereoSessionReplay)
+from src.gameplay.play_modes import (ModeManager, FreeMode, PlayMode,
+                                     ConfigMode, TheoryMode)
+
+
+N_PACKETS = 12
+STAGE_SECONDS = 0.02
+
+
+def _counter_source(n_packets, period=0.0):
+    """Fuente que numera paquetes y termina después de n_packets"""
+    state = {'seq': 0}
+
+    def produce(_):
+        if state['seq'] >= n_packets:
+            return END_OF_STREAM
+        if period:
+            time.sleep(period)
+        packet = FramePacket(state['seq'])
+        state['seq'] += 1
+        return packet
+    return PipelineStage('fuente', produce)
+
+
+def _slow_stage(name, seconds):
+    def work(packet):
+        time.sleep(seconds)
+        setattr(packet, name, True)
+        return packet
+    return PipelineStage(name, work)
+
+
+def _drain(pipeline, timeout=5):
+    received = []
+    while True:
+        packet = pipeline.get(timeout=timeout)
+        if packet is None:
+            break
+        received.append(packet)
+    return received
+
+
+def test_latest_queue_drops_oldest():
+    """put() no bloquea: con la cola llena se descarta el más viejo"""
+    queue = LatestQueue(maxsize=2)
+    assert not queue.put(1)
+    assert not queue.put(2)
+    assert queue.put(3)
+    assert queue.dropped == 1
+    assert queue.get(timeout=0) == 2
+    assert queue.get(timeout=0) == 3
+    assert queue.get(timeout=0.01) is None
+    queue.close()
+    assert queue.get() is None
+    print("✓ Cola acotada: gana el más reciente")
+
+
+def test_stages_overlap():
+    """Dos etapas lentas en hilos distintos: el tiempo total no se suma"""
+    # la fuente va al ritmo de las etapas para que no haya descartes
+    pipeline = Pipeline([_counter_source(N_PACKETS, period=STAGE_SECONDS),
+                         _slow_stage('deteccion', STAGE_SECONDS),
+                         _slow_stage('fusion', STAGE_SECONDS)],
+                        queue_size=N_PACKETS)
+    start = time.perf_counter()
+    pipeline.start()
+    received = _drain(pipeline)
+    elapsed = time.perf_counter() - start
+    pipeline.stop()
+
+    assert pipeline.finished
+    assert [p.seq for p in received] == list(range(N_PACKETS))
+    assert all(p.deteccion and p.fusion for p in received)
+    # en serie serían 3 etapas x N paquetes
+    serial = 3 * N_PACKETS * STAGE_SECONDS
+    assert elapsed < 0.8 * serial, (elapsed, serial)
+    times = pipeline.get_stage_times_ms()
+    assert list(times) == ['fuente', 'deteccion', 'fusion']
+    assert times['deteccion'] >= STAGE_SECONDS * 1000 * 0.9
+    print(f"✓ Etapas solapadas: {elapsed * 1000:.0f} ms vs "
+          f"{serial * 1000:.0f} ms en serie")
+
+
+def test_slow_consumer_gets_latest():
+    """Si el consumidor se atrasa, recibe los paquetes más recientes"""
+    pipeline = Pipeline([_counter_source(N_PACKETS, period=0.005),
+                         PipelineStage('copia', lambda packet: packet)])
+    pipeline.start()
+    time.sleep(0.2)   # el consumidor no lee mientras la fuente termina
+    received = _drain(pipeline)
+    pipeline.stop()
+
+    assert [p.seq for p in received] == [N_PACKETS - 1]
+    assert pipeline.stats['copia'].count == N_PACKETS
+    print("✓ Consumidor lento: solo el último paquete")
+
+
+def test_stage_error_reaches_consumer():
+    """Una excepción en una etapa se relanza en get()"""
+    def fail(packet):
+        raise ValueError("falla de prueba")
+
+    pipeline = Pipeline([_counter_source(N_PACKETS),
+                         PipelineStage('falla', fail)])
+    pipeline.start()
+    try:
+        _drain(pipeline)
+        raise AssertionError("get() debía relanzar el error")
+    except ValueError:
+        pass
+    finally:
+        pipeline.stop()
+    print("✓ Error de etapa propagado al hilo principal")
+
+
+class _FakeSynth:
+    def __init__(self):
+        self.events = []
+
+    def noteon(self, chan, key, vel):
+        self.events.append(('on', key))
+
+    def noteoff(self, chan, key):
+        self.events.append(('off', key))
+
+
+class _FakeKeyboard:
+    def note_from_key(self, k_pos):
+        return k_pos
+
+
+def test_modes_subscribe_to_keyboard_stage():
+    """Solo el modo activo recibe los mapas de teclas"""
+    def key_maps(packet):
+        packet.on_map = np.zeros(4, bool)
+        packet.off_map = np.zeros(4, bool)
+        packet.on_map[packet.seq % 4] = True
+        packet.off_map[(packet.seq + 1) % 4] = True
+        return packet
+
+    synth = _FakeSynth()
+    silent = PlayMode(synth, _FakeKeyboard(), octave_base=60)
+    silent.name = 'silencio'
+    pipeline = Pipeline([_counter_source(N_PACKETS),
+                         PipelineStage('teclado', key_maps)],
+                        queue_size=N_PACKETS)
+    modes = ModeManager([FreeMode(synth, _FakeKeyboard(), octave_base=60),
+                         silent], pipeline, 'teclado')
+    modes.switch('silencio')
+    modes.switch(FreeMode.name)
+    pipeline.start()
+    _drain(pipeline)
+    pipeline.stop()
+    modes.close()
+
+    assert len(pipeline.subscribers['teclado']) == 0
+    assert synth.events[:2] == [('on', 60), ('off', 61)]
+    assert len(synth.events) == 2 * N_PACKETS
+    print(f"✓ Modo libre suscrito: {len(synth.events)} eventos de audio")
+
+
+class _CountingDetector:
+    """Detector falso: una mano con el índice en (100, 50)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.landmarks = HandLandmarks(1)
+        points = np.zeros((1, 21, 3), np.float32)
+        points[0, 8, :2] = (100.0, 50.0)
+        self.landmarks.fill_from_arrays(points, np.array([[0, 0.9]]))
+
+    def findHands(self, img, hand_landmarks=None):
+        self.calls += 1
+        return True
+
+    def getLandmarks(self):
+        return self.landmarks
+
+    def getResults(self):
+        return 'manos'
+
+
+class _CountingKeyboardMap:
+    def __init__(self):
+        self.calls = 0
+
+    def get_kayboard_map(self, **kwargs):
+        self.calls += 1
+        return np.ones(4, bool), np.zeros(4, bool)
+
+
+def _run_gated(requirements):
+    """Un paquete por deteccion -> fusion -> teclado con los requisitos dados"""
+    left, right = _CountingDetector(), _CountingDetector()
+    keyboard_map = _CountingKeyboardMap()
+    stages = [HandDetectionStage(left, right),
+              StereoFusionStage(None, _FakeAngler(), camera_separation=10),
+              KeyboardStage(keyboard_map, _FakeKeyboard(), n_keys=4)]
+    packet = FramePacket(0, infer_left='L', infer_right='R',
+                         hand_landmarks=None, requirements=requirements)
+    for stage in stages:
+        packet = stage.process(packet)
+    return packet, (left.calls, right.calls, keyboard_map.calls)
+
+
+class _FakeAngler:
+    def angles_from_center(self, x, y, top_left, degrees):
+        return 0.0, 0.0
+
+    def location(self, separation, left_angles, right_angles, center,
+                 degrees):
+        return 0.0, 0.0, 40.0, 40.0
+
+
+def test_requirements_gate_vision_work():
+    """Los menús no detectan ni triangulan; los modos de juego sí"""
+    packet, calls = _run_gated(FULL_REQUIREMENTS)
+    assert calls == (1, 1, 1)
+    assert packet.on_map is not None and packet.finger_depths
+    assert packet.hand_results_left == 'manos'
+
+    packet, calls = _run_gated(COMPOSITION_REQUIREMENTS)
+    assert calls == (0, 0, 0)
+    assert packet.on_map is None and packet.hand_results_left is None
+
+    # manos dibujadas solo a la izquierda: sin cámara derecha ni teclas
+    left_only = StageRequirements(needs_depth=False, needs_keys=False,
+                                  needs_right_render=False)
+    packet, calls = _run_gated(left_only)
+    assert calls == (1, 0, 0)
+    assert packet.hand_results_left == 'manos' and packet.on_map is None
+
+    # las teclas arrastran profundidad y detección
+    assert StageRequirements(needs_detection=False, needs_depth=False,
+                             needs_keys=True).needs_right_detection
+    print("✓ Requisitos por modo: los menús solo capturan y componen")
+
+
+class _FakeLesson:
+    name = 'lección de prueba'
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class _FakeLessonManager:
+    def get_lesson(self, lesson_id):
+        return _FakeLesson() if lesson_id == 'chords' else None
+
+
+class _FakeTheoryUI:
+    def reset_selection(self):
+        pass
+
+
+def test_mode_requirements():
+    """Panel de configuración y menú de lecciones: solo composición"""
+    synth, keyboard = _FakeSynth(), _FakeKeyboard()
+    assert FreeMode(synth, keyboard, 60).get_requirements().needs_keys
+    assert ConfigMode(synth, keyboard, 60, None, None).get_requirements() \
+        is COMPOSITION_REQUIREMENTS
+
+    theory = TheoryMode(synth, keyboard, 60, _FakeLessonManager(),
+                        _FakeTheoryUI())
+    theory.enter()
+    assert theory.get_requirements() is COMPOSITION_REQUIREMENTS
+    assert theory.open_lesson('chords')
+    assert theory.get_requirements() is FULL_REQUIREMENTS
+    theory.exit()
+    assert theory.get_requirements() is COMPOSITION_REQUIREMENTS
+    print("✓ Requisitos de los modos de teoría y configuración")
+
+
+def test_capture_stage_ends_with_replay():
+    """CaptureStage entrega la sesión completa (volteada) y termina"""
+    width, height = 64, 48
+    with tempfile.TemporaryDirectory() as session_dir:
+        recorder = StereoSessionRecorder(session_dir)
+        for i in range(N_PACKETS):
+            frame = np.zeros((height, width, 3), np.uint8)
+            frame[0, 0] = 200      # esquina superior izquierda
+            recorder.write(frame, frame, i / 30.0, i / 30.0, seq=i)
+        recorder.close()
+
+        replay = StereoSessionReplay(session_dir, realtime=False)
+        replay.start()
+        pipeline = Pipeline([CaptureStage(replay, stop_at_end=True)],
+                            queue_size=N_PACKETS)
+        pipeline.start()
+        received = _drain(pipeline)
+        pipeline.stop()
+        replay.stop()
+
+    assert [p.seq for p in received] == list(range(N_PACKETS))
+    for packet in received:
+        # flip(-1): la esquina marcada pasa a la inferior derecha (JPEG)
+        assert packet.frame_left[-1, -1].mean() > 100
+        assert packet.infer_left is packet.frame_left
+    print(f"✓ {len(received)} pares capturados hasta el fin de la sesión")
+
+
+if __name__ == '__main__':
+    test_latest_queue_drops_oldest()
+    test_stages_overlap()
+    test_slow_consumer_gets_latest()
+    test_stage_error_reaches_consumer()
+    test_modes_subscribe_to_keyboard_stage()
+    test_requirements_gate_vision_work()
+    test_mode_requirements()
+    test_capture_stage_ends_with_replay()
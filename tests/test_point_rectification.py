@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la rectificación de puntos (DepthEstimator.rectify_points)
+Con la calibración del repositorio verifica que:
+- rectify_points sea la inversa de los mapas de rectify_images (el punto
+  rectificado, muestreado en los mapas, vuelve al punto original),
+- un punto 3D proyectado con distorsión quede en la misma fila en ambas
+  imágenes rectificadas y batch_triangulate lo recupere,
+- StereoFusionStage triangule sin remapear los frames (los mapas ni
+  siquiera se generan), también con los landmarks en el punto de vista
+  volteado (display_flipped),
+- y mida rectificar 10 yemas contra remapear el par completo.
+No requiere cámaras.
+
+Uso: python -m tests.test_point_rectification
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.depth_estimator import DepthEstimator
+from src.vision.hand_landmarks import (HandLandmarks, FINGER_TIP_IDS,
+                                       flip_points)
+from src.vision.pipeline import FramePacket
+from src.vision.pipeline_stages import StereoFusionStage, FULL_REQUIREMENTS
+from tests.test_stereo_band import CALIBRATION_FILE
+
+
+WIDTH, HEIGHT = 640, 480
+
+
+def _world_points(n=40, seed=0):
+    """Puntos frente a las cámaras (metros, como la calibración)"""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(-0.12, 0.12, n),
+                            rng.uniform(-0.08, 0.08, n),
+                            rng.uniform(0.3, 0.6, n)])
+
+
+def _project_distorted(estimator, points, is_left=True):
+    """Proyección completa (con distorsión) en la imagen original"""
+    if is_left:
+        K, D = estimator.K_left, estimator.D_left
+        R, T = estimator.R_world_left, estimator.T_world_left
+    else:
+        K, D = estimator.K_right, estimator.D_right
+        R, T = estimator.R_world_right, estimator.T_world_right
+    projected, _ = cv2.projectPoints(
+        points, cv2.Rodrigues(R.astype(np.float64))[0],
+        T.astype(np.float64), K.astype(np.float64), D.astype(np.float64))
+    return projected.reshape(-1, 2)
+
+
+def test_inverse_of_maps():
+    """El punto rectificado, muestreado en los mapas, es el original"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    ys, xs = np.mgrid[80:400:40, 80:520:40]
+    raw = np.column_stack([xs.ravel(), ys.ravel()]).astype(np.float32)
+
+    assert estimator.mapx_left is None     # mapas solo a pedido
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    rect_left, _ = estimator.rectify_images(frame, frame)
+    assert rect_left.shape == frame.shape
+    for is_left, mapx, mapy in ((True, estimator.mapx_left,
+                                 estimator.mapy_left),
+                                (False, estimator.mapx_right,
+                                 estimator.mapy_right)):
+        rect = estimator.rectify_points(raw, is_left)
+        # P1/P2 amplían la imagen: solo los puntos que caen dentro de ella
+        inside = np.all((rect >= 0) & (rect < np.array([WIDTH, HEIGHT]) - 1),
+                        axis=1)
+        assert inside.sum() > len(raw) // 2
+        map_x, map_y = rect[None, inside, 0], rect[None, inside, 1]
+        back = np.column_stack([
+            cv2.remap(mapx, map_x, map_y, cv2.INTER_LINEAR).ravel(),
+            cv2.remap(mapy, map_x, map_y, cv2.INTER_LINEAR).ravel()])
+        error = np.linalg.norm(back - raw[inside], axis=1)
+        assert error.max() < 0.05, error.max()
+
+    single = estimator.rectify_point(tuple(raw[7]), is_left=False)
+    assert np.allclose(single, estimator.rectify_points(raw[7:8], False)[0])
+    assert estimator.rectify_points(np.empty((0, 2))).shape == (0, 2)
+    print(f"✓ rectify_points invierte los mapas ({error.max():.3f} px)")
+
+
+def test_triangulation_with_distortion():
+    """Filas iguales tras rectificar y profundidad recuperada"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    points = _world_points()
+    left = _project_distorted(estimator, points, True)
+    right = _project_distorted(estimator, points, False)
+
+    rows = (estimator.rectify_points(left, True)[:, 1] -
+            estimator.rectify_points(right, False)[:, 1])
+    assert np.abs(rows).max() < 0.01, np.abs(rows).max()
+
+    expected = points * 100.0
+    expected[:, 2] *= estimator.DEPTH_CORRECTION_FACTOR
+    result = np.array(estimator.batch_triangulate(left, right))
+    error = np.abs(result - expected).max()
+    assert error < 0.05, error
+
+    # sin corregir la distorsión la DLT sobre píxeles crudos se desvía
+    raw = np.array([estimator.triangulate_point(a, b)
+                    for a, b in zip(left, right)])
+    raw_error = np.abs(raw - expected).max()
+    print(f"✓ Profundidad con distorsión: {error:.4f} cm "
+          f"(DLT sobre píxeles crudos: {raw_error:.2f} cm)")
+
+
+def _fusion_packet(estimator, points, flipped=False):
+    """
+    Una mano por cámara con las yemas en los puntos dados; flipped = los
+    landmarks en el punto de vista volteado, como los entrega el pipeline
+    """
+    hands = []
+    for is_left in (True, False):
+        xy = _project_distorted(estimator, points, is_left)
+        if flipped:
+            xy = flip_points(xy, WIDTH, HEIGHT)
+        landmarks = np.zeros((1, 21, 3), np.float32)
+        landmarks[0, :, :2] = xy.mean(axis=0)
+        landmarks[0, FINGER_TIP_IDS, :2] = xy
+        hands.append(HandLandmarks(2).fill_from_arrays(
+            landmarks, np.array([[0, 0.9]], np.float32)))
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    return FramePacket(0, frame_left=frame, frame_right=frame,
+                       hands_left=hands[0], hands_right=hands[1],
+                       hand_pairs=np.array([[0, 0]]),
+                       display_flipped=flipped,
+                       requirements=FULL_REQUIREMENTS)
+
+
+def test_fusion_without_remap():
+    """La fusión triangula sin tocar los frames completos"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    points = _world_points(n=len(FINGER_TIP_IDS), seed=1)
+    fusion = StereoFusionStage(estimator, None, camera_separation=9)
+    packet = fusion.process(_fusion_packet(estimator, points))
+
+    assert estimator.mapx_left is None
+    depths = [packet.finger_depths[(0, tip)] for tip in FINGER_TIP_IDS]
+    # la corrección la aplica solo el estimador
+    expected = points[:, 2] * 100.0 * estimator.DEPTH_CORRECTION_FACTOR
+    assert np.allclose(depths, expected, atol=0.05), (depths, expected)
+
+    # landmarks del frame volteado: se deshace el flip antes de rectificar
+    flipped = StereoFusionStage(estimator, None, camera_separation=9)
+    packet = flipped.process(_fusion_packet(estimator, points, flipped=True))
+    assert np.allclose([packet.finger_depths[(0, tip)]
+                        for tip in FINGER_TIP_IDS], expected, atol=0.05)
+    assert np.isclose(packet.target[0],
+                      points[FINGER_TIP_IDS.index(8), 0] * 100.0, atol=0.05)
+
+    n = 200
+    tips = _project_distorted(estimator, _world_points(n=10), True)
+    start = time.perf_counter()
+    for _ in range(n):
+        estimator.rectify_points(tips, True)
+        estimator.rectify_points(tips, False)
+    points_ms = (time.perf_counter() - start) / n * 1000
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    estimator.rectify_images(frame, frame)
+    start = time.perf_counter()
+    for _ in range(n):
+        estimator.rectify_images(frame, frame)
+    images_ms = (time.perf_counter() - start) / n * 1000
+    print(f"✓ Fusión sin remap: 10 yemas {points_ms:.3f} ms vs "
+          f"par completo {images_ms:.3f} ms")
+
+
+if __name__ == '__main__':
+    test_inverse_of_maps()
+    test_triangulation_with_distortion()
+    test_fusion_without_remap()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test del control adaptativo de calidad (QualityController)
+Con tiempos de etapa simulados verifica que:
+- con CPS bajo el objetivo y la detección como cuello de botella se baje
+  un nivel por vez, respetando la espera entre cambios,
+- no se baje si el cuello de botella es otra etapa,
+- el máximo de manos baje a las vistas y vuelva al subir con margen,
+- cada decisión quede registrada con su motivo,
+- HandDetector aplique los cambios en el próximo findHands (escala de la
+  imagen de inferencia, modelo y máximo de manos).
+No requiere cámaras.
+
+Uso: python -m tests.test_quality_controller
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.hand_detector import HandDetector
+from src.vision.quality_controller import QualityController, QUALITY_LEVELS
+
+
+class _FakeTracker:
+    """Detector envuelto en HandTracker: intervalo y configure()"""
+
+    def __init__(self):
+        self.detection_interval = 1
+        self.settings = None
+
+    def configure(self, **settings):
+        self.settings = settings
+
+
+SLOW = {'captura': 5.0, 'deteccion': 45.0, 'fusion': 2.0, 'teclado': 1.0}
+FAST = {'captura': 5.0, 'deteccion': 12.0, 'fusion': 2.0, 'teclado': 1.0}
+
+
+def test_step_down_and_up():
+    """Baja con la detección lenta, sube con margen, registra el motivo"""
+    detectors = [_FakeTracker(), _FakeTracker()]
+    controller = QualityController(detectors, target_fps=30, max_hands=2,
+                                   cooldown_s=3.0, verbose=False)
+    for _ in range(10):
+        controller.observe_hands(1)
+
+    assert controller.update(20, SLOW, now=0.0) is None   # nivel inicial
+    assert detectors[0].settings['model_complexity'] == 1
+    assert controller.update(20, SLOW, now=1.0) is None   # espera
+    decision = controller.update(20, SLOW, now=3.5)
+    assert decision['to_level'] == 1 and 'deteccion 45.0ms' in decision['reason']
+    assert detectors[1].settings['model_complexity'] == 0
+
+    # el cuello de botella es la fusión: bajar la detección no ayuda
+    slow_fusion = dict(FAST, fusion=50.0)
+    assert controller.update(20, slow_fusion, now=10.0) is None
+
+    # hasta el nivel más barato: manos vistas e intervalo
+    now = 10.0
+    while controller.level + 1 < len(QUALITY_LEVELS):
+        now += 3.5
+        assert controller.update(20, SLOW, now=now) is not None
+    assert controller.update(20, SLOW, now=now + 3.5) is None
+    assert detectors[0].settings['max_hands'] == 1
+    assert detectors[0].settings['inference_scale'] == 0.5
+    assert all(d.detection_interval == QUALITY_LEVELS[-1]['detection_interval']
+               for d in detectors)
+
+    # con margen sube de a un nivel hasta la calidad completa
+    while controller.level > 0:
+        now += 3.5
+        decision = controller.update(30, FAST, now=now)
+        assert decision is not None and 'margen' in decision['reason']
+    assert detectors[0].settings == {'model_complexity': 1, 'max_hands': 2,
+                                     'inference_scale': 1.0}
+    assert detectors[0].detection_interval == 1
+    assert len(controller.decisions) == 2 * (len(QUALITY_LEVELS) - 1)
+    print(f"✓ {len(controller.decisions)} decisiones registradas con motivo")
+
+
+class _FakeHands:
+    def __init__(self):
+        self.shapes = []
+        self.closed = False
+
+    def process(self, image):
+        self.shapes.append(image.shape[:2])
+        return SimpleNamespace(multi_hand_landmarks=None,
+                               multi_handedness=None)
+
+    def close(self):
+        self.closed = True
+
+
+def test_hand_detector_configure():
+    """La calidad nueva se aplica en el próximo findHands"""
+    detector = HandDetector(img_width=640, img_height=480)
+    detector.hands = fake = _FakeHands()
+    frame = np.zeros((480, 640, 3), np.uint8)
+
+    detector.configure(inference_scale=0.5)
+    detector.findHands(frame)
+    assert fake.shapes[-1] == (240, 320) and detector.hands is fake
+
+    # modelo y máximo de manos: se recrea el grafo de MediaPipe
+    detector.configure(model_complexity=0, max_hands=5)
+    assert detector.getSettings()['model_complexity'] == 1   # aún no
+    detector.findHands(frame)
+    assert fake.closed and detector.hands is not fake
+    assert detector.getSettings() == {'model_complexity': 0, 'max_hands': 2,
+                                      'inference_scale': 0.5}
+    detector.hands.close()
+    print("✓ HandDetector aplica la calidad en el próximo findHands")
+
+
+if __name__ == '__main__':
+    test_step_down_and_up()
+    test_hand_detector_configure()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la banda estéreo de la cámara derecha
+Con la calibración del repositorio verifica que:
+- el punto derecho de una yema quede sobre el segmento epipolar de su
+  punto izquierdo (y dentro de la banda de búsqueda),
+- HandDetectionStage fije la banda del detector derecho a partir de las
+  manos de la izquierda y no corra la derecha sin manos a la izquierda,
+- las manos derechas se emparejen por geometría (hand_id de la izquierda)
+  y se descarten las que no la cumplen.
+No requiere cámaras ni MediaPipe.
+
+Uso: python -m tests.test_stereo_band
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.depth_estimator import DepthEstimator
+from src.vision.hand_landmarks import HandLandmarks, TIPS
+from src.vision.pipeline import FramePacket
+from src.vision.pipeline_stages import (HandDetectionStage, StereoFusionStage,
+                                        FULL_REQUIREMENTS)
+
+
+CALIBRATION_FILE = os.path.join(os.path.dirname(__file__), '..',
+                                'camcalibration', 'calibration.json')
+DEPTH_RANGE = (20, 90)
+TIP_IDS = (4, 8, 12, 16, 20)
+
+
+def _project(estimator, points_3d_cm):
+    """Proyecta puntos del mundo (cm) en ambas imágenes"""
+    P0, P1 = estimator._get_projection_matrices_for_DLT()
+    X = np.hstack([np.asarray(points_3d_cm) / 100.0,
+                   np.ones((len(points_3d_cm), 1))]).T
+    left, right = P0 @ X, P1 @ X
+    return (left[:2] / left[2]).T, (right[:2] / right[2]).T
+
+
+def _hand_points(estimator, center_x_cm, depth_cm):
+    """Yemas de una mano a una profundidad dada (izquierda, derecha)"""
+    points = [(center_x_cm + 2.0 * i, -3.0 + (i % 2), depth_cm)
+              for i in range(len(TIP_IDS))]
+    return _project(estimator, points)
+
+
+def test_epipolar_segments():
+    """La correspondencia real queda sobre el segmento y dentro de la banda"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    left, right = _hand_points(estimator, -4.0, 45.0)
+
+    distances = estimator.epipolar_distance(left, right, DEPTH_RANGE)
+    assert np.all(distances < 1.0), distances
+    shifted = estimator.epipolar_distance(left, right + [0, 40], DEPTH_RANGE)
+    assert np.all(shifted > 35), shifted
+    # fuera del rango de profundidad el punto también queda lejos
+    assert np.all(estimator.epipolar_distance(
+        left, right, (60, 90)) > 10)
+
+    x0, y0, x1, y1 = estimator.right_search_band(left, DEPTH_RANGE, margin=10)
+    assert np.all((right[:, 0] > x0) & (right[:, 0] < x1))
+    assert np.all((right[:, 1] > y0) & (right[:, 1] < y1))
+    assert estimator.right_search_band([], DEPTH_RANGE) is None
+    print(f"✓ Segmentos epipolares: banda de {x1 - x0:.0f}x{y1 - y0:.0f} px")
+
+
+class _FakeDetector:
+    """Detector falso con manos fijas (yemas en los puntos dados)"""
+
+    def __init__(self, hands_tips):
+        self.landmarks = HandLandmarks(len(hands_tips))
+        self.set_hands(hands_tips)
+        self.band = 'sin fijar'
+        self.calls = 0
+
+    def set_hands(self, hands_tips):
+        points = np.zeros((len(hands_tips), 21, 3), np.float32)
+        for hand_id, tips in enumerate(hands_tips):
+            points[hand_id, :, :2] = tips.mean(axis=0)
+            points[hand_id, TIPS, :2] = tips
+        self.landmarks.fill_from_arrays(
+            points, np.zeros((len(hands_tips), 2), np.float32))
+
+    def findHands(self, img, hand_landmarks=None):
+        self.calls += 1
+        return len(self.landmarks) > 0
+
+    def getLandmarks(self):
+        return self.landmarks
+
+    def getResults(self):
+        return 'manos'
+
+    def setSearchBand(self, roi):
+        self.band = roi
+
+
+def _packet(seq):
+    frame = np.zeros((480, 640, 3), np.uint8)
+    return FramePacket(seq, infer_left='L', infer_right='R',
+                       frame_left=frame, frame_right=frame,
+                       hand_landmarks=None, requirements=FULL_REQUIREMENTS)
+
+
+def test_stage_band_and_matching():
+    """Banda desde la izquierda, emparejamiento y descarte por geometría"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    left_a, right_a = _hand_points(estimator, -10.0, 40.0)
+    left_b, right_b = _hand_points(estimator, 6.0, 50.0)
+
+    # la derecha detecta las manos en otro orden y un falso positivo
+    left = _FakeDetector([left_a, left_b])
+    right = _FakeDetector([right_b, right_a, right_a + [0, 80]])
+    stage = HandDetectionStage(left, right, estimator,
+                               depth_range_cm=DEPTH_RANGE)
+    packet = stage.process(_packet(0))
+
+    x0, y0, x1, y1 = right.band
+    assert x0 < right_a[:, 0].min() and right_b[:, 0].max() < x1
+    assert packet.hand_pairs.tolist() == [[0, 1], [1, 0]]
+    assert stage.rejected_hands == 1
+
+    # la fusión triangula cada yema con la de su mano emparejada
+    fusion = StereoFusionStage(estimator, None, camera_separation=9)
+    packet = fusion.process(packet)
+    assert len(packet.finger_depths) == 10
+    near = [packet.finger_depths[(0, tip)] for tip in TIP_IDS]
+    far = [packet.finger_depths[(1, tip)] for tip in TIP_IDS]
+    assert max(near) < min(far)
+
+    # sin manos a la izquierda no se busca a la derecha
+    left.set_hands([])
+    packet = stage.process(_packet(1))
+    assert right.calls == 1 and len(packet.hands_right) == 0
+    assert len(packet.hand_pairs) == 0
+    print("✓ Manos derechas emparejadas por geometría (1 descartada)")
+
+
+if __name__ == '__main__':
+    test_epipolar_segments()
+    test_stage_band_and_matching()
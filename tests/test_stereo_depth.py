@@ -4,19 +4,26 @@
 Test y Calibración de Visión Estereoscópica
 Herramienta interactiva para diagnosticar y ajustar parámetros de profundidad
 
-Uso: python -m src.vision.test_stereo_depth
+Uso: python -m src.vision.test_stereo_depth [carpeta_de_sesion_grabada]
 """
 
+import sys
 import time
 import cv2
 import numpy as np
 from src.vision import video_thread, angles
 from src.vision.hand_detector import HandDetector
 from src.vision.stereo_config import StereoConfig
+from src.vision.session_recorder import ReplayVideoThread
 
 
-def test_stereo_depth():
-    """Test interactivo de visión estereoscópica con visualización de profundidad"""
+def test_stereo_depth(replay_dir=None):
+    """
+    Test interactivo de visión estereoscópica con visualización de profundidad
+
+    Args:
+        replay_dir: Sesión grabada a reproducir en lugar de las cámaras
+    """
     
     config = StereoConfig()
     
@@ -41,25 +48,31 @@ def test_stereo_depth():
     print("\n" + "="*70 + "\n")
     
     try:
-        # Inicializar cámaras
-        print("Inicializando cámaras...")
-        cam_left = video_thread.VideoThread(
-            video_source=config.LEFT_CAMERA_SOURCE,
-            video_width=config.PIXEL_WIDTH,
-            video_height=config.PIXEL_HEIGHT,
-            video_frame_rate=config.FRAME_RATE,
-            buffer_all=False,
-            try_to_reconnect=False
-        )
-        
-        cam_right = video_thread.VideoThread(
-            video_source=config.RIGHT_CAMERA_SOURCE,
-            video_width=config.PIXEL_WIDTH,
-            video_height=config.PIXEL_HEIGHT,
-            video_frame_rate=config.FRAME_RATE,
-            buffer_all=False,
-            try_to_reconnect=False
-        )
+        if replay_dir:
+            # Reproducir una sesión grabada (mismo input en cada corrida)
+            print(f"Reproduciendo sesión: {replay_dir}")
+            cam_left = ReplayVideoThread(replay_dir, side='left')
+            cam_right = ReplayVideoThread(replay_dir, side='right')
+        else:
+            # Inicializar cámaras
+            print("Inicializando cámaras...")
+            cam_left = video_thread.VideoThread(
+                video_source=config.LEFT_CAMERA_SOURCE,
+                video_width=config.PIXEL_WIDTH,
+                video_height=config.PIXEL_HEIGHT,
+                video_frame_rate=config.FRAME_RATE,
+                buffer_all=False,
+                try_to_reconnect=False
+            )
+            
+            cam_right = video_thread.VideoThread(
+                video_source=config.RIGHT_CAMERA_SOURCE,
+                video_width=config.PIXEL_WIDTH,
+                video_height=config.PIXEL_HEIGHT,
+                video_frame_rate=config.FRAME_RATE,
+                buffer_all=False,
+                try_to_reconnect=False
+            )
         
         if not cam_left.is_available() or not cam_right.is_available():
             print("✗ Error: No se pudieron inicializar las cámaras")
@@ -302,4 +315,4 @@ def test_stereo_depth():
 
 
 if __name__ == '__main__':
-    test_stereo_depth()
+    test_stereo_depth(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la triangulación por lotes (DepthEstimator.triangulate_many)
+Con la calibración del repositorio verifica que:
+- las matrices de proyección se calculen una vez al cargar,
+- triangulate_many dé lo mismo que cv2.triangulatePoints y que la DLT
+  por punto (triangulate_point_DLT),
+- la máscara de validez marque los puntos detrás de la cámara,
+- y mida el costo por frame de triangular 10 yemas: DLT por punto con
+  scipy (implementación anterior), triangulate_many con y sin
+  rectificación y cv2.triangulatePoints.
+No requiere cámaras.
+
+Uso: python -m tests.test_triangulate_many
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from scipy import linalg
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.vision.depth_estimator import DepthEstimator
+from tests.test_point_rectification import _project_distorted, _world_points
+from tests.test_stereo_band import CALIBRATION_FILE, _project
+
+
+def _triangulate_per_point(estimator, points_left, points_right):
+    """DLT anterior: matrices por llamada y una SVD de scipy por punto"""
+    results = []
+    for (x1, y1), (x2, y2) in zip(points_left, points_right):
+        P0, P1 = estimator._get_projection_matrices_for_DLT()
+        A = np.array([y1 * P0[2, :] - P0[1, :], P0[0, :] - x1 * P0[2, :],
+                      y2 * P1[2, :] - P1[1, :], P1[0, :] - x2 * P1[2, :]],
+                     dtype=np.float32)
+        _, _, Vh = linalg.svd(A.T @ A, full_matrices=False)
+        X = Vh[3, :3] / Vh[3, 3] * 100
+        results.append((X[0], X[1], X[2] * estimator.DEPTH_CORRECTION_FACTOR)
+                       if X[2] > 0 else None)
+    return results
+
+
+def _time_ms(function, n=500):
+    start = time.perf_counter()
+    for _ in range(n):
+        function()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def test_matches_references():
+    """Mismo resultado que cv2.triangulatePoints y la DLT por punto"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    P0, P1 = estimator._get_projection_matrices_for_DLT()
+    assert np.array_equal(estimator.P0_dlt, P0)
+    assert np.array_equal(estimator.P1_dlt, P1)
+
+    points = _world_points()
+    left, right = _project(estimator, points * 100.0)
+    result, valid = estimator.triangulate_many(left, right, rectify=False)
+    assert result.shape == (len(points), 3) and valid.all()
+
+    homogeneous = cv2.triangulatePoints(P0.astype(np.float64),
+                                        P1.astype(np.float64),
+                                        left.T, right.T)
+    expected = (homogeneous[:3] / homogeneous[3]).T * 100.0
+    expected[:, 2] *= estimator.DEPTH_CORRECTION_FACTOR
+    assert np.allclose(result, expected, atol=1e-3)
+
+    single = np.array([estimator.triangulate_point_DLT(a, b)
+                       for a, b in zip(left, right)])
+    assert np.allclose(single, result)
+    previous = np.array(_triangulate_per_point(estimator, left, right))
+    assert np.allclose(previous, result, atol=0.05)
+    print("✓ triangulate_many == cv2.triangulatePoints == DLT por punto")
+
+
+def test_validity_mask():
+    """Puntos detrás de la cámara: inválidos y en 0"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    points = np.array([[0.0, 0.0, 50.0], [5.0, 2.0, -40.0], [-3.0, 1.0, 35.0]])
+    left, right = _project(estimator, points)
+    result, valid = estimator.triangulate_many(left, right, rectify=False)
+    assert valid.tolist() == [True, False, True]
+    assert not result[1].any()
+    assert estimator.batch_triangulate(left, right)[1] is None
+    assert estimator.triangulate_point_DLT(left[1], right[1]) is None
+
+    empty, empty_valid = estimator.triangulate_many(np.empty((0, 2)),
+                                                    np.empty((0, 2)))
+    assert empty.shape == (0, 3) and empty_valid.shape == (0,)
+    try:
+        estimator.triangulate_many(left, right[:2])
+        assert False, "debía rechazar listas de distinto largo"
+    except ValueError:
+        pass
+    print("✓ Máscara de validez (punto detrás de la cámara)")
+
+
+def test_cost_per_frame():
+    """Costo por frame de triangular 10 yemas"""
+    estimator = DepthEstimator(CALIBRATION_FILE)
+    points = _world_points(n=10)
+    # ruido de landmark: sin él las filas rectificadas coinciden exactamente
+    # y el sistema degenerado hace iterar de más a la SVD de OpenCV
+    rng = np.random.default_rng(0)
+    left = _project_distorted(estimator, points, True) + \
+        rng.normal(0, 0.5, (10, 2))
+    right = _project_distorted(estimator, points, False) + \
+        rng.normal(0, 0.5, (10, 2))
+    P0, P1 = estimator.P0_dlt.astype(np.float64), \
+        estimator.P1_dlt.astype(np.float64)
+
+    per_point_ms = _time_ms(lambda: _triangulate_per_point(estimator, left,
+                                                           right))
+    many_ms = _time_ms(lambda: estimator.triangulate_many(left, right,
+                                                          rectify=False))
+    rectified_ms = _time_ms(lambda: estimator.triangulate_many(left, right))
+    opencv_ms = _time_ms(lambda: cv2.triangulatePoints(P0, P1, left.T,
+                                                       right.T))
+    assert many_ms < per_point_ms
+    print(f"✓ 10 yemas por frame: por punto {per_point_ms:.3f} ms, "
+          f"triangulate_many {many_ms:.3f} ms "
+          f"({rectified_ms:.3f} ms rectificando), "
+          f"cv2.triangulatePoints {opencv_ms:.3f} ms")
+
+
+if __name__ == '__main__':
+    test_matches_references()
+    test_validity_mask()
+    test_cost_per_frame()